@@ -2,11 +2,11 @@ from fastapi import APIRouter, Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordBearer, OAuth2PasswordRequestForm
 from sqlalchemy.orm import Session
 from app.core.database import get_db
-from app.core.security import verify_password, create_access_token, create_refresh_token, verify_token
+from app.core.security import verify_and_update_password, verify_token
+from app.core.tokens import TokenClaims
+from app.deps import issue_tokens, rotate_tokens, token_revocations
 from app.models import User, Membership, MembershipRole
 from app.schemas import Token, UserCreate, User as UserSchema
-from datetime import timedelta
-from app.core.config import settings
 
 router = APIRouter()
 
@@ -21,8 +21,16 @@ def authenticate_user(db: Session, email: str, password: str):
     user = get_user_by_email(db, email)
     if not user:
         return False
-    if not verify_password(password, user.hashed_password):
+    hashed_password = user.hashed_password
+    # Hand the connection back to the pool while bcrypt runs
+    db.rollback()
+    verified, new_hash = verify_and_update_password(password, hashed_password)
+    if not verified:
         return False
+    if new_hash:
+        # Stored hash predates the current BCRYPT_ROUNDS
+        user.hashed_password = new_hash
+        db.commit()
     return user
 
 
@@ -33,12 +41,11 @@ def get_current_user(token: str = Depends(oauth2_scheme), db: Session = Depends(
         headers={"WWW-Authenticate": "Bearer"},
     )
     
-    payload = verify_token(token)
-    user_id: int = payload.get("sub")
-    if user_id is None:
+    claims = TokenClaims.from_payload(verify_token(token))
+    if claims is None or not token_revocations.is_current(claims):
         raise credentials_exception
     
-    user = db.query(User).filter(User.id == user_id).first()
+    user = db.query(User).filter(User.id == claims.user_id).first()
     if user is None:
         raise credentials_exception
     return user
@@ -86,53 +93,12 @@ def login_for_access_token(form_data: OAuth2PasswordRequestForm = Depends(), db:
             headers={"WWW-Authenticate": "Bearer"},
         )
     
-    access_token_expires = timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES)
-    access_token = create_access_token(
-        data={"sub": str(user.id)}, expires_delta=access_token_expires
-    )
-    refresh_token = create_refresh_token(data={"sub": str(user.id)})
-    
-    return {
-        "access_token": access_token,
-        "refresh_token": refresh_token,
-        "token_type": "bearer"
-    }
+    return issue_tokens(user, db)
 
 
 @router.post("/refresh", response_model=Token)
 def refresh_token(refresh_token: str, db: Session = Depends(get_db)):
-    try:
-        payload = verify_token(refresh_token)
-        if payload.get("type") != "refresh":
-            raise HTTPException(
-                status_code=status.HTTP_401_UNAUTHORIZED,
-                detail="Invalid token type"
-            )
-        
-        user_id = payload.get("sub")
-        user = db.query(User).filter(User.id == user_id).first()
-        if not user:
-            raise HTTPException(
-                status_code=status.HTTP_401_UNAUTHORIZED,
-                detail="User not found"
-            )
-        
-        access_token_expires = timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES)
-        access_token = create_access_token(
-            data={"sub": str(user.id)}, expires_delta=access_token_expires
-        )
-        new_refresh_token = create_refresh_token(data={"sub": str(user.id)})
-        
-        return {
-            "access_token": access_token,
-            "refresh_token": new_refresh_token,
-            "token_type": "bearer"
-        }
-    except Exception as e:
-        raise HTTPException(
-            status_code=status.HTTP_401_UNAUTHORIZED,
-            detail="Invalid refresh token"
-        )
+    return rotate_tokens(refresh_token, db)
 
 
 @router.get("/me", response_model=UserSchema)
@@ -1,10 +1,14 @@
 from fastapi import APIRouter, Depends, HTTPException, Request
+from fastapi.concurrency import run_in_threadpool
 from sqlalchemy.orm import Session
 from app.core.database import get_db
 from app.models import Donation, Cause, User, DonationStatus
 from app.schemas import DonationCreate, Donation as DonationSchema, DonationUpdate
 from app.api.v1.endpoints.auth import get_current_active_user
 from app.core.config import settings
+from app.core.metrics import payment_gateway_duration, webhook_queue_depth
+from app.services.donation_capture import DonationCapture
+from app.services.payment import PaymentService
 import razorpay
 import json
 from decimal import Decimal
@@ -19,6 +23,8 @@ if settings.PAYMENT_PROVIDER == "razorpay" and settings.RAZORPAY_KEY_ID and sett
 else:
     razorpay_client = None
 
+donation_capture = DonationCapture()
+
 
 @router.post("/donations/init")
 def init_donation(
@@ -62,7 +68,8 @@ def init_donation(
         }
         
         try:
-            order = razorpay_client.order.create(data=order_data)
+            with payment_gateway_duration.time("create_order"):
+                order = razorpay_client.order.create(data=order_data)
             
             # Update donation with order ID
             db_donation.pg_order_id = order["id"]
@@ -92,17 +99,45 @@ def init_donation(
         }
 
 
+def process_webhook(webhook_data: dict, signature: str, db: Session):
+    """Apply a verified webhook event; blocking, so it runs in the threadpool"""
+    payment_data = webhook_data.get("payload", {}).get("payment", {})
+    order_id = payment_data.get("order_id")
+    if not order_id:
+        return
+
+    if webhook_data.get("event") == "payment.captured":
+        captured = donation_capture.capture(
+            db,
+            order_id,
+            payment_id=payment_data.get("id"),
+            signature=signature,
+            audit=webhook_data
+        )
+        if captured:
+            PaymentService.publish_progress(captured, db)
+
+    elif webhook_data.get("event") == "payment.failed":
+        donation = db.query(Donation).filter(Donation.pg_order_id == order_id).first()
+        if donation:
+            donation.status = DonationStatus.FAILED
+            donation.pg_payment_id = payment_data.get("id")
+            donation.audit_json = webhook_data
+            db.commit()
+
+
 @router.post("/donations/webhook")
-def donation_webhook(request: Request, db: Session = Depends(get_db)):
+async def donation_webhook(request: Request, db: Session = Depends(get_db)):
     """Handle Razorpay webhook for payment status updates"""
-    body = request.body()
+    body = await request.body()
     headers = dict(request.headers)
+    signature = headers.get("x-razorpay-signature", "")
     
     if razorpay_client and settings.PAYMENT_PROVIDER == "razorpay":
         # Verify webhook signature
         try:
             razorpay_client.utility.verify_webhook_signature(
-                body, headers.get("X-Razorpay-Signature", ""), settings.RAZORPAY_KEY_SECRET
+                body.decode(), signature, settings.RAZORPAY_KEY_SECRET
             )
         except Exception as e:
             raise HTTPException(status_code=400, detail="Invalid webhook signature")
@@ -113,37 +148,9 @@ def donation_webhook(request: Request, db: Session = Depends(get_db)):
     except:
         raise HTTPException(status_code=400, detail="Invalid JSON")
     
-    # Handle payment events
-    if webhook_data.get("event") == "payment.captured":
-        payment_data = webhook_data.get("payload", {}).get("payment", {})
-        order_id = payment_data.get("order_id")
-        
-        if order_id:
-            donation = db.query(Donation).filter(Donation.pg_order_id == order_id).first()
-            if donation:
-                donation.status = DonationStatus.CAPTURED
-                donation.pg_payment_id = payment_data.get("id")
-                donation.pg_signature = headers.get("X-Razorpay-Signature", "")
-                donation.audit_json = webhook_data
-                
-                # Update cause raised amount
-                cause = db.query(Cause).filter(Cause.id == donation.cause_id).first()
-                if cause:
-                    cause.raised_amount += donation.amount
-                
-                db.commit()
-    
-    elif webhook_data.get("event") == "payment.failed":
-        payment_data = webhook_data.get("payload", {}).get("payment", {})
-        order_id = payment_data.get("order_id")
-        
-        if order_id:
-            donation = db.query(Donation).filter(Donation.pg_order_id == order_id).first()
-            if donation:
-                donation.status = DonationStatus.FAILED
-                donation.pg_payment_id = payment_data.get("id")
-                donation.audit_json = webhook_data
-                db.commit()
+    # Waiting for a threadpool slot counts towards the queue depth
+    with webhook_queue_depth.track():
+        await run_in_threadpool(process_webhook, webhook_data, signature, db)
     
     return {"status": "success"}
 
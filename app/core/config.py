@@ -15,6 +15,8 @@ class Settings(BaseSettings):
     ALGORITHM: str = "HS256"
     ACCESS_TOKEN_EXPIRE_MINUTES: int = 30
     REFRESH_TOKEN_EXPIRE_DAYS: int = 7
+    # Seconds before a worker picks up token revocations made by another
+    TOKEN_REVOCATION_TTL: int = 30
     
     # CORS - Store as string, will be parsed to list
     # Default to localhost for development, override in production
@@ -34,6 +36,35 @@ class Settings(BaseSettings):
     RAZORPAY_KEY_ID: str = ""
     RAZORPAY_KEY_SECRET: str = ""
     
+    # Password hashing: bcrypt cost, hashing processes (0 = inline) and how
+    # many logins may wait for them before new ones get 429
+    BCRYPT_ROUNDS: int = 12
+    PASSWORD_HASH_WORKERS: int = 2
+    PASSWORD_HASH_QUEUE: int = 16
+    
+    # Public catalogue cache (seconds clients may reuse a listing)
+    CATALOGUE_MAX_AGE: int = 60
+    
+    # Redis for the marketplace ranked feeds, shared by workers ("" = per worker)
+    REDIS_URL: str = ""
+    
+    # Requests whose slowest SQL statement takes this long (ms) log it at WARNING
+    SLOW_QUERY_MS: int = 200
+    
+    # /metrics: SQLite file every worker writes its metrics to ("" = this
+    # worker only) and how often (seconds) each worker writes
+    METRICS_PATH: str = ""
+    METRICS_FLUSH_INTERVAL: float = 5.0
+    
+    # Stack sampling profiler: GET /admin/profile for platform admins, and
+    # ?__profile=1 on any request carrying X-Profile-Token ("" = off)
+    PROFILING_ENABLED: bool = False
+    PROFILE_TOKEN: str = ""
+    
+    # Event loop stalls at least this long (ms) are logged with the blocking
+    # stack and route (0 = off)
+    LOOP_BLOCK_MS: int = 100
+    
     # Application
     DEBUG: bool = False
     LOG_LEVEL: str = "INFO"
@@ -0,0 +1,180 @@
+import asyncio
+import json
+import logging
+import sys
+import threading
+import time
+import traceback
+import weakref
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import TYPE_CHECKING, Iterator, List, Optional, Tuple
+
+from starlette.types import ASGIApp, Receive, Scope, Send
+
+from app.core.profiler import short_path
+
+if TYPE_CHECKING:  # app.core.metrics needs the app settings, simple_backend has none
+    from app.core.metrics import Histogram
+
+logger = logging.getLogger(__name__)
+
+# The request each task serves: set in the task that runs the middleware,
+# inherited by tasks it starts through the task factory below
+_request_scope: ContextVar[Optional[dict]] = ContextVar("loop_monitor_scope", default=None)
+_task_scopes: "weakref.WeakKeyDictionary[asyncio.Task, dict]" = weakref.WeakKeyDictionary()
+
+
+@contextmanager
+def request_context(scope: dict) -> Iterator[None]:
+    """Blame loop stalls in the current task, and tasks it starts, on request ``scope``"""
+    token = _request_scope.set(scope)
+    task = asyncio.current_task()
+    if task is not None:
+        _task_scopes[task] = scope
+    try:
+        yield
+    finally:
+        if task is not None:
+            _task_scopes.pop(task, None)
+        _request_scope.reset(token)
+
+
+class LoopMonitorMiddleware:
+    """Lets ``LoopMonitor`` name the request behind an event loop stall.
+
+    Add it last (outermost), so stalls in the other middleware are
+    attributed too. It lives here rather than in ``app.middleware``, whose
+    package imports the database settings that simple_backend lacks.
+    """
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        with request_context(scope):
+            await self.app(scope, receive, send)
+
+
+def _route(scope: Optional[dict]) -> Tuple[str, str]:
+    """Route for the log (template, else raw path) and for metrics (template, else ``unmatched``)"""
+    if scope is None:
+        return "", "unmatched"
+    route = scope.get("route")
+    if route is not None:
+        return route.path, route.path
+    return scope["path"], "unmatched"
+
+
+class LoopMonitor:
+    """Finds callbacks that block the event loop, and what they were doing.
+
+    A heartbeat task wakes every ``interval`` seconds and records how late
+    it ran into ``lag``. A watchdog thread checks the heartbeat; once it is
+    ``threshold_ms`` overdue the loop is stuck in one callback, so the
+    watchdog logs the loop thread's stack right then, with the request
+    being served, at WARNING. When the loop gets going again the whole
+    stall goes into ``blocked`` by route. Stalls shorter than a watchdog
+    poll only reach the metric, as ``unmatched``.
+
+    Requests are attributed through ``request_context`` plus a task
+    factory, so tasks spawned by middleware and task groups count too.
+    """
+
+    def __init__(
+        self, threshold_ms: float = 100, interval: float = 0.05, stack_depth: int = 30,
+        lag: Optional["Histogram"] = None, blocked: Optional["Histogram"] = None
+    ):
+        self.threshold = threshold_ms / 1000
+        self.interval = interval
+        self.stack_depth = stack_depth
+        self.lag = lag
+        self.blocked = blocked
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._loop_thread: Optional[int] = None
+        self._previous_factory = None
+        self._heartbeat_task: Optional[asyncio.Task] = None
+        self._watchdog: Optional[threading.Thread] = None
+        self._stop = threading.Event()
+        self._tick = 0.0
+        self._stall: Optional[Tuple[float, str]] = None
+
+    def start(self):
+        """Begin watching the running loop; call from a startup hook"""
+        if self.threshold <= 0 or self._loop is not None:
+            return
+        self._loop = asyncio.get_running_loop()
+        self._loop_thread = threading.get_ident()
+        self._previous_factory = self._loop.get_task_factory()
+        self._loop.set_task_factory(self._task_factory)
+        self._tick = time.monotonic()
+        self._heartbeat_task = self._loop.create_task(self._heartbeat())
+        self._stop.clear()
+        self._watchdog = threading.Thread(target=self._watch, name="loop-watchdog", daemon=True)
+        self._watchdog.start()
+
+    def stop(self):
+        if self._loop is None:
+            return
+        self._stop.set()
+        self._watchdog.join()
+        self._heartbeat_task.cancel()
+        self._loop.set_task_factory(self._previous_factory)
+        self._loop = self._watchdog = self._heartbeat_task = None
+
+    def _task_factory(self, loop, coro, **kwargs):
+        if self._previous_factory is not None:
+            task = self._previous_factory(loop, coro, **kwargs)
+        else:
+            task = asyncio.Task(coro, loop=loop, **kwargs)
+        context = kwargs.get("context")
+        scope = context.get(_request_scope) if context is not None else _request_scope.get()
+        if scope is not None:
+            _task_scopes[task] = scope
+        return task
+
+    async def _heartbeat(self):
+        while True:
+            await asyncio.sleep(self.interval)
+            now = time.monotonic()
+            lag = max(now - self._tick - self.interval, 0.0)
+            if self.lag is not None:
+                self.lag.observe(lag)
+            if lag >= self.threshold and self.blocked is not None:
+                stall = self._stall
+                self.blocked.observe(lag, stall[1] if stall and stall[0] == self._tick else "unmatched")
+            self._tick = now
+
+    def _watch(self):
+        poll = min(max(self.threshold / 4, 0.005), self.interval)
+        while not self._stop.wait(poll):
+            tick = self._tick
+            overdue = time.monotonic() - tick - self.interval
+            if overdue >= self.threshold and (self._stall is None or self._stall[0] != tick):
+                self._stall = (tick, self._report(overdue))
+
+    def _report(self, overdue: float) -> str:
+        task = asyncio.current_task(self._loop)
+        scope = _task_scopes.get(task) if task is not None else None
+        route, label = _route(scope)
+        frame = sys._current_frames().get(self._loop_thread)
+        logger.warning(json.dumps({
+            "event": "event_loop_blocked",
+            "method": scope["method"] if scope else None,
+            "route": route or None,
+            "blocked_ms": round(overdue * 1000, 1),
+            "task": task.get_name() if task is not None else None,
+            "stack": self._stack(frame)
+        }))
+        return label
+
+    def _stack(self, frame) -> List[str]:
+        if frame is None:
+            return []
+        return [
+            f"{short_path(entry.filename)}:{entry.lineno} in {entry.name}"
+            for entry in traceback.extract_stack(frame, limit=None)[-self.stack_depth:]
+        ]
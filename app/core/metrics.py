@@ -0,0 +1,308 @@
+import bisect
+import json
+import math
+import os
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Tuple
+
+Labels = Tuple[str, ...]
+
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+def _format_value(value: float) -> str:
+    if value == math.inf:
+        return "+Inf"
+    return repr(float(value)) if not float(value).is_integer() else str(int(value))
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _label_text(names: Iterable[str], values: Iterable[str]) -> str:
+    pairs = [f'{name}="{_escape(str(value))}"' for name, value in zip(names, values)]
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+class _Metric:
+    type = ""
+
+    def __init__(self, name: str, documentation: str, labelnames: Iterable[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._values: Dict[Labels, object] = {}
+        self._lock = threading.Lock()
+
+    def samples(self) -> Dict[Labels, object]:
+        with self._lock:
+            return {labels: self._copy(value) for labels, value in self._values.items()}
+
+    @staticmethod
+    def _copy(value):
+        return value
+
+    def render(self, samples: Dict[Labels, object]) -> List[str]:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.type}"]
+        for labels, value in sorted(samples.items()):
+            lines.append(f"{self.name}{_label_text(self.labelnames, labels)} {_format_value(value)}")
+        return lines
+
+    @staticmethod
+    def merge(values: List[object]) -> object:
+        return sum(values)
+
+
+class Counter(_Metric):
+    type = "counter"
+
+    def inc(self, *labels: str, amount: float = 1.0):
+        with self._lock:
+            self._values[labels] = self._values.get(labels, 0.0) + amount
+
+
+class Gauge(_Metric):
+    """A value that goes up and down; ``collect`` computes it at scrape time instead"""
+
+    type = "gauge"
+
+    def __init__(self, name: str, documentation: str, labelnames: Iterable[str] = (), collect: Optional[Callable[[], Dict[Labels, float]]] = None):
+        super().__init__(name, documentation, labelnames)
+        self.collect = collect
+
+    def inc(self, *labels: str, amount: float = 1.0):
+        with self._lock:
+            self._values[labels] = self._values.get(labels, 0.0) + amount
+
+    def dec(self, *labels: str, amount: float = 1.0):
+        self.inc(*labels, amount=-amount)
+
+    def set(self, value: float, *labels: str):
+        with self._lock:
+            self._values[labels] = value
+
+    @contextmanager
+    def track(self, *labels: str) -> Iterator[None]:
+        self.inc(*labels)
+        try:
+            yield
+        finally:
+            self.dec(*labels)
+
+    def samples(self) -> Dict[Labels, object]:
+        if self.collect is not None:
+            return dict(self.collect())
+        return super().samples()
+
+
+class Histogram(_Metric):
+    """Cumulative buckets, sum and count, as Prometheus histograms expect.
+
+    Per label set the state is one list: a count per bucket (not yet
+    cumulative, so an observation touches one slot), then sum and count.
+    """
+
+    type = "histogram"
+
+    def __init__(self, name: str, documentation: str, labelnames: Iterable[str] = (), buckets: Iterable[float] = DEFAULT_BUCKETS):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets)) + (math.inf,)
+
+    def observe(self, value: float, *labels: str):
+        slot = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            state = self._values.get(labels)
+            if state is None:
+                state = self._values[labels] = [0] * len(self.buckets) + [0.0, 0]
+            state[slot] += 1
+            state[-2] += value
+            state[-1] += 1
+
+    @contextmanager
+    def time(self, *labels: str) -> Iterator[None]:
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - started, *labels)
+
+    @staticmethod
+    def _copy(value):
+        return list(value)
+
+    @staticmethod
+    def merge(values: List[list]) -> list:
+        return [sum(column) for column in zip(*values)]
+
+    def render(self, samples: Dict[Labels, list]) -> List[str]:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.type}"]
+        names = self.labelnames + ("le",)
+        for labels, state in sorted(samples.items()):
+            cumulative = 0
+            for bound, count in zip(self.buckets, state):
+                cumulative += count
+                lines.append(f"{self.name}_bucket{_label_text(names, labels + (_format_value(bound),))} {cumulative}")
+            lines.append(f"{self.name}_sum{_label_text(self.labelnames, labels)} {_format_value(state[-2])}")
+            lines.append(f"{self.name}_count{_label_text(self.labelnames, labels)} {state[-1]}")
+        return lines
+
+
+class MetricsRegistry:
+    """Metrics of one process, merged with the other workers' when rendering.
+
+    Each worker keeps its metrics in memory. With ``path`` set, it writes a
+    snapshot into a SQLite file shared by all workers every
+    ``flush_interval`` seconds (from a background thread) and when
+    scraped; a scrape renders the sum over every worker's latest snapshot.
+    Counters and histograms of workers that exited are kept, so totals
+    never go backwards; gauges of workers that stopped writing for
+    ``stale_after`` seconds are dropped.
+    """
+
+    def __init__(self, path: str = "", flush_interval: float = 5.0, stale_after: Optional[float] = None):
+        self.path = path
+        self.flush_interval = flush_interval
+        self.stale_after = stale_after if stale_after is not None else 3 * flush_interval
+        self.metrics: Dict[str, _Metric] = {}
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._conn: Optional[sqlite3.Connection] = None
+        self._conn_lock = threading.Lock()
+        self._pid: Optional[int] = None
+        self._worker_id = ""
+
+    @property
+    def worker_id(self) -> str:
+        # pid plus start time: a restarted worker reusing a pid must not overwrite its predecessor's totals
+        if self._pid != os.getpid():
+            self._pid = os.getpid()
+            self._worker_id = f"{self._pid}-{time.time():.6f}"
+        return self._worker_id
+
+    def _register(self, metric: _Metric) -> _Metric:
+        if metric.name in self.metrics:
+            raise ValueError(f"Metric {metric.name} is already registered")
+        self.metrics[metric.name] = metric
+        return metric
+
+    def counter(self, name: str, documentation: str, labelnames: Iterable[str] = ()) -> Counter:
+        return self._register(Counter(name, documentation, labelnames))
+
+    def gauge(self, name: str, documentation: str, labelnames: Iterable[str] = (), collect=None) -> Gauge:
+        return self._register(Gauge(name, documentation, labelnames, collect))
+
+    def histogram(self, name: str, documentation: str, labelnames: Iterable[str] = (), buckets: Iterable[float] = DEFAULT_BUCKETS) -> Histogram:
+        return self._register(Histogram(name, documentation, labelnames, buckets))
+
+    def snapshot(self) -> Dict[str, list]:
+        return {name: [[list(labels), value] for labels, value in metric.samples().items()] for name, metric in self.metrics.items()}
+
+    def render(self) -> str:
+        """Prometheus text exposition format 0.0.4"""
+        snapshots = self._shared_snapshots() if self.path else [(self.snapshot(), True)]
+        lines = []
+        for name, metric in self.metrics.items():
+            merged: Dict[Labels, List[object]] = {}
+            for snapshot, live in snapshots:
+                if isinstance(metric, Gauge) and not live:
+                    continue
+                for labels, value in snapshot.get(name, ()):
+                    merged.setdefault(tuple(labels), []).append(value)
+            lines.extend(metric.render({labels: metric.merge(values) for labels, values in merged.items()}))
+        return "\n".join(lines) + "\n"
+
+    def start(self):
+        """Begin writing this worker's snapshots, if metrics are shared"""
+        if not self.path or self._thread is not None:
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._flush_loop, name="metrics-flush", daemon=True)
+        self._thread.start()
+
+    def shutdown(self):
+        """Write the last snapshot without gauges, so the worker's totals survive it"""
+        if self._thread is not None:
+            self._stop.set()
+            self._thread.join()
+            self._thread = None
+        if self.path:
+            self.flush(final=True)
+
+    def flush(self, final: bool = False):
+        snapshot = self.snapshot()
+        if final:
+            snapshot = {name: values for name, values in snapshot.items() if not isinstance(self.metrics[name], Gauge)}
+        with self._conn_lock:
+            self._connection().execute(
+                "INSERT OR REPLACE INTO worker_metrics (worker, written_at, live, data) VALUES (?, ?, ?, ?)",
+                (self.worker_id, time.time(), not final, json.dumps(snapshot))
+            )
+
+    def _flush_loop(self):
+        while not self._stop.wait(self.flush_interval):
+            try:
+                self.flush()
+            except sqlite3.Error:
+                pass
+
+    def _shared_snapshots(self) -> List[Tuple[dict, bool]]:
+        self.flush()
+        stale_before = time.time() - self.stale_after
+        with self._conn_lock:
+            rows = self._connection().execute("SELECT worker, written_at, live, data FROM worker_metrics").fetchall()
+        return [
+            (json.loads(data), bool(live) and (worker == self.worker_id or written_at >= stale_before))
+            for worker, written_at, live, data in rows
+        ]
+
+    def _connection(self) -> sqlite3.Connection:
+        if self._conn is None:
+            self._conn = sqlite3.connect(self.path, timeout=5.0, isolation_level=None, check_same_thread=False)
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS worker_metrics ("
+                "worker TEXT PRIMARY KEY, written_at REAL NOT NULL, live INTEGER NOT NULL, data TEXT NOT NULL)"
+            )
+        return self._conn
+
+
+def _pool_connections() -> Dict[Labels, float]:
+    from app.core.database import engine
+
+    pool = engine.pool
+    if not hasattr(pool, "checkedout"):
+        return {}
+    return {
+        ("size",): pool.size(),
+        ("checked_out",): pool.checkedout(),
+        ("idle",): pool.checkedin(),
+        ("overflow",): max(pool.overflow(), 0)
+    }
+
+
+def _registry() -> MetricsRegistry:
+    from app.core.config import settings
+
+    return MetricsRegistry(settings.METRICS_PATH, settings.METRICS_FLUSH_INTERVAL)
+
+
+registry = _registry()
+http_requests = registry.counter("http_requests_total", "HTTP requests by route and status", ("method", "route", "status"))
+http_request_duration = registry.histogram("http_request_duration_seconds", "HTTP request latency by route", ("method", "route"))
+http_requests_in_flight = registry.gauge("http_requests_in_flight", "HTTP requests being served")
+db_pool_connections = registry.gauge("db_pool_connections", "Database pool connections by state", ("state",), collect=_pool_connections)
+payment_gateway_duration = registry.histogram(
+    "payment_gateway_request_duration_seconds", "Payment gateway API call latency", ("operation",)
+)
+webhook_queue_depth = registry.gauge("payment_webhook_queue_depth", "Payment webhooks received and not yet processed")
+event_loop_lag = registry.histogram(
+    "event_loop_lag_seconds", "How late the event loop ran a timer due now",
+    buckets=(0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0)
+)
+event_loop_blocked = registry.histogram(
+    "event_loop_blocked_seconds", "Event loop stalls over LOOP_BLOCK_MS by the route that caused them", ("route",)
+)
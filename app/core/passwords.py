@@ -0,0 +1,111 @@
+import multiprocessing
+import threading
+from concurrent.futures import Executor, ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Optional, Tuple
+
+from passlib.context import CryptContext
+
+# Set in each pool worker by _init_worker, or lazily for inline hashing
+_context: Optional[CryptContext] = None
+
+
+class PasswordPoolBusy(Exception):
+    """Raised when more hashing work is queued than the pool accepts"""
+
+
+def make_context(rounds: int) -> CryptContext:
+    # Pinning min and max to the configured cost makes hashes made with any
+    # other cost report needs_update, so they are rehashed at next login
+    return CryptContext(
+        schemes=["bcrypt"],
+        deprecated="auto",
+        bcrypt__rounds=rounds,
+        bcrypt__min_rounds=rounds,
+        bcrypt__max_rounds=rounds
+    )
+
+
+def _init_worker(rounds: int):
+    global _context
+    _context = make_context(rounds)
+
+
+def _hash(password: str) -> str:
+    return _context.hash(password)
+
+
+def _verify(password: str, hashed: str) -> Tuple[bool, Optional[str]]:
+    """(matches, new hash if the stored one was made with another cost)"""
+    return _context.verify_and_update(password, hashed)
+
+
+class PasswordPool:
+    """Runs bcrypt on a small process pool so it never holds up request threads.
+
+    bcrypt is deliberately slow (~250 ms at cost 12). Run inline it occupies
+    a request thread and competes for the GIL with everything else the
+    worker serves. Here hashing runs in ``workers`` separate processes; at
+    most ``max_pending`` calls may be queued or running at once and further
+    calls raise ``PasswordPoolBusy`` straight away, so a login storm is shed
+    instead of piling up. ``workers=0`` hashes inline (scripts and tests).
+    """
+
+    def __init__(self, workers: int = 2, max_pending: int = 16, rounds: int = 12):
+        self.workers = workers
+        self.max_pending = max_pending
+        self.rounds = rounds
+        self._executor: Optional[Executor] = None
+        self._lock = threading.Lock()
+        self._pending = 0
+
+    @property
+    def pending(self) -> int:
+        return self._pending
+
+    def hash(self, password: str) -> str:
+        return self._run(_hash, password)
+
+    def verify(self, password: str, hashed: str) -> Tuple[bool, Optional[str]]:
+        """Check ``password``; also returns a rehash when the cost setting changed"""
+        return self._run(_verify, password, hashed)
+
+    def shutdown(self):
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=False, cancel_futures=True)
+
+    def _run(self, fn, *args):
+        if self.workers <= 0:
+            global _context
+            if _context is None or _context.handler("bcrypt").default_rounds != self.rounds:
+                _context = make_context(self.rounds)
+            return fn(*args)
+
+        with self._lock:
+            if self._pending >= self.max_pending:
+                raise PasswordPoolBusy(f"{self._pending} password operations already pending")
+            self._pending += 1
+            if self._executor is None:
+                # spawn, not fork: the server process has threads and open sockets
+                self._executor = ProcessPoolExecutor(
+                    max_workers=self.workers,
+                    mp_context=multiprocessing.get_context("spawn"),
+                    initializer=_init_worker,
+                    initargs=(self.rounds,)
+                )
+            executor = self._executor
+        try:
+            return executor.submit(fn, *args).result()
+        except BrokenProcessPool:
+            # A worker died (e.g. OOM-killed); the pool refuses all further
+            # work, so drop it and let the next call start a fresh one
+            with self._lock:
+                if self._executor is executor:
+                    self._executor = None
+            executor.shutdown(wait=False, cancel_futures=True)
+            raise
+        finally:
+            with self._lock:
+                self._pending -= 1
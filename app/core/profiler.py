@@ -0,0 +1,159 @@
+import json
+import os
+import sys
+import sysconfig
+import threading
+import time
+from collections import Counter
+from typing import Dict, List, Optional, Tuple
+
+Frame = Tuple[str, str, int]  # (function, file, line)
+Stack = Tuple[Frame, ...]
+
+# Innermost frames in these files mean the thread is parked, not working:
+# pool workers waiting for jobs, the event loop waiting for I/O (uvloop
+# waits in C, under asyncio.run)
+_IDLE_FILES = ("threading.py", "queue.py", "selectors.py", os.path.join("asyncio", "runners.py"))
+_ROOT = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+_LIBRARY_ROOTS = sorted({sysconfig.get_paths()[name] for name in ("purelib", "platlib", "stdlib")}, key=len, reverse=True)
+
+
+class ProfilerBusy(Exception):
+    """Another profile is being taken in this process"""
+
+
+def short_path(path: str) -> str:
+    """Path relative to the project, site-packages or the standard library"""
+    for prefix in (_ROOT, *_LIBRARY_ROOTS):
+        if path.startswith(prefix + os.sep):
+            return os.path.relpath(path, prefix)
+    return path
+
+
+class Profile:
+    """Stack samples per thread, exported as collapsed stacks or for speedscope"""
+
+    def __init__(self, samples: Dict[Tuple[str, Stack], int], idle: int, interval: float, duration: float):
+        self.samples = samples
+        self.idle = idle
+        self.interval = interval
+        self.duration = duration
+
+    @property
+    def sample_count(self) -> int:
+        return sum(self.samples.values())
+
+    @staticmethod
+    def _label(frame: Frame) -> str:
+        function, path, line = frame
+        return f"{function} ({path}:{line})"
+
+    def collapsed(self) -> str:
+        """One ``thread;outer;...;inner count`` line per distinct stack (flamegraph.pl, speedscope)"""
+        lines = [
+            ";".join([thread, *(self._label(frame) for frame in stack)]) + f" {count}"
+            for (thread, stack), count in sorted(self.samples.items(), key=lambda item: -item[1])
+        ]
+        return "\n".join(lines) + "\n"
+
+    def speedscope(self, name: str = "profile") -> dict:
+        """Speedscope file format: one sampled profile per thread, weights in seconds"""
+        frames: List[dict] = []
+        frame_index: Dict[Frame, int] = {}
+        threads: Dict[str, Tuple[list, list]] = {}
+        for (thread, stack), count in self.samples.items():
+            indexes = []
+            for frame in stack:
+                if frame not in frame_index:
+                    frame_index[frame] = len(frames)
+                    frames.append({"name": frame[0], "file": frame[1], "line": frame[2]})
+                indexes.append(frame_index[frame])
+            stacks, weights = threads.setdefault(thread, ([], []))
+            stacks.append(indexes)
+            weights.append(count * self.interval)
+        return {
+            "$schema": "https://www.speedscope.app/file-format-schema.json",
+            "name": name,
+            "exporter": "ngo-platform sampler",
+            "shared": {"frames": frames},
+            "profiles": [
+                {
+                    "type": "sampled", "name": thread, "unit": "seconds",
+                    "startValue": 0, "endValue": sum(weights), "samples": stacks, "weights": weights
+                }
+                for thread, (stacks, weights) in sorted(threads.items())
+            ]
+        }
+
+
+class StackSampler:
+    """Samples the Python stack of every thread from a background thread.
+
+    Nothing runs until ``start``; between profiles the cost is nil, so it
+    stays compiled in. Only one profile is taken per process at a time.
+    Samples of parked threads are counted as idle and left out of the
+    stacks, so the profile shows where work happens.
+    """
+
+    _lock = threading.Lock()
+
+    def __init__(self, interval: float = 0.005):
+        self.interval = interval
+        self._samples: Counter = Counter()
+        self._idle = 0
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._started = 0.0
+        self._paths: Dict[str, str] = {}
+
+    def start(self) -> "StackSampler":
+        if not self._lock.acquire(blocking=False):
+            raise ProfilerBusy("A profile is already being taken")
+        self._started = time.perf_counter()
+        self._thread = threading.Thread(target=self._run, name="stack-sampler", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> Profile:
+        self._stop.set()
+        self._thread.join()
+        self._lock.release()
+        return Profile(dict(self._samples), self._idle, self.interval, time.perf_counter() - self._started)
+
+    def _run(self):
+        own = threading.get_ident()
+        while not self._stop.wait(self.interval):
+            names = {thread.ident: thread.name for thread in threading.enumerate()}
+            for ident, frame in sys._current_frames().items():
+                if ident == own:
+                    continue
+                stack = self._stack(frame)
+                if stack[-1][1].endswith(_IDLE_FILES):
+                    self._idle += 1
+                    continue
+                self._samples[(names.get(ident, str(ident)), stack)] += 1
+
+    def _stack(self, frame) -> Stack:
+        stack = []
+        while frame is not None:
+            code = frame.f_code
+            path = self._paths.get(code.co_filename)
+            if path is None:
+                path = self._paths[code.co_filename] = short_path(code.co_filename)
+            stack.append((code.co_qualname, path, code.co_firstlineno))
+            frame = frame.f_back
+        stack.reverse()
+        return tuple(stack)
+
+
+FORMATS = {
+    "speedscope": "application/json",
+    "collapsed": "text/plain; charset=utf-8"
+}
+
+
+def render(profile: Profile, fmt: str, name: str = "profile") -> Tuple[bytes, str]:
+    """Profile body and media type for one of ``FORMATS``"""
+    if fmt == "collapsed":
+        return profile.collapsed().encode(), FORMATS[fmt]
+    return json.dumps(profile.speedscope(name)).encode(), FORMATS["speedscope"]
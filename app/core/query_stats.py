@@ -0,0 +1,89 @@
+import re
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from typing import Iterator, List, Optional
+
+from sqlalchemy import event
+
+_STARTED = "query_stats_started"
+_LITERALS = re.compile(r"'(?:[^']|'')*'|\b\d+(?:\.\d+)?\b")
+_WHITESPACE = re.compile(r"\s+")
+
+
+def redact(statement: str) -> str:
+    """SQL text with inline literals replaced by ``?``; bound parameters are never kept"""
+    return _WHITESPACE.sub(" ", _LITERALS.sub("?", statement)).strip()
+
+
+@dataclass
+class QueryStats:
+    """Statements run on behalf of one request (or one ``track_queries`` block).
+
+    ``statements`` collects every redacted statement when it starts as a
+    list, which tests use to show what blew a query budget.
+    """
+
+    count: int = 0
+    total_ms: float = 0.0
+    slowest_ms: float = 0.0
+    slowest_statement: Optional[str] = None
+    statements: Optional[List[str]] = field(default=None, repr=False)
+
+    def record(self, statement: str, elapsed_ms: float):
+        self.count += 1
+        self.total_ms += elapsed_ms
+        if self.slowest_statement is None or elapsed_ms > self.slowest_ms:
+            self.slowest_ms = elapsed_ms
+            self.slowest_statement = redact(statement)
+        if self.statements is not None:
+            self.statements.append(redact(statement))
+
+    def server_timing(self) -> str:
+        """``Server-Timing`` header value: total DB time and statement count"""
+        return f'db;dur={self.total_ms:.1f};desc="{self.count} queries", db-slowest;dur={self.slowest_ms:.1f}'
+
+
+_current: ContextVar[Optional[QueryStats]] = ContextVar("query_stats", default=None)
+
+
+def current_stats() -> Optional[QueryStats]:
+    return _current.get()
+
+
+@contextmanager
+def track_queries(stats: Optional[QueryStats] = None) -> Iterator[QueryStats]:
+    """Count statements run in this context, including threadpool work it starts"""
+    stats = stats if stats is not None else QueryStats()
+    token = _current.set(stats)
+    try:
+        yield stats
+    finally:
+        _current.reset(token)
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault(_STARTED, []).append(time.perf_counter())
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    started = conn.info[_STARTED].pop()
+    stats = _current.get()
+    if stats is not None:
+        stats.record(statement, (time.perf_counter() - started) * 1000)
+
+
+def _handle_error(exception_context):
+    # A failed statement never reaches after_cursor_execute
+    connection = exception_context.connection
+    if connection is not None and connection.info.get(_STARTED):
+        connection.info[_STARTED].pop()
+
+
+def instrument(engine):
+    """Time every statement ``engine`` runs into the current ``QueryStats``"""
+    if not event.contains(engine, "before_cursor_execute", _before_cursor_execute):
+        event.listen(engine, "before_cursor_execute", _before_cursor_execute)
+        event.listen(engine, "after_cursor_execute", _after_cursor_execute)
+        event.listen(engine, "handle_error", _handle_error)
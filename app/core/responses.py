@@ -0,0 +1,61 @@
+"""
+Fast JSON encoding for hot endpoints.
+
+``dumps`` encodes datetimes, dates, Decimals, enums and UUIDs directly, so
+handlers can return rows as they come from the database instead of calling
+``.isoformat()`` / ``float()`` per field. orjson is used when installed
+(``pip install .[fast]``); otherwise the standard library encoder is used
+with the same output.
+"""
+
+import datetime
+import enum
+import json
+import uuid
+from decimal import Decimal
+from typing import Any, Optional
+
+from fastapi.responses import JSONResponse
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - exercised when the extra is missing
+    orjson = None
+
+
+def _default(value: Any):
+    if isinstance(value, Decimal):
+        return float(value)
+    if isinstance(value, (datetime.datetime, datetime.date, datetime.time)):
+        return value.isoformat()
+    if isinstance(value, enum.Enum):
+        return value.value
+    if isinstance(value, uuid.UUID):
+        return str(value)
+    if isinstance(value, (set, frozenset, tuple)):
+        return list(value)
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+
+if orjson is not None:
+    _ORJSON_OPTIONS = orjson.OPT_NON_STR_KEYS
+
+    def dumps(content: Any) -> bytes:
+        return orjson.dumps(content, default=_default, option=_ORJSON_OPTIONS)
+else:
+    def dumps(content: Any) -> bytes:
+        return json.dumps(
+            content, default=_default, ensure_ascii=False, allow_nan=False, separators=(",", ":")
+        ).encode("utf-8")
+
+
+class FastJSONResponse(JSONResponse):
+    """JSONResponse rendered with ``dumps``; usable as an app's default_response_class"""
+
+    def render(self, content: Any) -> bytes:
+        return dumps(content)
+
+
+def fast_json(content: Any, status_code: int = 200, headers: Optional[dict] = None) -> FastJSONResponse:
+    """Return trusted handler output as-is, skipping response_model validation and jsonable_encoder"""
+    return FastJSONResponse(content, status_code=status_code, headers=headers)
@@ -1,19 +1,39 @@
 from datetime import datetime, timedelta
-from typing import Optional
+from typing import Optional, Tuple
 from jose import JWTError, jwt
-from passlib.context import CryptContext
 from fastapi import HTTPException, status
 from app.core.config import settings
+from app.core.passwords import PasswordPool, PasswordPoolBusy
 
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+password_pool = PasswordPool(
+    workers=settings.PASSWORD_HASH_WORKERS,
+    max_pending=settings.PASSWORD_HASH_QUEUE,
+    rounds=settings.BCRYPT_ROUNDS
+)
+
+
+def _hashing(fn, *args):
+    try:
+        return fn(*args)
+    except PasswordPoolBusy:
+        raise HTTPException(
+            status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+            detail="Too many sign-ins in progress, please retry shortly",
+            headers={"Retry-After": "1"},
+        )
+
+
+def verify_and_update_password(plain_password: str, hashed_password: str) -> Tuple[bool, Optional[str]]:
+    """Verify a password; the second value is a new hash to store when BCRYPT_ROUNDS changed"""
+    return _hashing(password_pool.verify, plain_password, hashed_password)
 
 
 def verify_password(plain_password: str, hashed_password: str) -> bool:
-    return pwd_context.verify(plain_password, hashed_password)
+    return verify_and_update_password(plain_password, hashed_password)[0]
 
 
 def get_password_hash(password: str) -> str:
-    return pwd_context.hash(password)
+    return _hashing(password_pool.hash, password)
 
 
 def create_access_token(data: dict, expires_delta: Optional[timedelta] = None):
@@ -0,0 +1,162 @@
+import threading
+import time
+from dataclasses import dataclass
+from typing import Callable, Dict, FrozenSet, Iterable, Mapping, Optional, Tuple
+
+
+@dataclass(frozen=True)
+class TokenMembership:
+    tenant_id: int
+    role: str
+
+
+@dataclass(frozen=True)
+class TokenClaims:
+    """What a verified access token says about its user.
+
+    ``memberships`` are the user's (tenant, role) pairs when the token was
+    issued and ``version`` is the user's ``token_version`` at that time;
+    bumping the version revokes every token issued before. ``family`` is
+    the refresh token family (login session) the token was issued for.
+    """
+
+    user_id: int
+    version: int
+    memberships: Tuple[TokenMembership, ...] = ()
+    family: Optional[str] = None
+
+    @classmethod
+    def from_payload(cls, payload: Mapping) -> Optional["TokenClaims"]:
+        """Claims of a decoded access token; ``None`` if it lacks them"""
+        if payload.get("type") == "refresh" or "sub" not in payload or "ver" not in payload:
+            return None
+        try:
+            return cls(
+                user_id=int(payload["sub"]),
+                version=int(payload["ver"]),
+                memberships=tuple(TokenMembership(int(tenant_id), role) for tenant_id, role in payload.get("mem", ())),
+                family=payload.get("fam")
+            )
+        except (TypeError, ValueError):
+            return None
+
+    @property
+    def roles(self) -> frozenset:
+        return frozenset(membership.role for membership in self.memberships)
+
+    def has_role(self, roles: Iterable) -> bool:
+        wanted = {getattr(role, "value", role) for role in roles}
+        return any(membership.role in wanted for membership in self.memberships)
+
+    def membership(self, tenant_id: Optional[int] = None) -> Optional[TokenMembership]:
+        """Membership in ``tenant_id``, or the first one when no tenant is given"""
+        for membership in self.memberships:
+            if tenant_id is None or membership.tenant_id == tenant_id:
+                return membership
+        return None
+
+
+def access_claims(user_id: int, version: int, memberships: Iterable[Tuple[int, object]], family: Optional[str] = None) -> dict:
+    """JWT payload fields for an access token carrying the user's memberships"""
+    claims = {
+        "sub": str(user_id),
+        "ver": version,
+        "mem": [[tenant_id, getattr(role, "value", role)] for tenant_id, role in memberships]
+    }
+    if family is not None:
+        claims["fam"] = family
+    return claims
+
+
+class TokenRevocations:
+    """Minimum valid token version per user, inactive users and revoked token families, in memory.
+
+    Revocations only matter for ``window`` seconds, the lifetime of an
+    access token: after that every token issued before them has expired
+    anyway. So only users whose tokens were revoked within the window have
+    a version entry, and refresh token families (logouts, detected reuse)
+    revoked within it are kept; both are forgotten after that, which keeps
+    the maps small however many users there are.
+
+    ``loader`` returns ``{user_id: token_version}`` for users whose version
+    changed since a given ``time.time()``, and ``family_loader`` the
+    families revoked since then. Both are re-run at most every ``ttl``
+    seconds, which is how revocations made by other workers arrive;
+    revocations made in this process through ``revoke`` apply at once.
+    ``inactive_loader`` returns the ids of deactivated users, whose tokens
+    are all rejected; it is re-run on the same schedule and replaces the
+    previous set, so reactivated users get back in too. Checking a token is
+    three set or dict lookups.
+    """
+
+    def __init__(
+        self,
+        loader: Optional[Callable[[float], Mapping[int, int]]] = None,
+        ttl: float = 30.0,
+        family_loader: Optional[Callable[[float], Iterable[str]]] = None,
+        window: float = 1800.0,
+        inactive_loader: Optional[Callable[[], Iterable[int]]] = None
+    ):
+        self.loader = loader
+        self.ttl = ttl
+        self.family_loader = family_loader
+        self.window = window
+        self.inactive_loader = inactive_loader
+        # user_id -> (minimum version, time.time() it was learned)
+        self._versions: Dict[int, Tuple[int, float]] = {}
+        self._families: Dict[str, float] = {}
+        self._inactive: FrozenSet[int] = frozenset()
+        self._loaded_at = float("-inf")
+        self._lock = threading.Lock()
+
+    def is_current(self, claims: TokenClaims) -> bool:
+        self._refresh()
+        if claims.user_id in self._inactive:
+            return False
+        if claims.family is not None and claims.family in self._families:
+            return False
+        entry = self._versions.get(claims.user_id)
+        return entry is None or claims.version >= entry[0]
+
+    def revoke(self, user_id: int, version: int):
+        """Reject tokens of ``user_id`` issued with a version below ``version``"""
+        with self._lock:
+            self._raise_version(user_id, version, time.time())
+
+    def revoke_family(self, family: str):
+        """Reject access tokens issued for a refresh token family"""
+        with self._lock:
+            self._families[family] = time.time()
+
+    def clear(self):
+        with self._lock:
+            self._versions.clear()
+            self._families.clear()
+            self._inactive = frozenset()
+            self._loaded_at = float("-inf")
+
+    def _refresh(self):
+        loaders = (self.loader, self.family_loader, self.inactive_loader)
+        if all(loader is None for loader in loaders) or time.monotonic() - self._loaded_at < self.ttl:
+            return
+        with self._lock:
+            if time.monotonic() - self._loaded_at < self.ttl:
+                return
+            now = time.time()
+            since = now - self.window
+            if self.loader is not None:
+                for user_id, version in self.loader(since).items():
+                    self._raise_version(user_id, version, now)
+            if self.inactive_loader is not None:
+                self._inactive = frozenset(self.inactive_loader())
+            if self.family_loader is not None:
+                for family in self.family_loader(since):
+                    self._families.setdefault(family, now)
+            self._versions = {user_id: entry for user_id, entry in self._versions.items() if entry[1] >= since}
+            self._families = {family: at for family, at in self._families.items() if at >= since}
+            self._loaded_at = time.monotonic()
+
+    def _raise_version(self, user_id: int, version: int, now: float):
+        current = self._versions.get(user_id)
+        if current is None or version > current[0]:
+            self._versions[user_id] = (version, now)
@@ -1,30 +1,173 @@
+from datetime import datetime, timedelta, timezone
+from functools import cached_property
 from fastapi import Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordBearer
+from sqlalchemy import event, inspect
 from sqlalchemy.orm import Session
-from app.core.database import get_db
-from app.models import User, Membership, MembershipRole, Tenant
-from app.core.security import verify_token
-from typing import Optional
+from app.core.config import settings
+from app.core.database import SessionLocal, get_db
+from app.models import User, Membership, MembershipRole, Tenant, Vendor
+from app.core.security import create_access_token, verify_token
+from app.core.tokens import TokenClaims, TokenMembership, TokenRevocations, access_claims
+from app.services.refresh_tokens import RefreshTokenError, RefreshTokenStore
+from typing import Optional, Tuple
 
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="auth/login")
 
 
-def get_current_user(token: str = Depends(oauth2_scheme), db: Session = Depends(get_db)) -> User:
-    """Get current authenticated user"""
-    credentials_exception = HTTPException(
+def _load_token_versions(since: float):
+    db = SessionLocal()
+    try:
+        return dict(
+            db.query(User.id, User.token_version)
+            .filter(User.token_version_changed_at >= datetime.fromtimestamp(since, timezone.utc))
+            .all()
+        )
+    finally:
+        db.close()
+
+
+def _load_inactive_users():
+    db = SessionLocal()
+    try:
+        return [user_id for user_id, in db.query(User.id).filter(User.is_active.is_(False))]
+    finally:
+        db.close()
+
+
+def _load_revoked_families(since: float):
+    db = SessionLocal()
+    try:
+        return refresh_tokens.revoked_families(db, datetime.fromtimestamp(since, timezone.utc))
+    finally:
+        db.close()
+
+
+token_revocations = TokenRevocations(
+    _load_token_versions,
+    ttl=settings.TOKEN_REVOCATION_TTL,
+    family_loader=_load_revoked_families,
+    window=settings.ACCESS_TOKEN_EXPIRE_MINUTES * 60,
+    inactive_loader=_load_inactive_users
+)
+refresh_tokens = RefreshTokenStore(
+    lifetime=timedelta(days=settings.REFRESH_TOKEN_EXPIRE_DAYS),
+    revocations=token_revocations
+)
+
+
+def issue_access_token(user: User, db: Session, family: Optional[str] = None) -> str:
+    """Access token carrying the user's memberships, so authorization needs no queries"""
+    memberships = db.query(Membership.tenant_id, Membership.role).filter(Membership.user_id == user.id).all()
+    return create_access_token(
+        data=access_claims(user.id, user.token_version or 0, memberships, family),
+        expires_delta=timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES)
+    )
+
+
+def issue_tokens(user: User, db: Session) -> dict:
+    """Access token plus the first refresh token of a new login session"""
+    refresh_token, family = refresh_tokens.issue(db, user.id)
+    return {
+        "access_token": issue_access_token(user, db, family),
+        "refresh_token": refresh_token,
+        "token_type": "bearer"
+    }
+
+
+def rotate_tokens(refresh_token: str, db: Session) -> dict:
+    """Exchange a refresh token for a new access and refresh token pair"""
+    invalid = HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
-        detail="Could not validate credentials",
+        detail="Invalid refresh token",
         headers={"WWW-Authenticate": "Bearer"},
     )
-    
-    payload = verify_token(token)
-    user_id: int = payload.get("sub")
-    if user_id is None:
-        raise credentials_exception
-    
+    try:
+        user_id, family, successor = refresh_tokens.rotate(db, refresh_token)
+    except RefreshTokenError:
+        raise invalid
     user = db.query(User).filter(User.id == user_id).first()
+    if user is None or not user.is_active:
+        refresh_tokens.revoke_family(db, family)
+        raise invalid
+    return {
+        "access_token": issue_access_token(user, db, family),
+        "refresh_token": successor,
+        "token_type": "bearer"
+    }
+
+
+def revoke_user_tokens(user: User, db: Session):
+    """Invalidate every access token issued to ``user`` so far, e.g. when one may have leaked"""
+    bump_token_version(user)
+    db.commit()
+    token_revocations.revoke(user.id, user.token_version)
+
+
+def bump_token_version(user: User):
+    """Revoke the user's earlier access tokens once the session commits"""
+    user.token_version = (user.token_version or 0) + 1
+    # Other workers only load versions changed within an access token's lifetime
+    user.token_version_changed_at = datetime.now(timezone.utc)
+
+
+# Tokens carry the user's memberships, so any change to them or to the
+# user's active status revokes the tokens issued before, whatever code
+# path makes it. Versions are bumped in the same flush and applied to this
+# worker's revocations once the change commits.
+TOKEN_VERSION_BUMPS = "token_version_bumps"
+
+
+@event.listens_for(Session, "before_flush")
+def _revoke_on_access_change(session, flush_context, instances):
+    user_ids = set()
+    for instance in list(session.new) + list(session.dirty) + list(session.deleted):
+        if isinstance(instance, Membership) and (instance not in session.dirty or session.is_modified(instance)):
+            user_ids.add(instance.user_id if instance.user_id is not None else getattr(instance.user, "id", None))
+        elif isinstance(instance, User) and instance not in session.new and inspect(instance).attrs.is_active.history.has_changes():
+            user_ids.add(instance.id)
+    with session.no_autoflush:
+        for user_id in user_ids:
+            user = session.get(User, user_id) if user_id is not None else None
+            # Users created in this flush have no tokens yet
+            if user is None or user in session.new:
+                continue
+            bump_token_version(user)
+            session.info.setdefault(TOKEN_VERSION_BUMPS, {})[user.id] = user.token_version
+
+
+@event.listens_for(Session, "after_commit")
+def _apply_token_version_bumps(session):
+    for user_id, version in session.info.pop(TOKEN_VERSION_BUMPS, {}).items():
+        token_revocations.revoke(user_id, version)
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_token_version_bumps(session):
+    session.info.pop(TOKEN_VERSION_BUMPS, None)
+
+
+def get_token_claims(token: str = Depends(oauth2_scheme)) -> TokenClaims:
+    """Verified claims of the bearer token, checked without touching the database"""
+    claims = TokenClaims.from_payload(verify_token(token))
+    if claims is None or not token_revocations.is_current(claims):
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Could not validate credentials",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
+    return claims
+
+
+def get_current_user(claims: TokenClaims = Depends(get_token_claims), db: Session = Depends(get_db)) -> User:
+    """Get current authenticated user"""
+    user = db.query(User).filter(User.id == claims.user_id).first()
     if user is None:
-        raise credentials_exception
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Could not validate credentials",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
     return user
 
 
@@ -35,25 +178,64 @@ def get_current_active_user(current_user: User = Depends(get_current_user)) -> U
     return current_user
 
 
-def get_user_membership(user_id: int, tenant_id: int, db: Session) -> Optional[Membership]:
-    """Get user membership for a tenant"""
-    return db.query(Membership).filter(
-        Membership.user_id == user_id,
-        Membership.tenant_id == tenant_id
-    ).first()
+class AuthContext:
+    """Who is calling and what they may act on, resolved once per request.
+
+    Built from the access token's claims, so roles and tenants cost no
+    queries. The vendor id is looked up on first use only, once per
+    request. Routers take it with ``Depends(get_auth_context)``; FastAPI
+    caches dependencies per request, so every dependency asking for it
+    shares the same instance.
+    """
+
+    def __init__(self, claims: TokenClaims, db: Session):
+        self.claims = claims
+        self._db = db
+
+    @property
+    def user_id(self) -> int:
+        return self.claims.user_id
+
+    @property
+    def memberships(self) -> Tuple[TokenMembership, ...]:
+        return self.claims.memberships
+
+    @property
+    def roles(self) -> frozenset:
+        return self.claims.roles
+
+    @property
+    def tenant_ids(self) -> frozenset:
+        return frozenset(membership.tenant_id for membership in self.claims.memberships)
+
+    def membership(self, tenant_id: Optional[int] = None) -> Optional[TokenMembership]:
+        """Membership in ``tenant_id``, or the user's primary (first) membership"""
+        return self.claims.membership(tenant_id)
+
+    def has_role(self, *roles: MembershipRole, tenant_id: Optional[int] = None) -> bool:
+        if tenant_id is None:
+            return self.claims.has_role(roles)
+        membership = self.membership(tenant_id)
+        return membership is not None and membership.role in roles
+
+    @cached_property
+    def vendor_id(self) -> Optional[int]:
+        """Vendor the user acts for, if they hold a VENDOR membership"""
+        membership = next((m for m in self.memberships if m.role == MembershipRole.VENDOR), None)
+        if membership is None:
+            return None
+        return self._db.query(Vendor.id).filter(Vendor.tenant_id == membership.tenant_id).limit(1).scalar()
+
+
+def get_auth_context(claims: TokenClaims = Depends(get_token_claims), db: Session = Depends(get_db)) -> AuthContext:
+    return AuthContext(claims, db)
 
 
 def require_role(required_roles: list[MembershipRole]):
     """Dependency to require specific roles"""
-    def role_checker(
-        current_user: User = Depends(get_current_active_user),
-        db: Session = Depends(get_db)
-    ):
+    def role_checker(auth: AuthContext = Depends(get_auth_context)):
         # Check if user has any of the required roles across all tenants
-        memberships = db.query(Membership).filter(
-            Membership.user_id == current_user.id,
-            Membership.role.in_(required_roles)
-        ).all()
+        memberships = [m for m in auth.memberships if m.role in required_roles]
         
         if not memberships:
             raise HTTPException(
@@ -61,7 +243,7 @@ def require_role(required_roles: list[MembershipRole]):
                 detail="Insufficient permissions"
             )
         
-        return current_user, memberships
+        return auth, memberships
     
     return role_checker
 
@@ -70,10 +252,9 @@ def require_tenant_role(required_roles: list[MembershipRole]):
     """Dependency to require specific roles within a tenant context"""
     def tenant_role_checker(
         tenant_id: int,
-        current_user: User = Depends(get_current_active_user),
-        db: Session = Depends(get_db)
+        auth: AuthContext = Depends(get_auth_context)
     ):
-        membership = get_user_membership(current_user.id, tenant_id, db)
+        membership = auth.membership(tenant_id)
         
         if not membership or membership.role not in required_roles:
             raise HTTPException(
@@ -81,7 +262,7 @@ def require_tenant_role(required_roles: list[MembershipRole]):
                 detail="Insufficient permissions for this tenant"
             )
         
-        return current_user, membership
+        return auth, membership
     
     return tenant_role_checker
 
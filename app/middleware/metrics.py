@@ -0,0 +1,41 @@
+import time
+
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.core.metrics import http_request_duration, http_requests, http_requests_in_flight
+
+
+class MetricsMiddleware:
+    """Request count, latency histogram and in-flight gauge per route.
+
+    Routes are labelled by their path template (``/causes/{cause_id}``),
+    never the raw path, so label sets stay bounded; requests that match no
+    route share ``unmatched``.
+    """
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        status_code = 500
+        started = time.perf_counter()
+
+        async def send_with_status(message: Message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        http_requests_in_flight.inc()
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            http_requests_in_flight.dec()
+            route = scope.get("route")
+            route = route.path if route is not None else "unmatched"
+            http_requests.inc(scope["method"], route, str(status_code))
+            http_request_duration.observe(time.perf_counter() - started, scope["method"], route)
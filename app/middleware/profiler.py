@@ -0,0 +1,75 @@
+import hmac
+from typing import Optional
+from urllib.parse import parse_qs
+
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.core.config import settings
+from app.core.profiler import FORMATS, ProfilerBusy, StackSampler, render
+from app.middleware.query_stats import route_path
+
+
+class ProfilerMiddleware:
+    """Profile one request with ``?__profile=1`` (or ``=collapsed``).
+
+    Only when profiling is enabled and the request's ``X-Profile-Token``
+    header matches ``PROFILE_TOKEN``. The request runs as usual, its
+    response is discarded and the profile is returned in its place, with
+    the original status in ``X-Profiled-Status``. Every thread is sampled,
+    so concurrent requests show up too. Other requests pay one substring
+    check.
+    """
+
+    def __init__(self, app: ASGIApp, token: Optional[str] = None, interval: float = 0.001):
+        self.app = app
+        self.token = (settings.PROFILE_TOKEN if settings.PROFILING_ENABLED else "") if token is None else token
+        self.interval = interval
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if not self.token or scope["type"] != "http" or b"__profile=" not in scope["query_string"]:
+            await self.app(scope, receive, send)
+            return
+
+        fmt = parse_qs(scope["query_string"].decode("latin-1")).get("__profile", [""])[-1]
+        fmt = fmt if fmt in FORMATS else "speedscope"
+        token = dict(scope["headers"]).get(b"x-profile-token", b"")
+        if not hmac.compare_digest(token, self.token.encode()):
+            await self.app(scope, receive, send)
+            return
+
+        try:
+            sampler = StackSampler(self.interval).start()
+        except ProfilerBusy:
+            await self._respond(send, 409, b"A profile is already being taken\n", FORMATS["collapsed"])
+            return
+
+        status_code = 500
+
+        async def discard(message: Message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+
+        try:
+            await self.app(scope, receive, discard)
+        finally:
+            profile = sampler.stop()
+        body, media_type = render(profile, fmt, f"{scope['method']} {route_path(scope)}")
+        await self._respond(send, 200, body, media_type, [
+            (b"x-profiled-status", str(status_code).encode()),
+            (b"x-profile-samples", str(profile.sample_count).encode())
+        ])
+
+    @staticmethod
+    async def _respond(send: Send, status_code: int, body: bytes, media_type: str, headers=()):
+        await send({
+            "type": "http.response.start",
+            "status": status_code,
+            "headers": [
+                (b"content-type", media_type.encode()),
+                (b"content-length", str(len(body)).encode()),
+                (b"cache-control", b"no-store"),
+                *headers
+            ]
+        })
+        await send({"type": "http.response.body", "body": body})
@@ -0,0 +1,77 @@
+import json
+import logging
+from typing import Optional
+
+from starlette.datastructures import MutableHeaders
+from starlette.routing import Match
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.core.config import settings
+from app.core.query_stats import QueryStats, track_queries
+
+logger = logging.getLogger(__name__)
+
+
+def route_path(scope: Scope) -> str:
+    """Path template of the route serving ``scope``, e.g. ``/causes/{cause_id}``"""
+    route = scope.get("route")
+    if route is not None:
+        return route.path
+    app = scope.get("app")
+    for route in getattr(getattr(app, "router", None), "routes", ()):
+        match, _ = route.matches(scope)
+        if match == Match.FULL:
+            return route.path
+    return scope["path"]
+
+
+class QueryStatsMiddleware:
+    """SQL statement count and database time per request.
+
+    Adds a ``Server-Timing`` header and logs one JSON line per request:
+    at WARNING with the slowest statement (literals redacted) when it took
+    ``slow_query_ms`` or more, at DEBUG otherwise. Pure ASGI so streamed
+    responses pass through unbuffered; statements they run after the
+    headers are sent are still logged.
+    """
+
+    def __init__(self, app: ASGIApp, slow_query_ms: Optional[float] = None):
+        self.app = app
+        self.slow_query_ms = settings.SLOW_QUERY_MS if slow_query_ms is None else slow_query_ms
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        status_code = 500
+        with track_queries() as stats:
+            async def send_with_timing(message: Message):
+                nonlocal status_code
+                if message["type"] == "http.response.start":
+                    status_code = message["status"]
+                    MutableHeaders(scope=message).append("Server-Timing", stats.server_timing())
+                await send(message)
+
+            try:
+                await self.app(scope, receive, send_with_timing)
+            finally:
+                self.log(scope, status_code, stats)
+
+    def log(self, scope: Scope, status_code: int, stats: QueryStats):
+        slow = stats.slowest_ms >= self.slow_query_ms
+        level = logging.WARNING if slow else logging.DEBUG
+        if not logger.isEnabledFor(level):
+            return
+        record = {
+            "event": "request_queries",
+            "method": scope["method"],
+            "route": route_path(scope),
+            "status": status_code,
+            "queries": stats.count,
+            "db_ms": round(stats.total_ms, 2),
+            "slowest_ms": round(stats.slowest_ms, 2)
+        }
+        if slow:
+            record["slowest_statement"] = stats.slowest_statement
+        logger.log(level, json.dumps(record))
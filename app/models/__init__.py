@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, Boolean, DateTime, Text, ForeignKey, Numeric, JSON, Enum
+from sqlalchemy import Column, Integer, String, Boolean, DateTime, Text, ForeignKey, Numeric, JSON, Enum, UniqueConstraint
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 from app.core.database import Base
@@ -111,6 +111,9 @@ class User(Base):
     last_name = Column(String(100))
     phone = Column(String(50))
     is_active = Column(Boolean, default=True)
+    # Bumped to revoke every access token issued before
+    token_version = Column(Integer, nullable=False, default=0, server_default="0")
+    token_version_changed_at = Column(DateTime(timezone=True), index=True)
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     updated_at = Column(DateTime(timezone=True), onupdate=func.now())
     
@@ -178,13 +181,13 @@ class Donation(Base):
     donor_user_id = Column(Integer, ForeignKey("users.id"), nullable=False)
     amount = Column(Numeric(15, 2), nullable=False)
     currency = Column(String(3), default="INR")
-    pg_order_id = Column(String(255))
+    pg_order_id = Column(String(255), index=True)
     pg_payment_id = Column(String(255))
     pg_signature = Column(String(500))
     status = Column(Enum(DonationStatus), default=DonationStatus.INIT)
     audit_json = Column(JSON)
-    created_at = Column(DateTime(timezone=True), server_default=func.now())
-    updated_at = Column(DateTime(timezone=True), onupdate=func.now())
+    created_at = Column(DateTime(timezone=True), server_default=func.now(), index=True)
+    updated_at = Column(DateTime(timezone=True), onupdate=func.now(), index=True)
     
     # Relationships
     cause = relationship("Cause", back_populates="donations")
@@ -316,3 +319,42 @@ class TenantPolicy(Base):
     
     # Relationships
     tenant = relationship("Tenant", back_populates="policies")
+
+
+class TaxStatement(Base):
+    __tablename__ = "tax_statements"
+    __table_args__ = (
+        UniqueConstraint("donor_user_id", "tenant_id", "financial_year", name="uq_tax_statements_donor_tenant_fy"),
+    )
+    
+    id = Column(Integer, primary_key=True, index=True)
+    donor_user_id = Column(Integer, ForeignKey("users.id"), nullable=False, index=True)
+    tenant_id = Column(Integer, ForeignKey("tenants.id"), nullable=False)
+    financial_year = Column(String(7), nullable=False)  # e.g. "2024-25"
+    donation_count = Column(Integer, nullable=False)
+    total_amount = Column(Numeric(15, 2), nullable=False)
+    currency = Column(String(3), default="INR")
+    first_donation_at = Column(DateTime(timezone=True))
+    last_donation_at = Column(DateTime(timezone=True))
+    generated_at = Column(DateTime(timezone=True), nullable=False)
+    
+    # Relationships
+    donor = relationship("User")
+    tenant = relationship("Tenant")
+
+
+class RefreshToken(Base):
+    __tablename__ = "refresh_tokens"
+    
+    id = Column(Integer, primary_key=True, index=True)
+    user_id = Column(Integer, ForeignKey("users.id"), nullable=False, index=True)
+    # All tokens rotated from one login share a family; reuse revokes the family
+    family_id = Column(String(32), nullable=False, index=True)
+    token_hash = Column(String(64), nullable=False, unique=True)
+    expires_at = Column(DateTime(timezone=True), nullable=False)
+    used_at = Column(DateTime(timezone=True))
+    revoked_at = Column(DateTime(timezone=True), index=True)
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    
+    # Relationships
+    user = relationship("User")
@@ -1,45 +1,47 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+import asyncio
+
+from fastapi import APIRouter, Depends, HTTPException, Query, Response, status
 from sqlalchemy.orm import Session
 from sqlalchemy import func
 from app.core.database import get_db
 from app.models import (
     User, Membership, Tenant, Vendor, Category, Cause, 
     Donation, VendorInvoice, NGOReceipt, VendorLink,
-    MembershipRole, CauseStatus
+    MembershipRole, CauseStatus, TaxStatement
 )
 from app.schemas import (
     User as UserSchema, Tenant as TenantSchema, 
     Vendor as VendorSchema, Cause as CauseSchema
 )
-from app.deps import get_current_active_user
+from app.core.config import settings
+from app.core.profiler import ProfilerBusy, StackSampler, render
+from app.core.responses import fast_json
+from app.deps import AuthContext, get_auth_context, revoke_user_tokens
+from app.services.tax_statements import TaxStatementBuilder
 from typing import List, Optional
 
 router = APIRouter()
 
 
-def get_user_membership(user_id: int, db: Session):
-    """Get user's membership"""
-    return db.query(Membership).filter(Membership.user_id == user_id).first()
-
-
-def check_admin_access(current_user: User, db: Session):
-    """Check if user has admin access"""
-    membership = get_user_membership(current_user.id, db)
-    if not membership or membership.role not in [MembershipRole.PLATFORM_ADMIN, MembershipRole.NGO_ADMIN]:
-        raise HTTPException(
-            status_code=status.HTTP_403_FORBIDDEN,
-            detail="Not authorized to access admin resources"
-        )
-    return membership
+def check_admin_access(auth: AuthContext):
+    """Check if user has admin access, from the token's claims alone"""
+    for role in (MembershipRole.PLATFORM_ADMIN, MembershipRole.NGO_ADMIN):
+        membership = next((m for m in auth.memberships if m.role == role), None)
+        if membership:
+            return membership
+    raise HTTPException(
+        status_code=status.HTTP_403_FORBIDDEN,
+        detail="Not authorized to access admin resources"
+    )
 
 
 @router.get("/admin/ngos")
 def get_admin_ngos(
-    current_user: User = Depends(get_current_active_user),
+    auth: AuthContext = Depends(get_auth_context),
     db: Session = Depends(get_db)
 ):
     """Get NGOs - filtered by user role"""
-    membership = check_admin_access(current_user, db)
+    membership = check_admin_access(auth)
     
     query = db.query(Tenant)
     
@@ -49,7 +51,7 @@ def get_admin_ngos(
     
     ngos = query.all()
     
-    return {
+    return fast_json({
         "value": [
             {
                 "id": ngo.id,
@@ -61,21 +63,21 @@ def get_admin_ngos(
                 "contact_email": ngo.contact_email,
                 "contact_phone": ngo.contact_phone,
                 "address": ngo.address,
-                "created_at": ngo.created_at.isoformat() if ngo.created_at else None
+                "created_at": ngo.created_at
             }
             for ngo in ngos
         ],
         "Count": len(ngos)
-    }
+    })
 
 
 @router.get("/admin/vendors")
 def get_admin_vendors(
-    current_user: User = Depends(get_current_active_user),
+    auth: AuthContext = Depends(get_auth_context),
     db: Session = Depends(get_db)
 ):
     """Get vendors - filtered by user role"""
-    membership = get_user_membership(current_user.id, db)
+    membership = auth.membership()
     
     if not membership:
         return {"value": [], "Count": 0}
@@ -92,7 +94,7 @@ def get_admin_vendors(
     
     vendors = query.all()
     
-    return {
+    return fast_json({
         "value": [
             {
                 "id": vendor.id,
@@ -101,21 +103,21 @@ def get_admin_vendors(
                 "gstin": vendor.gstin,
                 "bank_json": vendor.bank_json,
                 "kyc_status": vendor.kyc_status,
-                "created_at": vendor.created_at.isoformat() if vendor.created_at else None
+                "created_at": vendor.created_at
             }
             for vendor in vendors
         ],
         "Count": len(vendors)
-    }
+    })
 
 
 @router.get("/admin/donors")
 def get_admin_donors(
-    current_user: User = Depends(get_current_active_user),
+    auth: AuthContext = Depends(get_auth_context),
     db: Session = Depends(get_db)
 ):
     """Get donors who have made donations"""
-    membership = check_admin_access(current_user, db)
+    membership = check_admin_access(auth)
     
     # Get users who have donor role
     query = db.query(User).join(Membership).filter(
@@ -124,7 +126,7 @@ def get_admin_donors(
     
     donors = query.all()
     
-    return {
+    return fast_json({
         "value": [
             {
                 "id": donor.id,
@@ -133,21 +135,21 @@ def get_admin_donors(
                 "last_name": donor.last_name,
                 "phone": donor.phone,
                 "is_active": donor.is_active,
-                "created_at": donor.created_at.isoformat() if donor.created_at else None
+                "created_at": donor.created_at
             }
             for donor in donors
         ],
         "Count": len(donors)
-    }
+    })
 
 
 @router.get("/admin/causes")
 def get_admin_causes(
-    current_user: User = Depends(get_current_active_user),
+    auth: AuthContext = Depends(get_auth_context),
     db: Session = Depends(get_db)
 ):
     """Get causes - filtered by user role"""
-    membership = get_user_membership(current_user.id, db)
+    membership = auth.membership()
     
     if not membership:
         return []
@@ -160,32 +162,32 @@ def get_admin_causes(
     
     causes = query.all()
     
-    return [
+    return fast_json([
         {
             "id": cause.id,
             "tenant_id": cause.tenant_id,
             "category_id": cause.category_id,
             "title": cause.title,
             "description": cause.description,
-            "target_amount": float(cause.target_amount) if cause.target_amount else 0,
-            "current_amount": float(cause.current_amount) if cause.current_amount else 0,
-            "type": cause.type.value if cause.type else None,
-            "status": cause.status.value if cause.status else None,
+            "target_amount": cause.target_amount or 0,
+            "current_amount": cause.current_amount or 0,
+            "type": cause.type,
+            "status": cause.status,
             "image_url": cause.image_url,
             "policy_flags_json": cause.policy_flags_json,
-            "created_at": cause.created_at.isoformat() if cause.created_at else None
+            "created_at": cause.created_at
         }
         for cause in causes
-    ]
+    ])
 
 
 @router.get("/admin/pending-causes")
 def get_pending_causes(
-    current_user: User = Depends(get_current_active_user),
+    auth: AuthContext = Depends(get_auth_context),
     db: Session = Depends(get_db)
 ):
     """Get pending causes for approval"""
-    membership = check_admin_access(current_user, db)
+    membership = check_admin_access(auth)
     
     query = db.query(Cause).filter(Cause.status == CauseStatus.PENDING_APPROVAL)
     
@@ -195,29 +197,29 @@ def get_pending_causes(
     
     causes = query.all()
     
-    return {
+    return fast_json({
         "value": [
             {
                 "id": cause.id,
                 "tenant_id": cause.tenant_id,
                 "title": cause.title,
                 "description": cause.description,
-                "status": cause.status.value if cause.status else None,
-                "created_at": cause.created_at.isoformat() if cause.created_at else None
+                "status": cause.status,
+                "created_at": cause.created_at
             }
             for cause in causes
         ],
         "Count": len(causes)
-    }
+    })
 
 
 @router.get("/admin/payments")
 def get_admin_payments(
-    current_user: User = Depends(get_current_active_user),
+    auth: AuthContext = Depends(get_auth_context),
     db: Session = Depends(get_db)
 ):
     """Get payment summary"""
-    membership = check_admin_access(current_user, db)
+    membership = check_admin_access(auth)
     
     query = db.query(Donation)
     
@@ -237,17 +239,26 @@ def get_admin_payments(
 
 @router.get("/admin/ngo-vendor-associations")
 def get_ngo_vendor_associations(
-    current_user: User = Depends(get_current_active_user),
+    auth: AuthContext = Depends(get_auth_context),
     db: Session = Depends(get_db)
 ):
     """Get NGO-Vendor associations through causes"""
-    membership = get_user_membership(current_user.id, db)
+    membership = auth.membership()
     
     if not membership:
         return {"value": [], "Count": 0}
     
-    # Get vendor links (associations through causes)
-    query = db.query(VendorLink).join(Cause)
+    # Vendor links (associations through causes) with their cause, NGO and vendor in one query
+    query = (
+        db.query(
+            VendorLink.id, VendorLink.created_at, Cause.id.label("cause_id"), Cause.title,
+            Tenant.id.label("tenant_id"), Tenant.name.label("tenant_name"),
+            Vendor.id.label("vendor_id"), Vendor.name.label("vendor_name")
+        )
+        .join(Cause, Cause.id == VendorLink.cause_id)
+        .join(Tenant, Tenant.id == Cause.tenant_id)
+        .join(Vendor, Vendor.id == VendorLink.vendor_id)
+    )
     
     # Filter by tenant for NGO users
     if membership.role in [MembershipRole.NGO_ADMIN, MembershipRole.NGO_STAFF]:
@@ -255,44 +266,39 @@ def get_ngo_vendor_associations(
     
     # Filter by vendor for vendor users
     elif membership.role == MembershipRole.VENDOR:
-        # Get vendor associated with this user's tenant
-        vendor = db.query(Vendor).filter(Vendor.tenant_id == membership.tenant_id).first()
-        if vendor:
-            query = query.filter(VendorLink.vendor_id == vendor.id)
+        # Vendor resolved once per request by the auth context
+        if auth.vendor_id:
+            query = query.filter(VendorLink.vendor_id == auth.vendor_id)
     
     links = query.all()
     
-    associations = []
-    for link in links:
-        cause = db.query(Cause).filter(Cause.id == link.cause_id).first()
-        vendor = db.query(Vendor).filter(Vendor.id == link.vendor_id).first()
-        tenant = db.query(Tenant).filter(Tenant.id == cause.tenant_id).first() if cause else None
-        
-        if cause and vendor and tenant:
-            associations.append({
-                "id": link.id,
-                "ngo_id": tenant.id,
-                "ngo_name": tenant.name,
-                "vendor_id": vendor.id,
-                "vendor_name": vendor.name,
-                "cause_id": cause.id,
-                "cause_title": cause.title,
-                "created_at": link.created_at.isoformat() if link.created_at else None
-            })
+    associations = [
+        {
+            "id": link.id,
+            "ngo_id": link.tenant_id,
+            "ngo_name": link.tenant_name,
+            "vendor_id": link.vendor_id,
+            "vendor_name": link.vendor_name,
+            "cause_id": link.cause_id,
+            "cause_title": link.title,
+            "created_at": link.created_at
+        }
+        for link in links
+    ]
     
-    return {
+    return fast_json({
         "value": associations,
         "Count": len(associations)
-    }
+    })
 
 
 @router.get("/admin/users")
 def get_admin_users(
-    current_user: User = Depends(get_current_active_user),
+    auth: AuthContext = Depends(get_auth_context),
     db: Session = Depends(get_db)
 ):
     """Get all users with their roles"""
-    membership = check_admin_access(current_user, db)
+    membership = check_admin_access(auth)
     
     # Only platform admins can see all users
     if membership.role != MembershipRole.PLATFORM_ADMIN:
@@ -303,9 +309,13 @@ def get_admin_users(
     
     users = db.query(User).all()
     
+    # First membership of every user in one query rather than one per user
+    roles = {}
+    for user_id, role in db.query(Membership.user_id, Membership.role).order_by(Membership.id):
+        roles.setdefault(user_id, role)
+    
     result = []
     for user in users:
-        user_membership = db.query(Membership).filter(Membership.user_id == user.id).first()
         result.append({
             "id": user.id,
             "email": user.email,
@@ -313,23 +323,84 @@ def get_admin_users(
             "last_name": user.last_name,
             "phone": user.phone,
             "is_active": user.is_active,
-            "role": user_membership.role.value if user_membership else None,
-            "created_at": user.created_at.isoformat() if user.created_at else None
+            "role": roles[user.id].value if user.id in roles else None,
+            "created_at": user.created_at
         })
     
-    return {
+    return fast_json({
         "value": result,
         "Count": len(result)
-    }
+    })
+
+
+@router.post("/admin/users/{user_id}/revoke-tokens")
+def revoke_tokens(
+    user_id: int,
+    auth: AuthContext = Depends(get_auth_context),
+    db: Session = Depends(get_db)
+):
+    """Sign a user out everywhere; membership and active-status changes do this on their own"""
+    membership = check_admin_access(auth)
+    if membership.role != MembershipRole.PLATFORM_ADMIN:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Only platform admins can revoke tokens"
+        )
+
+    user = db.query(User).filter(User.id == user_id).first()
+    if not user:
+        raise HTTPException(status_code=404, detail="User not found")
+
+    revoke_user_tokens(user, db)
+    return {"user_id": user.id, "token_version": user.token_version}
+
+
+@router.get("/admin/profile")
+async def profile_worker(
+    seconds: float = Query(10, gt=0, le=60),
+    interval_ms: float = Query(5, ge=1, le=100),
+    fmt: str = Query("speedscope", alias="format", pattern="^(speedscope|collapsed)$"),
+    auth: AuthContext = Depends(get_auth_context)
+):
+    """Sample every thread of the worker serving this request for ``seconds``.
+
+    Returns a speedscope profile (open it at speedscope.app) or collapsed
+    stacks for flamegraph.pl. The event loop stays free while sampling, so
+    the profile shows the traffic the worker is serving meanwhile.
+    """
+    if not settings.PROFILING_ENABLED:
+        raise HTTPException(status_code=404, detail="Not Found")
+    membership = check_admin_access(auth)
+    if membership.role != MembershipRole.PLATFORM_ADMIN:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Only platform admins can profile workers"
+        )
+
+    try:
+        sampler = StackSampler(interval_ms / 1000).start()
+    except ProfilerBusy as exc:
+        raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail=str(exc))
+    try:
+        await asyncio.sleep(seconds)
+    finally:
+        profile = sampler.stop()
+
+    body, media_type = render(profile, fmt, f"worker profile ({seconds:g}s)")
+    return Response(body, media_type=media_type, headers={
+        "Cache-Control": "no-store",
+        "X-Profile-Samples": str(profile.sample_count),
+        "X-Profile-Idle-Samples": str(profile.idle)
+    })
 
 
 @router.get("/ngo/orders")
 def get_ngo_orders(
-    current_user: User = Depends(get_current_active_user),
+    auth: AuthContext = Depends(get_auth_context),
     db: Session = Depends(get_db)
 ):
     """Get orders/donations for NGO"""
-    membership = get_user_membership(current_user.id, db)
+    membership = auth.membership()
     
     if not membership or membership.role not in [MembershipRole.NGO_ADMIN, MembershipRole.NGO_STAFF]:
         return []
@@ -339,82 +410,128 @@ def get_ngo_orders(
         Cause.tenant_id == membership.tenant_id
     ).all()
     
-    return [
+    return fast_json([
         {
             "id": donation.id,
             "cause_id": donation.cause_id,
             "donor_id": donation.donor_id,
-            "amount": float(donation.amount) if donation.amount else 0,
+            "amount": donation.amount or 0,
             "currency": donation.currency,
-            "status": donation.status.value if donation.status else None,
+            "status": donation.status,
             "pg_order_id": donation.pg_order_id,
-            "created_at": donation.created_at.isoformat() if donation.created_at else None
+            "created_at": donation.created_at
         }
         for donation in donations
-    ]
+    ])
 
 
 @router.get("/donor/donations")
 def get_donor_donations(
-    current_user: User = Depends(get_current_active_user),
+    auth: AuthContext = Depends(get_auth_context),
     db: Session = Depends(get_db)
 ):
     """Get donations made by current donor"""
-    donations = db.query(Donation).filter(Donation.donor_id == current_user.id).all()
+    donations = db.query(Donation).filter(Donation.donor_id == auth.user_id).all()
     
-    return [
+    return fast_json([
         {
             "id": donation.id,
             "cause_id": donation.cause_id,
-            "amount": float(donation.amount) if donation.amount else 0,
+            "amount": donation.amount or 0,
             "currency": donation.currency,
-            "status": donation.status.value if donation.status else None,
+            "status": donation.status,
             "pg_order_id": donation.pg_order_id,
-            "created_at": donation.created_at.isoformat() if donation.created_at else None
+            "created_at": donation.created_at
         }
         for donation in donations
-    ]
+    ])
 
 
 @router.get("/donor/orders")
 def get_donor_orders(
-    current_user: User = Depends(get_current_active_user),
+    auth: AuthContext = Depends(get_auth_context),
     db: Session = Depends(get_db)
 ):
     """Get orders/donations for current donor (same as donations)"""
-    return get_donor_donations(current_user, db)
+    return get_donor_donations(auth, db)
+
+
+@router.get("/donor/tax-statements")
+def get_donor_tax_statements(
+    financial_year: Optional[str] = None,
+    auth: AuthContext = Depends(get_auth_context),
+    db: Session = Depends(get_db)
+):
+    """Get consolidated tax statements (per NGO and financial year) of current donor"""
+    query = db.query(TaxStatement, Tenant.name).join(Tenant, Tenant.id == TaxStatement.tenant_id).filter(
+        TaxStatement.donor_user_id == auth.user_id
+    )
+    if financial_year:
+        query = query.filter(TaxStatement.financial_year == financial_year)
+    
+    return fast_json([
+        {
+            "id": statement.id,
+            "tenant_id": statement.tenant_id,
+            "ngo_name": ngo_name,
+            "financial_year": statement.financial_year,
+            "donation_count": statement.donation_count,
+            "total_amount": statement.total_amount,
+            "currency": statement.currency,
+            "first_donation_at": statement.first_donation_at,
+            "last_donation_at": statement.last_donation_at,
+            "generated_at": statement.generated_at
+        }
+        for statement, ngo_name in query.order_by(TaxStatement.financial_year.desc(), Tenant.name).all()
+    ])
+
+
+@router.post("/admin/tax-statements/rebuild")
+def rebuild_tax_statements(
+    full: bool = False,
+    auth: AuthContext = Depends(get_auth_context),
+    db: Session = Depends(get_db)
+):
+    """Rebuild donor tax statements; incremental unless ``full`` is set"""
+    membership = check_admin_access(auth)
+    if membership.role != MembershipRole.PLATFORM_ADMIN:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Only platform admins can rebuild tax statements"
+        )
+    
+    builder = TaxStatementBuilder()
+    result = builder.rebuild(db) if full else builder.rebuild_incremental(db)
+    return {**result, "generated_at": result["generated_at"].isoformat()}
 
 
 @router.get("/vendor/invoices")
 def get_vendor_invoices(
-    current_user: User = Depends(get_current_active_user),
+    auth: AuthContext = Depends(get_auth_context),
     db: Session = Depends(get_db)
 ):
     """Get invoices for current vendor"""
-    membership = get_user_membership(current_user.id, db)
+    membership = auth.membership()
     
     if not membership or membership.role != MembershipRole.VENDOR:
         return []
     
-    # Get vendor for this tenant
-    vendor = db.query(Vendor).filter(Vendor.tenant_id == membership.tenant_id).first()
-    
-    if not vendor:
+    if not auth.vendor_id:
         return []
     
-    invoices = db.query(VendorInvoice).filter(VendorInvoice.vendor_id == vendor.id).all()
+    invoices = db.query(VendorInvoice).filter(VendorInvoice.vendor_id == auth.vendor_id).all()
     
-    return [
+    return fast_json([
         {
             "id": invoice.id,
             "cause_id": invoice.cause_id,
             "vendor_id": invoice.vendor_id,
             "number": invoice.number,
-            "amount": float(invoice.amount) if invoice.amount else 0,
+            "amount": invoice.amount or 0,
             "files": invoice.files,
-            "status": invoice.status.value if invoice.status else None,
-            "created_at": invoice.created_at.isoformat() if invoice.created_at else None
+            "status": invoice.status,
+            "created_at": invoice.created_at
         }
         for invoice in invoices
-    ]
+    ])
 
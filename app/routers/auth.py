@@ -2,12 +2,11 @@ from fastapi import APIRouter, Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordRequestForm
 from sqlalchemy.orm import Session
 from app.core.database import get_db
-from app.core.security import verify_password, create_access_token, create_refresh_token
+from app.core.security import verify_and_update_password
+from app.core.tokens import TokenClaims
 from app.models import User
-from app.schemas import Token, UserCreate, User as UserSchema
-from app.deps import get_current_active_user
-from datetime import timedelta
-from app.core.config import settings
+from app.schemas import RefreshRequest, Token, UserCreate, User as UserSchema
+from app.deps import get_current_active_user, get_token_claims, issue_tokens, refresh_tokens, rotate_tokens
 
 router = APIRouter()
 
@@ -20,8 +19,16 @@ def authenticate_user(db: Session, email: str, password: str):
     user = get_user_by_email(db, email)
     if not user:
         return False
-    if not verify_password(password, user.hashed_password):
+    hashed_password = user.hashed_password
+    # Hand the connection back to the pool while bcrypt runs
+    db.rollback()
+    verified, new_hash = verify_and_update_password(password, hashed_password)
+    if not verified:
         return False
+    if new_hash:
+        # Stored hash predates the current BCRYPT_ROUNDS
+        user.hashed_password = new_hash
+        db.commit()
     return user
 
 
@@ -63,17 +70,20 @@ def login(form_data: OAuth2PasswordRequestForm = Depends(), db: Session = Depend
             headers={"WWW-Authenticate": "Bearer"},
         )
     
-    access_token_expires = timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES)
-    access_token = create_access_token(
-        data={"sub": str(user.id)}, expires_delta=access_token_expires
-    )
-    refresh_token = create_refresh_token(data={"sub": str(user.id)})
-    
-    return {
-        "access_token": access_token,
-        "refresh_token": refresh_token,
-        "token_type": "bearer"
-    }
+    return issue_tokens(user, db)
+
+
+@router.post("/refresh", response_model=Token)
+def refresh(body: RefreshRequest, db: Session = Depends(get_db)):
+    """Exchange a refresh token for new tokens; each refresh token works once"""
+    return rotate_tokens(body.refresh_token, db)
+
+
+@router.post("/logout", status_code=204)
+def logout(claims: TokenClaims = Depends(get_token_claims), db: Session = Depends(get_db)):
+    """End this login session: its refresh tokens and access tokens stop working"""
+    if claims.family:
+        refresh_tokens.revoke_family(db, claims.family)
 
 
 @router.get("/me", response_model=UserSchema)
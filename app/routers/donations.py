@@ -1,10 +1,12 @@
 from fastapi import APIRouter, Depends, HTTPException, Request
+from fastapi.concurrency import run_in_threadpool
 from sqlalchemy.orm import Session
 from app.core.database import get_db
 from app.models import Donation, Cause, User, DonationStatus
 from app.schemas import DonationCreate, Donation as DonationSchema, DonationUpdate
 from app.deps import get_current_active_user
 from app.core.config import settings
+from app.core.metrics import webhook_queue_depth
 from app.services.payment import PaymentService
 import json
 from decimal import Decimal
@@ -68,9 +70,9 @@ def init_donation(
 
 
 @router.post("/donations/webhook")
-def donation_webhook(request: Request, db: Session = Depends(get_db)):
+async def donation_webhook(request: Request, db: Session = Depends(get_db)):
     """Handle payment webhook for status updates"""
-    body = request.body()
+    body = await request.body()
     headers = dict(request.headers)
     
     # Initialize payment service
@@ -88,9 +90,10 @@ def donation_webhook(request: Request, db: Session = Depends(get_db)):
     except:
         raise HTTPException(status_code=400, detail="Invalid JSON")
     
-    # Process webhook
+    # Process webhook; waiting for a threadpool slot counts towards the queue depth
     try:
-        payment_service.process_webhook(webhook_data, db)
+        with webhook_queue_depth.track():
+            await run_in_threadpool(payment_service.process_webhook, webhook_data, db)
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Webhook processing error: {str(e)}")
     
@@ -1,9 +1,9 @@
 from fastapi import APIRouter, Depends, HTTPException, UploadFile, File, Form
 from sqlalchemy.orm import Session
 from app.core.database import get_db
-from app.models import NGOReceipt, Cause, ReceiptStatus, Payout, PayoutToType, PayoutStatus, MembershipRole, User
+from app.models import NGOReceipt, Cause, ReceiptStatus, Payout, PayoutToType, PayoutStatus, MembershipRole
 from app.schemas import NGOReceiptCreate, NGOReceipt as NGOReceiptSchema, NGOReceiptUpdate
-from app.deps import get_current_active_user, get_user_membership
+from app.deps import AuthContext, get_auth_context
 from typing import List
 
 router = APIRouter()
@@ -15,7 +15,7 @@ def create_ngo_receipt(
     amount: float = Form(...),
     note: str = Form(None),
     files: List[UploadFile] = File(...),
-    current_user: User = Depends(get_current_active_user),
+    auth: AuthContext = Depends(get_auth_context),
     db: Session = Depends(get_db)
 ):
     """Create NGO receipt with file uploads (NGO_ADMIN only)"""
@@ -25,7 +25,7 @@ def create_ngo_receipt(
         raise HTTPException(status_code=404, detail="Cause not found")
     
     # Check user has NGO_ADMIN role for this tenant
-    membership = get_user_membership(current_user.id, cause.tenant_id, db)
+    membership = auth.membership(cause.tenant_id)
     if not membership or membership.role != MembershipRole.NGO_ADMIN:
         raise HTTPException(status_code=403, detail="Only NGO admins can submit receipts")
     
@@ -57,7 +57,7 @@ def create_ngo_receipt(
 @router.patch("/ngo-receipts/{receipt_id}/approve")
 def approve_ngo_receipt(
     receipt_id: int,
-    current_user: User = Depends(get_current_active_user),
+    auth: AuthContext = Depends(get_auth_context),
     db: Session = Depends(get_db)
 ):
     """Approve NGO receipt (PLATFORM_ADMIN only) and create payout"""
@@ -67,7 +67,7 @@ def approve_ngo_receipt(
         raise HTTPException(status_code=404, detail="Receipt not found")
     
     # Check user has PLATFORM_ADMIN role
-    membership = get_user_membership(current_user.id, receipt.cause.tenant_id, db)
+    membership = auth.membership(receipt.cause.tenant_id)
     if not membership or membership.role != MembershipRole.PLATFORM_ADMIN:
         raise HTTPException(status_code=403, detail="Only platform admins can approve NGO receipts")
     
@@ -99,7 +99,7 @@ def approve_ngo_receipt(
 @router.get("/ngo-receipts/{receipt_id}")
 def get_ngo_receipt(
     receipt_id: int,
-    current_user: User = Depends(get_current_active_user),
+    auth: AuthContext = Depends(get_auth_context),
     db: Session = Depends(get_db)
 ):
     """Get NGO receipt details"""
@@ -108,7 +108,7 @@ def get_ngo_receipt(
         raise HTTPException(status_code=404, detail="Receipt not found")
     
     # Check permissions
-    membership = get_user_membership(current_user.id, receipt.cause.tenant_id, db)
+    membership = auth.membership(receipt.cause.tenant_id)
     if not membership:
         raise HTTPException(status_code=403, detail="Insufficient permissions")
     
@@ -1,9 +1,9 @@
 from fastapi import APIRouter, Depends, HTTPException
 from sqlalchemy.orm import Session
 from app.core.database import get_db
-from app.models import Payout, Vendor, MembershipRole, User
+from app.models import Payout, Vendor, MembershipRole
 from app.schemas import Payout as PayoutSchema
-from app.deps import get_current_active_user, get_user_membership
+from app.deps import AuthContext, get_auth_context
 
 router = APIRouter()
 
@@ -11,7 +11,7 @@ router = APIRouter()
 @router.get("/payouts/{payout_id}")
 def get_payout(
     payout_id: int,
-    current_user: User = Depends(get_current_active_user),
+    auth: AuthContext = Depends(get_auth_context),
     db: Session = Depends(get_db)
 ):
     """Get payout details"""
@@ -24,12 +24,12 @@ def get_payout(
         # For vendor payouts, check if user is vendor or NGO admin
         vendor = db.query(Vendor).filter(Vendor.id == payout.to_id).first()
         if vendor:
-            membership = get_user_membership(current_user.id, vendor.tenant_id, db)
+            membership = auth.membership(vendor.tenant_id)
             if not membership or membership.role not in [MembershipRole.VENDOR, MembershipRole.NGO_ADMIN, MembershipRole.PLATFORM_ADMIN]:
                 raise HTTPException(status_code=403, detail="Insufficient permissions")
     elif payout.to_type == "NGO":
         # For NGO payouts, check if user is NGO admin or platform admin
-        membership = get_user_membership(current_user.id, payout.to_id, db)
+        membership = auth.membership(payout.to_id)
         if not membership or membership.role not in [MembershipRole.NGO_ADMIN, MembershipRole.PLATFORM_ADMIN]:
             raise HTTPException(status_code=403, detail="Insufficient permissions")
     
@@ -1,41 +1,169 @@
-from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi import APIRouter, Depends, HTTPException, Query, Request
+from pydantic import TypeAdapter
+from sqlalchemy import event, func
 from sqlalchemy.orm import Session
+from app.core.config import settings
 from app.core.database import get_db
-from app.models import Category, Tenant, Cause, CauseStatus, TenantDomain
+from app.models import Category, Tenant, Cause, CauseStatus, Donation, DonationStatus, TenantDomain
 from app.schemas import Category as CategorySchema, PublicTenant, PublicCause, TenantByHostResponse
+from app.core.responses import fast_json
+from app.services.catalogue_cache import CATALOGUE_CHANGES, CatalogueCache, mark_catalogue_changed
+from app.services.cause_search import CauseSearch
+from app.services.progress_hub import cause_topic, event_stream_response, progress_hub, progress_payload, tenant_topic
+from app.services.cause_feeds import cause_feeds
+from app.services.ranked_feeds import FEEDS
 from typing import List, Optional
 
 router = APIRouter()
 
+# Catalogue listings are serialized once per change rather than per request
+catalogue_cache = CatalogueCache(max_age=settings.CATALOGUE_MAX_AGE)
+CATALOGUE_VIEWS = {Category: ("categories",), Tenant: ("ngos", "causes"), Cause: ("causes",)}
+CATALOGUE_TABLES = {model.__tablename__: views for model, views in CATALOGUE_VIEWS.items()}
+
+categories_adapter = TypeAdapter(List[CategorySchema])
+tenants_adapter = TypeAdapter(List[PublicTenant])
+causes_adapter = TypeAdapter(List[PublicCause])
+
+
+@event.listens_for(Session, "after_flush")
+def _collect_catalogue_writes(session, flush_context):
+    for instance in list(session.new) + list(session.dirty) + list(session.deleted):
+        mark_catalogue_changed(session, *CATALOGUE_VIEWS.get(type(instance), ()))
+
+
+@event.listens_for(Session, "do_orm_execute")
+def _collect_bulk_catalogue_writes(orm_execute_state):
+    # Bulk and Core INSERT/UPDATE/DELETE through a session never reach after_flush
+    statement = orm_execute_state.statement
+    if orm_execute_state.is_insert or orm_execute_state.is_update or orm_execute_state.is_delete:
+        mark_catalogue_changed(orm_execute_state.session, *CATALOGUE_TABLES.get(statement.table.name, ()))
+
+
+@event.listens_for(Session, "after_commit")
+def _invalidate_catalogue(session):
+    views = session.info.pop(CATALOGUE_CHANGES, None)
+    if views:
+        catalogue_cache.invalidate(*views)
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_catalogue_writes(session):
+    session.info.pop(CATALOGUE_CHANGES, None)
+
 
 @router.get("/categories", response_model=List[CategorySchema])
-def get_categories(db: Session = Depends(get_db)):
+def get_categories(request: Request, db: Session = Depends(get_db)):
     """Get all categories"""
-    return db.query(Category).all()
+    return catalogue_cache.response(
+        request, "categories",
+        lambda: categories_adapter.dump_json(categories_adapter.validate_python(db.query(Category).all(), from_attributes=True))
+    )
 
 
 @router.get("/ngos", response_model=List[PublicTenant])
-def get_ngos(db: Session = Depends(get_db)):
+def get_ngos(request: Request, db: Session = Depends(get_db)):
     """Get all NGOs (tenants)"""
-    return db.query(Tenant).all()
+    return catalogue_cache.response(
+        request, "ngos",
+        lambda: tenants_adapter.dump_json(tenants_adapter.validate_python(db.query(Tenant).all(), from_attributes=True))
+    )
 
 
 @router.get("/causes", response_model=List[PublicCause])
 def get_causes(
+    request: Request,
     tenant: Optional[str] = Query(None, description="Tenant slug"),
     status: Optional[CauseStatus] = Query(CauseStatus.LIVE, description="Cause status"),
     db: Session = Depends(get_db)
 ):
-    """Get causes with optional filtering"""
-    query = db.query(Cause)
-    
-    if tenant:
-        query = query.join(Tenant).filter(Tenant.slug == tenant)
-    
-    if status:
-        query = query.filter(Cause.status == status)
+    """Get causes with optional filtering; each tenant/status pair is cached separately"""
+    def build():
+        query = db.query(Cause)
+        
+        if tenant:
+            query = query.join(Tenant).filter(Tenant.slug == tenant)
+        
+        if status:
+            query = query.filter(Cause.status == status)
+        
+        return causes_adapter.dump_json(causes_adapter.validate_python(query.all(), from_attributes=True))
     
-    return query.all()
+    return catalogue_cache.response(request, "causes", build, variant=(tenant, status))
+
+
+@router.get("/search")
+def search_causes(
+    q: str = Query("", description="Search text"),
+    category_id: Optional[int] = Query(None),
+    status: Optional[CauseStatus] = Query(None),
+    ngo_id: Optional[int] = Query(None, description="Tenant id"),
+    page: int = Query(1, ge=1),
+    limit: int = Query(20, ge=1, le=100),
+    db: Session = Depends(get_db)
+):
+    """Search public causes by text with category, status and NGO facets"""
+    return fast_json(CauseSearch().search(
+        db, q, category_id=category_id, status=status, tenant_id=ngo_id, page=page, limit=limit
+    ))
+
+
+@router.get("/feeds/{feed}")
+def get_feed(
+    feed: str,
+    category_id: Optional[int] = Query(None),
+    limit: int = Query(10, ge=1, le=50),
+    db: Session = Depends(get_db)
+):
+    """Top causes of a ranked feed, overall or within a category"""
+    if feed not in FEEDS:
+        raise HTTPException(status_code=404, detail=f"Unknown feed; expected one of {', '.join(FEEDS)}")
+    cause_ids = cause_feeds.top(db, feed, limit, category_id=category_id)
+    causes = {cause.id: cause for cause in db.query(Cause).filter(Cause.id.in_(cause_ids)).all()}
+    ranked = causes_adapter.validate_python(
+        [causes[cause_id] for cause_id in cause_ids if cause_id in causes], from_attributes=True
+    )
+    return fast_json({"feed": feed, "value": causes_adapter.dump_python(ranked, mode="json"), "Count": len(ranked)})
+
+
+def _progress_snapshots(db: Session, *conditions):
+    """Current progress payloads of the causes matching ``conditions``"""
+    donation_counts = (
+        db.query(Donation.cause_id, func.count(Donation.id))
+        .filter(Donation.status == DonationStatus.CAPTURED)
+        .group_by(Donation.cause_id)
+        .subquery()
+    )
+    rows = (
+        db.query(Cause.id, Cause.raised_amount, Cause.goal_amount, donation_counts.c[1])
+        .outerjoin(donation_counts, donation_counts.c.cause_id == Cause.id)
+        .filter(Cause.status == CauseStatus.LIVE, *conditions)
+        .all()
+    )
+    return [(cause_id, progress_payload(cause_id, raised, goal, count)) for cause_id, raised, goal, count in rows]
+
+
+@router.get("/causes/{cause_id}/stream")
+def stream_cause_progress(cause_id: int, db: Session = Depends(get_db)):
+    """Server-sent events with the cause's raised amount and donation count"""
+    initial = _progress_snapshots(db, Cause.id == cause_id)
+    # get_db only closes after the stream ends; give the connection back now
+    db.close()
+    if not initial:
+        raise HTTPException(status_code=404, detail="Cause not found")
+    return event_stream_response(progress_hub.stream(cause_topic(cause_id), initial=initial))
+
+
+@router.get("/tenants/{slug}/stream")
+def stream_tenant_progress(slug: str, db: Session = Depends(get_db)):
+    """Server-sent events for every live cause of a tenant (microsite pages)"""
+    tenant = db.query(Tenant).filter(Tenant.slug == slug).first()
+    if not tenant:
+        raise HTTPException(status_code=404, detail="Tenant not found")
+    tenant_id = tenant.id
+    initial = _progress_snapshots(db, Cause.tenant_id == tenant_id)
+    db.close()
+    return event_stream_response(progress_hub.stream(tenant_topic(tenant_id), initial=initial))
 
 
 @router.get("/tenants/{slug}", response_model=PublicTenant)
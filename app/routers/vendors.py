@@ -1,24 +1,30 @@
 from fastapi import APIRouter, Depends, HTTPException, UploadFile, File, Form
 from sqlalchemy.orm import Session
 from app.core.database import get_db
-from app.models import VendorInvoice, Cause, Vendor, InvoiceStatus, Payout, PayoutToType, PayoutStatus, MembershipRole, User, VendorLink
+from app.models import VendorInvoice, Cause, Vendor, InvoiceStatus, Payout, PayoutToType, PayoutStatus, MembershipRole, VendorLink
 from app.schemas import VendorInvoiceCreate, VendorInvoice as VendorInvoiceSchema, VendorInvoiceUpdate, VendorCreate, Vendor as VendorSchema, VendorLinkCreate, VendorLink as VendorLinkSchema
-from app.deps import get_current_active_user, get_user_membership
+from app.deps import AuthContext, get_auth_context
+from app.services.audit import AuditLogSink
+from app.services.state_machine import Transition, TransitionError, TransitionTable
 from typing import List
 
 router = APIRouter()
 
+INVOICE_TRANSITIONS = TransitionTable([
+    Transition("approve", InvoiceStatus.SUBMITTED.value, InvoiceStatus.NGO_APPROVED.value, (MembershipRole.NGO_ADMIN.value,)),
+])
+
 
 @router.post("/vendors", response_model=VendorSchema)
 def create_vendor(
     vendor: VendorCreate,
     tenant_id: int,
-    current_user: User = Depends(get_current_active_user),
+    auth: AuthContext = Depends(get_auth_context),
     db: Session = Depends(get_db)
 ):
     """Create a vendor (NGO_ADMIN only)"""
     # Check user has NGO_ADMIN role for this tenant
-    membership = get_user_membership(current_user.id, tenant_id, db)
+    membership = auth.membership(tenant_id)
     if not membership or membership.role != MembershipRole.NGO_ADMIN:
         raise HTTPException(status_code=403, detail="Only NGO admins can create vendors")
     
@@ -41,7 +47,7 @@ def create_vendor(
 def link_vendor_to_cause(
     cause_id: int,
     vendor_link: VendorLinkCreate,
-    current_user: User = Depends(get_current_active_user),
+    auth: AuthContext = Depends(get_auth_context),
     db: Session = Depends(get_db)
 ):
     """Link vendor to cause (NGO_ADMIN only)"""
@@ -51,7 +57,7 @@ def link_vendor_to_cause(
         raise HTTPException(status_code=404, detail="Cause not found")
     
     # Check user has NGO_ADMIN role for this tenant
-    membership = get_user_membership(current_user.id, cause.tenant_id, db)
+    membership = auth.membership(cause.tenant_id)
     if not membership or membership.role != MembershipRole.NGO_ADMIN:
         raise HTTPException(status_code=403, detail="Only NGO admins can link vendors")
     
@@ -83,7 +89,7 @@ def create_vendor_invoice(
     number: str = Form(...),
     amount: float = Form(...),
     files: List[UploadFile] = File(...),
-    current_user: User = Depends(get_current_active_user),
+    auth: AuthContext = Depends(get_auth_context),
     db: Session = Depends(get_db)
 ):
     """Create vendor invoice with file uploads (VENDOR only)"""
@@ -98,7 +104,7 @@ def create_vendor_invoice(
         raise HTTPException(status_code=404, detail="Vendor not found")
     
     # Check user has vendor role for this tenant
-    membership = get_user_membership(current_user.id, vendor.tenant_id, db)
+    membership = auth.membership(vendor.tenant_id)
     if not membership or membership.role != MembershipRole.VENDOR:
         raise HTTPException(status_code=403, detail="Only vendors can submit invoices")
     
@@ -131,7 +137,7 @@ def create_vendor_invoice(
 @router.patch("/vendor-invoices/{invoice_id}/approve")
 def approve_vendor_invoice(
     invoice_id: int,
-    current_user: User = Depends(get_current_active_user),
+    auth: AuthContext = Depends(get_auth_context),
     db: Session = Depends(get_db)
 ):
     """Approve vendor invoice and create payout (NGO_ADMIN only)"""
@@ -141,13 +147,17 @@ def approve_vendor_invoice(
         raise HTTPException(status_code=404, detail="Invoice not found")
     
     # Check user has NGO_ADMIN role for this tenant
-    membership = get_user_membership(current_user.id, invoice.vendor.tenant_id, db)
+    membership = auth.membership(invoice.vendor.tenant_id)
     if not membership or membership.role != MembershipRole.NGO_ADMIN:
         raise HTTPException(status_code=403, detail="Only NGO admins can approve invoices")
     
     # Update invoice status
-    invoice.status = InvoiceStatus.NGO_APPROVED
-    db.commit()
+    try:
+        transition = INVOICE_TRANSITIONS.resolve(invoice.status.value, "approve", membership.role)
+    except TransitionError as e:
+        raise HTTPException(status_code=e.status_code, detail=str(e))
+    previous_status = invoice.status.value
+    invoice.status = InvoiceStatus(transition.target)
     
     # Create payout
     payout = Payout(
@@ -159,6 +169,15 @@ def approve_vendor_invoice(
     )
     
     db.add(payout)
+    db.flush()
+    AuditLogSink(db)([{
+        "actor_id": auth.user_id,
+        "entity": "vendor_invoice",
+        "entity_id": invoice.id,
+        "event": transition.event,
+        "from_status": previous_status,
+        "changes": {"status": transition.target, "payout_id": payout.id}
+    }])
     db.commit()
     db.refresh(payout)
     
@@ -173,7 +192,7 @@ def approve_vendor_invoice(
 @router.get("/vendor-invoices/{invoice_id}")
 def get_vendor_invoice(
     invoice_id: int,
-    current_user: User = Depends(get_current_active_user),
+    auth: AuthContext = Depends(get_auth_context),
     db: Session = Depends(get_db)
 ):
     """Get vendor invoice details"""
@@ -182,7 +201,7 @@ def get_vendor_invoice(
         raise HTTPException(status_code=404, detail="Invoice not found")
     
     # Check permissions
-    membership = get_user_membership(current_user.id, invoice.vendor.tenant_id, db)
+    membership = auth.membership(invoice.vendor.tenant_id)
     if not membership:
         raise HTTPException(status_code=403, detail="Insufficient permissions")
     
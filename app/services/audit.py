@@ -0,0 +1,32 @@
+from typing import Dict, List
+
+from sqlalchemy import insert
+from sqlalchemy.orm import Session
+
+from app.models import AuditLog
+
+
+class AuditLogSink:
+    """Writes state machine events to ``audit_logs`` in the caller's transaction.
+
+    Events are inserted in one batch and committed together with the state
+    change itself, so the log never disagrees with the data.
+    """
+
+    def __init__(self, db: Session):
+        self.db = db
+
+    def __call__(self, events: List[Dict]):
+        if not events:
+            return
+        self.db.execute(insert(AuditLog), [
+            {
+                "actor_id": event.get("actor_id"),
+                "entity": event["entity"],
+                "entity_id": event["entity_id"],
+                "action": event["event"],
+                "before_json": {"status": event["from_status"]},
+                "after_json": event["changes"]
+            }
+            for event in events
+        ])
@@ -0,0 +1,109 @@
+import hashlib
+import math
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Callable, Dict, Hashable, Optional, Tuple
+
+from fastapi import Request, Response
+
+
+# Session.info key of the catalogue views a transaction has changed
+CATALOGUE_CHANGES = "catalogue_views"
+
+
+def mark_catalogue_changed(session, *views: str):
+    """Drop the cached ``views`` when ``session`` commits.
+
+    The unit-of-work listeners only see ORM objects; writes made with Core
+    statements through the session call this instead.
+    """
+    session.info.setdefault(CATALOGUE_CHANGES, set()).update(views)
+
+
+@dataclass(frozen=True)
+class CachedBody:
+    body: bytes
+    etag: str
+    expires_at: float = math.inf
+
+
+def make_etag(body: bytes) -> str:
+    """Strong ETag derived from the response bytes"""
+    return '"' + hashlib.blake2b(body, digest_size=16).hexdigest() + '"'
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    # If-None-Match uses the weak comparison, so W/ prefixes are ignored
+    tags = [tag.strip() for tag in if_none_match.split(",")]
+    return etag in [tag[2:] if tag.startswith("W/") else tag for tag in tags]
+
+
+class CatalogueCache:
+    """Pre-serialized JSON bodies for read-mostly catalogue views.
+
+    Entries are keyed by ``(view, variant)``; the variant is ``None`` for the
+    marketplace listing and e.g. the tenant slug for a microsite. Writes call
+    ``invalidate(view)``, which drops every variant of the view and bumps its
+    generation so a body that was being built while the write happened is not
+    stored. Variants are kept in an LRU capped at ``max_entries``.
+
+    Invalidation only sees writes this process makes through the ORM, so
+    every body is also rebuilt ``ttl`` seconds after it was built (by
+    default ``max_age``): writes by other workers or by raw SQL show up
+    within that time rather than never.
+    """
+
+    def __init__(self, max_age: int = 60, max_entries: int = 1024, ttl: Optional[float] = None):
+        self.max_age = max_age
+        self.ttl = max_age if ttl is None else ttl
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[Tuple[str, Hashable], CachedBody]" = OrderedDict()
+        self._generations: Dict[str, int] = {}
+        self._lock = threading.Lock()
+
+    def get(self, view: str, variant: Hashable, build: Callable[[], bytes]) -> CachedBody:
+        key = (view, variant)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry.expires_at > time.monotonic():
+                self._entries.move_to_end(key)
+                return entry
+            generation = self._generations.get(view, 0)
+
+        body = build()
+        entry = CachedBody(body, make_etag(body), time.monotonic() + self.ttl)
+        with self._lock:
+            if self._generations.get(view, 0) == generation:
+                self._entries[key] = entry
+                if len(self._entries) > self.max_entries:
+                    self._entries.popitem(last=False)
+        return entry
+
+    def invalidate(self, *views: str):
+        with self._lock:
+            for view in views:
+                self._generations[view] = self._generations.get(view, 0) + 1
+                for key in [key for key in self._entries if key[0] == view]:
+                    del self._entries[key]
+
+    def clear(self):
+        with self._lock:
+            views = {key[0] for key in self._entries} | set(self._generations)
+        self.invalidate(*views)
+
+    def response(self, request: Request, view: str, build: Callable[[], bytes], variant: Hashable = None) -> Response:
+        """Serve the cached body, or 304 when the client already has it"""
+        entry = self.get(view, variant, build)
+        headers = {
+            "ETag": entry.etag,
+            "Cache-Control": f"public, max-age={self.max_age}"
+        }
+        if etag_matches(request.headers.get("if-none-match"), entry.etag):
+            return Response(status_code=304, headers=headers)
+        return Response(content=entry.body, media_type="application/json", headers=headers)
@@ -0,0 +1,106 @@
+import threading
+import time
+from decimal import Decimal
+from typing import List, Optional
+
+from sqlalchemy import distinct, func, select
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.models import Cause, CauseStatus, Donation, DonationStatus
+from app.services.ranked_feeds import RankedFeeds
+
+
+def _donor_count(cause_id=None):
+    """Distinct donors with a captured donation, for one cause or correlated to ``Cause.id``"""
+    return (
+        select(func.count(distinct(Donation.donor_user_id)))
+        .where(Donation.cause_id == (Cause.id if cause_id is None else cause_id))
+        .where(Donation.status == DonationStatus.CAPTURED)
+        .scalar_subquery()
+    )
+
+
+def _feed_entry(cause, donor_count) -> dict:
+    return {
+        "id": cause.id,
+        "category_id": cause.category_id,
+        "created_at": cause.created_at,
+        "goal_amount": cause.goal_amount,
+        "raised_amount": cause.raised_amount,
+        "donor_count": donor_count or 0
+    }
+
+
+class CauseFeeds:
+    """Ranked marketplace feeds over the SQL catalogue, maintained incrementally.
+
+    The first read (and then one read every ``max_age`` seconds) loads every
+    live cause and its captured donations into ``feeds``; in between, each
+    capture moves only its own cause with ``record_capture`` and reads are a
+    ``top()`` of the sorted sets. The periodic reload picks up causes that
+    went live or were edited, which do not pass through capture.
+
+    ``feeds`` lives in Redis when REDIS_URL is set, so workers share it;
+    otherwise each worker keeps its own.
+    """
+
+    def __init__(self, feeds: Optional[RankedFeeds] = None, max_age: float = 60):
+        self.feeds = feeds if feeds is not None else RankedFeeds()
+        self.max_age = max_age
+        self._loaded_at: Optional[float] = None
+        self._lock = threading.Lock()
+
+    def top(self, db: Session, feed: str, limit: int = 10, category_id: Optional[int] = None) -> List[int]:
+        """Ids of the first ``limit`` causes of ``feed``, best first"""
+        self.feeds.key(feed)  # unknown feeds fail before any loading
+        with self._lock:
+            if self._loaded_at is None or time.monotonic() - self._loaded_at > self.max_age:
+                self._load(db)
+        return self.feeds.top(feed, limit, category_id=category_id)
+
+    def record_capture(self, db: Session, cause_id: int, amount: Decimal):
+        """Move a cause after one of its donations was captured and committed"""
+        row = db.execute(
+            select(Cause.id, Cause.category_id, Cause.created_at, Cause.goal_amount, Cause.raised_amount,
+                   Cause.status, _donor_count(cause_id))
+            .where(Cause.id == cause_id)
+        ).first()
+        if row is None:
+            return
+        entry = _feed_entry(row, row[-1])
+        with self._lock:
+            # Reaching the goal takes a cause off the marketplace feeds
+            if row.status != CauseStatus.LIVE:
+                self.feeds.remove(entry)
+            else:
+                self.feeds.record_donation(entry, amount)
+
+    def invalidate(self):
+        """Reload everything on the next read"""
+        with self._lock:
+            self._loaded_at = None
+
+    def _load(self, db: Session):
+        causes = db.execute(
+            select(Cause.id, Cause.category_id, Cause.created_at, Cause.goal_amount, Cause.raised_amount,
+                   _donor_count())
+            .where(Cause.status == CauseStatus.LIVE)
+        ).all()
+        donations = db.execute(
+            select(Donation.cause_id, Donation.amount, Donation.created_at)
+            .join(Cause, Cause.id == Donation.cause_id)
+            .where(Cause.status == CauseStatus.LIVE, Donation.status == DonationStatus.CAPTURED)
+        ).all()
+        self.feeds.rebuild(
+            [_feed_entry(cause, cause[-1]) for cause in causes],
+            [{"cause_id": d.cause_id, "amount": d.amount, "created_at": d.created_at} for d in donations]
+        )
+        self._loaded_at = time.monotonic()
+
+
+if settings.REDIS_URL:
+    import redis
+    cause_feeds = CauseFeeds(RankedFeeds(redis.Redis.from_url(settings.REDIS_URL)), max_age=settings.CATALOGUE_MAX_AGE)
+else:
+    cause_feeds = CauseFeeds(max_age=settings.CATALOGUE_MAX_AGE)
@@ -0,0 +1,139 @@
+from typing import Dict, List, Optional
+
+from sqlalchemy import String, and_, case, func, literal, literal_column, or_, select, union
+from sqlalchemy.orm import Session
+
+from app.models import Category, Cause, CauseStatus, Tenant
+from app.services.search_index import FUZZY, PROGRESS_WEIGHT, tokenize
+
+PUBLIC_STATUSES = (CauseStatus.LIVE, CauseStatus.FUNDED, CauseStatus.FULFILLED)
+
+# Generated columns added by migration 0003. They are not mapped on the
+# models so the schema can still be created on databases without tsvector.
+CAUSE_VECTOR = literal_column("causes.search_vector")
+TENANT_VECTOR = literal_column("tenants.search_vector")
+
+
+class CauseSearch:
+    """Ranked, faceted search over public causes.
+
+    On PostgreSQL a cause matches when the web-search query hits its own
+    tsvector, its NGO's or its category name, or when the query is
+    trigram-similar to its title or NGO name (typo tolerance). Each of those
+    is a separate indexed lookup, unioned into the candidate set; ranking
+    (``ts_rank_cd`` plus trigram similarity plus funding progress) is only
+    computed for candidates. Other databases fall back to substring
+    matching so the endpoint still works in development.
+
+    Facet counts for a facet ignore that facet's own filter.
+    """
+
+    FACETS = {
+        "category": (Cause.category_id, Category.name),
+        "status": (Cause.status, None),
+        "ngo": (Cause.tenant_id, Tenant.name),
+    }
+
+    def search(
+        self,
+        db: Session,
+        q: str = "",
+        category_id: Optional[int] = None,
+        status: Optional[CauseStatus] = None,
+        tenant_id: Optional[int] = None,
+        page: int = 1,
+        limit: int = 20
+    ) -> Dict:
+        postgres = db.get_bind().dialect.name == "postgresql"
+        match, relevance = self._text_match(q, postgres) if tokenize(q) else (None, literal(0.0))
+        filters = {
+            "category": Cause.category_id == category_id if category_id is not None else None,
+            "status": Cause.status == status if status is not None else None,
+            "ngo": Cause.tenant_id == tenant_id if tenant_id is not None else None,
+        }
+        base = [Cause.status.in_(PUBLIC_STATUSES)] + ([match] if match is not None else [])
+        where = and_(*base, *[condition for condition in filters.values() if condition is not None])
+
+        goal = func.nullif(Cause.goal_amount, 0)
+        progress = func.coalesce(Cause.raised_amount / goal, 0)
+        score = (relevance + PROGRESS_WEIGHT * case((progress > 1, 1), else_=progress)).label("score")
+        rows = db.execute(
+            self._joined(select(Cause, Tenant.name, Category.name, score))
+            .where(where)
+            .order_by(score.desc(), Cause.id)
+            .offset((page - 1) * limit)
+            .limit(limit)
+        ).all()
+        total = db.execute(self._joined(select(func.count(Cause.id))).where(where)).scalar_one()
+
+        return {
+            "value": [
+                {
+                    "id": cause.id,
+                    "title": cause.title,
+                    "description": cause.description,
+                    "goal_amount": cause.goal_amount,
+                    "raised_amount": cause.raised_amount or 0,
+                    "type": cause.type,
+                    "status": cause.status,
+                    "tenant_id": cause.tenant_id,
+                    "ngo_name": ngo_name,
+                    "category_id": cause.category_id,
+                    "category_name": category_name,
+                    "created_at": cause.created_at,
+                    "score": round(float(row_score), 4)
+                }
+                for cause, ngo_name, category_name, row_score in rows
+            ],
+            "Count": total,
+            "page": page,
+            "limit": limit,
+            "facets": {
+                name: self._facet(db, name, base, filters)
+                for name in self.FACETS
+            }
+        }
+
+    @staticmethod
+    def _joined(query):
+        return query.select_from(Cause).join(Tenant, Tenant.id == Cause.tenant_id).join(
+            Category, Category.id == Cause.category_id
+        )
+
+    def _facet(self, db: Session, name: str, base: list, filters: Dict) -> List[Dict]:
+        column, label = self.FACETS[name]
+        others = [condition for other, condition in filters.items() if other != name and condition is not None]
+        columns = [column] + ([label] if label is not None else [])
+        counts = db.execute(
+            self._joined(select(*columns, func.count(Cause.id).label("count")))
+            .where(and_(*base, *others))
+            .group_by(*columns)
+            .order_by(func.count(Cause.id).desc(), column)
+        ).all()
+        if label is None:
+            return [{"value": row[0], "count": row[-1]} for row in counts]
+        return [{"id": row[0], "name": row[1], "count": row[-1]} for row in counts]
+
+    def _text_match(self, q: str, postgres: bool):
+        if not postgres:
+            fields = (Cause.title, Cause.description, Tenant.name, Category.name)
+            tokens = tokenize(q)
+            match = and_(*[or_(*[field.ilike(f"%{token}%") for field in fields]) for token in tokens])
+            relevance = sum(case((Cause.title.ilike(f"%{token}%"), 1.0), else_=0.0) for token in tokens)
+            return match, relevance
+
+        query = func.websearch_to_tsquery("english", q)
+        text = literal(q, String)
+        category_vector = func.setweight(func.to_tsvector("english", Category.name), literal_column("'B'"))
+        candidates = union(
+            select(Cause.id).where(CAUSE_VECTOR.op("@@")(query)),
+            select(Cause.id).join(Tenant, Tenant.id == Cause.tenant_id).where(TENANT_VECTOR.op("@@")(query)),
+            select(Cause.id).join(Category, Category.id == Cause.category_id).where(category_vector.op("@@")(query)),
+            select(Cause.id).where(text.op("<%")(Cause.title)),
+            select(Cause.id).join(Tenant, Tenant.id == Cause.tenant_id).where(text.op("<%")(Tenant.name)),
+        )
+        document = CAUSE_VECTOR.op("||")(TENANT_VECTOR).op("||")(category_vector)
+        relevance = func.ts_rank_cd(document, query) + FUZZY * func.greatest(
+            func.word_similarity(text, Cause.title), func.word_similarity(text, Tenant.name)
+        )
+        return Cause.id.in_(candidates), relevance
@@ -0,0 +1,75 @@
+from typing import Dict, List, Optional
+
+
+class CauseStore:
+    """Single store for causes in every state, partitioned by status.
+
+    ``records`` is the one list holding every cause (it is what gets persisted
+    and shared between workers); it is append-only, and a state change only
+    updates the cause in place. On top of it the store keeps an id index and
+    one insertion-ordered partition per status, so lookups, id allocation and
+    transitions are all O(1) and each view reads its partition directly.
+    """
+
+    STATUSES = ("PENDING_APPROVAL", "LIVE", "REJECTED")
+
+    def __init__(self, records: List[dict]):
+        self.records = records
+        self._by_id: Dict[int, dict] = {}
+        self._partitions: Dict[str, Dict[int, dict]] = {}
+        self._next_id = 1
+        self.reindex()
+
+    def reindex(self):
+        """Rebuild the index after ``records`` was replaced or reloaded"""
+        self._by_id = {}
+        self._partitions = {status: {} for status in self.STATUSES}
+        for cause in self.records:
+            self._index(cause)
+        self._next_id = max(self._by_id, default=0) + 1
+
+    def allocate_id(self) -> int:
+        cause_id = self._next_id
+        self._next_id += 1
+        return cause_id
+
+    def add(self, cause: dict) -> dict:
+        if "id" not in cause:
+            cause["id"] = self.allocate_id()
+        elif cause["id"] >= self._next_id:
+            self._next_id = cause["id"] + 1
+        self.records.append(cause)
+        self._index(cause)
+        return cause
+
+    def get(self, cause_id: int, status: Optional[str] = None) -> Optional[dict]:
+        """Cause by id; with ``status``, only if it is currently in that state"""
+        cause = self._by_id.get(cause_id)
+        if cause is None or (status is not None and cause["status"] != status):
+            return None
+        return cause
+
+    def transition(self, cause_id: int, status: str, **fields) -> dict:
+        """Move a cause to ``status`` (and update ``fields``); raises KeyError if unknown"""
+        cause = self._by_id[cause_id]
+        self._partition(cause["status"]).pop(cause_id, None)
+        cause["status"] = status
+        cause.update(fields)
+        self._partition(status)[cause_id] = cause
+        return cause
+
+    def partition(self, status: str) -> List[dict]:
+        return list(self._partitions.get(status, {}).values())
+
+    def count(self, status: str) -> int:
+        return len(self._partitions.get(status, ()))
+
+    def all(self) -> List[dict]:
+        return list(self.records)
+
+    def _partition(self, status: str) -> Dict[int, dict]:
+        return self._partitions.setdefault(status, {})
+
+    def _index(self, cause: dict):
+        self._by_id[cause["id"]] = cause
+        self._partition(cause["status"])[cause["id"]] = cause
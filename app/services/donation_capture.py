@@ -0,0 +1,117 @@
+import logging
+from dataclasses import dataclass
+from decimal import Decimal
+from typing import Any, Dict, Optional
+
+from sqlalchemy import and_, bindparam, case, func, update
+from sqlalchemy.orm import Session
+
+from app.models import Cause, CauseStatus, Donation, DonationStatus
+from app.services.catalogue_cache import mark_catalogue_changed
+from app.services.cause_feeds import CauseFeeds, cause_feeds
+
+logger = logging.getLogger(__name__)
+
+# Built once against the tables rather than the mapped classes: the ORM's
+# bulk-update bookkeeping is not needed, and every capture reuses the same
+# compiled statements.
+donations, causes = Donation.__table__, Cause.__table__
+
+CAPTURE_DONATION = (
+    update(donations)
+    .where(donations.c.pg_order_id == bindparam("order_id"), donations.c.status == DonationStatus.INIT)
+    .values(
+        status=DonationStatus.CAPTURED,
+        pg_payment_id=bindparam("payment_id"),
+        pg_signature=bindparam("signature"),
+        audit_json=bindparam("audit", type_=donations.c.audit_json.type)
+    )
+    .returning(donations.c.id, donations.c.cause_id, donations.c.amount)
+)
+
+_raised = func.coalesce(causes.c.raised_amount, 0) + bindparam("amount", type_=causes.c.raised_amount.type)
+CREDIT_CAUSE = (
+    update(causes)
+    .where(causes.c.id == bindparam("cause_id"))
+    .values(
+        raised_amount=_raised,
+        status=case(
+            (and_(causes.c.status == CauseStatus.LIVE, _raised >= causes.c.goal_amount), CauseStatus.FUNDED),
+            else_=causes.c.status
+        )
+    )
+    .returning(causes.c.tenant_id, causes.c.raised_amount, causes.c.goal_amount, causes.c.status)
+)
+
+
+@dataclass(frozen=True)
+class CapturedDonation:
+    donation_id: int
+    cause_id: int
+    tenant_id: int
+    amount: Decimal
+    raised_amount: Decimal
+    goal_amount: Decimal
+    cause_status: CauseStatus
+
+    @property
+    def funded(self) -> bool:
+        return self.cause_status == CauseStatus.FUNDED
+
+
+class DonationCapture:
+    """Marks a donation captured and credits its cause in two statements.
+
+    The donation is flipped with ``UPDATE ... WHERE status = INIT RETURNING``,
+    so a replayed webhook or a concurrent verify finds no row and changes
+    nothing. The cause is then credited with ``raised_amount = raised_amount
+    + :amount`` in the database, which cannot lose updates the way a read,
+    add in Python, write sequence can, and moves from LIVE to FUNDED in the
+    same statement once the goal is reached. Both run in one transaction,
+    whose commit drops the cached cause listings; after it the cause is
+    moved in the ranked marketplace ``feeds``.
+    """
+
+    def __init__(self, feeds: Optional[CauseFeeds] = None):
+        self.feeds = feeds if feeds is not None else cause_feeds
+
+    def capture(
+        self,
+        db: Session,
+        order_id: str,
+        payment_id: Optional[str] = None,
+        signature: Optional[str] = None,
+        audit: Optional[Dict[str, Any]] = None
+    ) -> Optional[CapturedDonation]:
+        """Capture the INIT donation of ``order_id``; ``None`` if there is none"""
+        try:
+            donation = db.execute(CAPTURE_DONATION, {
+                "order_id": order_id, "payment_id": payment_id, "signature": signature, "audit": audit
+            }).first()
+            if donation is None:
+                db.rollback()
+                return None
+
+            cause = db.execute(CREDIT_CAUSE, {"cause_id": donation.cause_id, "amount": donation.amount}).first()
+            mark_catalogue_changed(db, "causes")
+            db.commit()
+        except Exception:
+            db.rollback()
+            raise
+
+        if cause is None:
+            return None
+        try:
+            self.feeds.record_capture(db, donation.cause_id, donation.amount)
+        except Exception:
+            # The capture is committed; the next feed reload catches up
+            logger.exception("Could not update the feeds for cause %s", donation.cause_id)
+        return CapturedDonation(
+            donation_id=donation.id,
+            cause_id=donation.cause_id,
+            tenant_id=cause.tenant_id,
+            amount=donation.amount,
+            raised_amount=cause.raised_amount,
+            goal_amount=cause.goal_amount,
+            cause_status=cause.status
+        )
@@ -0,0 +1,93 @@
+from dataclasses import dataclass
+from typing import Dict, Hashable, Iterable, List, Optional, Set, Tuple
+
+
+@dataclass
+class DonationTotals:
+    count: int = 0
+    amount: float = 0
+
+
+class DonorIndex:
+    """Donor-centric index over a list of donation dicts.
+
+    Each donor has their donations in insertion (= time) order, overall and per
+    NGO and per cause, so a dashboard page is a slice from the end of a list.
+    Running totals of completed donations are kept per donor, (donor, NGO) and
+    (donor, cause) and updated when a donation is verified, instead of being
+    summed on every request.
+
+    Lists are append-only, so a cursor is simply a position in the list and
+    stays valid while new donations arrive.
+    """
+
+    COMPLETED = "COMPLETED"
+
+    def __init__(self):
+        self._entries: Dict[Tuple, List[dict]] = {}
+        self._totals: Dict[Tuple, DonationTotals] = {}
+        self._completed: Set[Hashable] = set()
+
+    def rebuild(self, donations: Iterable[dict]):
+        self._entries.clear()
+        self._totals.clear()
+        self._completed.clear()
+        for donation in sorted(donations, key=lambda d: d.get("created_at") or ""):
+            self.add(donation)
+
+    def add(self, donation: dict):
+        """Index a newly created donation (counted in totals once it completes)"""
+        for key in self._keys(donation):
+            self._entries.setdefault(key, []).append(donation)
+        if donation.get("status") == self.COMPLETED:
+            self.record_completed(donation)
+
+    def record_completed(self, donation: dict):
+        """Add a verified donation to the running totals; safe to call twice"""
+        if donation["id"] in self._completed:
+            return
+        self._completed.add(donation["id"])
+        for key in self._keys(donation):
+            totals = self._totals.setdefault(key, DonationTotals())
+            totals.count += 1
+            totals.amount += donation["amount"]
+
+    def count(self, donor: str, ngo_id: Optional[int] = None, cause_id: Optional[int] = None) -> int:
+        return len(self._entries.get(self._key(donor, ngo_id, cause_id), ()))
+
+    def totals(self, donor: str, ngo_id: Optional[int] = None, cause_id: Optional[int] = None) -> DonationTotals:
+        return self._totals.get(self._key(donor, ngo_id, cause_id), DonationTotals())
+
+    def page(
+        self, donor: str, ngo_id: Optional[int] = None, cause_id: Optional[int] = None,
+        cursor: Optional[str] = None, limit: int = 50
+    ) -> Tuple[List[dict], Optional[str]]:
+        """Most recent donations first; returns the page and the cursor of the next one"""
+        entries = self._entries.get(self._key(donor, ngo_id, cause_id), [])
+        end = len(entries)
+        if cursor:
+            try:
+                end = min(int(cursor), end)
+            except ValueError:
+                raise ValueError(f"Invalid cursor: {cursor!r}")
+        start = max(end - limit, 0)
+        items = entries[start:end]
+        items.reverse()
+        return items, (str(start) if start > 0 else None)
+
+    @staticmethod
+    def _key(donor: str, ngo_id: Optional[int], cause_id: Optional[int]) -> Tuple:
+        if ngo_id is not None:
+            return ("ngo", donor, ngo_id)
+        if cause_id is not None:
+            return ("cause", donor, cause_id)
+        return ("donor", donor)
+
+    @staticmethod
+    def _keys(donation: dict) -> List[Tuple]:
+        donor = donation["donor_email"]
+        keys = [("donor", donor)]
+        if donation.get("ngo_id") is not None:
+            keys.append(("ngo", donor, donation["ngo_id"]))
+        keys.append(("cause", donor, donation["cause_id"]))
+        return keys
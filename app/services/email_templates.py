@@ -0,0 +1,217 @@
+import html
+import re
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Callable, Dict, Iterable, Iterator, Mapping, Tuple
+
+# Fields every template can use; they come from the tenant/platform branding
+# and are baked in when a template is compiled.
+BRANDING_DEFAULTS = {
+    "app_name": "NGO Platform",
+    "primary_color": "#2563EB",
+    "secondary_color": "#059669",
+    "contact_email": "info@bheeshmaa.in",
+    "footer_text": "Making a Difference Together",
+    "frontend_url": "http://localhost:5173",
+}
+
+_STYLES = """
+        <style>
+            body {{ font-family: Arial, sans-serif; line-height: 1.6; color: #333; margin: 0; padding: 0; }}
+            .container {{ max-width: 600px; margin: 0 auto; padding: 20px; }}
+            .header {{ background: linear-gradient(135deg, ${primary_color}, ${secondary_color}); color: white; padding: 30px; text-align: center; border-radius: 10px 10px 0 0; }}
+            .content {{ background: #f8fafc; padding: 30px; border-radius: 0 0 10px 10px; }}
+            .button {{ display: inline-block; background: ${primary_color}; color: white; padding: 15px 30px; text-decoration: none; border-radius: 5px; margin: 20px 0; }}
+            .receipt {{ background: white; padding: 20px; border-radius: 5px; margin: 20px 0; border-left: 4px solid ${primary_color}; }}
+            .footer {{ text-align: center; margin-top: 30px; color: #666; font-size: 14px; }}
+        </style>"""
+
+
+def _page(title: str, heading: str, tagline: str, body: str, footer_line: str) -> str:
+    return f"""
+    <!DOCTYPE html>
+    <html>
+    <head>
+        <meta charset="utf-8">
+        <meta name="viewport" content="width=device-width, initial-scale=1.0">
+        <title>{title}</title>{_STYLES}
+    </head>
+    <body>
+        <div class="container">
+            <div class="header">
+                <h1>{heading}</h1>
+                <p>{tagline}</p>
+            </div>
+            <div class="content">{body}
+            </div>
+            <div class="footer">
+                <p>© 2024 ${{app_name}}. All rights reserved.</p>
+                <p>{footer_line}</p>
+            </div>
+        </div>
+    </body>
+    </html>
+    """
+
+
+def _money(value) -> str:
+    return f"{float(value):,.2f}"
+
+
+def _role(value) -> str:
+    return str(value).replace('_', ' ')
+
+
+@dataclass(frozen=True)
+class TemplateSource:
+    subject: str
+    html: str
+    # Per-field formatters applied before escaping, e.g. money formatting
+    formatters: Tuple[Tuple[str, Callable], ...] = ()
+
+
+TEMPLATES: Dict[str, TemplateSource] = {
+    "password_reset": TemplateSource(
+        subject="Password Reset Request - ${app_name}",
+        html=_page(
+            "Password Reset - ${app_name}", "🔐 Password Reset Request", "${app_name}",
+            """
+                <h2>Hello {user_name},</h2>
+                <p>We received a request to reset your password for your ${app_name} account.</p>
+                <p>Click the button below to reset your password:</p>
+                <a href="{reset_link}" class="button">Reset Password</a>
+                <p>If you didn't request this password reset, please ignore this email.</p>
+                <p>This link will expire in 24 hours for security reasons.</p>""",
+            "This email was sent from ${contact_email}"
+        )
+    ),
+    "welcome": TemplateSource(
+        subject="Welcome to ${app_name}!",
+        html=_page(
+            "Welcome to ${app_name}", "🎉 Welcome to ${app_name}!", "${footer_text}",
+            """
+                <h2>Hello {user_name},</h2>
+                <p>Welcome to the ${app_name}! We're excited to have you join our community of changemakers.</p>
+                <p>Your account has been created with the role: <strong>{user_role}</strong></p>
+                <p>You can now:</p>
+                <ul>
+                    <li>Access your personalized dashboard</li>
+                    <li>Manage your profile and settings</li>
+                    <li>Connect with NGOs and causes</li>
+                    <li>Make a positive impact in your community</li>
+                </ul>
+                <a href="${frontend_url}/login" class="button">Get Started</a>
+                <p>If you have any questions, feel free to contact our support team.</p>""",
+            "Contact us: ${contact_email}"
+        ),
+        formatters=(("user_role", _role),)
+    ),
+    "donation_invoice": TemplateSource(
+        subject="Donation Receipt - {cause_title}",
+        html=_page(
+            "Donation Receipt - ${app_name}", "💰 Donation Receipt", "Thank you for your generosity!",
+            """
+                <h2>Hello {donor_name},</h2>
+                <p>Thank you for your generous donation! Your contribution is making a real difference.</p>
+                <div class="receipt">
+                    <h3>Donation Details</h3>
+                    <p><strong>Cause:</strong> {cause_title}</p>
+                    <p><strong>Amount:</strong> ₹{amount}</p>
+                    <p><strong>Transaction ID:</strong> {transaction_id}</p>
+                    <p><strong>Date:</strong> {date}</p>
+                    <p><strong>Status:</strong> Completed</p>
+                </div>
+                <p>Your donation is tax-deductible. Please keep this receipt for your records.</p>
+                <p>Thank you for supporting our mission to create positive change!</p>""",
+            "Contact us: ${contact_email}"
+        ),
+        formatters=(("amount", _money),)
+    ),
+    "donor_thank_you": TemplateSource(
+        subject="Thank you for your support in {year} - ${app_name}",
+        html=_page(
+            "Thank You - ${app_name}", "🙏 Thank You!", "${footer_text}",
+            """
+                <h2>Dear {donor_name},</h2>
+                <p>{message}</p>
+                <div class="receipt">
+                    <h3>Your {year} in numbers</h3>
+                    <p><strong>Donations:</strong> {donation_count}</p>
+                    <p><strong>Total given:</strong> ₹{total_amount}</p>
+                </div>
+                <a href="${frontend_url}/donor" class="button">See your impact</a>""",
+            "Contact us: ${contact_email}"
+        ),
+        formatters=(("total_amount", _money),)
+    ),
+}
+
+_BRANDING_FIELD = re.compile(r"\$\{(\w+)\}")
+
+
+@dataclass(frozen=True)
+class RenderedEmail:
+    to_email: str
+    subject: str
+    html_content: str
+
+
+class CompiledTemplate:
+    """A template with branding baked in, rendered with a single ``format_map``"""
+
+    def __init__(self, source: TemplateSource, branding: Mapping[str, str]):
+        self.subject = self._bake(source.subject, branding, escape=False)
+        self.html = self._bake(source.html, branding, escape=True)
+        self.formatters = dict(source.formatters)
+
+    @staticmethod
+    def _bake(text: str, branding: Mapping[str, str], escape: bool) -> str:
+        def substitute(match):
+            value = str(branding[match.group(1)])
+            value = html.escape(value) if escape else value
+            # Branding values end up inside a format string
+            return value.replace("{", "{{").replace("}", "}}")
+        return _BRANDING_FIELD.sub(substitute, text)
+
+    def render(self, fields: Mapping) -> Tuple[str, str]:
+        """Return (subject, html) for one recipient"""
+        values = {}
+        for key, value in fields.items():
+            formatter = self.formatters.get(key)
+            values[key] = str(formatter(value) if formatter else value)
+        escaped = {key: html.escape(value) for key, value in values.items()}
+        return self.subject.format_map(values), self.html.format_map(escaped)
+
+
+def _branding_key(branding: Mapping) -> Tuple[Tuple[str, str], ...]:
+    return tuple((key, str(branding.get(key, default))) for key, default in BRANDING_DEFAULTS.items())
+
+
+@lru_cache(maxsize=256)
+def _compile(name: str, branding_key: Tuple[Tuple[str, str], ...]) -> CompiledTemplate:
+    return CompiledTemplate(TEMPLATES[name], dict(branding_key))
+
+
+def get_template(name: str, branding: Mapping) -> CompiledTemplate:
+    """Compiled template for ``name``, cached per distinct branding"""
+    if name not in TEMPLATES:
+        raise KeyError(f"Unknown email template: {name}")
+    return _compile(name, _branding_key(branding))
+
+
+def render(name: str, branding: Mapping, **fields) -> Tuple[str, str]:
+    return get_template(name, branding).render(fields)
+
+
+def render_many(name: str, branding: Mapping, recipients: Iterable[Mapping]) -> Iterator[RenderedEmail]:
+    """Lazily render one message per recipient; each needs a ``to_email`` key"""
+    template = get_template(name, branding)
+    for recipient in recipients:
+        fields = dict(recipient)
+        to_email = fields.pop("to_email")
+        subject, html_content = template.render(fields)
+        yield RenderedEmail(to_email=to_email, subject=subject, html_content=html_content)
+
+
+def clear_cache():
+    _compile.cache_clear()
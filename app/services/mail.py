@@ -0,0 +1,321 @@
+import asyncio
+import logging
+import queue
+import smtplib
+import threading
+import time
+import uuid
+from collections import deque
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from email.mime.multipart import MIMEMultipart
+from email.mime.text import MIMEText
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+
+class MailQueueFull(Exception):
+    """Raised when the outbound queue cannot take more messages"""
+
+
+@dataclass
+class OutboundEmail:
+    to_email: str
+    subject: str
+    html_content: str
+    id: str = field(default_factory=lambda: uuid.uuid4().hex)
+    attempts: int = 0
+    last_error: Optional[str] = None
+    queued_at: float = field(default_factory=time.time)
+
+    def as_string(self, from_email: str, from_name: str) -> str:
+        msg = MIMEMultipart('alternative')
+        msg['From'] = f"{from_name} <{from_email}>"
+        msg['To'] = self.to_email
+        msg['Subject'] = self.subject
+        msg.attach(MIMEText(self.html_content, 'html'))
+        return msg.as_string()
+
+
+class SMTPConnectionPool:
+    """Small pool of long-lived, authenticated SMTP connections.
+
+    Settings are read through ``settings_provider`` on every checkout, so a
+    change to the SMTP settings retires connections opened with the old ones.
+    """
+
+    def __init__(self, settings_provider: Callable[[], Dict], size: int = 2, idle_timeout: float = 60.0, timeout: float = 30.0):
+        self.settings_provider = settings_provider
+        self.size = size
+        self.idle_timeout = idle_timeout
+        self.timeout = timeout
+        self._idle: "queue.LifoQueue" = queue.LifoQueue()
+        self._slots = threading.BoundedSemaphore(size)
+
+    @contextmanager
+    def connection(self):
+        """Check out a ready-to-use connection; broken connections are dropped"""
+        self._slots.acquire()
+        conn = None
+        try:
+            conn = self._checkout()
+            yield conn
+        except (smtplib.SMTPServerDisconnected, OSError):
+            self._close(conn)
+            conn = None
+            raise
+        finally:
+            if conn is not None:
+                self._idle.put((conn, time.monotonic()))
+            self._slots.release()
+
+    def close_all(self):
+        while True:
+            try:
+                conn, _ = self._idle.get_nowait()
+            except queue.Empty:
+                return
+            self._close(conn)
+
+    def _checkout(self) -> smtplib.SMTP:
+        settings = dict(self.settings_provider())
+        fingerprint = self._fingerprint(settings)
+        while True:
+            try:
+                conn, released_at = self._idle.get_nowait()
+            except queue.Empty:
+                return self._connect(settings, fingerprint)
+            stale = time.monotonic() - released_at > self.idle_timeout
+            if conn._pool_fingerprint == fingerprint and not stale and self._alive(conn):
+                return conn
+            self._close(conn)
+
+    def _connect(self, settings: Dict, fingerprint) -> smtplib.SMTP:
+        encryption = str(settings.get("smtp_encryption", "SSL")).upper()
+        if encryption == "SSL":
+            conn = smtplib.SMTP_SSL(settings["smtp_host"], settings["smtp_port"], timeout=self.timeout)
+        else:
+            conn = smtplib.SMTP(settings["smtp_host"], settings["smtp_port"], timeout=self.timeout)
+            if encryption in ("TLS", "STARTTLS"):
+                conn.starttls()
+        if settings.get("smtp_username"):
+            conn.login(settings["smtp_username"], settings["smtp_password"])
+        conn._pool_fingerprint = fingerprint
+        return conn
+
+    @staticmethod
+    def _alive(conn: smtplib.SMTP) -> bool:
+        try:
+            return conn.noop()[0] == 250
+        except (smtplib.SMTPException, OSError):
+            return False
+
+    @staticmethod
+    def _close(conn: Optional[smtplib.SMTP]):
+        if conn is None:
+            return
+        try:
+            conn.quit()
+        except (smtplib.SMTPException, OSError):
+            conn.close()
+
+    @staticmethod
+    def _fingerprint(settings: Dict):
+        return tuple(settings.get(key) for key in (
+            "smtp_host", "smtp_port", "smtp_username", "smtp_password", "smtp_encryption"
+        ))
+
+
+class MailQueue:
+    """Bounded outbound queue drained in batches by background workers.
+
+    Each worker takes whatever has piled up (up to ``batch_size``) and sends it
+    over a single pooled connection. Failed messages are retried with
+    exponential backoff; after ``max_attempts`` they go to ``dead_letters``.
+    That store keeps the newest ``dead_letter_size`` failures; older ones are
+    logged at ERROR as they are pushed out and counted in
+    ``dead_letters_dropped``.
+
+    Sending runs in threads, but counters and the dead-letter store are only
+    updated on the event loop. Unexpected errors fail the batch like SMTP
+    errors do, so a worker never stops draining the queue.
+    """
+
+    def __init__(
+        self,
+        pool: SMTPConnectionPool,
+        sender_provider: Callable[[], Dict],
+        maxsize: int = 1000,
+        batch_size: int = 20,
+        workers: Optional[int] = None,
+        max_attempts: int = 5,
+        backoff_base: float = 1.0,
+        backoff_max: float = 300.0,
+        dead_letter_size: int = 1000
+    ):
+        self.pool = pool
+        self.sender_provider = sender_provider
+        self.batch_size = batch_size
+        self.workers = workers or pool.size
+        self.max_attempts = max_attempts
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.dead_letters: deque = deque(maxlen=dead_letter_size)
+        self._maxsize = maxsize
+        self._queue: Optional[asyncio.Queue] = None
+        self._tasks: List[asyncio.Task] = []
+        self._pending_retries = 0
+        self.sent_count = 0
+        self.dead_letters_dropped = 0
+
+    async def start(self):
+        if self._tasks:
+            return
+        self._queue = asyncio.Queue(maxsize=self._maxsize)
+        self._tasks = [asyncio.create_task(self._worker()) for _ in range(self.workers)]
+
+    async def stop(self):
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+        await asyncio.to_thread(self.pool.close_all)
+
+    def enqueue(self, message: OutboundEmail) -> OutboundEmail:
+        """Queue a message without blocking; raises MailQueueFull when saturated"""
+        if self._queue is None:
+            raise RuntimeError("Mail queue is not running")
+        try:
+            self._queue.put_nowait(message)
+        except asyncio.QueueFull:
+            raise MailQueueFull(f"Mail queue is full ({self._maxsize} messages)")
+        return message
+
+    async def enqueue_many(self, messages: Iterable[OutboundEmail]) -> int:
+        """Queue a stream of messages, waiting for room instead of failing"""
+        if self._queue is None:
+            raise RuntimeError("Mail queue is not running")
+        count = 0
+        for message in messages:
+            await self._queue.put(message)
+            count += 1
+        return count
+
+    async def join(self):
+        """Wait until every queued message has been sent or dead-lettered"""
+        while True:
+            await self._queue.join()
+            if self._pending_retries == 0:
+                return
+            await asyncio.sleep(0.01)
+
+    def retry_dead_letters(self) -> int:
+        """Move dead letters back onto the queue; stops early if it fills up"""
+        count = 0
+        while self.dead_letters:
+            message = self.dead_letters[0]
+            message.attempts = 0
+            self.enqueue(message)
+            self.dead_letters.popleft()
+            count += 1
+        return count
+
+    def stats(self) -> Dict:
+        return {
+            "queued": self._queue.qsize() if self._queue else 0,
+            "capacity": self._maxsize,
+            "pending_retries": self._pending_retries,
+            "sent": self.sent_count,
+            "dead_letters": len(self.dead_letters),
+            "dead_letters_dropped": self.dead_letters_dropped,
+            "workers": len(self._tasks),
+            "pool_size": self.pool.size
+        }
+
+    async def _worker(self):
+        while True:
+            batch = [await self._queue.get()]
+            while len(batch) < self.batch_size:
+                try:
+                    batch.append(self._queue.get_nowait())
+                except asyncio.QueueEmpty:
+                    break
+            try:
+                try:
+                    sent, failed, refused = await asyncio.to_thread(self._send_batch, batch)
+                except Exception as e:
+                    # Not an SMTP failure (settings, message building, a bug):
+                    # keep the worker alive and treat the whole batch as failed
+                    logger.exception("Sending a batch of %d emails failed", len(batch))
+                    sent, failed, refused = 0, batch, []
+                    for message in batch:
+                        message.last_error = f"{type(e).__name__}: {e}"
+                self.sent_count += sent
+                for message in refused:
+                    self._dead_letter(message)
+                for message in failed:
+                    self._schedule_retry(message)
+            finally:
+                for _ in batch:
+                    self._queue.task_done()
+
+    def _send_batch(self, batch: List[OutboundEmail]) -> Tuple[int, List[OutboundEmail], List[OutboundEmail]]:
+        """Send a batch over one connection; returns the sent count, messages to retry and refused ones"""
+        sender = self.sender_provider()
+        remaining = deque(batch)
+        sent = 0
+        failed = []
+        refused = []
+        try:
+            with self.pool.connection() as conn:
+                while remaining:
+                    message = remaining[0]
+                    try:
+                        conn.sendmail(
+                            sender["from_email"], message.to_email,
+                            message.as_string(sender["from_email"], sender["from_name"])
+                        )
+                        sent += 1
+                    except smtplib.SMTPRecipientsRefused as e:
+                        # Retrying will not help a refused address
+                        message.last_error = str(e)
+                        refused.append(message)
+                    except smtplib.SMTPServerDisconnected:
+                        raise
+                    except smtplib.SMTPException as e:
+                        message.last_error = str(e)
+                        failed.append(message)
+                    remaining.popleft()
+        except (smtplib.SMTPException, OSError) as e:
+            for message in remaining:
+                message.last_error = f"{type(e).__name__}: {e}"
+            failed.extend(remaining)
+        return sent, failed, refused
+
+    def _schedule_retry(self, message: OutboundEmail):
+        message.attempts += 1
+        if message.attempts >= self.max_attempts:
+            self._dead_letter(message)
+            return
+        delay = min(self.backoff_base * (2 ** (message.attempts - 1)), self.backoff_max)
+        self._pending_retries += 1
+        asyncio.get_running_loop().call_later(delay, self._requeue, message)
+
+    def _requeue(self, message: OutboundEmail):
+        try:
+            self._queue.put_nowait(message)
+            self._pending_retries -= 1
+        except asyncio.QueueFull:
+            asyncio.get_running_loop().call_later(self.backoff_base, self._requeue, message)
+
+    def _dead_letter(self, message: OutboundEmail):
+        logger.warning("Email %s to %s dead-lettered: %s", message.id, message.to_email, message.last_error)
+        if len(self.dead_letters) == self.dead_letters.maxlen:
+            dropped = self.dead_letters[0]
+            self.dead_letters_dropped += 1
+            logger.error(
+                "Dead-letter store full, dropping email %s to %s (%r): %s",
+                dropped.id, dropped.to_email, dropped.subject, dropped.last_error
+            )
+        self.dead_letters.append(message)
@@ -1,13 +1,17 @@
 import razorpay
 from app.core.config import settings
+from app.core.metrics import payment_gateway_duration
 from decimal import Decimal
 from typing import Dict, Any
+from app.services.donation_capture import CapturedDonation, DonationCapture
+from app.services.progress_hub import cause_topic, progress_hub, progress_payload, tenant_topic
 
 
 class PaymentService:
     """Service for handling payment operations"""
     
     def __init__(self):
+        self.capture = DonationCapture()
         self.client = None
         if settings.PAYMENT_PROVIDER == "razorpay" and settings.RAZORPAY_KEY_ID and settings.RAZORPAY_KEY_SECRET:
             self.client = razorpay.Client(
@@ -29,7 +33,8 @@ class PaymentService:
                 }
             }
             
-            order = self.client.order.create(data=order_data)
+            with payment_gateway_duration.time("create_order"):
+                order = self.client.order.create(data=order_data)
             
             return {
                 "order_id": order["id"],
@@ -50,14 +55,34 @@ class PaymentService:
     def verify_webhook_signature(self, body: bytes, headers: Dict[str, str]):
         """Verify webhook signature"""
         if self.client:
-            signature = headers.get("X-Razorpay-Signature", "")
+            # Starlette lower-cases header names; the SDK signs text, not bytes
+            signature = headers.get("x-razorpay-signature", "")
             self.client.utility.verify_webhook_signature(
-                body, signature, settings.RAZORPAY_KEY_SECRET
+                body.decode(), signature, settings.RAZORPAY_KEY_SECRET
             )
     
+    @staticmethod
+    def publish_progress(captured: CapturedDonation, db):
+        """Push the cause's new totals to live progress streams"""
+        from app.models import Donation, DonationStatus
+        
+        topics = [cause_topic(captured.cause_id), tenant_topic(captured.tenant_id)]
+        # Counting donations is only worth a query when someone is watching
+        if not any(progress_hub.subscriber_count(topic) for topic in topics):
+            return
+        donation_count = db.query(Donation).filter(
+            Donation.cause_id == captured.cause_id,
+            Donation.status == DonationStatus.CAPTURED
+        ).count()
+        progress_hub.publish(
+            topics,
+            captured.cause_id,
+            progress_payload(captured.cause_id, captured.raised_amount, captured.goal_amount, donation_count)
+        )
+    
     def process_webhook(self, webhook_data: Dict[str, Any], db):
         """Process webhook data"""
-        from app.models import Donation, Cause, DonationStatus
+        from app.models import Donation, DonationStatus
         
         # Handle payment events
         if webhook_data.get("event") == "payment.captured":
@@ -65,19 +90,15 @@ class PaymentService:
             order_id = payment_data.get("order_id")
             
             if order_id:
-                donation = db.query(Donation).filter(Donation.pg_order_id == order_id).first()
-                if donation:
-                    donation.status = DonationStatus.CAPTURED
-                    donation.pg_payment_id = payment_data.get("id")
-                    donation.pg_signature = webhook_data.get("signature", "")
-                    donation.audit_json = webhook_data
-                    
-                    # Update cause raised amount
-                    cause = db.query(Cause).filter(Cause.id == donation.cause_id).first()
-                    if cause:
-                        cause.raised_amount += donation.amount
-                    
-                    db.commit()
+                captured = self.capture.capture(
+                    db,
+                    order_id,
+                    payment_id=payment_data.get("id"),
+                    signature=webhook_data.get("signature", ""),
+                    audit=webhook_data
+                )
+                if captured:
+                    self.publish_progress(captured, db)
         
         elif webhook_data.get("event") == "payment.failed":
             payment_data = webhook_data.get("payload", {}).get("payment", {})
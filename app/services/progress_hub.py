@@ -0,0 +1,182 @@
+import asyncio
+import threading
+from typing import AsyncIterator, Dict, Hashable, Iterable, Optional, Set, Tuple
+
+from fastapi.responses import StreamingResponse
+
+from app.core.responses import dumps
+
+
+def cause_topic(cause_id) -> str:
+    return f"cause:{cause_id}"
+
+
+def tenant_topic(tenant_id) -> str:
+    return f"tenant:{tenant_id}"
+
+
+def progress_payload(cause_id, raised, target, donation_count) -> dict:
+    raised, target = float(raised or 0), float(target or 0)
+    return {
+        "cause_id": cause_id,
+        "raised_amount": raised,
+        "target_amount": target,
+        "donation_count": donation_count or 0,
+        "progress": round(raised / target, 4) if target else 0.0
+    }
+
+
+def event_stream_response(stream: AsyncIterator[bytes]) -> StreamingResponse:
+    # X-Accel-Buffering stops nginx from buffering the stream
+    return StreamingResponse(stream, media_type="text/event-stream", headers={
+        "Cache-Control": "no-cache",
+        "X-Accel-Buffering": "no"
+    })
+
+
+def sse_frame(event: str, data, event_id: Optional[str] = None) -> bytes:
+    head = f"id: {event_id}\n" if event_id is not None else ""
+    return f"{head}event: {event}\n".encode() + b"data: " + dumps(data) + b"\n\n"
+
+
+class Subscription:
+    """One stream's mailbox: the latest payload per key, and a wake-up event"""
+
+    __slots__ = ("topic", "pending", "event", "heartbeat")
+
+    def __init__(self, topic: str):
+        self.topic = topic
+        self.pending: Dict[Hashable, dict] = {}
+        self.event = asyncio.Event()
+        self.heartbeat = False
+
+    def push(self, key: Hashable, payload: dict):
+        self.pending[key] = payload
+        self.event.set()
+
+
+class ProgressHub:
+    """In-process pub/sub for live progress updates, served as SSE.
+
+    Updates are published per ``(topic, key)``, e.g. key = cause id on the
+    cause's own topic and on its tenant's topic. Bursts are coalesced: the
+    first update of a key goes out at once, later ones within
+    ``min_interval`` replace each other and only the latest is delivered
+    when the interval ends. A subscriber that falls behind keeps just the
+    latest payload per key, so memory per subscriber stays bounded.
+
+    Idle subscribers cost one ``Subscription`` and one suspended generator;
+    keep-alives for all of them come from a single hub-wide timer.
+    ``publish`` may be called from any thread (e.g. sync endpoints running
+    in the threadpool).
+    """
+
+    def __init__(self, min_interval: float = 0.25, heartbeat: float = 15.0):
+        self.min_interval = min_interval
+        self.heartbeat = heartbeat
+        self._subscribers: Dict[str, Set[Subscription]] = {}
+        self._pending: Dict[Tuple[str, Hashable], dict] = {}
+        self._sent_at: Dict[str, Dict[Hashable, float]] = {}
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._loop_thread: Optional[int] = None
+        self._heartbeat_handle = None
+
+    def subscriber_count(self, topic: Optional[str] = None) -> int:
+        if topic is not None:
+            return len(self._subscribers.get(topic, ()))
+        return sum(len(subscribers) for subscribers in self._subscribers.values())
+
+    def subscribe(self, topic: str) -> Subscription:
+        self._bind_loop()
+        subscription = Subscription(topic)
+        self._subscribers.setdefault(topic, set()).add(subscription)
+        if self._heartbeat_handle is None:
+            self._heartbeat_handle = self._loop.call_later(self.heartbeat, self._beat)
+        return subscription
+
+    def unsubscribe(self, subscription: Subscription):
+        subscribers = self._subscribers.get(subscription.topic)
+        if subscribers is None:
+            return
+        subscribers.discard(subscription)
+        if not subscribers:
+            del self._subscribers[subscription.topic]
+            self._sent_at.pop(subscription.topic, None)
+
+    def publish(self, topics: Iterable[str], key: Hashable, payload: dict):
+        loop = self._loop
+        if loop is None or loop.is_closed():
+            return
+        if self._on_loop_thread():
+            self._publish(tuple(topics), key, payload)
+        else:
+            loop.call_soon_threadsafe(self._publish, tuple(topics), key, payload)
+
+    async def stream(self, topic: str, initial: Iterable[Tuple[Hashable, dict]] = (), event: str = "progress") -> AsyncIterator[bytes]:
+        """SSE frames for ``topic``: ``initial`` snapshots, then live updates"""
+        subscription = self.subscribe(topic)
+        try:
+            yield f"retry: {int(self.heartbeat * 1000)}\n\n".encode()
+            for key, payload in initial:
+                yield sse_frame(event, payload)
+            while True:
+                await subscription.event.wait()
+                subscription.event.clear()
+                if subscription.heartbeat:
+                    subscription.heartbeat = False
+                    yield b": keep-alive\n\n"
+                pending, subscription.pending = subscription.pending, {}
+                for key, payload in pending.items():
+                    yield sse_frame(event, payload)
+        finally:
+            self.unsubscribe(subscription)
+
+    def _bind_loop(self):
+        loop = asyncio.get_running_loop()
+        if self._loop is not loop:
+            self._loop = loop
+            self._loop_thread = threading.get_ident()
+            self._heartbeat_handle = None
+
+    def _on_loop_thread(self) -> bool:
+        return threading.get_ident() == self._loop_thread
+
+    def _publish(self, topics: Tuple[str, ...], key: Hashable, payload: dict):
+        now = self._loop.time()
+        for topic in topics:
+            if topic not in self._subscribers:
+                continue
+            slot = (topic, key)
+            scheduled = slot in self._pending
+            self._pending[slot] = payload
+            if scheduled:
+                continue
+            due = self._sent_at.get(topic, {}).get(key, float("-inf")) + self.min_interval
+            if due <= now:
+                self._flush(slot)
+            else:
+                self._loop.call_at(due, self._flush, slot)
+
+    def _flush(self, slot: Tuple[str, Hashable]):
+        payload = self._pending.pop(slot, None)
+        topic, key = slot
+        subscribers = self._subscribers.get(topic)
+        if payload is None or not subscribers:
+            return
+        self._sent_at.setdefault(topic, {})[key] = self._loop.time()
+        for subscription in subscribers:
+            subscription.push(key, payload)
+
+    def _beat(self):
+        if not self._subscribers:
+            self._heartbeat_handle = None
+            return
+        for subscribers in self._subscribers.values():
+            for subscription in subscribers:
+                subscription.heartbeat = True
+                subscription.event.set()
+        self._heartbeat_handle = self._loop.call_later(self.heartbeat, self._beat)
+
+
+# One hub per process; both apps publish to and stream from it
+progress_hub = ProgressHub()
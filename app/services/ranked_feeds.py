@@ -0,0 +1,190 @@
+import math
+from bisect import bisect_left, insort
+from datetime import datetime, timezone
+from typing import Dict, Iterable, List, Mapping, Optional, Tuple
+
+FEEDS = ("trending", "nearly_funded", "newest", "most_donors")
+
+# Trending is the donated amount with each donation's weight doubling every
+# TRENDING_HALF_LIFE seconds after TRENDING_EPOCH, which ranks the same as
+# decaying every score over time without ever rewriting old scores. Scores
+# are kept as log2 of that sum so they stay finite.
+TRENDING_EPOCH = datetime(2024, 1, 1, tzinfo=timezone.utc)
+TRENDING_HALF_LIFE = 3 * 24 * 3600
+
+
+class LocalSortedSets:
+    """In-process stand-in for the Redis sorted-set commands the feeds use.
+
+    Each set keeps a member -> score dict and a list of (-score, member)
+    kept sorted with bisect, so updates are O(log n) searches plus a list
+    shift and reading the top N is a slice.
+    """
+
+    def __init__(self):
+        self._scores: Dict[str, Dict[str, float]] = {}
+        self._ranked: Dict[str, List[Tuple[float, str]]] = {}
+
+    def zadd(self, name: str, mapping: Mapping[str, float]) -> int:
+        scores = self._scores.setdefault(name, {})
+        ranked = self._ranked.setdefault(name, [])
+        added = 0
+        for member, score in mapping.items():
+            member = str(member)
+            previous = scores.get(member)
+            if previous is not None:
+                del ranked[bisect_left(ranked, (-previous, member))]
+            else:
+                added += 1
+            scores[member] = float(score)
+            insort(ranked, (-float(score), member))
+        return added
+
+    def zrem(self, name: str, *members) -> int:
+        scores = self._scores.get(name, {})
+        ranked = self._ranked.get(name, [])
+        removed = 0
+        for member in map(str, members):
+            score = scores.pop(member, None)
+            if score is not None:
+                del ranked[bisect_left(ranked, (-score, member))]
+                removed += 1
+        return removed
+
+    def zscore(self, name: str, member) -> Optional[float]:
+        return self._scores.get(name, {}).get(str(member))
+
+    def zrevrange(self, name: str, start: int, end: int) -> List[str]:
+        ranked = self._ranked.get(name, [])
+        stop = None if end == -1 else end + 1
+        return [member for _, member in ranked[start:stop]]
+
+    def zcard(self, name: str) -> int:
+        return len(self._scores.get(name, {}))
+
+    def delete(self, *names: str) -> int:
+        deleted = 0
+        for name in names:
+            deleted += self._scores.pop(name, None) is not None
+            self._ranked.pop(name, None)
+        return deleted
+
+
+def _timestamp(value) -> float:
+    if isinstance(value, str):
+        value = datetime.fromisoformat(value.replace("Z", "+00:00"))
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=timezone.utc)
+    return value.timestamp()
+
+
+def _donation_weight(amount, at) -> float:
+    """log2 of a donation's trending weight"""
+    return math.log2(max(float(amount), 1.0)) + (_timestamp(at) - TRENDING_EPOCH.timestamp()) / TRENDING_HALF_LIFE
+
+
+def _log_add(a: Optional[float], b: float) -> float:
+    """log2(2**a + 2**b) without leaving log space"""
+    if a is None:
+        return b
+    high, low = max(a, b), min(a, b)
+    return high + math.log2(1 + 2 ** (low - high))
+
+
+class RankedFeeds:
+    """Marketplace feeds kept as sorted sets, overall and per category.
+
+    ``store`` is a redis-py client (shared by all workers) or a
+    ``LocalSortedSets``. Causes are added with ``put`` when they go live and
+    updated with ``record_donation`` as donations are captured, touching
+    only that cause's entries; ``top`` reads the first N ids of a feed
+    without looking at the other causes. Keys are ``{prefix}:{feed}:all``
+    and ``{prefix}:{feed}:category:{id}``.
+    """
+
+    def __init__(self, store=None, prefix: str = "feeds"):
+        self.store = store if store is not None else LocalSortedSets()
+        self.prefix = prefix
+        self._categories: Dict[str, str] = {}
+
+    def key(self, feed: str, category_id=None) -> str:
+        if feed not in FEEDS:
+            raise ValueError(f"Unknown feed: {feed}")
+        scope = "all" if category_id is None else f"category:{category_id}"
+        return f"{self.prefix}:{feed}:{scope}"
+
+    def put(self, cause: Mapping, trending: Optional[float] = None):
+        """Add or refresh a live cause in every feed"""
+        member = str(cause["id"])
+        previous = self._categories.get(member)
+        if previous is not None and previous != str(cause.get("category_id")):
+            for feed in FEEDS:
+                self.store.zrem(self.key(feed, previous), member)
+        self._categories[member] = str(cause.get("category_id"))
+        scores = {
+            "newest": _timestamp(cause["created_at"]) if cause.get("created_at") else 0.0,
+            # Distinct donors where the caller knows them, else donations
+            "most_donors": float(cause.get("donor_count", cause.get("donation_count")) or 0),
+        }
+        progress = self._progress(cause)
+        if progress is not None:
+            scores["nearly_funded"] = progress
+        for feed in FEEDS:
+            if feed in scores:
+                self._set(feed, cause, member, scores[feed])
+            elif feed == "nearly_funded":
+                self._remove(feed, cause, member)
+        if trending is None:
+            trending = self.store.zscore(self.key("trending"), member)
+        self._set("trending", cause, member, -math.inf if trending is None else float(trending))
+
+    def remove(self, cause: Mapping):
+        member = str(cause["id"])
+        for feed in FEEDS:
+            self._remove(feed, cause, member)
+        self._categories.pop(member, None)
+
+    def record_donation(self, cause: Mapping, amount, at=None):
+        """Update the feeds after a donation was captured; ``cause`` already counts it"""
+        member = str(cause["id"])
+        at = datetime.now(timezone.utc) if at is None else at
+        current = self.store.zscore(self.key("trending"), member)
+        current = None if current is None or float(current) == -math.inf else float(current)
+        self.put(cause, trending=_log_add(current, _donation_weight(amount, at)))
+
+    def rebuild(self, causes: Iterable[Mapping], donations: Iterable[Mapping] = ()):
+        """Recompute every feed from scratch, e.g. after a reload"""
+        names = {self.key(feed) for feed in FEEDS}
+        names.update(self.key(feed, category) for feed in FEEDS for category in set(self._categories.values()))
+        causes = list(causes)
+        names.update(self.key(feed, cause.get("category_id")) for feed in FEEDS for cause in causes)
+        self.store.delete(*names)
+        self._categories.clear()
+
+        trending: Dict[str, Optional[float]] = {}
+        for donation in donations:
+            member = str(donation["cause_id"])
+            trending[member] = _log_add(trending.get(member), _donation_weight(donation["amount"], donation["created_at"]))
+        for cause in causes:
+            self.put(cause, trending=trending.get(str(cause["id"]), -math.inf))
+
+    def top(self, feed: str, limit: int = 10, category_id=None, offset: int = 0) -> List[int]:
+        members = self.store.zrevrange(self.key(feed, category_id), offset, offset + limit - 1)
+        return [int(member) for member in members]
+
+    @staticmethod
+    def _progress(cause: Mapping) -> Optional[float]:
+        """Funding progress of causes still short of their target"""
+        target = cause.get("target_amount") or cause.get("goal_amount") or 0
+        raised = cause.get("current_amount", cause.get("raised_amount")) or 0
+        if not target or raised >= target:
+            return None
+        return float(raised) / float(target)
+
+    def _set(self, feed: str, cause: Mapping, member: str, score: float):
+        self.store.zadd(self.key(feed), {member: score})
+        self.store.zadd(self.key(feed, cause.get("category_id")), {member: score})
+
+    def _remove(self, feed: str, cause: Mapping, member: str):
+        self.store.zrem(self.key(feed), member)
+        self.store.zrem(self.key(feed, cause.get("category_id")), member)
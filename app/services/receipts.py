@@ -0,0 +1,394 @@
+import hashlib
+import json
+import os
+import tempfile
+import threading
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from datetime import date, datetime, timedelta, timezone
+from typing import Dict, Iterable, List, Mapping, Optional, Tuple
+
+from starlette.requests import Request
+from starlette.responses import Response
+
+# Bump when the layout changes so cached documents are re-rendered
+LAYOUT_VERSION = 1
+
+DOCUMENT_KINDS = ("receipt", "80g")
+
+# Asia/Kolkata: a fixed offset, India has no daylight saving time
+IST = timezone(timedelta(hours=5, minutes=30), "IST")
+
+
+def indian_date(value) -> date:
+    """Calendar date in India of a date, datetime or ISO string.
+
+    Datetimes are converted to Indian time; naive ones are taken as UTC.
+    """
+    if isinstance(value, str):
+        value = datetime.fromisoformat(value.replace("Z", "+00:00"))
+    if isinstance(value, datetime):
+        if value.tzinfo is None:
+            value = value.replace(tzinfo=timezone.utc)
+        value = value.astimezone(IST).date()
+    if not isinstance(value, date):
+        raise ValueError(f"Not a date: {value!r}")
+    return value
+
+
+def financial_year(value) -> str:
+    """Indian financial year (April to March) of a date, e.g. ``"2024-25"``.
+
+    Uses ``indian_date``, so a donation made just after midnight IST on
+    1 April counts in the new year.
+    """
+    value = indian_date(value)
+    start = value.year if value.month >= 4 else value.year - 1
+    return f"{start}-{str(start + 1)[-2:]}"
+
+
+# --- PDF rendering ---------------------------------------------------------
+#
+# Receipts are a single page of text, so a tiny PDF writer using the built-in
+# Helvetica fonts is enough. Output is byte-for-byte deterministic for the same
+# input (no timestamps or random IDs), which is what makes content addressing
+# work.
+
+def _pdf_text(value) -> str:
+    text = str(value).replace("₹", "Rs. ")
+    text = text.encode("cp1252", errors="replace").decode("latin-1")
+    return text.replace("\\", "\\\\").replace("(", "\\(").replace(")", "\\)")
+
+
+def render_pdf(lines: List[Tuple[float, float, int, bool, str]]) -> bytes:
+    """Render ``(x, y, size, bold, text)`` lines onto one A4 page"""
+    ops = []
+    for x, y, size, bold, text in lines:
+        font = "F2" if bold else "F1"
+        ops.append(f"BT /{font} {size} Tf {x:.1f} {y:.1f} Td ({_pdf_text(text)}) Tj ET")
+    stream = "\n".join(ops).encode("latin-1")
+
+    objects = [
+        b"<< /Type /Catalog /Pages 2 0 R >>",
+        b"<< /Type /Pages /Kids [3 0 R] /Count 1 >>",
+        b"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 595 842] "
+        b"/Resources << /Font << /F1 4 0 R /F2 5 0 R >> >> /Contents 6 0 R >>",
+        b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica /Encoding /WinAnsiEncoding >>",
+        b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica-Bold /Encoding /WinAnsiEncoding >>",
+        b"<< /Length %d >>\nstream\n" % len(stream) + stream + b"\nendstream",
+    ]
+    out = bytearray(b"%PDF-1.4\n%\xe2\xe3\xcf\xd3\n")
+    offsets = []
+    for number, body in enumerate(objects, start=1):
+        offsets.append(len(out))
+        out += b"%d 0 obj\n" % number + body + b"\nendobj\n"
+    xref = len(out)
+    out += b"xref\n0 %d\n0000000000 65535 f \n" % (len(objects) + 1)
+    for offset in offsets:
+        out += b"%010d 00000 n \n" % offset
+    out += b"trailer\n<< /Size %d /Root 1 0 R >>\nstartxref\n%d\n%%%%EOF\n" % (len(objects) + 1, xref)
+    return bytes(out)
+
+
+def _money(value) -> str:
+    return f"Rs. {float(value):,.2f}"
+
+
+def _layout(title: str, subtitle: str, sections: List[Tuple[str, List[Tuple[str, str]]]], footer: List[str]):
+    lines = [(50, 790, 18, True, title), (50, 768, 10, False, subtitle)]
+    y = 730
+    for heading, rows in sections:
+        lines.append((50, y, 12, True, heading))
+        y -= 20
+        for label, value in rows:
+            lines.append((60, y, 10, True, label))
+            lines.append((220, y, 10, False, value))
+            y -= 16
+        y -= 14
+    for text in footer:
+        lines.append((50, y, 9, False, text))
+        y -= 13
+    return lines
+
+
+def _receipt_lines(data: Mapping) -> list:
+    return _layout(
+        f"Donation Receipt {data['receipt_number']}",
+        data["ngo_name"],
+        [
+            ("Donor", [
+                ("Name", data["donor_name"]),
+                ("Email", data.get("donor_email", "")),
+            ]),
+            ("Donation", [
+                ("Cause", data["cause_title"]),
+                ("Amount", _money(data["amount"])),
+                ("Payment ID", data.get("payment_id") or "-"),
+                ("Date", data["date"]),
+                ("Financial year", data["financial_year"]),
+            ]),
+        ],
+        ["Thank you for your generous donation.",
+         "This is a computer generated receipt and does not require a signature."]
+    )
+
+
+def _certificate_lines(data: Mapping) -> list:
+    return _layout(
+        "Certificate of Donation under Section 80G",
+        f"Certificate No. {data['certificate_number']}  |  FY {data['financial_year']}",
+        [
+            ("Donee", [
+                ("Name", data["ngo_name"]),
+                ("PAN", data.get("ngo_pan") or "-"),
+                ("80G registration", data.get("ngo_80g_registration") or "-"),
+                ("Address", data.get("ngo_address") or "-"),
+            ]),
+            ("Donor", [
+                ("Name", data["donor_name"]),
+                ("PAN", data.get("donor_pan") or "-"),
+                ("Address", data.get("donor_address") or "-"),
+            ]),
+            ("Donation", [
+                ("Amount", _money(data["amount"])),
+                ("Mode of payment", data.get("payment_mode", "Electronic")),
+                ("Reference", data.get("payment_id") or "-"),
+                ("Date", data["date"]),
+            ]),
+        ],
+        ["The donation is eligible for deduction under section 80G of the Income-tax Act, 1961.",
+         "This is a computer generated certificate and does not require a signature."]
+    )
+
+
+_LAYOUTS = {"receipt": _receipt_lines, "80g": _certificate_lines}
+
+
+def render_document(kind: str, data: Mapping) -> bytes:
+    if kind not in _LAYOUTS:
+        raise KeyError(f"Unknown document kind: {kind}")
+    return render_pdf(_LAYOUTS[kind](data))
+
+
+def _render_job(job: Tuple[str, Mapping]) -> Tuple[str, bytes]:
+    kind, data = job
+    return kind, render_document(kind, data)
+
+
+# --- Object storage --------------------------------------------------------
+
+class LocalObjectStore:
+    """Object store on the local filesystem; safe to share between workers"""
+
+    def __init__(self, root: str):
+        self.root = root
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.root, *key.split("/"))
+
+    def get(self, key: str) -> Optional[bytes]:
+        try:
+            with open(self._path(key), "rb") as f:
+                return f.read()
+        except FileNotFoundError:
+            return None
+
+    def exists(self, key: str) -> bool:
+        return os.path.exists(self._path(key))
+
+    def put(self, key: str, body: bytes, content_type: str):
+        path = self._path(key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        fd, tmp = tempfile.mkstemp(dir=os.path.dirname(path))
+        with os.fdopen(fd, "wb") as f:
+            f.write(body)
+        os.replace(tmp, path)
+
+
+class S3ObjectStore:
+    """Object store backed by an S3/MinIO bucket through a boto3 client"""
+
+    def __init__(self, client, bucket: str, prefix: str = ""):
+        self.client = client
+        self.bucket = bucket
+        self.prefix = prefix
+
+    def get(self, key: str) -> Optional[bytes]:
+        try:
+            return self.client.get_object(Bucket=self.bucket, Key=self.prefix + key)["Body"].read()
+        except self.client.exceptions.NoSuchKey:
+            return None
+
+    def exists(self, key: str) -> bool:
+        try:
+            self.client.head_object(Bucket=self.bucket, Key=self.prefix + key)
+            return True
+        except self.client.exceptions.ClientError:
+            return False
+
+    def put(self, key: str, body: bytes, content_type: str):
+        self.client.put_object(Bucket=self.bucket, Key=self.prefix + key, Body=body, ContentType=content_type)
+
+
+# --- Receipt service -------------------------------------------------------
+
+@dataclass(frozen=True)
+class StoredDocument:
+    digest: str
+    body: bytes
+
+    @property
+    def etag(self) -> str:
+        return f'"{self.digest}"'
+
+
+class ReceiptService:
+    """Renders receipts lazily and keeps them content-addressed in a store.
+
+    Blobs live under ``receipts/sha256/<digest>.pdf``. A small index object per
+    (kind, donation) records the digest together with a fingerprint of the data
+    it was rendered from, so a document is only re-rendered when that data
+    changes. Recently used index entries and blobs are kept in memory.
+    """
+
+    def __init__(self, store, cache_size: int = 1024):
+        self.store = store
+        self.cache_size = cache_size
+        self._index: "OrderedDict[Tuple[str, int], Tuple[str, str]]" = OrderedDict()
+        self._blobs: "OrderedDict[str, bytes]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def fingerprint(kind: str, data: Mapping) -> str:
+        payload = json.dumps([LAYOUT_VERSION, kind, data], sort_keys=True, default=str)
+        return hashlib.sha256(payload.encode()).hexdigest()
+
+    @staticmethod
+    def blob_key(digest: str) -> str:
+        return f"receipts/sha256/{digest}.pdf"
+
+    @staticmethod
+    def index_key(kind: str, donation_id: int) -> str:
+        return f"receipts/index/{kind}/{donation_id}.json"
+
+    def get(self, kind: str, data: Mapping) -> StoredDocument:
+        """Stored document for ``data``, rendering it on first request"""
+        fingerprint = self.fingerprint(kind, data)
+        digest = self._lookup(kind, data["donation_id"], fingerprint)
+        if digest:
+            body = self._read_blob(digest)
+            if body is not None:
+                return StoredDocument(digest, body)
+        return self._save(kind, data, fingerprint, render_document(kind, data))
+
+    def pregenerate(self, kind: str, documents: Iterable[Mapping], workers: Optional[int] = None, chunksize: int = 16) -> Dict:
+        """Render every missing or outdated document using a process pool"""
+        pending = []
+        cached = 0
+        for data in documents:
+            fingerprint = self.fingerprint(kind, data)
+            if self._lookup(kind, data["donation_id"], fingerprint):
+                cached += 1
+            else:
+                pending.append((data, fingerprint))
+        if pending:
+            with ProcessPoolExecutor(max_workers=workers) as pool:
+                jobs = [(kind, data) for data, _ in pending]
+                for (data, fingerprint), (_, body) in zip(pending, pool.map(_render_job, jobs, chunksize=chunksize)):
+                    self._save(kind, data, fingerprint, body, keep_in_memory=False)
+        return {"generated": len(pending), "cached": cached}
+
+    def _lookup(self, kind: str, donation_id: int, fingerprint: str) -> Optional[str]:
+        key = (kind, donation_id)
+        with self._lock:
+            entry = self._index.get(key)
+            if entry:
+                self._index.move_to_end(key)
+        if entry is None:
+            raw = self.store.get(self.index_key(kind, donation_id))
+            if raw is None:
+                return None
+            stored = json.loads(raw)
+            entry = (stored["fingerprint"], stored["digest"])
+            self._remember(self._index, key, entry)
+        return entry[1] if entry[0] == fingerprint else None
+
+    def _read_blob(self, digest: str) -> Optional[bytes]:
+        with self._lock:
+            body = self._blobs.get(digest)
+            if body is not None:
+                self._blobs.move_to_end(digest)
+                return body
+        body = self.store.get(self.blob_key(digest))
+        if body is not None:
+            self._remember(self._blobs, digest, body)
+        return body
+
+    def _save(self, kind: str, data: Mapping, fingerprint: str, body: bytes, keep_in_memory: bool = True) -> StoredDocument:
+        digest = hashlib.sha256(body).hexdigest()
+        if not self.store.exists(self.blob_key(digest)):
+            self.store.put(self.blob_key(digest), body, "application/pdf")
+        entry = {"fingerprint": fingerprint, "digest": digest}
+        self.store.put(self.index_key(kind, data["donation_id"]), json.dumps(entry).encode(), "application/json")
+        self._remember(self._index, (kind, data["donation_id"]), (fingerprint, digest))
+        if keep_in_memory:
+            self._remember(self._blobs, digest, body)
+        return StoredDocument(digest, body)
+
+    def _remember(self, cache: OrderedDict, key, value):
+        with self._lock:
+            cache[key] = value
+            cache.move_to_end(key)
+            while len(cache) > self.cache_size:
+                cache.popitem(last=False)
+
+
+# --- HTTP ------------------------------------------------------------------
+
+def _parse_range(header: str, size: int) -> Optional[Tuple[int, int]]:
+    """Parse a single ``bytes=`` range; returns None when it is unsatisfiable"""
+    start, _, end = header[len("bytes="):].strip().partition("-")
+    if not start:
+        length = int(end)
+        if length == 0:
+            return None
+        return max(size - length, 0), size - 1
+    first = int(start)
+    last = min(int(end), size - 1) if end else size - 1
+    if first >= size or first > last:
+        return None
+    return first, last
+
+
+def pdf_response(request: Request, document: StoredDocument, filename: str) -> Response:
+    """Serve a stored PDF with ETag revalidation and single byte-range support"""
+    headers = {
+        "ETag": document.etag,
+        "Cache-Control": "private, no-cache",
+        "Accept-Ranges": "bytes",
+        "Content-Disposition": f'inline; filename="{filename}"',
+    }
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match and document.etag in [tag.strip() for tag in if_none_match.split(",")]:
+        return Response(status_code=304, headers=headers)
+
+    body = document.body
+    range_header = request.headers.get("range", "")
+    if_range = request.headers.get("if-range")
+    # Multiple ranges are rare for PDFs; fall back to the full body for them
+    if range_header.startswith("bytes=") and "," not in range_header and if_range in (None, document.etag):
+        try:
+            byte_range = _parse_range(range_header, len(body))
+        except ValueError:
+            # A malformed Range is ignored (RFC 9110 §14.2): plain 200 below
+            pass
+        else:
+            if byte_range is None:
+                headers["Content-Range"] = f"bytes */{len(body)}"
+                return Response(status_code=416, headers=headers)
+            first, last = byte_range
+            headers["Content-Range"] = f"bytes {first}-{last}/{len(body)}"
+            return Response(body[first:last + 1], status_code=206, media_type="application/pdf", headers=headers)
+
+    return Response(body, media_type="application/pdf", headers=headers)
@@ -0,0 +1,98 @@
+import hashlib
+import secrets
+from datetime import datetime, timedelta, timezone
+from typing import List, Optional, Tuple
+
+from sqlalchemy import update
+from sqlalchemy.orm import Session
+
+from app.core.tokens import TokenRevocations
+from app.models import RefreshToken
+
+
+class RefreshTokenError(Exception):
+    """The refresh token is unknown, expired or revoked"""
+
+
+class RefreshTokenReuse(RefreshTokenError):
+    """An already rotated refresh token was presented again; its family is revoked"""
+
+
+def _utc(value: datetime) -> datetime:
+    # SQLite hands back naive datetimes even for timezone-aware columns
+    return value if value.tzinfo is not None else value.replace(tzinfo=timezone.utc)
+
+
+class RefreshTokenStore:
+    """Opaque, single-use refresh tokens stored as SHA-256 hashes.
+
+    Each login starts a token family. Every refresh marks the presented
+    token used and issues its successor in the same family; presenting a
+    used token again means it leaked (or a client raced itself), so the
+    whole family is revoked and its holder has to sign in again. Revoked
+    families are also pushed to ``revocations`` so the access tokens issued
+    for them stop working without a database lookup per request.
+    """
+
+    def __init__(self, lifetime: timedelta = timedelta(days=7), revocations: Optional[TokenRevocations] = None):
+        self.lifetime = lifetime
+        self.revocations = revocations
+
+    @staticmethod
+    def hash(token: str) -> str:
+        return hashlib.sha256(token.encode()).hexdigest()
+
+    def issue(self, db: Session, user_id: int, family_id: Optional[str] = None) -> Tuple[str, str]:
+        """New refresh token, in a new family unless ``family_id`` is given; returns (token, family)"""
+        token = secrets.token_urlsafe(32)
+        family_id = family_id or secrets.token_hex(16)
+        db.add(RefreshToken(
+            user_id=user_id,
+            family_id=family_id,
+            token_hash=self.hash(token),
+            expires_at=datetime.now(timezone.utc) + self.lifetime
+        ))
+        db.commit()
+        return token, family_id
+
+    def rotate(self, db: Session, token: str) -> Tuple[int, str, str]:
+        """Use ``token`` once; returns (user id, family, successor token)"""
+        row = db.query(
+            RefreshToken.id, RefreshToken.user_id, RefreshToken.family_id,
+            RefreshToken.expires_at, RefreshToken.revoked_at
+        ).filter(RefreshToken.token_hash == self.hash(token)).first()
+        now = datetime.now(timezone.utc)
+        if row is None or row.revoked_at is not None or _utc(row.expires_at) <= now:
+            db.rollback()
+            raise RefreshTokenError("Invalid refresh token")
+
+        # Only one caller can flip used_at, so a replay loses even when it races
+        claimed = db.execute(
+            update(RefreshToken)
+            .where(RefreshToken.id == row.id, RefreshToken.used_at.is_(None))
+            .values(used_at=now)
+        ).rowcount
+        if not claimed:
+            db.rollback()
+            self.revoke_family(db, row.family_id)
+            raise RefreshTokenReuse("Refresh token reused")
+
+        successor, _ = self.issue(db, row.user_id, row.family_id)
+        return row.user_id, row.family_id, successor
+
+    def revoke_family(self, db: Session, family_id: str):
+        """Revoke every token of a family, e.g. on logout"""
+        db.execute(
+            update(RefreshToken)
+            .where(RefreshToken.family_id == family_id, RefreshToken.revoked_at.is_(None))
+            .values(revoked_at=datetime.now(timezone.utc))
+        )
+        db.commit()
+        if self.revocations is not None:
+            self.revocations.revoke_family(family_id)
+
+    def revoked_families(self, db: Session, since: datetime) -> List[str]:
+        return [
+            family_id for family_id, in
+            db.query(RefreshToken.family_id).filter(RefreshToken.revoked_at >= since).distinct()
+        ]
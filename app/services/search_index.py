@@ -0,0 +1,166 @@
+import re
+from bisect import bisect_left, insort
+from dataclasses import dataclass, field
+from typing import Dict, Hashable, Iterable, List, Mapping, Optional, Sequence, Set, Tuple
+
+_TOKEN = re.compile(r"[a-z0-9]+")
+
+# Score factors for the ways a query token can match an indexed term
+EXACT = 1.0
+PREFIX = 0.7
+FUZZY = 0.6
+# Weight of funding progress (0..1) added to text relevance
+PROGRESS_WEIGHT = 0.25
+
+
+def tokenize(text: Optional[str]) -> List[str]:
+    return _TOKEN.findall(text.lower()) if text else []
+
+
+def trigrams(term: str) -> Set[str]:
+    """Trigrams of a term padded like pg_trgm, so short terms still get some"""
+    padded = f"  {term} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+def similarity(a: str, b: str) -> float:
+    ta, tb = trigrams(a), trigrams(b)
+    return len(ta & tb) / len(ta | tb)
+
+
+@dataclass
+class SearchResult:
+    total: int
+    hits: List[Tuple[Hashable, float]]
+    facets: Dict[str, Dict[Hashable, int]] = field(default_factory=dict)
+
+
+class SearchIndex:
+    """In-memory inverted index with prefix and trigram (typo-tolerant) matching.
+
+    Documents are indexed from weighted text fields plus facet values (a
+    value or a list of values per facet) and a ``progress`` in 0..1. Every
+    query token must match a term of the document exactly, as a prefix of
+    a longer term, or by trigram similarity; the best match per token counts
+    towards relevance. Facet counts for a facet are taken over the documents
+    matching the query and every *other* filter, so the UI can offer the
+    alternatives to the current selection.
+    """
+
+    def __init__(self, facets: Sequence[str], min_similarity: float = 0.4, max_expansions: int = 50):
+        self.facet_names = tuple(facets)
+        self.min_similarity = min_similarity
+        self.max_expansions = max_expansions
+        self.clear()
+
+    def clear(self):
+        self._postings: Dict[str, Dict[Hashable, float]] = {}
+        self._terms: List[str] = []
+        self._trigrams: Dict[str, Set[str]] = {}
+        self._doc_terms: Dict[Hashable, Set[str]] = {}
+        self._facets: Dict[Hashable, Dict[str, tuple]] = {}
+        self._progress: Dict[Hashable, float] = {}
+
+    def __len__(self) -> int:
+        return len(self._doc_terms)
+
+    def __contains__(self, doc_id) -> bool:
+        return doc_id in self._doc_terms
+
+    def put(self, doc_id: Hashable, texts: Iterable[Tuple[Optional[str], float]], facets: Mapping[str, object], progress: float = 0.0):
+        """Index or re-index a document from ``(text, weight)`` pairs"""
+        self.remove(doc_id)
+        weights: Dict[str, float] = {}
+        for text, weight in texts:
+            for term in tokenize(text):
+                weights[term] = max(weights.get(term, 0.0), weight)
+        for term, weight in weights.items():
+            postings = self._postings.get(term)
+            if postings is None:
+                postings = self._postings[term] = {}
+                insort(self._terms, term)
+                for gram in trigrams(term):
+                    self._trigrams.setdefault(gram, set()).add(term)
+            postings[doc_id] = weight
+        self._doc_terms[doc_id] = set(weights)
+        self._facets[doc_id] = {
+            name: tuple(value) if isinstance(value, (list, tuple, set)) else (value,)
+            for name, value in facets.items()
+        }
+        self._progress[doc_id] = min(max(progress, 0.0), 1.0)
+
+    def remove(self, doc_id: Hashable):
+        for term in self._doc_terms.pop(doc_id, ()):
+            postings = self._postings[term]
+            del postings[doc_id]
+            if not postings:
+                del self._postings[term]
+                del self._terms[bisect_left(self._terms, term)]
+                for gram in trigrams(term):
+                    self._trigrams[gram].discard(term)
+        self._facets.pop(doc_id, None)
+        self._progress.pop(doc_id, None)
+
+    def expand(self, token: str) -> Dict[str, float]:
+        """Indexed terms a query token matches, with their match factor"""
+        matches: Dict[str, float] = {}
+        if token in self._postings:
+            matches[token] = EXACT
+        if len(token) >= 2:
+            start = bisect_left(self._terms, token)
+            for term in self._terms[start:start + self.max_expansions]:
+                if not term.startswith(token):
+                    break
+                matches.setdefault(term, PREFIX)
+        if len(token) >= 3:
+            candidates: Dict[str, int] = {}
+            for gram in trigrams(token):
+                for term in self._trigrams.get(gram, ()):
+                    candidates[term] = candidates.get(term, 0) + 1
+            for term in sorted(candidates, key=candidates.get, reverse=True)[:self.max_expansions]:
+                if term not in matches:
+                    score = similarity(token, term)
+                    if score >= self.min_similarity:
+                        matches[term] = FUZZY * score
+        return matches
+
+    def search(self, query: str = "", filters: Optional[Mapping[str, object]] = None, offset: int = 0, limit: int = 20) -> SearchResult:
+        relevance = self._match(tokenize(query))
+        filters = {name: value for name, value in (filters or {}).items() if value is not None}
+        facets = {name: {} for name in self.facet_names}
+        hits = []
+        for doc_id, score in relevance.items():
+            values = self._facets[doc_id]
+            failed = [name for name, wanted in filters.items() if wanted not in values.get(name, ())]
+            if len(failed) > 1:
+                continue
+            for name in (failed or self.facet_names):
+                counts = facets.get(name)
+                if counts is not None:
+                    for value in values.get(name, ()):
+                        counts[value] = counts.get(value, 0) + 1
+            if not failed:
+                hits.append((doc_id, score + PROGRESS_WEIGHT * self._progress[doc_id]))
+        hits.sort(key=lambda hit: (-hit[1], hit[0]))
+        return SearchResult(total=len(hits), hits=hits[offset:offset + limit], facets=facets)
+
+    def _match(self, tokens: List[str]) -> Dict[Hashable, float]:
+        if not tokens:
+            return {doc_id: 0.0 for doc_id in self._doc_terms}
+        relevance: Optional[Dict[Hashable, float]] = None
+        for token in dict.fromkeys(tokens):
+            best: Dict[Hashable, float] = {}
+            for term, factor in self.expand(token).items():
+                for doc_id, weight in self._postings[term].items():
+                    if relevance is not None and doc_id not in relevance:
+                        continue
+                    score = factor * weight
+                    if score > best.get(doc_id, 0.0):
+                        best[doc_id] = score
+            if relevance is None:
+                relevance = best
+            else:
+                relevance = {doc_id: relevance[doc_id] + score for doc_id, score in best.items()}
+            if not relevance:
+                break
+        return relevance or {}
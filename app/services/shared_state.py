@@ -0,0 +1,196 @@
+import asyncio
+import hashlib
+import json
+import sqlite3
+import threading
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator, Callable, Dict, Iterable, List, MutableMapping, Tuple
+
+from fastapi.concurrency import run_in_threadpool
+
+# name -> (version, parsed value, digest of the stored document)
+Fetched = Dict[str, Tuple[int, Any, bytes]]
+
+
+class SharedStateStore:
+    """SQLite-backed store that keeps in-memory collections in sync across workers.
+
+    Every collection (a module-level list or dict) is persisted as one JSON
+    document with a version number. Workers keep serving reads from their own
+    copy and call ``refresh()`` before each request; only collections whose
+    version moved are reloaded. Writes run inside ``mutation(*names)``, which
+    takes the SQLite write lock for just that block and publishes only the
+    named collections, so mutations are serialized across processes while
+    the rest of the request runs freely.
+
+    SQLite work and JSON encoding and parsing run in the threadpool. The
+    namespace is only changed on the event loop, and is only read from a
+    thread while this worker holds the write lock, when no other mutation
+    can run.
+    """
+
+    def __init__(self, path: str, namespace: MutableMapping, names: Iterable[str], timeout: float = 30.0):
+        self.path = path
+        self.namespace = namespace
+        self.names = list(names)
+        # One connection holds the write lock during mutations, the other
+        # serves refreshes, so readers never queue behind a writer
+        self._conn = self._connect(timeout)
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS collections ("
+            "name TEXT PRIMARY KEY, version INTEGER NOT NULL, data TEXT NOT NULL)"
+        )
+        self._reader = self._connect(timeout)
+        self._read_lock = threading.Lock()
+        self._mutating = asyncio.Lock()
+        self._versions: Dict[str, int] = {}
+        self._digests: Dict[str, bytes] = {}
+        self._data_version = None
+        self._listeners: Dict[str, List[Callable[[str], None]]] = {}
+
+    def _connect(self, timeout: float) -> sqlite3.Connection:
+        conn = sqlite3.connect(self.path, timeout=timeout, isolation_level=None, check_same_thread=False)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        return conn
+
+    def bootstrap(self):
+        """Seed missing collections from this worker, then adopt the stored state"""
+        self._conn.execute("BEGIN IMMEDIATE")
+        try:
+            for name in self.names:
+                self._conn.execute(
+                    "INSERT OR IGNORE INTO collections (name, version, data) VALUES (?, 1, ?)",
+                    (name, self._dump(name))
+                )
+            self._conn.execute("COMMIT")
+        except BaseException:
+            self._conn.execute("ROLLBACK")
+            raise
+        self.sync()
+
+    def subscribe(self, name: str, callback: Callable[[str], None]):
+        """Call ``callback(name)`` whenever ``name`` is reloaded from another worker"""
+        self._listeners.setdefault(name, []).append(callback)
+
+    def sync(self) -> List[str]:
+        """Blocking ``refresh()``, for startup and scripts"""
+        return self._apply(self._read())
+
+    async def refresh(self) -> List[str]:
+        """Reload collections changed by other workers; returns their names"""
+        return self._apply(await run_in_threadpool(self._read))
+
+    @asynccontextmanager
+    async def mutation(self, *names: str) -> AsyncIterator[None]:
+        """Run a mutation of ``names`` under the cross-process write lock and publish it.
+
+        Keep the block to the lookup and the change itself: other workers
+        wait on the lock for as long as it runs.
+        """
+        async with self._mutating:
+            try:
+                self._apply(await run_in_threadpool(self._begin))
+                yield
+                self._stored(await run_in_threadpool(self._commit, names))
+            except BaseException:
+                if self._conn.in_transaction:
+                    self._conn.execute("ROLLBACK")
+                # Most failures are a 4xx raised before anything changed; only
+                # collections the block did change are reloaded (and their
+                # subscribers told). If this is cut short, the next refresh
+                # finishes the job.
+                changed = await run_in_threadpool(self._changed, names)
+                if changed:
+                    for name in changed:
+                        self._versions.pop(name, None)
+                    await self.refresh()
+                raise
+
+    def close(self):
+        self._conn.close()
+        self._reader.close()
+
+    def _read(self) -> Fetched:
+        with self._read_lock:
+            data_version = self._reader.execute("PRAGMA data_version").fetchone()[0]
+            if data_version == self._data_version and all(name in self._versions for name in self.names):
+                return {}
+            self._data_version = data_version
+            return self._fetch(self._reader)
+
+    def _begin(self) -> Fetched:
+        self._conn.execute("BEGIN IMMEDIATE")
+        try:
+            return self._fetch(self._conn)
+        except BaseException:
+            self._conn.execute("ROLLBACK")
+            raise
+
+    def _fetch(self, conn: sqlite3.Connection) -> Fetched:
+        fetched = {}
+        for name, version in conn.execute("SELECT name, version FROM collections").fetchall():
+            if name not in self.names or self._versions.get(name) == version:
+                continue
+            data = conn.execute("SELECT data FROM collections WHERE name = ?", (name,)).fetchone()[0]
+            fetched[name] = (version, json.loads(data), self._digest(data))
+        return fetched
+
+    def _changed(self, names: Iterable[str]) -> List[str]:
+        """Which of ``names`` differ in memory from what was last loaded or stored"""
+        return [name for name in names if self._digests.get(name) != self._digest(self._dump(name))]
+
+    def _commit(self, names: Iterable[str]) -> Dict[str, Tuple[int, bytes]]:
+        stored = {}
+        for name in names:
+            data = self._dump(name)
+            digest = self._digest(data)
+            if self._digests.get(name) == digest:
+                continue
+            self._conn.execute(
+                "UPDATE collections SET version = version + 1, data = ? WHERE name = ?",
+                (data, name)
+            )
+            version = self._conn.execute("SELECT version FROM collections WHERE name = ?", (name,)).fetchone()[0]
+            stored[name] = (version, digest)
+        self._conn.execute("COMMIT")
+        return stored
+
+    def _stored(self, stored: Dict[str, Tuple[int, bytes]]):
+        for name, (version, digest) in stored.items():
+            self._versions[name] = max(version, self._versions.get(name, 0))
+            self._digests[name] = digest
+
+    def _apply(self, fetched: Fetched) -> List[str]:
+        changed = []
+        for name, (version, value, digest) in fetched.items():
+            # A refresh that raced a mutation may carry data we have moved past
+            if self._versions.get(name, 0) >= version:
+                continue
+            self._load(name, value)
+            self._versions[name] = version
+            self._digests[name] = digest
+            changed.append(name)
+
+        for name in changed:
+            for callback in self._listeners.get(name, []):
+                callback(name)
+        return changed
+
+    def _dump(self, name: str) -> str:
+        return json.dumps(self.namespace[name], separators=(",", ":"), default=str)
+
+    def _load(self, name: str, value: Any):
+        current = self.namespace.get(name)
+        # Update in place so references held elsewhere keep seeing the live data
+        if isinstance(current, list) and isinstance(value, list):
+            current[:] = value
+        elif isinstance(current, dict) and isinstance(value, dict):
+            current.clear()
+            current.update(value)
+        else:
+            self.namespace[name] = value
+
+    @staticmethod
+    def _digest(data: str) -> bytes:
+        return hashlib.blake2b(data.encode(), digest_size=16).digest()
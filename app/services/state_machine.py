@@ -0,0 +1,167 @@
+from collections import Counter
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+
+
+class TransitionError(Exception):
+    """Raised when an event is not allowed; ``status_code`` says why"""
+
+    def __init__(self, message: str, status_code: int = 400):
+        super().__init__(message)
+        self.status_code = status_code
+
+
+@dataclass(frozen=True)
+class Transition:
+    event: str
+    source: str
+    target: str
+    roles: Tuple[str, ...]
+    # Field stamped with the transition time, e.g. "delivered_at"
+    stamp: Optional[str] = None
+    # Fields the caller may set along with the transition
+    fields: Tuple[str, ...] = ()
+
+
+class TransitionTable:
+    """Declarative table of the events allowed from each state"""
+
+    def __init__(self, transitions: Iterable[Transition]):
+        self._by_event: Dict[Tuple[str, str], Transition] = {}
+        self._by_target: Dict[Tuple[str, str], Transition] = {}
+        for transition in transitions:
+            self._by_event[(transition.source, transition.event)] = transition
+            self._by_target[(transition.source, transition.target)] = transition
+
+    def resolve(self, state: str, event: str, role: str) -> Transition:
+        transition = self._by_event.get((state, event))
+        if transition is None:
+            raise TransitionError(f"Cannot {event} from {state}")
+        if role not in transition.roles:
+            raise TransitionError(f"{role} cannot {event} from {state}", status_code=403)
+        return transition
+
+    def event_for(self, state: str, target: str, role: Optional[str] = None) -> str:
+        """Name of the event leading from ``state`` to ``target``.
+
+        With ``role``, only events that role may fire lead anywhere: asking
+        for a status only another role can set is an invalid transition
+        (400), not a forbidden one.
+        """
+        transition = self._by_target.get((state, target))
+        if transition is None or (role is not None and role not in transition.roles):
+            raise TransitionError(f"Invalid status transition from {state} to {target}")
+        return transition.event
+
+
+ORDER_TRANSITIONS = TransitionTable([
+    Transition("start_processing", "ORDER_RECEIVED", "ORDER_IN_PROCESS", ("VENDOR",)),
+    Transition("ship", "ORDER_IN_PROCESS", "ORDER_IN_TRANSIT", ("VENDOR",), fields=("delivery_date",)),
+    Transition("deliver", "ORDER_IN_TRANSIT", "ORDER_DELIVERED", ("VENDOR",), stamp="delivered_at"),
+    Transition("confirm_delivery", "ORDER_DELIVERED", "ORDER_DELIVERED", ("NGO_ADMIN", "NGO_STAFF"), stamp="ngo_confirmed_at"),
+])
+
+
+def _now() -> str:
+    return datetime.now().isoformat() + "Z"
+
+
+class StateMachine:
+    """Runs a transition table over a list of record dicts.
+
+    Every applied event is appended to ``events`` (an append-only list of
+    plain dicts, so it can be persisted with the records) and handed to the
+    optional ``sink`` first: if the sink fails, nothing changes. Per-state
+    counts, overall and per ``group_by`` field, are maintained as events are
+    applied rather than computed by filtering.
+    """
+
+    def __init__(
+        self,
+        table: TransitionTable,
+        records: List[dict],
+        events: List[dict],
+        entity: str,
+        group_by: Sequence[str] = (),
+        sink: Optional[Callable[[List[dict]], None]] = None
+    ):
+        self.table = table
+        self.records = records
+        self.events = events
+        self.entity = entity
+        self.group_by = tuple(group_by)
+        self.sink = sink
+        self.reindex()
+
+    def reindex(self):
+        """Rebuild the id index and counters after ``records`` was reloaded"""
+        self._by_id = {record["id"]: record for record in self.records}
+        self._history: Dict[int, List[dict]] = {}
+        for event in self.events:
+            self._history.setdefault(event["entity_id"], []).append(event)
+        self._counts: Dict[Tuple, Counter] = {(): Counter()}
+        for record in self.records:
+            self._count(record, record["status"], 1)
+
+    def get(self, record_id: int) -> Optional[dict]:
+        return self._by_id.get(record_id)
+
+    def counts(self, field: Optional[str] = None, value=None) -> Dict[str, int]:
+        """Records per state, overall or within one ``group_by`` group"""
+        key = () if field is None else (field, value)
+        return {state: n for state, n in self._counts.get(key, Counter()).items() if n}
+
+    def fire(self, record_id: int, event: str, actor: Dict, data: Optional[Dict] = None) -> dict:
+        return self.fire_many([record_id], event, actor, data)[0]
+
+    def fire_many(self, record_ids: Sequence[int], event: str, actor: Dict, data: Optional[Dict] = None) -> List[dict]:
+        """Apply ``event`` to every record, or to none if any of them cannot take it"""
+        planned = []
+        for record_id in dict.fromkeys(record_ids):
+            record = self._by_id.get(record_id)
+            if record is None:
+                raise TransitionError(f"{self.entity.capitalize()} {record_id} not found", status_code=404)
+            planned.append((record, self.table.resolve(record["status"], event, actor["role"])))
+
+        now = _now()
+        applied = []
+        for record, transition in planned:
+            changes = {"status": transition.target, "updated_at": now}
+            if transition.stamp:
+                changes[transition.stamp] = now
+            for field in transition.fields:
+                if data and data.get(field) is not None:
+                    changes[field] = data[field]
+            applied.append({
+                "id": len(self.events) + len(applied) + 1,
+                "entity": self.entity,
+                "entity_id": record["id"],
+                "event": event,
+                "from_status": record["status"],
+                "to_status": transition.target,
+                "changes": changes,
+                "actor_id": actor.get("id"),
+                "actor_email": actor.get("email"),
+                "at": now
+            })
+        # Audit first: records only change once their events are recorded
+        if self.sink:
+            self.sink(applied)
+
+        for (record, _), applied_event in zip(planned, applied):
+            self._count(record, record["status"], -1)
+            record.update(applied_event["changes"])
+            self._count(record, record["status"], 1)
+        self.events.extend(applied)
+        for applied_event in applied:
+            self._history.setdefault(applied_event["entity_id"], []).append(applied_event)
+        return [record for record, _ in planned]
+
+    def history(self, record_id: int) -> List[dict]:
+        return list(self._history.get(record_id, ()))
+
+    def _count(self, record: dict, state: str, delta: int):
+        self._counts[()][state] += delta
+        for field in self.group_by:
+            self._counts.setdefault((field, record.get(field)), Counter())[state] += delta
@@ -0,0 +1,108 @@
+from typing import Dict, Iterable, List, Optional, Tuple
+
+STOCK_STATUSES = ("AVAILABLE", "LIMITED", "OUT_OF_STOCK")
+
+
+class StockStatusStore:
+    """Current vendor stock status per (vendor_id, cause_id), with history.
+
+    ``records`` holds the current row of every key and ``history`` the rows
+    they replaced, newest last, capped at ``history_size`` per key. Both are
+    plain JSON-friendly containers so they can be shared between workers;
+    the store indexes ``records`` by key, vendor and cause so an upsert is
+    O(1) and per-vendor or per-cause reads touch only their own rows.
+    """
+
+    def __init__(self, records: List[dict], history: Dict[str, List[dict]], history_size: int = 50):
+        self.records = records
+        self.history = history
+        self.history_size = history_size
+        self.reindex()
+
+    def reindex(self):
+        """Rebuild the index after ``records`` was replaced or reloaded"""
+        self._positions: Dict[Tuple[int, int], int] = {}
+        self._by_vendor: Dict[int, Dict[int, dict]] = {}
+        self._by_cause: Dict[int, Dict[int, dict]] = {}
+        for position, row in enumerate(self.records):
+            self._index(position, row)
+        self._next_id = max((row["id"] for row in self.records), default=0) + 1
+
+    def upsert(self, row: dict) -> dict:
+        """Insert or replace the row for its (vendor_id, cause_id); the old row goes to history"""
+        key = (row["vendor_id"], row["cause_id"])
+        position = self._positions.get(key)
+        if position is None:
+            row["id"] = self._next_id
+            self._next_id += 1
+            self.records.append(row)
+            position = len(self.records) - 1
+        else:
+            previous = self.records[position]
+            row["id"] = previous["id"]
+            row["created_at"] = previous.get("created_at", row.get("created_at"))
+            entries = self.history.setdefault(self._history_key(*key), [])
+            entries.append(previous)
+            if len(entries) > self.history_size:
+                del entries[:len(entries) - self.history_size]
+            self.records[position] = row
+        self._index(position, row)
+        return row
+
+    def upsert_many(self, rows: Iterable[dict]) -> List[dict]:
+        return [self.upsert(row) for row in rows]
+
+    def get(self, vendor_id: int, cause_id: int) -> Optional[dict]:
+        position = self._positions.get((vendor_id, cause_id))
+        return None if position is None else self.records[position]
+
+    def for_vendor(self, vendor_id: int) -> List[dict]:
+        return list(self._by_vendor.get(vendor_id, {}).values())
+
+    def for_cause(self, cause_id: int) -> List[dict]:
+        return list(self._by_cause.get(cause_id, {}).values())
+
+    def changes(self, vendor_id: int, cause_id: int) -> List[dict]:
+        """Current row followed by the rows it replaced, newest first"""
+        current = self.get(vendor_id, cause_id)
+        if current is None:
+            return []
+        return [current] + self.history.get(self._history_key(vendor_id, cause_id), [])[::-1]
+
+    def availability(self, cause_id: int) -> Dict:
+        """Stock for a cause aggregated across its vendors"""
+        rows = self._by_cause.get(cause_id, {}).values()
+        by_status = {status: 0 for status in STOCK_STATUSES}
+        quantity = 0
+        prices = []
+        for row in rows:
+            by_status[row["status"]] = by_status.get(row["status"], 0) + 1
+            if row["status"] != "OUT_OF_STOCK":
+                quantity += row.get("available_quantity") or 0
+                if row.get("price_per_unit"):
+                    prices.append(row["price_per_unit"])
+        if by_status["AVAILABLE"]:
+            overall = "AVAILABLE"
+        elif by_status["LIMITED"]:
+            overall = "LIMITED"
+        elif rows:
+            overall = "OUT_OF_STOCK"
+        else:
+            overall = "UNKNOWN"
+        return {
+            "cause_id": cause_id,
+            "status": overall,
+            "vendors": len(rows),
+            "vendors_by_status": by_status,
+            "available_quantity": quantity,
+            "min_price_per_unit": min(prices) if prices else None
+        }
+
+    @staticmethod
+    def _history_key(vendor_id: int, cause_id: int) -> str:
+        return f"{vendor_id}:{cause_id}"
+
+    def _index(self, position: int, row: dict):
+        self._positions[(row["vendor_id"], row["cause_id"])] = position
+        self._by_vendor.setdefault(row["vendor_id"], {})[row["cause_id"]] = row
+        self._by_cause.setdefault(row["cause_id"], {})[row["vendor_id"]] = row
@@ -0,0 +1,130 @@
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from decimal import Decimal
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+
+from sqlalchemy import and_, delete, func, insert, or_, select, tuple_
+from sqlalchemy.orm import Session
+
+from app.services.receipts import financial_year
+
+
+@dataclass
+class StatementTotals:
+    key: tuple
+    financial_year: str
+    donation_count: int
+    total_amount: Decimal
+    first_donation_at: object
+    last_donation_at: object
+
+
+def aggregate_statements(rows: Iterable[Tuple[tuple, object, object]]) -> Iterator[StatementTotals]:
+    """Fold ``(key, donated_at, amount)`` rows into per key and financial year totals.
+
+    Rows must be ordered by key and then date, as a streaming cursor with
+    ``ORDER BY key..., date`` delivers them; only the current group is held in
+    memory, so this runs in constant space over any number of donations.
+    """
+    current = None
+    for key, donated_at, amount in rows:
+        fy = financial_year(donated_at)
+        if current is not None and current.key == key and current.financial_year == fy:
+            current.donation_count += 1
+            current.total_amount += Decimal(str(amount))
+            current.last_donation_at = donated_at
+            continue
+        if current is not None:
+            yield current
+        current = StatementTotals(key, fy, 1, Decimal(str(amount)), donated_at, donated_at)
+    if current is not None:
+        yield current
+
+
+class TaxStatementBuilder:
+    """Builds consolidated per donor, NGO and financial year tax statements.
+
+    Captured donations are streamed through a server-side cursor ordered by
+    (donor, tenant, date) and folded into statements one group at a time, and
+    the statements are written with batched multi-row inserts. Memory use is
+    bounded by ``yield_per`` + ``batch_size`` rows regardless of volume.
+    """
+
+    def __init__(self, batch_size: int = 1000, yield_per: int = 5000):
+        self.batch_size = batch_size
+        self.yield_per = yield_per
+
+    def rebuild(self, db: Session, since: Optional[datetime] = None) -> Dict:
+        """Rebuild all statements, or only those of donor/NGO pairs touched since ``since``"""
+        # Imported here: simple_backend folds statements without a database configured
+        from app.models import Cause, Donation, DonationStatus, TaxStatement
+
+        generated_at = datetime.now(timezone.utc)
+        rows = (
+            select(Donation.donor_user_id, Cause.tenant_id, Donation.created_at, Donation.amount)
+            .join(Cause, Cause.id == Donation.cause_id)
+            .where(Donation.status == DonationStatus.CAPTURED)
+        )
+        if since is None:
+            db.execute(delete(TaxStatement))
+        else:
+            affected = (
+                select(Donation.donor_user_id, Cause.tenant_id)
+                .join(Cause, Cause.id == Donation.cause_id)
+                .where(or_(Donation.created_at >= since, Donation.updated_at >= since))
+                .distinct()
+                .subquery()
+            )
+            db.execute(
+                delete(TaxStatement)
+                .where(tuple_(TaxStatement.donor_user_id, TaxStatement.tenant_id).in_(
+                    select(affected.c.donor_user_id, affected.c.tenant_id)
+                ))
+                .execution_options(synchronize_session=False)
+            )
+            rows = rows.join(affected, and_(
+                affected.c.donor_user_id == Donation.donor_user_id,
+                affected.c.tenant_id == Cause.tenant_id
+            ))
+        rows = rows.order_by(Donation.donor_user_id, Cause.tenant_id, Donation.created_at)
+
+        result = db.execute(rows.execution_options(yield_per=self.yield_per))
+        stream = (((donor_id, tenant_id), created_at, amount) for donor_id, tenant_id, created_at, amount in result)
+        batch: List[Dict] = []
+        statements = 0
+        for totals in aggregate_statements(stream):
+            donor_id, tenant_id = totals.key
+            batch.append({
+                "donor_user_id": donor_id,
+                "tenant_id": tenant_id,
+                "financial_year": totals.financial_year,
+                "donation_count": totals.donation_count,
+                "total_amount": totals.total_amount,
+                "first_donation_at": totals.first_donation_at,
+                "last_donation_at": totals.last_donation_at,
+                "generated_at": generated_at
+            })
+            if len(batch) >= self.batch_size:
+                statements += self._flush(db, batch)
+        statements += self._flush(db, batch)
+        db.commit()
+        return {"statements": statements, "incremental": since is not None, "generated_at": generated_at}
+
+    def rebuild_incremental(self, db: Session) -> Dict:
+        """Pick up donations created or changed since the previous build"""
+        from app.models import TaxStatement
+
+        last_build = db.execute(select(func.max(TaxStatement.generated_at))).scalar()
+        return self.rebuild(db, since=last_build)
+
+    @staticmethod
+    def _flush(db: Session, batch: List[Dict]) -> int:
+        if not batch:
+            return 0
+        from app.models import TaxStatement
+
+        count = len(batch)
+        db.execute(insert(TaxStatement), batch)
+        batch.clear()
+        return count
+
@@ -0,0 +1,131 @@
+#!/usr/bin/env python3
+"""
+Serialization CPU for the hot list endpoints, before and after fast JSON.
+
+"before" is FastAPI's default path (response_model validation where the
+endpoint has one, jsonable_encoder, then json.dumps in JSONResponse);
+"after" is app.core.responses (orjson when installed) and, for the SQL
+catalogue, a single pydantic dump_json. Payloads are synthetic lists of
+``--rows`` rows shaped like the real responses.
+
+    python benchmarks/json_serialization.py --rows 5000 --repeat 20
+"""
+
+import argparse
+import json
+import os
+import sys
+import time
+from datetime import datetime, timedelta
+from decimal import Decimal
+from types import SimpleNamespace
+from typing import List
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from fastapi.encoders import jsonable_encoder  # noqa: E402
+from fastapi.responses import JSONResponse  # noqa: E402
+from pydantic import TypeAdapter  # noqa: E402
+
+from app.core import responses  # noqa: E402
+
+
+def admin_orders(rows: int) -> dict:
+    """Enriched order dicts as returned by simple_backend's /admin/orders"""
+    base = datetime(2024, 1, 1, 9, 30)
+    orders = []
+    for i in range(rows):
+        orders.append({
+            "id": i + 1, "cause_id": i % 50 + 1, "vendor_id": i % 7 + 1, "ngo_id": i % 11 + 1,
+            "cause_title": f"Cause {i % 50}", "vendor_name": f"Vendor {i % 7}", "ngo_name": f"NGO {i % 11}",
+            "amount": 1000 + i, "status": "ORDER_IN_PROCESS", "items": [{"name": "Rice", "quantity": 10}],
+            "delivery_date": None, "created_at": (base + timedelta(minutes=i)).isoformat() + "Z",
+            "vendor_contact_email": "vendor@example.com", "ngo_contact_email": "ngo@example.com",
+            "cause_description": "Provide nutritious meals to children in rural schools",
+        })
+    return {"value": orders, "Count": len(orders)}
+
+
+def sql_causes(rows: int) -> list:
+    """Objects shaped like Cause rows, with Decimal amounts and datetimes"""
+    from app.models import CauseStatus, CauseType
+
+    base = datetime(2024, 1, 1, 9, 30)
+    return [
+        SimpleNamespace(
+            id=i + 1, title=f"Cause {i}", description="Provide nutritious meals to children",
+            goal_amount=Decimal("50000.00"), raised_amount=Decimal(i) + Decimal("0.50"),
+            type=CauseType.NGO_MANAGED, status=CauseStatus.LIVE, created_at=base + timedelta(minutes=i)
+        )
+        for i in range(rows)
+    ]
+
+
+def cpu_ms(fn, repeat: int) -> float:
+    fn()
+    start = time.process_time()
+    for _ in range(repeat):
+        fn()
+    return (time.process_time() - start) * 1000 / repeat
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=5000)
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    os.environ.setdefault("DATABASE_URL", "sqlite://")
+    os.environ.setdefault("SECRET_KEY", "benchmark")
+    from app.schemas import PublicCause
+
+    orders = admin_orders(args.rows)
+    causes = sql_causes(args.rows)
+    cause_dicts = {
+        "value": [
+            {**vars(cause), "goal_amount": int(cause.goal_amount), "raised_amount": float(cause.raised_amount),
+             "type": cause.type.value, "status": cause.status.value, "created_at": cause.created_at.isoformat() + "Z",
+             "ngo_ids": [cause.id % 11 + 1], "category_name": "Education"}
+            for cause in causes
+        ],
+        "Count": args.rows
+    }
+    adapter = TypeAdapter(List[PublicCause])
+
+    def orders_before():
+        return JSONResponse(jsonable_encoder(orders)).body
+
+    def orders_after():
+        return responses.fast_json(orders).body
+
+    def sql_causes_before():
+        validated = adapter.validate_python(causes, from_attributes=True)
+        return JSONResponse(jsonable_encoder(adapter.dump_python(validated, mode="json"))).body
+
+    def sql_causes_after():
+        return adapter.dump_json(adapter.validate_python(causes, from_attributes=True))
+
+    def memory_causes_before():
+        return JSONResponse(jsonable_encoder(cause_dicts)).body
+
+    def memory_causes_after():
+        return responses.dumps(cause_dicts)
+
+    cases = [
+        ("/admin/orders", orders_before, orders_after),
+        ("/public/causes (SQL)", sql_causes_before, sql_causes_after),
+        ("/public/causes (in-memory)", memory_causes_before, memory_causes_after),
+    ]
+    encoder = "orjson" if responses.orjson is not None else "json (orjson not installed)"
+    print(f"{args.rows} rows, {args.repeat} repeats, encoder: {encoder}")
+    print(f"{'endpoint':<28} {'before ms':>10} {'after ms':>10} {'speedup':>8}")
+    for name, before, after in cases:
+        assert json.loads(before()) == json.loads(after()), f"{name}: outputs differ"
+        before_ms = cpu_ms(before, args.repeat)
+        after_ms = cpu_ms(after, args.repeat)
+        print(f"{name:<28} {before_ms:>10.2f} {after_ms:>10.2f} {before_ms / after_ms:>7.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,386 @@
+#!/usr/bin/env python3
+"""
+End-to-end HTTP load test of app.main or simple_backend, with regression gates.
+
+``run`` boots the target with uvicorn, drives each scenario in turn with
+``--concurrency`` virtual users for ``--duration`` seconds and writes
+per-scenario and per-endpoint RPS and p50/p95/p99 latency to JSON.
+``compare`` reads two such files and exits non-zero when a scenario's
+p95 or throughput got worse than ``--threshold`` percent, or its error
+rate rose.
+
+Scenarios (simple_backend only has browse and admin):
+
+    browse   public marketplace: categories, NGOs, causes, search
+    donate   donor initialises a donation and the payment webhook captures it
+    admin    NGO admin dashboards: NGOs, vendors, donors, payments, associations
+    vendor   vendor uploads an invoice and reads it back
+
+By default app.main runs on a scratch SQLite database filled by
+seed_synthetic.py at ``--scale``. With ``--database-url`` it runs against
+that database instead, which must already hold synthetic data
+(``python seed_synthetic.py --scale medium``).
+
+    python benchmarks/load_test.py run --output baseline.json
+    python benchmarks/load_test.py run --scenario browse admin --concurrency 32 --output current.json
+    python benchmarks/load_test.py run --target simple --output simple.json
+    python benchmarks/load_test.py compare baseline.json current.json --threshold 10
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import random
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime, timezone
+
+import httpx
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+os.environ.setdefault("DATABASE_URL", "sqlite://")
+os.environ.setdefault("SECRET_KEY", "benchmark")
+
+from sqlalchemy import create_engine, select  # noqa: E402
+
+from app.models import Cause, CauseStatus, Membership, MembershipRole, Tenant, User, Vendor, VendorLink  # noqa: E402
+
+PASSWORD = "Synthetic@123"
+SCENARIOS = {"app": ["browse", "donate", "admin", "vendor"], "simple": ["browse", "admin"]}
+SIMPLE_ADMIN_TOKEN = "demo_token_admin@example.com"
+INVOICE_PDF = b"%PDF-1.4\n1 0 obj <<>> endobj\ntrailer <<>>\n%%EOF\n"
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def percentile(values, pct: float) -> float:
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * pct / 100))] if ordered else 0.0
+
+
+def git_revision() -> str:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=ROOT, capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+def seed_database(url: str, scale: str, seed: int):
+    subprocess.run(
+        [sys.executable, "seed_synthetic.py", "--scale", scale, "--seed", str(seed), "--create-tables", "--database-url", url],
+        cwd=ROOT, env=dict(os.environ, DATABASE_URL=url, PASSWORD_HASH_WORKERS="0"), check=True, stdout=subprocess.DEVNULL
+    )
+
+
+def discover_fixtures(url: str) -> dict:
+    """Accounts and ids the scenarios act on, taken from the synthetic data"""
+    engine = create_engine(url)
+    synthetic = User.email.like("%@synthetic.example.org")
+    with engine.connect() as connection:
+        def account(role: MembershipRole):
+            return connection.execute(
+                select(User.email, Membership.tenant_id).join(Membership, Membership.user_id == User.id)
+                .where(synthetic, Membership.role == role).order_by(User.id).limit(1)
+            ).first()
+
+        admin, donor = account(MembershipRole.NGO_ADMIN), account(MembershipRole.DONOR)
+        vendor = connection.execute(
+            select(User.email, Vendor.id, VendorLink.cause_id)
+            .join(Membership, Membership.user_id == User.id)
+            .join(Vendor, Vendor.tenant_id == Membership.tenant_id)
+            .join(VendorLink, VendorLink.vendor_id == Vendor.id)
+            .where(synthetic, Membership.role == MembershipRole.VENDOR)
+            .order_by(User.id).limit(1)
+        ).first()
+        # Most headroom first: a cause that reaches its goal is FUNDED and stops taking donations
+        causes = connection.execute(
+            select(Cause.id).where(Cause.status == CauseStatus.LIVE)
+            .order_by((Cause.goal_amount - Cause.raised_amount).desc(), Cause.id).limit(500)
+        ).scalars().all()
+        slugs = connection.execute(select(Tenant.slug).order_by(Tenant.id).limit(50)).scalars().all()
+    engine.dispose()
+    if not (admin and donor and vendor and causes):
+        raise SystemExit(f"{url} holds no synthetic data; run seed_synthetic.py against it first")
+    return {
+        "admin": admin.email, "donor": donor.email, "vendor": vendor.email,
+        "vendor_id": vendor.id, "vendor_cause_id": vendor.cause_id, "causes": causes, "slugs": slugs
+    }
+
+
+def start_target(target: str, port: int, url: str, workers: int) -> subprocess.Popen:
+    if target == "simple":
+        env = dict(os.environ, BACKEND_HOST="127.0.0.1", BACKEND_PORT=str(port), BACKEND_WORKERS=str(workers))
+        env.pop("SHARED_STATE_PATH", None)
+        command = [sys.executable, "simple_backend.py"]
+    else:
+        # No gateway keys: orders are simulated and webhooks are not signed
+        env = dict(os.environ, DATABASE_URL=url, SECRET_KEY="benchmark", RAZORPAY_KEY_ID="", RAZORPAY_KEY_SECRET="")
+        command = [
+            sys.executable, "-m", "uvicorn", "app.main:app", "--host", "127.0.0.1", "--port", str(port),
+            "--workers", str(workers), "--log-level", "warning"
+        ]
+    return subprocess.Popen(command, cwd=ROOT, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+
+
+def wait_until_ready(base_url: str, timeout: float = 60.0):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            if httpx.get(f"{base_url}/public/categories", timeout=1.0).status_code == 200:
+                return
+        except httpx.HTTPError:
+            pass
+        time.sleep(0.2)
+    raise RuntimeError(f"Target at {base_url} did not become ready")
+
+
+class Recorder:
+    """Latency samples and errors per endpoint; nothing is kept while warming up"""
+
+    def __init__(self):
+        self.samples = {}
+        self.errors = {}
+        self.recording = False
+
+    async def request(self, client: httpx.AsyncClient, method: str, path: str, name: str = None, **kwargs) -> httpx.Response:
+        name = f"{method} {name or path}"
+        started = time.perf_counter()
+        try:
+            response = await client.request(method, path, **kwargs)
+        except httpx.HTTPError:
+            response = None
+        elapsed = (time.perf_counter() - started) * 1000
+        if self.recording:
+            self.samples.setdefault(name, []).append(elapsed)
+            if response is None or response.status_code >= 400:
+                self.errors[name] = self.errors.get(name, 0) + 1
+        return response
+
+    def summary(self, elapsed: float) -> dict:
+        def stats(samples, errors):
+            return {
+                "requests": len(samples), "errors": errors, "rps": round(len(samples) / elapsed, 1),
+                "p50_ms": round(percentile(samples, 50), 2), "p95_ms": round(percentile(samples, 95), 2),
+                "p99_ms": round(percentile(samples, 99), 2)
+            }
+
+        everything = [sample for samples in self.samples.values() for sample in samples]
+        return {
+            **stats(everything, sum(self.errors.values())),
+            "endpoints": {name: stats(samples, self.errors.get(name, 0)) for name, samples in sorted(self.samples.items())}
+        }
+
+
+async def login(client: httpx.AsyncClient, email: str) -> dict:
+    response = await client.post("/auth/login", data={"username": email, "password": PASSWORD})
+    response.raise_for_status()
+    return {"Authorization": f"Bearer {response.json()['access_token']}"}
+
+
+async def browse(client, recorder: Recorder, fixtures: dict, rng: random.Random):
+    await recorder.request(client, "GET", "/public/categories")
+    await recorder.request(client, "GET", "/public/ngos")
+    await recorder.request(client, "GET", "/public/causes")
+    if fixtures.get("slugs"):
+        await recorder.request(client, "GET", "/public/causes", name="/public/causes?tenant", params={"tenant": rng.choice(fixtures["slugs"])})
+    await recorder.request(client, "GET", "/public/search", params={"q": "cause", "page": rng.randint(1, 5)})
+
+
+async def donate(client, recorder: Recorder, fixtures: dict, rng: random.Random):
+    response = await recorder.request(
+        client, "POST", "/donations/donations/init", headers=fixtures["donor_headers"],
+        json={"cause_id": rng.choice(fixtures["causes"]), "amount": rng.choice([100, 500, 1000]), "currency": "INR"}
+    )
+    if response is None or response.status_code != 200:
+        return
+    order_id = response.json()["order_id"]
+    await recorder.request(client, "POST", "/donations/donations/webhook", json={
+        "event": "payment.captured",
+        "payload": {"payment": {"id": f"pay_{order_id}", "order_id": order_id}}
+    })
+
+
+async def admin(client, recorder: Recorder, fixtures: dict, rng: random.Random):
+    headers = fixtures["admin_headers"]
+    paths = ["/admin/ngos", "/admin/vendors", "/admin/donors", "/admin/payments", "/admin/ngo-vendor-associations"]
+    if fixtures["target"] == "simple":
+        paths.append("/admin/orders")
+    for path in paths:
+        await recorder.request(client, "GET", path, headers=headers)
+
+
+async def vendor(client, recorder: Recorder, fixtures: dict, rng: random.Random):
+    response = await recorder.request(
+        client, "POST", "/vendors/vendor-invoices", headers=fixtures["vendor_headers"],
+        data={
+            "cause_id": fixtures["vendor_cause_id"], "vendor_id": fixtures["vendor_id"],
+            "number": f"LOAD-{rng.getrandbits(48):012x}", "amount": rng.choice([5000, 20000, 75000])
+        },
+        files={"files": ("invoice.pdf", INVOICE_PDF, "application/pdf")}
+    )
+    if response is not None and response.status_code == 200:
+        await recorder.request(
+            client, "GET", f"/vendors/vendor-invoices/{response.json()['id']}",
+            name="/vendors/vendor-invoices/{id}", headers=fixtures["vendor_headers"]
+        )
+
+
+SCENARIO_STEPS = {"browse": browse, "donate": donate, "admin": admin, "vendor": vendor}
+
+
+async def drive(base_url: str, scenario: str, fixtures: dict, concurrency: int, duration: float, warmup: float, seed: int) -> dict:
+    recorder = Recorder()
+    step = SCENARIO_STEPS[scenario]
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+    async with httpx.AsyncClient(base_url=base_url, limits=limits, timeout=30.0) as client:
+        async def user(index: int, stop_at: float):
+            rng = random.Random(seed * 1000 + index)
+            while time.monotonic() < stop_at:
+                await step(client, recorder, fixtures, rng)
+
+        if warmup > 0:
+            await asyncio.gather(*(user(i, time.monotonic() + warmup) for i in range(concurrency)))
+        recorder.recording = True
+        started = time.monotonic()
+        await asyncio.gather(*(user(i, started + duration) for i in range(concurrency)))
+        elapsed = time.monotonic() - started
+    return recorder.summary(elapsed)
+
+
+async def prepare_fixtures(base_url: str, target: str, fixtures: dict, scenarios) -> dict:
+    fixtures = dict(fixtures, target=target)
+    async with httpx.AsyncClient(base_url=base_url, timeout=60.0) as client:
+        if target == "simple":
+            fixtures["admin_headers"] = {"Authorization": f"Bearer {SIMPLE_ADMIN_TOKEN}"}
+            return fixtures
+        for scenario, role in (("admin", "admin"), ("donate", "donor"), ("vendor", "vendor")):
+            if scenario in scenarios:
+                fixtures[f"{role}_headers"] = await login(client, fixtures[role])
+    return fixtures
+
+
+def run(args) -> dict:
+    scenarios = args.scenario or SCENARIOS[args.target]
+    unsupported = sorted(set(scenarios) - set(SCENARIOS[args.target]))
+    if unsupported:
+        raise SystemExit(f"{args.target} does not support: {', '.join(unsupported)}")
+
+    with tempfile.TemporaryDirectory() as scratch:
+        url = args.database_url
+        fixtures = {}
+        if args.target == "app":
+            if url is None:
+                url = f"sqlite:///{os.path.join(scratch, 'load.db')}"
+                print(f"Seeding a scratch SQLite database at scale {args.scale}...")
+                seed_database(url, args.scale, args.seed)
+            fixtures = discover_fixtures(url)
+
+        port = free_port()
+        base_url = f"http://127.0.0.1:{port}"
+        server = start_target(args.target, port, url, args.workers)
+        try:
+            wait_until_ready(base_url)
+            fixtures = asyncio.run(prepare_fixtures(base_url, args.target, fixtures, scenarios))
+            results = {}
+            for scenario in scenarios:
+                results[scenario] = asyncio.run(drive(
+                    base_url, scenario, fixtures, args.concurrency, args.duration, args.warmup, args.seed
+                ))
+                summary = results[scenario]
+                print(
+                    f"{scenario:<8} {summary['rps']:>8.1f} req/s  p50 {summary['p50_ms']:>7.1f}ms  "
+                    f"p95 {summary['p95_ms']:>7.1f}ms  p99 {summary['p99_ms']:>7.1f}ms  errors {summary['errors']}"
+                )
+        finally:
+            server.terminate()
+            server.wait()
+
+    return {
+        "target": args.target,
+        "revision": git_revision(),
+        "recorded_at": datetime.now(timezone.utc).isoformat(),
+        "database": "scratch sqlite" if args.database_url is None else args.database_url.split("@")[-1],
+        "scale": args.scale if args.database_url is None else None,
+        "workers": args.workers,
+        "concurrency": args.concurrency,
+        "duration": args.duration,
+        "scenarios": results
+    }
+
+
+def compare(baseline: dict, current: dict, threshold: float) -> list:
+    """Regressions of ``current`` against ``baseline``, as printable lines"""
+    regressions = []
+    limit = threshold / 100
+    print(f"{'scenario':<10} {'p95 before':>11} {'after':>9} {'req/s before':>13} {'after':>9} {'errors':>13}")
+    for scenario, before in baseline["scenarios"].items():
+        after = current["scenarios"].get(scenario)
+        if after is None:
+            continue
+        error_rate = [run["errors"] / max(run["requests"], 1) for run in (before, after)]
+        print(
+            f"{scenario:<10} {before['p95_ms']:>9.1f}ms {after['p95_ms']:>7.1f}ms "
+            f"{before['rps']:>13.1f} {after['rps']:>9.1f} {error_rate[0]:>6.1%} {error_rate[1]:>6.1%}"
+        )
+        if after["p95_ms"] > before["p95_ms"] * (1 + limit):
+            regressions.append(f"{scenario}: p95 {before['p95_ms']:.1f}ms -> {after['p95_ms']:.1f}ms")
+        if after["rps"] < before["rps"] * (1 - limit):
+            regressions.append(f"{scenario}: throughput {before['rps']:.1f} -> {after['rps']:.1f} req/s")
+        if error_rate[1] > error_rate[0] + 0.01:
+            regressions.append(f"{scenario}: error rate {error_rate[0]:.1%} -> {error_rate[1]:.1%}")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    run_parser = commands.add_parser("run", help="load the target and record results")
+    run_parser.add_argument("--target", choices=sorted(SCENARIOS), default="app")
+    run_parser.add_argument("--scenario", nargs="+", choices=sorted(SCENARIO_STEPS))
+    run_parser.add_argument("--concurrency", type=int, default=16)
+    run_parser.add_argument("--duration", type=float, default=15.0)
+    run_parser.add_argument("--warmup", type=float, default=3.0)
+    run_parser.add_argument("--workers", type=int, default=1)
+    run_parser.add_argument("--scale", default="small", help="seed_synthetic.py scale of the scratch database")
+    run_parser.add_argument("--seed", type=int, default=0)
+    run_parser.add_argument("--database-url", help="app.main only: an already seeded database to run against")
+    run_parser.add_argument("--output", help="write results to this JSON file")
+
+    compare_parser = commands.add_parser("compare", help="fail on regressions against a baseline")
+    compare_parser.add_argument("baseline")
+    compare_parser.add_argument("current")
+    compare_parser.add_argument("--threshold", type=float, default=10.0, help="allowed p95/throughput change, percent")
+    args = parser.parse_args()
+
+    if args.command == "run":
+        results = run(args)
+        if args.output:
+            with open(args.output, "w") as output:
+                json.dump(results, output, indent=2)
+            print(f"Results written to {args.output}")
+        return
+
+    with open(args.baseline) as baseline, open(args.current) as current:
+        regressions = compare(json.load(baseline), json.load(current), args.threshold)
+    if regressions:
+        print("\nRegressions beyond the threshold:")
+        for regression in regressions:
+            print(f"  {regression}")
+        sys.exit(1)
+    print("\nNo regressions beyond the threshold")
+
+
+if __name__ == "__main__":
+    main()
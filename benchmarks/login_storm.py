@@ -0,0 +1,141 @@
+#!/usr/bin/env python3
+"""
+Mixed login and browse load against app.main, bcrypt inline vs on the pool.
+
+Starts the API on a scratch SQLite database once per PASSWORD_HASH_WORKERS
+setting, then runs ``--logins`` clients posting to /auth/login in a loop
+alongside ``--browsers`` clients reading /public/categories. Prints browse
+latency percentiles (what the login storm does to everyone else) and how
+many logins succeeded or were shed with 429.
+
+    python benchmarks/login_storm.py --logins 32 --browsers 8 --duration 10 --hash-workers 0 2
+"""
+
+import argparse
+import asyncio
+import os
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+
+import httpx
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+EMAIL, PASSWORD = "storm@example.com", "Storm@123"
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def prepare_database(url: str, rounds: int):
+    env = dict(os.environ, DATABASE_URL=url, SECRET_KEY="benchmark", PASSWORD_HASH_WORKERS="0", BCRYPT_ROUNDS=str(rounds))
+    script = (
+        "from app.core.database import Base, engine, SessionLocal\n"
+        "from app.core.security import get_password_hash\n"
+        "from app.models import Category, User\n"
+        "Base.metadata.create_all(engine)\n"
+        "db = SessionLocal()\n"
+        f"db.add(User(email={EMAIL!r}, hashed_password=get_password_hash({PASSWORD!r})))\n"
+        "db.add_all([Category(name=f'Category {i}') for i in range(20)])\n"
+        "db.commit()\n"
+    )
+    subprocess.run([sys.executable, "-c", script], cwd=ROOT, env=env, check=True)
+
+
+def start_api(url: str, port: int, hash_workers: int, rounds: int) -> subprocess.Popen:
+    env = dict(
+        os.environ, DATABASE_URL=url, SECRET_KEY="benchmark", BCRYPT_ROUNDS=str(rounds),
+        PASSWORD_HASH_WORKERS=str(hash_workers)
+    )
+    return subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "app.main:app", "--host", "127.0.0.1", "--port", str(port), "--log-level", "warning"],
+        cwd=ROOT, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL
+    )
+
+
+def wait_until_ready(base_url: str, timeout: float = 30.0):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            if httpx.get(f"{base_url}/public/categories", timeout=1.0).status_code == 200:
+                return
+        except httpx.HTTPError:
+            pass
+        time.sleep(0.2)
+    raise RuntimeError(f"API at {base_url} did not become ready")
+
+
+def percentile(values, pct: float) -> float:
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * pct / 100))] if ordered else 0.0
+
+
+async def drive(base_url: str, logins: int, browsers: int, duration: float) -> dict:
+    stats = {"browse": [], "login_ok": 0, "login_429": 0, "login_other": 0}
+    deadline = time.monotonic() + duration
+
+    async def login_client(client):
+        while time.monotonic() < deadline:
+            response = await client.post("/auth/login", data={"username": EMAIL, "password": PASSWORD})
+            key = {200: "login_ok", 429: "login_429"}.get(response.status_code, "login_other")
+            stats[key] += 1
+            if response.status_code == 429:
+                await asyncio.sleep(float(response.headers.get("Retry-After", 1)))
+
+    async def browse_client(client):
+        while time.monotonic() < deadline:
+            started = time.perf_counter()
+            await client.get("/public/categories")
+            stats["browse"].append((time.perf_counter() - started) * 1000)
+
+    limits = httpx.Limits(max_connections=logins + browsers)
+    async with httpx.AsyncClient(base_url=base_url, limits=limits, timeout=60.0) as client:
+        await asyncio.gather(
+            *[login_client(client) for _ in range(logins)],
+            *[browse_client(client) for _ in range(browsers)]
+        )
+    return stats
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--logins", type=int, default=32)
+    parser.add_argument("--browsers", type=int, default=8)
+    parser.add_argument("--duration", type=float, default=10.0)
+    parser.add_argument("--rounds", type=int, default=12)
+    parser.add_argument("--hash-workers", type=int, nargs="+", default=[0, 2])
+    args = parser.parse_args()
+
+    print(f"{args.logins} login + {args.browsers} browse clients, {args.duration:.0f}s, bcrypt cost {args.rounds}")
+    print(f"{'hash workers':<14} {'browse p50':>11} {'p95':>8} {'p99':>8} {'browse/s':>9} {'logins':>7} {'429s':>6}")
+    for hash_workers in args.hash_workers:
+        with tempfile.TemporaryDirectory() as scratch:
+            url = f"sqlite:///{os.path.join(scratch, 'storm.db')}"
+            prepare_database(url, args.rounds)
+            port = free_port()
+            server = start_api(url, port, hash_workers, args.rounds)
+            try:
+                base_url = f"http://127.0.0.1:{port}"
+                wait_until_ready(base_url)
+                stats = asyncio.run(drive(base_url, args.logins, args.browsers, args.duration))
+            finally:
+                server.terminate()
+                server.wait()
+        browse = stats["browse"]
+        label = "inline" if hash_workers == 0 else str(hash_workers)
+        print(
+            f"{label:<14} {percentile(browse, 50):>9.1f}ms {percentile(browse, 95):>6.1f}ms "
+            f"{percentile(browse, 99):>6.1f}ms {len(browse) / args.duration:>9.0f} "
+            f"{stats['login_ok']:>7} {stats['login_429']:>6}"
+        )
+        if stats["login_other"]:
+            print(f"  {stats['login_other']} logins failed with other statuses")
+
+
+if __name__ == "__main__":
+    main()
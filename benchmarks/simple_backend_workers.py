@@ -0,0 +1,103 @@
+#!/usr/bin/env python3
+"""
+Load test comparing simple_backend throughput with 1 and N workers.
+
+Starts simple_backend.py once per worker count, drives the marketplace read
+endpoints with a fixed number of concurrent clients and prints requests/sec.
+
+    python benchmarks/simple_backend_workers.py --workers 4 --duration 10
+"""
+
+import argparse
+import asyncio
+import os
+import socket
+import subprocess
+import sys
+import time
+
+import httpx
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+PATHS = ["/public/causes", "/public/ngos", "/public/categories", "/admin/orders"]
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def start_backend(workers: int, port: int) -> subprocess.Popen:
+    env = dict(os.environ, BACKEND_HOST="127.0.0.1", BACKEND_PORT=str(port), BACKEND_WORKERS=str(workers))
+    env.pop("SHARED_STATE_PATH", None)
+    return subprocess.Popen(
+        [sys.executable, "simple_backend.py"],
+        cwd=ROOT, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL
+    )
+
+
+def wait_until_ready(base_url: str, timeout: float = 30.0):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            if httpx.get(f"{base_url}/healthz", timeout=1.0).status_code == 200:
+                return
+        except httpx.HTTPError:
+            pass
+        time.sleep(0.2)
+    raise RuntimeError(f"Backend at {base_url} did not become ready")
+
+
+async def drive(base_url: str, concurrency: int, duration: float) -> float:
+    completed = 0
+    deadline = time.monotonic() + duration
+    headers = {"Authorization": "Bearer demo_token_admin@example.com"}
+
+    async def client_loop(client: httpx.AsyncClient, offset: int):
+        nonlocal completed
+        i = offset
+        while time.monotonic() < deadline:
+            response = await client.get(PATHS[i % len(PATHS)], headers=headers)
+            response.raise_for_status()
+            completed += 1
+            i += 1
+
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+    async with httpx.AsyncClient(base_url=base_url, limits=limits, timeout=10.0) as client:
+        started = time.monotonic()
+        await asyncio.gather(*(client_loop(client, i) for i in range(concurrency)))
+        elapsed = time.monotonic() - started
+    return completed / elapsed
+
+
+def run(workers: int, concurrency: int, duration: float) -> float:
+    port = free_port()
+    base_url = f"http://127.0.0.1:{port}"
+    process = start_backend(workers, port)
+    try:
+        wait_until_ready(base_url)
+        return asyncio.run(drive(base_url, concurrency, duration))
+    finally:
+        process.terminate()
+        process.wait(timeout=30)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 2)
+    parser.add_argument("--concurrency", type=int, default=64)
+    parser.add_argument("--duration", type=float, default=10.0)
+    args = parser.parse_args()
+
+    results = {}
+    for workers in sorted({1, args.workers}):
+        results[workers] = run(workers, args.concurrency, args.duration)
+        print(f"{workers:>3} worker(s): {results[workers]:10.1f} req/s")
+
+    if len(results) > 1:
+        print(f"speedup: {results[args.workers] / results[1]:.2f}x")
+
+
+if __name__ == "__main__":
+    main()
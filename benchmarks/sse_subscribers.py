@@ -0,0 +1,75 @@
+#!/usr/bin/env python3
+"""
+Cost of idle live-progress subscribers and of fanning an update out to them.
+
+Opens ``--subscribers`` progress streams spread over ``--causes`` causes
+(what one worker holds with that many cause pages open), measures the
+memory they keep with tracemalloc, then publishes a burst of updates to
+one cause and times how long until every one of its subscribers has the
+new frame. Compare with the polling it replaces: every open page issuing a
+/public/causes request each ``--poll-interval`` seconds.
+
+    python benchmarks/sse_subscribers.py --subscribers 10000 --causes 100
+"""
+
+import argparse
+import asyncio
+import os
+import sys
+import time
+import tracemalloc
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from app.services.progress_hub import ProgressHub, cause_topic, progress_payload  # noqa: E402
+
+
+async def run(args):
+    hub = ProgressHub(min_interval=0.25)
+    tracemalloc.start()
+    baseline = tracemalloc.get_traced_memory()[0]
+    streams = []
+    for i in range(args.subscribers):
+        cause_id = i % args.causes
+        stream = hub.stream(cause_topic(cause_id), initial=[(cause_id, progress_payload(cause_id, 0, 1000, 0))])
+        await stream.__anext__()
+        await stream.__anext__()
+        streams.append((cause_id, stream))
+    idle_bytes = tracemalloc.get_traced_memory()[0] - baseline
+    tracemalloc.stop()
+
+    # Start every stream waiting for its next frame, as the server would
+    waiting = {id(stream): asyncio.ensure_future(stream.__anext__()) for _, stream in streams}
+    await asyncio.sleep(0)
+    targets = [waiting[id(stream)] for cause_id, stream in streams if cause_id == 0]
+
+    started = time.perf_counter()
+    for raised in range(100, 100 * (args.burst + 1), 100):
+        hub.publish([cause_topic(0)], 0, progress_payload(0, raised, 1000, raised // 100))
+    await asyncio.gather(*targets)
+    fanout_ms = (time.perf_counter() - started) * 1000
+
+    for future in waiting.values():
+        future.cancel()
+    await asyncio.gather(*waiting.values(), return_exceptions=True)
+    for _, stream in streams:
+        await stream.aclose()
+
+    print(f"{args.subscribers} subscribers over {args.causes} causes")
+    print(f"idle memory: {idle_bytes / 1024 / 1024:.1f} MiB ({idle_bytes / args.subscribers:.0f} B per subscriber)")
+    print(f"fan-out of a {args.burst}-update burst to {len(targets)} subscribers: {fanout_ms:.1f} ms")
+    print(f"polling equivalent: {args.subscribers / args.poll_interval:.0f} requests/s")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--subscribers", type=int, default=10000)
+    parser.add_argument("--causes", type=int, default=100)
+    parser.add_argument("--burst", type=int, default=20)
+    parser.add_argument("--poll-interval", type=float, default=10.0)
+    asyncio.run(run(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
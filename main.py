@@ -1,4 +1,5 @@
 from fastapi import FastAPI
+from fastapi.responses import PlainTextResponse
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.middleware.trustedhost import TrustedHostMiddleware
 import os
@@ -6,22 +7,39 @@ from contextlib import asynccontextmanager
 
 from app.core.config import settings
 from app.core.database import engine
+from app.core.loop_monitor import LoopMonitor, LoopMonitorMiddleware
+from app.core.metrics import event_loop_blocked, event_loop_lag, registry as metrics_registry
+from app.core.query_stats import instrument
+from app.core.responses import FastJSONResponse
+from app.core.security import password_pool
 from app.api.v1.api import api_router
 from app.middleware.tenant import TenantMiddleware
+from app.middleware.query_stats import QueryStatsMiddleware
+from app.middleware.metrics import MetricsMiddleware
+from app.middleware.profiler import ProfilerMiddleware
+
+
+loop_monitor = LoopMonitor(settings.LOOP_BLOCK_MS, lag=event_loop_lag, blocked=event_loop_blocked)
 
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     # Startup
+    metrics_registry.start()
+    loop_monitor.start()
     yield
     # Shutdown
+    loop_monitor.stop()
+    password_pool.shutdown()
+    metrics_registry.shutdown()
 
 
 app = FastAPI(
     title="NGO Donations Platform",
     description="Multi-tenant NGO donations platform API",
     version="1.0.0",
-    lifespan=lifespan
+    lifespan=lifespan,
+    default_response_class=FastJSONResponse
 )
 
 # CORS middleware
@@ -42,6 +60,19 @@ app.add_middleware(
 # Tenant middleware
 app.add_middleware(TenantMiddleware)
 
+# SQL statement counts and timings per request (outside the tenant middleware, so its lookups count)
+instrument(engine)
+app.add_middleware(QueryStatsMiddleware)
+
+# Per-route request metrics, served below at /metrics
+app.add_middleware(MetricsMiddleware)
+
+# ?__profile=1 with the X-Profile-Token header returns a profile of the request
+app.add_middleware(ProfilerMiddleware)
+
+# Logs the stack and route of anything blocking the event loop (outermost)
+app.add_middleware(LoopMonitorMiddleware)
+
 # Include API router
 app.include_router(api_router, prefix="/api/v1")
 
@@ -52,6 +83,12 @@ async def health_check():
     return {"status": "healthy"}
 
 
+@app.get("/metrics", include_in_schema=False)
+def metrics():
+    """Prometheus metrics, summed over every worker"""
+    return PlainTextResponse(metrics_registry.render(), media_type="text/plain; version=0.0.4; charset=utf-8")
+
+
 @app.get("/.well-known/runtime-config")
 async def runtime_config():
     """Runtime configuration endpoint"""
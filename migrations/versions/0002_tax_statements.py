@@ -0,0 +1,47 @@
+"""Tax statements
+
+Revision ID: 0002
+Revises: 0001
+Create Date: 2026-10-19 00:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = '0002'
+down_revision = '0001'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # Create tax_statements table
+    op.create_table('tax_statements',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('donor_user_id', sa.Integer(), nullable=False),
+        sa.Column('tenant_id', sa.Integer(), nullable=False),
+        sa.Column('financial_year', sa.String(length=7), nullable=False),
+        sa.Column('donation_count', sa.Integer(), nullable=False),
+        sa.Column('total_amount', sa.Numeric(precision=15, scale=2), nullable=False),
+        sa.Column('currency', sa.String(length=3), nullable=True),
+        sa.Column('first_donation_at', sa.DateTime(timezone=True), nullable=True),
+        sa.Column('last_donation_at', sa.DateTime(timezone=True), nullable=True),
+        sa.Column('generated_at', sa.DateTime(timezone=True), nullable=False),
+        sa.ForeignKeyConstraint(['donor_user_id'], ['users.id'], ),
+        sa.ForeignKeyConstraint(['tenant_id'], ['tenants.id'], ),
+        sa.PrimaryKeyConstraint('id'),
+        sa.UniqueConstraint('donor_user_id', 'tenant_id', 'financial_year', name='uq_tax_statements_donor_tenant_fy')
+    )
+    op.create_index(op.f('ix_tax_statements_id'), 'tax_statements', ['id'], unique=False)
+    op.create_index(op.f('ix_tax_statements_donor_user_id'), 'tax_statements', ['donor_user_id'], unique=False)
+
+    # Find donations changed since the last build for incremental rebuilds
+    op.create_index('ix_donations_created_at', 'donations', ['created_at'], unique=False)
+    op.create_index('ix_donations_updated_at', 'donations', ['updated_at'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index('ix_donations_updated_at', table_name='donations')
+    op.drop_index('ix_donations_created_at', table_name='donations')
+    op.drop_table('tax_statements')
@@ -0,0 +1,54 @@
+"""Search vectors for causes and tenants
+
+Revision ID: 0003
+Revises: 0002
+Create Date: 2026-10-19 00:00:00.000000
+
+"""
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = '0003'
+down_revision = '0002'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # Trigram matching for typo-tolerant search
+    op.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+
+    # Generated tsvector columns; weights rank titles/names above descriptions
+    op.execute(
+        "ALTER TABLE causes ADD COLUMN search_vector tsvector GENERATED ALWAYS AS ("
+        "setweight(to_tsvector('english', coalesce(title, '')), 'A') || "
+        "setweight(to_tsvector('english', coalesce(description, '')), 'C')) STORED"
+    )
+    op.execute(
+        "ALTER TABLE tenants ADD COLUMN search_vector tsvector GENERATED ALWAYS AS ("
+        "setweight(to_tsvector('english', coalesce(name, '')), 'B') || "
+        "setweight(to_tsvector('english', coalesce(description, '')), 'D')) STORED"
+    )
+    op.create_index('ix_causes_search_vector', 'causes', ['search_vector'], postgresql_using='gin')
+    op.create_index('ix_tenants_search_vector', 'tenants', ['search_vector'], postgresql_using='gin')
+    op.create_index(
+        'ix_causes_title_trgm', 'causes', ['title'],
+        postgresql_using='gin', postgresql_ops={'title': 'gin_trgm_ops'}
+    )
+    op.create_index(
+        'ix_tenants_name_trgm', 'tenants', ['name'],
+        postgresql_using='gin', postgresql_ops={'name': 'gin_trgm_ops'}
+    )
+
+    # Facet filters
+    op.create_index('ix_causes_status_category_id', 'causes', ['status', 'category_id'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index('ix_causes_status_category_id', table_name='causes')
+    op.drop_index('ix_tenants_name_trgm', table_name='tenants')
+    op.drop_index('ix_causes_title_trgm', table_name='causes')
+    op.drop_index('ix_tenants_search_vector', table_name='tenants')
+    op.drop_index('ix_causes_search_vector', table_name='causes')
+    op.drop_column('tenants', 'search_vector')
+    op.drop_column('causes', 'search_vector')
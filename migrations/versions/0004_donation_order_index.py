@@ -0,0 +1,23 @@
+"""Index donations by payment gateway order id
+
+Revision ID: 0004
+Revises: 0003
+Create Date: 2026-10-19 00:00:00.000000
+
+"""
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = '0004'
+down_revision = '0003'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # Every capture looks its donation up by the gateway order id
+    op.create_index('ix_donations_pg_order_id', 'donations', ['pg_order_id'])
+
+
+def downgrade() -> None:
+    op.drop_index('ix_donations_pg_order_id', table_name='donations')
@@ -0,0 +1,25 @@
+"""When each user's token version last changed
+
+Revision ID: 0007
+Revises: 0006
+Create Date: 2026-10-19 00:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = '0007'
+down_revision = '0006'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column('users', sa.Column('token_version_changed_at', sa.DateTime(timezone=True), nullable=True))
+    op.create_index(op.f('ix_users_token_version_changed_at'), 'users', ['token_version_changed_at'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index(op.f('ix_users_token_version_changed_at'), table_name='users')
+    op.drop_column('users', 'token_version_changed_at')
@@ -1,193 +1,59 @@
 # In-memory storage for demo purposes
-from fastapi import FastAPI, Form, Request, HTTPException, Depends, File, UploadFile
+from fastapi import FastAPI, Form, Query, Request, HTTPException, File, UploadFile
 from fastapi.middleware.cors import CORSMiddleware
 import uvicorn
 from datetime import datetime
 import razorpay
-import json
 import hashlib
 import hmac
 import os
+import asyncio
+import secrets
+import tempfile
+from contextlib import nullcontext
 from dotenv import load_dotenv
+from app.core.loop_monitor import LoopMonitor, LoopMonitorMiddleware
+from app.core.responses import FastJSONResponse, dumps, fast_json
+from app.services.shared_state import SharedStateStore
+from app.services.mail import MailQueue, MailQueueFull, OutboundEmail, SMTPConnectionPool
+from app.services import email_templates
+from app.services.catalogue_cache import CatalogueCache
+from app.services.cause_store import CauseStore
+from app.services.donor_index import DonorIndex
+from app.services.state_machine import ORDER_TRANSITIONS, StateMachine, TransitionError
+from app.services.stock_status import STOCK_STATUSES, StockStatusStore
+from app.services.progress_hub import cause_topic, event_stream_response, progress_hub, progress_payload, tenant_topic
+from app.services.ranked_feeds import FEEDS, LocalSortedSets, RankedFeeds
+from app.services.search_index import SearchIndex
+from app.services.receipts import LocalObjectStore, ReceiptService, financial_year, indian_date, pdf_response
+from app.services.tax_statements import aggregate_statements
 
 # Load environment variables from .env file
 load_dotenv()
-import smtplib
-from email.mime.text import MIMEText
-from email.mime.multipart import MIMEMultipart
-from email.mime.base import MIMEBase
-from email import encoders
 
 # Email Template Functions
+def email_branding() -> dict:
+    """Branding used to compile email templates"""
+    return {**website_settings_storage, "frontend_url": FRONTEND_URL}
+
 def get_password_reset_template(user_name: str, reset_link: str) -> str:
-    return f"""
-    <!DOCTYPE html>
-    <html>
-    <head>
-        <meta charset="utf-8">
-        <meta name="viewport" content="width=device-width, initial-scale=1.0">
-        <title>Password Reset - NGO Platform</title>
-        <style>
-            body {{ font-family: Arial, sans-serif; line-height: 1.6; color: #333; margin: 0; padding: 0; }}
-            .container {{ max-width: 600px; margin: 0 auto; padding: 20px; }}
-            .header {{ background: linear-gradient(135deg, #2563EB, #059669); color: white; padding: 30px; text-align: center; border-radius: 10px 10px 0 0; }}
-            .content {{ background: #f8fafc; padding: 30px; border-radius: 0 0 10px 10px; }}
-            .button {{ display: inline-block; background: #2563EB; color: white; padding: 15px 30px; text-decoration: none; border-radius: 5px; margin: 20px 0; }}
-            .footer {{ text-align: center; margin-top: 30px; color: #666; font-size: 14px; }}
-        </style>
-    </head>
-    <body>
-        <div class="container">
-            <div class="header">
-                <h1>🔐 Password Reset Request</h1>
-                <p>NGO Platform</p>
-            </div>
-            <div class="content">
-                <h2>Hello {user_name},</h2>
-                <p>We received a request to reset your password for your NGO Platform account.</p>
-                <p>Click the button below to reset your password:</p>
-                <a href="{reset_link}" class="button">Reset Password</a>
-                <p>If you didn't request this password reset, please ignore this email.</p>
-                <p>This link will expire in 24 hours for security reasons.</p>
-            </div>
-            <div class="footer">
-                <p>© 2024 NGO Platform. All rights reserved.</p>
-                <p>This email was sent from info@bheeshmaa.in</p>
-            </div>
-        </div>
-    </body>
-    </html>
-    """
+    return email_templates.render("password_reset", email_branding(), user_name=user_name, reset_link=reset_link)[1]
 
 def get_welcome_template(user_name: str, user_role: str) -> str:
-    return f"""
-    <!DOCTYPE html>
-    <html>
-    <head>
-        <meta charset="utf-8">
-        <meta name="viewport" content="width=device-width, initial-scale=1.0">
-        <title>Welcome to NGO Platform</title>
-        <style>
-            body {{ font-family: Arial, sans-serif; line-height: 1.6; color: #333; margin: 0; padding: 0; }}
-            .container {{ max-width: 600px; margin: 0 auto; padding: 20px; }}
-            .header {{ background: linear-gradient(135deg, #2563EB, #059669); color: white; padding: 30px; text-align: center; border-radius: 10px 10px 0 0; }}
-            .content {{ background: #f8fafc; padding: 30px; border-radius: 0 0 10px 10px; }}
-            .button {{ display: inline-block; background: #2563EB; color: white; padding: 15px 30px; text-decoration: none; border-radius: 5px; margin: 20px 0; }}
-            .footer {{ text-align: center; margin-top: 30px; color: #666; font-size: 14px; }}
-        </style>
-    </head>
-    <body>
-        <div class="container">
-            <div class="header">
-                <h1>🎉 Welcome to NGO Platform!</h1>
-                <p>Making a Difference Together</p>
-            </div>
-            <div class="content">
-                <h2>Hello {user_name},</h2>
-                <p>Welcome to the NGO Platform! We're excited to have you join our community of changemakers.</p>
-                <p>Your account has been created with the role: <strong>{user_role.replace('_', ' ')}</strong></p>
-                <p>You can now:</p>
-                <ul>
-                    <li>Access your personalized dashboard</li>
-                    <li>Manage your profile and settings</li>
-                    <li>Connect with NGOs and causes</li>
-                    <li>Make a positive impact in your community</li>
-                </ul>
-                <a href="{FRONTEND_URL}/login" class="button">Get Started</a>
-                <p>If you have any questions, feel free to contact our support team.</p>
-            </div>
-            <div class="footer">
-                <p>© 2024 NGO Platform. All rights reserved.</p>
-                <p>Contact us: info@bheeshmaa.in</p>
-            </div>
-        </div>
-    </body>
-    </html>
-    """
+    return email_templates.render("welcome", email_branding(), user_name=user_name, user_role=user_role)[1]
 
 def get_donation_invoice_template(donor_name: str, cause_title: str, amount: float, transaction_id: str, date: str) -> str:
-    return f"""
-    <!DOCTYPE html>
-    <html>
-    <head>
-        <meta charset="utf-8">
-        <meta name="viewport" content="width=device-width, initial-scale=1.0">
-        <title>Donation Receipt - NGO Platform</title>
-        <style>
-            body {{ font-family: Arial, sans-serif; line-height: 1.6; color: #333; margin: 0; padding: 0; }}
-            .container {{ max-width: 600px; margin: 0 auto; padding: 20px; }}
-            .header {{ background: linear-gradient(135deg, #2563EB, #059669); color: white; padding: 30px; text-align: center; border-radius: 10px 10px 0 0; }}
-            .content {{ background: #f8fafc; padding: 30px; border-radius: 0 0 10px 10px; }}
-            .receipt {{ background: white; padding: 20px; border-radius: 5px; margin: 20px 0; border-left: 4px solid #2563EB; }}
-            .footer {{ text-align: center; margin-top: 30px; color: #666; font-size: 14px; }}
-        </style>
-    </head>
-    <body>
-        <div class="container">
-            <div class="header">
-                <h1>💰 Donation Receipt</h1>
-                <p>Thank you for your generosity!</p>
-            </div>
-            <div class="content">
-                <h2>Hello {donor_name},</h2>
-                <p>Thank you for your generous donation! Your contribution is making a real difference.</p>
-                <div class="receipt">
-                    <h3>Donation Details</h3>
-                    <p><strong>Cause:</strong> {cause_title}</p>
-                    <p><strong>Amount:</strong> ₹{amount:,.2f}</p>
-                    <p><strong>Transaction ID:</strong> {transaction_id}</p>
-                    <p><strong>Date:</strong> {date}</p>
-                    <p><strong>Status:</strong> Completed</p>
-                </div>
-                <p>Your donation is tax-deductible. Please keep this receipt for your records.</p>
-                <p>Thank you for supporting our mission to create positive change!</p>
-            </div>
-            <div class="footer">
-                <p>© 2024 NGO Platform. All rights reserved.</p>
-                <p>Contact us: info@bheeshmaa.in</p>
-            </div>
-        </div>
-    </body>
-    </html>
-    """
+    return email_templates.render(
+        "donation_invoice", email_branding(),
+        donor_name=donor_name, cause_title=cause_title, amount=amount, transaction_id=transaction_id, date=date
+    )[1]
 
-def send_email(to_email: str, subject: str, html_content: str) -> bool:
-    """Send email using SMTP settings"""
+def queue_email(to_email: str, subject: str, html_content: str) -> OutboundEmail:
+    """Hand an email to the background delivery queue"""
     try:
-        settings = email_settings_storage
-        
-        print(f"Attempting to send email to: {to_email}")
-        print(f"Using SMTP settings: {settings['smtp_host']}:{settings['smtp_port']}")
-        
-        # Create message
-        msg = MIMEMultipart('alternative')
-        msg['From'] = f"{settings['from_name']} <{settings['from_email']}>"
-        msg['To'] = to_email
-        msg['Subject'] = subject
-        
-        # Add HTML content
-        html_part = MIMEText(html_content, 'html')
-        msg.attach(html_part)
-        
-        # Connect to SMTP server
-        print("Connecting to SMTP server...")
-        server = smtplib.SMTP_SSL(settings['smtp_host'], settings['smtp_port'])
-        
-        print("Logging in to SMTP server...")
-        server.login(settings['smtp_username'], settings['smtp_password'])
-        
-        # Send email
-        print("Sending email...")
-        text = msg.as_string()
-        server.sendmail(settings['from_email'], to_email, text)
-        server.quit()
-        
-        print("Email sent successfully!")
-        return True
-    except Exception as e:
-        print(f"Email sending failed: {str(e)}")
-        print(f"Error type: {type(e).__name__}")
-        return False
+        return mail_queue.enqueue(OutboundEmail(to_email=to_email, subject=subject, html_content=html_content))
+    except MailQueueFull:
+        raise HTTPException(status_code=503, detail="Email queue is full, please retry shortly")
 
 # Environment Configuration
 BACKEND_HOST = os.getenv("BACKEND_HOST", "0.0.0.0")
@@ -622,10 +488,7 @@ causes_storage = [
         "image_url": "https://picsum.photos/400/300?random=5",
         "created_at": datetime.now().isoformat() + "Z",
         "donation_count": 22
-    }
-]
-
-pending_causes_storage = [
+    },
     {
         "id": 6,
         "title": "Emergency Relief Fund",
@@ -982,6 +845,9 @@ stock_status_storage = [
     }
 ]
 
+# Rows replaced in stock_status_storage, keyed "vendor_id:cause_id"
+stock_status_history = {}
+
 # Email and Website Settings Storage
 email_settings_storage = {
     "smtp_host": "smtp.hostinger.com",
@@ -1006,7 +872,133 @@ website_settings_storage = {
     "address": "123 NGO Street, City, State, Country"
 }
 
-app = FastAPI(title="NGO Donations Platform", version="1.0.0")
+app = FastAPI(title="NGO Donations Platform", version="1.0.0", default_response_class=FastJSONResponse)
+
+# Outbound email: bounded queue drained over a small pool of SMTP connections
+mail_pool = SMTPConnectionPool(lambda: email_settings_storage, size=int(os.getenv("SMTP_POOL_SIZE", "2")))
+mail_queue = MailQueue(
+    mail_pool,
+    sender_provider=lambda: email_settings_storage,
+    maxsize=int(os.getenv("MAIL_QUEUE_SIZE", "1000")),
+    batch_size=int(os.getenv("MAIL_BATCH_SIZE", "20"))
+)
+
+background_tasks = set()
+
+def shared_mutation(*names):
+    """Publish a change to the named collections to the other workers.
+
+    Wrap only the lookup and the change: in multi-worker mode it holds the
+    cross-process write lock. A no-op with a single worker.
+    """
+    return shared_state.mutation(*names) if shared_state else nullcontext()
+
+# Causes in every state live in causes_storage, indexed by id and status
+cause_store = CauseStore(causes_storage)
+
+# Order lifecycle: transitions, append-only event log and per-state counters
+order_events_storage = []
+order_machine = StateMachine(
+    ORDER_TRANSITIONS, orders_storage, order_events_storage, "order", group_by=("vendor_id", "ngo_id")
+)
+
+# Current stock per (vendor, cause) with change history
+stock_store = StockStatusStore(stock_status_storage, stock_status_history)
+
+# Pre-serialized public catalogue (categories, NGOs, live causes) served
+# with ETags; invalidated by every write to the collections behind it
+catalogue_cache = CatalogueCache(max_age=int(os.getenv("CATALOGUE_MAX_AGE", "60")))
+
+def catalogue_json(items) -> bytes:
+    return dumps({"value": items, "Count": len(items)})
+
+# Public search over live causes, matching their own text, their NGOs and
+# category; kept up to date as causes go live or receive donations
+cause_search = SearchIndex(facets=("category", "status", "ngo"))
+
+def cause_progress(cause) -> float:
+    target = cause.get("target_amount") or 0
+    return (cause.get("current_amount") or 0) / target if target else 0.0
+
+def index_cause(cause, ngos_by_id=None):
+    if cause["status"] != "LIVE":
+        cause_search.remove(cause["id"])
+        return
+    if ngos_by_id is None:
+        ngos_by_id = {ngo["id"]: ngo for ngo in ngos_storage}
+    ngos = [ngos_by_id[ngo_id] for ngo_id in cause.get("ngo_ids", []) if ngo_id in ngos_by_id]
+    texts = [(cause.get("title"), 1.0), (cause.get("description"), 0.4), (cause.get("category_name"), 0.5)]
+    texts += [(ngo["name"], 0.5) for ngo in ngos] + [(ngo.get("description"), 0.2) for ngo in ngos]
+    facets = {"category": cause.get("category_id"), "status": cause["status"], "ngo": cause.get("ngo_ids", [])}
+    cause_search.put(cause["id"], texts, facets, cause_progress(cause))
+
+def reindex_search():
+    cause_search.clear()
+    ngos_by_id = {ngo["id"]: ngo for ngo in ngos_storage}
+    for cause in cause_store.partition("LIVE"):
+        index_cause(cause, ngos_by_id)
+
+reindex_search()
+
+# Ranked marketplace feeds (trending, nearly funded, newest, most donors),
+# kept in Redis sorted sets when REDIS_URL is set so workers share them
+REDIS_URL = os.getenv("REDIS_URL", "")
+if REDIS_URL:
+    import redis
+    ranked_feeds = RankedFeeds(redis.Redis.from_url(REDIS_URL))
+else:
+    ranked_feeds = RankedFeeds(LocalSortedSets())
+
+def rebuild_feeds():
+    ranked_feeds.rebuild(
+        cause_store.partition("LIVE"), (d for d in donations_storage if d.get("status") == "COMPLETED")
+    )
+
+rebuild_feeds()
+
+def cause_progress_payload(cause):
+    return progress_payload(cause["id"], cause.get("current_amount"), cause.get("target_amount"), cause.get("donation_count"))
+
+# Live progress (SSE) subscribers get an update when a cause's numbers change
+published_progress = {}
+
+def publish_progress(cause):
+    payload = cause_progress_payload(cause)
+    if published_progress.get(cause["id"]) == payload:
+        return
+    published_progress[cause["id"]] = payload
+    topics = [cause_topic(cause["id"])] + [tenant_topic(ngo_id) for ngo_id in cause.get("ngo_ids", [])]
+    progress_hub.publish(topics, cause["id"], payload)
+
+def cause_changed(cause, donation_amount=None):
+    """Propagate a change of a cause to the catalogue cache, search, feeds and live streams"""
+    catalogue_cache.invalidate("causes")
+    index_cause(cause)
+    if cause["status"] != "LIVE":
+        ranked_feeds.remove(cause)
+    elif donation_amount is not None:
+        ranked_feeds.record_donation(cause, donation_amount)
+    else:
+        ranked_feeds.put(cause)
+    publish_progress(cause)
+
+# Per-donor view of donations_storage for the donor dashboard
+donor_index = DonorIndex()
+donor_index.rebuild(donations_storage)
+
+# Donation receipts and 80G certificates, rendered on first request and kept
+# content-addressed on disk (shared by all workers)
+RECEIPT_STORE_PATH = os.getenv("RECEIPT_STORE_PATH", os.path.join(os.path.dirname(os.path.abspath(__file__)), "data"))
+receipt_service = ReceiptService(LocalObjectStore(RECEIPT_STORE_PATH))
+receipt_jobs = {}
+
+@app.on_event("startup")
+async def start_mail_queue():
+    await mail_queue.start()
+
+@app.on_event("shutdown")
+async def stop_mail_queue():
+    await mail_queue.stop()
 
 # Razorpay Configuration (using environment variables)
 razorpay_client = razorpay.Client(auth=(RAZORPAY_KEY_ID, RAZORPAY_KEY_SECRET))
@@ -1113,18 +1105,20 @@ async def update_ngo_about_page(ngo_id: int, request: Request, about_data: dict)
     if current_user["role"] == "NGO_ADMIN" and current_user.get("ngo_id") != ngo_id:
         raise HTTPException(status_code=403, detail="Access denied")
     
-    # Find and update NGO
-    ngo = next((n for n in ngos_storage if n["id"] == ngo_id), None)
-    if not ngo:
-        raise HTTPException(status_code=404, detail="NGO not found")
-    
-    # Update about page data
-    ngo["about_content"] = about_data.get("content", ngo.get("about_content", ""))
-    ngo["mission"] = about_data.get("mission", ngo.get("mission", ""))
-    ngo["vision"] = about_data.get("vision", ngo.get("vision", ""))
-    ngo["values"] = about_data.get("values", ngo.get("values", []))
-    ngo["team"] = about_data.get("team", ngo.get("team", []))
-    ngo["about_updated_at"] = datetime.now().isoformat() + "Z"
+    async with shared_mutation("ngos_storage"):
+        # Find and update NGO
+        ngo = next((n for n in ngos_storage if n["id"] == ngo_id), None)
+        if not ngo:
+            raise HTTPException(status_code=404, detail="NGO not found")
+    
+        # Update about page data
+        ngo["about_content"] = about_data.get("content", ngo.get("about_content", ""))
+        ngo["mission"] = about_data.get("mission", ngo.get("mission", ""))
+        ngo["vision"] = about_data.get("vision", ngo.get("vision", ""))
+        ngo["values"] = about_data.get("values", ngo.get("values", []))
+        ngo["team"] = about_data.get("team", ngo.get("team", []))
+        ngo["about_updated_at"] = datetime.now().isoformat() + "Z"
+        catalogue_cache.invalidate("ngos")
     
     return {"message": "About page updated successfully", "updated_at": ngo["about_updated_at"]}
 
@@ -1140,17 +1134,19 @@ async def update_ngo_contact_page(ngo_id: int, request: Request, contact_data: d
     if current_user["role"] == "NGO_ADMIN" and current_user.get("ngo_id") != ngo_id:
         raise HTTPException(status_code=403, detail="Access denied")
     
-    # Find and update NGO
-    ngo = next((n for n in ngos_storage if n["id"] == ngo_id), None)
-    if not ngo:
-        raise HTTPException(status_code=404, detail="NGO not found")
+    async with shared_mutation("ngos_storage"):
+        # Find and update NGO
+        ngo = next((n for n in ngos_storage if n["id"] == ngo_id), None)
+        if not ngo:
+            raise HTTPException(status_code=404, detail="NGO not found")
     
-    # Update contact page data
-    ngo["phone"] = contact_data.get("phone", ngo.get("phone", ""))
-    ngo["office_hours"] = contact_data.get("office_hours", ngo.get("office_hours", ""))
-    ngo["departments"] = contact_data.get("departments", ngo.get("departments", []))
-    ngo["social_media"] = contact_data.get("social_media", ngo.get("social_media", {}))
-    ngo["contact_updated_at"] = datetime.now().isoformat() + "Z"
+        # Update contact page data
+        ngo["phone"] = contact_data.get("phone", ngo.get("phone", ""))
+        ngo["office_hours"] = contact_data.get("office_hours", ngo.get("office_hours", ""))
+        ngo["departments"] = contact_data.get("departments", ngo.get("departments", []))
+        ngo["social_media"] = contact_data.get("social_media", ngo.get("social_media", {}))
+        ngo["contact_updated_at"] = datetime.now().isoformat() + "Z"
+        catalogue_cache.invalidate("ngos")
     
     return {"message": "Contact page updated successfully", "updated_at": ngo["contact_updated_at"]}
 
@@ -1163,31 +1159,35 @@ async def create_donation(donation_data: dict):
         if field not in donation_data:
             raise HTTPException(status_code=400, detail=f"Missing required field: {field}")
     
-    # Generate donation ID
-    donation_id = len(donations_storage) + 1
-    
-    # Create donation record
-    donation = {
-        "id": donation_id,
-        "cause_id": donation_data["cause_id"],
-        "donor_name": donation_data["donor_name"],
-        "donor_email": donation_data["donor_email"],
-        "amount": donation_data["amount"],
-        "payment_method": donation_data["payment_method"],
-        "status": "PENDING",
-        "transaction_id": f"TXN_{donation_id}_{datetime.now().strftime('%Y%m%d%H%M%S')}",
-        "created_at": datetime.now().isoformat() + "Z",
-        "updated_at": datetime.now().isoformat() + "Z"
-    }
+    async with shared_mutation("donations_storage", "causes_storage"):
+        # Generate donation ID
+        donation_id = len(donations_storage) + 1
     
-    # Add to storage
-    donations_storage.append(donation)
+        # Create donation record
+        donation = {
+            "id": donation_id,
+            "cause_id": donation_data["cause_id"],
+            "donor_name": donation_data["donor_name"],
+            "donor_email": donation_data["donor_email"],
+            "amount": donation_data["amount"],
+            "payment_method": donation_data["payment_method"],
+            "status": "PENDING",
+            "transaction_id": f"TXN_{donation_id}_{datetime.now().strftime('%Y%m%d%H%M%S')}",
+            "created_at": datetime.now().isoformat() + "Z",
+            "updated_at": datetime.now().isoformat() + "Z"
+        }
     
-    # Update cause raised amount
-    cause = next((c for c in causes_storage if c["id"] == donation_data["cause_id"]), None)
-    if cause:
-        cause["current_amount"] = (cause.get("current_amount", 0) or 0) + donation_data["amount"]
-        cause["donation_count"] = (cause.get("donation_count", 0) or 0) + 1
+        # Add to storage
+        donations_storage.append(donation)
+        donor_index.add(donation)
+    
+        # Update cause raised amount
+        cause = cause_store.get(donation_data["cause_id"])
+        if cause:
+            cause["current_amount"] = (cause.get("current_amount", 0) or 0) + donation_data["amount"]
+            cause["donation_count"] = (cause.get("donation_count", 0) or 0) + 1
+            # Still pending: trending only counts it once verify_donation completes it
+            cause_changed(cause)
     
     return {
         "success": True,
@@ -1394,20 +1394,22 @@ async def get_admin_orders(request: Request):
         raise HTTPException(status_code=403, detail="Access denied")
     
     # Return all orders with enriched data
+    vendor_emails = {v["id"]: v["contact_email"] for v in vendors_storage}
+    ngo_emails = {n["id"]: n["contact_email"] for n in ngos_storage}
     enriched_orders = []
     for order in orders_storage:
         enriched_order = {
             **order,
-            "vendor_contact_email": next((v["contact_email"] for v in vendors_storage if v["id"] == order["vendor_id"]), ""),
-            "ngo_contact_email": next((n["contact_email"] for n in ngos_storage if n["id"] == order["ngo_id"]), ""),
-            "cause_description": next((c["description"] for c in causes_storage if c["id"] == order["cause_id"]), ""),
+            "vendor_contact_email": vendor_emails.get(order["vendor_id"], ""),
+            "ngo_contact_email": ngo_emails.get(order["ngo_id"], ""),
+            "cause_description": (cause_store.get(order["cause_id"]) or {}).get("description", ""),
         }
         enriched_orders.append(enriched_order)
     
-    return {
+    return fast_json({
         "value": enriched_orders,
         "Count": len(enriched_orders)
-    }
+    })
 
 @app.get("/admin/payments")
 async def get_admin_payments():
@@ -1459,23 +1461,26 @@ async def create_ngo(
     logo_url: str = Form(None)
 ):
     """Create a new NGO"""
-    new_id = max([ngo["id"] for ngo in ngos_storage], default=0) + 1
-    new_ngo = {
-        "id": new_id,
-        "name": name,
-        "slug": name.lower().replace(" ", "-"),
-        "description": description,
-        "logo_url": logo_url or f"https://picsum.photos/200/200?random={hash(name) % 1000}",
-        "contact_email": contact_email,
-        "website_url": website_url,
-        "status": "ACTIVE",
-        "created_at": datetime.now().isoformat() + "Z",
-        "total_donations": 0,
-        "total_causes": 0,
-        "verified": False
-    }
-    ngos_storage.append(new_ngo)
-    return new_ngo
+    async with shared_mutation("ngos_storage"):
+        new_id = max([ngo["id"] for ngo in ngos_storage], default=0) + 1
+        new_ngo = {
+            "id": new_id,
+            "name": name,
+            "slug": name.lower().replace(" ", "-"),
+            "description": description,
+            "logo_url": logo_url or f"https://picsum.photos/200/200?random={hash(name) % 1000}",
+            "contact_email": contact_email,
+            "website_url": website_url,
+            "status": "ACTIVE",
+            "created_at": datetime.now().isoformat() + "Z",
+            "total_donations": 0,
+            "total_causes": 0,
+            "verified": False
+        }
+        ngos_storage.append(new_ngo)
+        # Microsite cause listings are keyed by slug, so a new NGO affects them too
+        catalogue_cache.invalidate("ngos", "causes")
+        return new_ngo
 
 @app.post("/admin/vendors")
 async def create_vendor(
@@ -1486,22 +1491,23 @@ async def create_vendor(
     address: str = Form(...)
 ):
     """Create a new vendor"""
-    new_id = max([vendor["id"] for vendor in vendors_storage], default=0) + 1
-    new_vendor = {
-        "id": new_id,
-        "name": name,
-        "gstin": gstin,
-        "contact_email": contact_email,
-        "phone": phone,
-        "address": address,
-        "kyc_status": "PENDING",
-        "tenant_name": None,
-        "created_at": datetime.now().isoformat() + "Z",
-        "total_invoices": 0,
-        "total_amount": 0
-    }
-    vendors_storage.append(new_vendor)
-    return new_vendor
+    async with shared_mutation("vendors_storage"):
+        new_id = max([vendor["id"] for vendor in vendors_storage], default=0) + 1
+        new_vendor = {
+            "id": new_id,
+            "name": name,
+            "gstin": gstin,
+            "contact_email": contact_email,
+            "phone": phone,
+            "address": address,
+            "kyc_status": "PENDING",
+            "tenant_name": None,
+            "created_at": datetime.now().isoformat() + "Z",
+            "total_invoices": 0,
+            "total_amount": 0
+        }
+        vendors_storage.append(new_vendor)
+        return new_vendor
 
 @app.post("/admin/categories")
 async def create_category(
@@ -1509,15 +1515,17 @@ async def create_category(
     description: str = Form(...)
 ):
     """Create a new category"""
-    new_id = max([cat["id"] for cat in categories_storage], default=0) + 1
-    new_category = {
-        "id": new_id,
-        "name": name,
-        "description": description,
-        "created_at": datetime.now().isoformat() + "Z"
-    }
-    categories_storage.append(new_category)
-    return new_category
+    async with shared_mutation("categories_storage"):
+        new_id = max([cat["id"] for cat in categories_storage], default=0) + 1
+        new_category = {
+            "id": new_id,
+            "name": name,
+            "description": description,
+            "created_at": datetime.now().isoformat() + "Z"
+        }
+        categories_storage.append(new_category)
+        catalogue_cache.invalidate("categories")
+        return new_category
 
 @app.post("/admin/causes")
 async def create_cause(
@@ -1529,72 +1537,72 @@ async def create_cause(
     image_url: str = Form(None)
 ):
     """Create a new cause that can be associated with multiple NGOs"""
-    new_id = max([cause["id"] for cause in causes_storage + pending_causes_storage], default=0) + 1
-    
     # Parse NGO IDs
     ngo_id_list = [int(id.strip()) for id in ngo_ids.split(',') if id.strip()]
-    
-    # Find category name
-    category = next((cat for cat in categories_storage if cat["id"] == category_id), None)
-    
-    # Find NGO names
-    ngo_names = []
-    for ngo_id in ngo_id_list:
-        ngo = next((ngo for ngo in ngos_storage if ngo["id"] == ngo_id), None)
-        if ngo:
-            ngo_names.append(ngo["name"])
-    
-    new_cause = {
-        "id": new_id,
-        "title": title,
-        "description": description,
-        "target_amount": target_amount,
-        "current_amount": 0,
-        "status": "PENDING_APPROVAL",
-        "category_id": category_id,
-        "ngo_ids": ngo_id_list,  # List of NGO IDs
-        "image_url": image_url or f"https://picsum.photos/400/300?random={hash(title) % 1000}",
-        "created_at": datetime.now().isoformat() + "Z",
-        "ngo_names": ngo_names,  # List of NGO names
-        "ngo_name": ngo_names[0] if ngo_names else "Unknown NGO",  # Single NGO name for frontend
-        "category_name": category["name"] if category else "Unknown Category",
-        "donation_count": 0
-    }
-    pending_causes_storage.append(new_cause)
-    return new_cause
+
+    async with shared_mutation("causes_storage"):
+        # Find category name
+        category = next((cat for cat in categories_storage if cat["id"] == category_id), None)
+    
+        # Find NGO names
+        ngo_names = []
+        for ngo_id in ngo_id_list:
+            ngo = next((ngo for ngo in ngos_storage if ngo["id"] == ngo_id), None)
+            if ngo:
+                ngo_names.append(ngo["name"])
+    
+        new_cause = {
+            "id": cause_store.allocate_id(),
+            "title": title,
+            "description": description,
+            "target_amount": target_amount,
+            "current_amount": 0,
+            "status": "PENDING_APPROVAL",
+            "category_id": category_id,
+            "ngo_ids": ngo_id_list,  # List of NGO IDs
+            "image_url": image_url or f"https://picsum.photos/400/300?random={hash(title) % 1000}",
+            "created_at": datetime.now().isoformat() + "Z",
+            "ngo_names": ngo_names,  # List of NGO names
+            "ngo_name": ngo_names[0] if ngo_names else "Unknown NGO",  # Single NGO name for frontend
+            "category_name": category["name"] if category else "Unknown Category",
+            "donation_count": 0
+        }
+        cause_store.add(new_cause)
+        catalogue_cache.invalidate("causes")
+        return new_cause
 
 @app.post("/admin/causes/{cause_id}/approve")
 async def approve_cause(cause_id: int):
     """Approve a cause to make it visible to donors"""
-    # Find the cause in pending_causes_storage
-    cause_index = next((i for i, cause in enumerate(pending_causes_storage) if cause["id"] == cause_id), None)
-    
-    if cause_index is not None:
-        # Move cause from pending to live
-        approved_cause = pending_causes_storage.pop(cause_index)
-        approved_cause["status"] = "LIVE"
-        approved_cause["approved_at"] = "2024-01-15T00:00:00Z"
-        causes_storage.append(approved_cause)
+    async with shared_mutation("causes_storage"):
+        if cause_store.get(cause_id, status="PENDING_APPROVAL"):
+            # Move cause from pending to live
+            cause_changed(cause_store.transition(cause_id, "LIVE", approved_at="2024-01-15T00:00:00Z"))
         
-        return {
-            "id": cause_id,
-            "status": "LIVE",
-            "approved_at": "2024-01-15T00:00:00Z",
-            "message": "Cause approved successfully"
-        }
-    else:
-        return {"error": "Cause not found"}
+            return {
+                "id": cause_id,
+                "status": "LIVE",
+                "approved_at": "2024-01-15T00:00:00Z",
+                "message": "Cause approved successfully"
+            }
+        else:
+            return {"error": "Cause not found"}
 
 @app.post("/admin/causes/{cause_id}/reject")
 async def reject_cause(cause_id: int, reason: str = Form(...)):
     """Reject a cause"""
-    return {
-        "id": cause_id,
-        "status": "REJECTED",
-        "rejected_at": "2024-01-15T00:00:00Z",
-        "reason": reason,
-        "message": "Cause rejected"
-    }
+    async with shared_mutation("causes_storage"):
+        if not cause_store.get(cause_id, status="PENDING_APPROVAL"):
+            return {"error": "Cause not found"}
+        cause_store.transition(cause_id, "REJECTED", rejected_at="2024-01-15T00:00:00Z", rejection_reason=reason)
+        catalogue_cache.invalidate("causes")
+        return {
+            "id": cause_id,
+            "status": "REJECTED",
+            "rejected_at": "2024-01-15T00:00:00Z",
+            "reason": reason,
+            "message": "Cause rejected"
+        }
 
 @app.post("/ngo/causes")
 async def create_ngo_cause(
@@ -1607,40 +1615,40 @@ async def create_ngo_cause(
     type: str = Form("NGO_MANAGED")
 ):
     """Create a new cause for NGO admin (single NGO)"""
-    new_id = max([cause["id"] for cause in causes_storage + pending_causes_storage], default=0) + 1
-    
-    # Find category name
-    category = next((cat for cat in categories_storage if cat["id"] == category_id), None)
+    async with shared_mutation("causes_storage"):
+        # Find category name
+        category = next((cat for cat in categories_storage if cat["id"] == category_id), None)
     
-    # Find NGO name
-    ngo = next((ngo for ngo in ngos_storage if ngo["id"] == ngo_id), None)
+        # Find NGO name
+        ngo = next((ngo for ngo in ngos_storage if ngo["id"] == ngo_id), None)
     
-    new_cause = {
-        "id": new_id,
-        "title": title,
-        "description": description,
-        "target_amount": target_amount,
-        "current_amount": 0,
-        "status": "PENDING_APPROVAL",
-        "category_id": category_id,
-        "ngo_ids": [ngo_id],  # Single NGO for NGO admin
-        "image_url": image_url or f"https://picsum.photos/400/300?random={hash(title) % 1000}",
-        "created_at": datetime.now().isoformat() + "Z",
-        "ngo_names": [ngo["name"]] if ngo else ["Unknown NGO"],
-        "ngo_name": ngo["name"] if ngo else "Unknown NGO",  # Single NGO name for frontend
-        "category_name": category["name"] if category else "Unknown Category",
-        "donation_count": 0,
-        "type": type
-    }
-    pending_causes_storage.append(new_cause)
-    return new_cause
+        new_cause = {
+            "id": cause_store.allocate_id(),
+            "title": title,
+            "description": description,
+            "target_amount": target_amount,
+            "current_amount": 0,
+            "status": "PENDING_APPROVAL",
+            "category_id": category_id,
+            "ngo_ids": [ngo_id],  # Single NGO for NGO admin
+            "image_url": image_url or f"https://picsum.photos/400/300?random={hash(title) % 1000}",
+            "created_at": datetime.now().isoformat() + "Z",
+            "ngo_names": [ngo["name"]] if ngo else ["Unknown NGO"],
+            "ngo_name": ngo["name"] if ngo else "Unknown NGO",  # Single NGO name for frontend
+            "category_name": category["name"] if category else "Unknown Category",
+            "donation_count": 0,
+            "type": type
+        }
+        cause_store.add(new_cause)
+        catalogue_cache.invalidate("causes")
+        return new_cause
 
 @app.get("/admin/pending-causes")
 async def get_pending_causes():
     """Get all causes pending approval"""
     return {
-        "value": pending_causes_storage,
-        "Count": len(pending_causes_storage)
+        "value": cause_store.partition("PENDING_APPROVAL"),
+        "Count": cause_store.count("PENDING_APPROVAL")
     }
 
 @app.post("/auth/login")
@@ -1795,20 +1803,14 @@ async def get_current_user(request: Request):
     return None
 
 @app.get("/public/categories")
-async def get_categories():
+async def get_categories(request: Request):
     """Get all cause categories"""
-    return {
-        "value": categories_storage,
-        "Count": len(categories_storage)
-    }
+    return catalogue_cache.response(request, "categories", lambda: catalogue_json(categories_storage))
 
 @app.get("/public/ngos")
-async def get_ngos():
+async def get_ngos(request: Request):
     """Get all NGOs"""
-    return {
-        "value": ngos_storage,
-        "Count": len(ngos_storage)
-    }
+    return catalogue_cache.response(request, "ngos", lambda: catalogue_json(ngos_storage))
 
 @app.get("/admin/causes")
 async def get_admin_causes(request: Request):
@@ -1819,24 +1821,22 @@ async def get_admin_causes(request: Request):
         raise HTTPException(status_code=401, detail="Authentication required")
     
     if current_user["role"] == "PLATFORM_ADMIN":
-        # Platform admin sees all causes
+        # Platform admin sees live and pending causes
+        visible = cause_store.partition("LIVE") + cause_store.partition("PENDING_APPROVAL")
         return {
-            "value": causes_storage + pending_causes_storage,
-            "Count": len(causes_storage) + len(pending_causes_storage)
+            "value": visible,
+            "Count": len(visible)
         }
     elif current_user["role"] in ["NGO_ADMIN", "NGO_STAFF"]:
         # NGO users see only their NGO's causes
         user_ngo_id = current_user.get("ngo_id")
         if user_ngo_id:
             ngo_causes = []
-            # Get live causes
-            for cause in causes_storage:
-                if user_ngo_id in cause.get("ngo_ids", []):
-                    ngo_causes.append(cause)
-            # Get pending causes
-            for cause in pending_causes_storage:
-                if user_ngo_id in cause.get("ngo_ids", []):
-                    ngo_causes.append(cause)
+            # Get live and pending causes
+            for status in ("LIVE", "PENDING_APPROVAL"):
+                for cause in cause_store.partition(status):
+                    if user_ngo_id in cause.get("ngo_ids", []):
+                        ngo_causes.append(cause)
             
             return {
                 "value": ngo_causes,
@@ -1855,13 +1855,84 @@ async def get_admin_causes(request: Request):
         }
 
 @app.get("/public/causes")
-async def get_causes():
+async def get_causes(request: Request, tenant: str = Query(None, description="NGO slug (microsite)")):
     """Get all live causes with proper category and NGO relationships"""
+    def build():
+        causes = cause_store.partition("LIVE")
+        if tenant:
+            ngo = next((n for n in ngos_storage if n["slug"] == tenant), None)
+            causes = [c for c in causes if ngo and ngo["id"] in c.get("ngo_ids", [])]
+        return catalogue_json(causes)
+    return catalogue_cache.response(request, "causes", build, variant=tenant)
+
+def facet_list(counts, labels=None):
+    """Facet counts as a list, largest first, with display names when known"""
+    items = sorted(counts.items(), key=lambda item: (-item[1], str(item[0])))
+    if labels is None:
+        return [{"value": value, "count": count} for value, count in items]
+    return [{"id": value, "name": labels.get(value), "count": count} for value, count in items]
+
+@app.get("/public/search")
+async def search_causes(
+    q: str = Query("", description="Search text"),
+    category_id: int = Query(None),
+    status: str = Query(None),
+    ngo_id: int = Query(None),
+    page: int = Query(1, ge=1),
+    limit: int = Query(20, ge=1, le=100)
+):
+    """Search live causes by text with category, status and NGO facets"""
+    result = cause_search.search(
+        q, {"category": category_id, "status": status, "ngo": ngo_id}, offset=(page - 1) * limit, limit=limit
+    )
+    # Hits can outlive their cause until the index catches up with a reload
+    hits = [(cause_store.get(cause_id), score) for cause_id, score in result.hits]
     return {
-        "value": causes_storage,
-        "Count": len(causes_storage)
+        "value": [{**cause, "score": round(score, 4)} for cause, score in hits if cause],
+        "Count": result.total,
+        "page": page,
+        "limit": limit,
+        "facets": {
+            "category": facet_list(result.facets["category"], {c["id"]: c["name"] for c in categories_storage}),
+            "status": facet_list(result.facets["status"]),
+            "ngo": facet_list(result.facets["ngo"], {n["id"]: n["name"] for n in ngos_storage})
+        }
     }
 
+@app.get("/public/feeds/{feed}")
+async def get_feed(
+    feed: str,
+    category_id: int = Query(None),
+    limit: int = Query(10, ge=1, le=50)
+):
+    """Top causes of a ranked feed, overall or within a category"""
+    if feed not in FEEDS:
+        raise HTTPException(status_code=404, detail=f"Unknown feed; expected one of {', '.join(FEEDS)}")
+    causes = [cause_store.get(cause_id) for cause_id in ranked_feeds.top(feed, limit, category_id=category_id)]
+    causes = [cause for cause in causes if cause]
+    return {"feed": feed, "value": causes, "Count": len(causes)}
+
+@app.get("/public/causes/{cause_id}/stream")
+async def stream_cause_progress(cause_id: int):
+    """Server-sent events with the cause's raised amount and donation count"""
+    cause = cause_store.get(cause_id, status="LIVE")
+    if not cause:
+        raise HTTPException(status_code=404, detail="Cause not found")
+    return event_stream_response(
+        progress_hub.stream(cause_topic(cause_id), initial=[(cause_id, cause_progress_payload(cause))])
+    )
+
+@app.get("/public/tenants/{slug}/stream")
+async def stream_tenant_progress(slug: str):
+    """Server-sent events for every live cause of an NGO (microsite pages)"""
+    ngo = next((n for n in ngos_storage if n["slug"] == slug), None)
+    if not ngo:
+        raise HTTPException(status_code=404, detail="NGO not found")
+    causes = [c for c in cause_store.partition("LIVE") if ngo["id"] in c.get("ngo_ids", [])]
+    return event_stream_response(
+        progress_hub.stream(tenant_topic(ngo["id"]), initial=[(c["id"], cause_progress_payload(c)) for c in causes])
+    )
+
 # Donation Management Endpoints
 @app.post("/donations/init")
 async def init_donation(
@@ -1874,34 +1945,17 @@ async def init_donation(
     """Initialize a donation and create Razorpay order"""
     try:
         # Find the cause
-        cause = next((c for c in causes_storage if c["id"] == cause_id), None)
+        cause = cause_store.get(cause_id, status="LIVE")
         if not cause:
             raise HTTPException(status_code=404, detail="Cause not found")
         
-        # Create donation record
-        donation_id = len(donations_storage) + 1
-        donation = {
-            "id": donation_id,
-            "cause_id": cause_id,
-            "cause_title": cause["title"],
-            "ngo_id": cause["ngo_ids"][0] if cause["ngo_ids"] else None,
-            "ngo_name": cause["ngo_names"][0] if cause["ngo_names"] else "Unknown NGO",
-            "amount": amount,
-            "donor_name": donor_name,
-            "donor_email": donor_email,
-            "donor_phone": donor_phone,
-            "status": "PENDING",
-            "created_at": datetime.now().isoformat() + "Z",
-            "razorpay_order_id": None,
-            "razorpay_payment_id": None,
-            "razorpay_signature": None
-        }
-        
-        # Create Razorpay order
+        # Create Razorpay order. The shared write lock is not held across the
+        # call, so the order is tagged with its own receipt, not the donation id
+        receipt = f"donation_{secrets.token_hex(8)}"
         order_data = {
             "amount": amount * 100,  # Convert to paise
             "currency": "INR",
-            "receipt": f"donation_{donation_id}",
+            "receipt": receipt,
             "notes": {
                 "cause_id": str(cause_id),
                 "cause_title": cause["title"],
@@ -1912,9 +1966,28 @@ async def init_donation(
         
         razorpay_order = razorpay_client.order.create(data=order_data)
         
-        # Update donation with order ID
-        donation["razorpay_order_id"] = razorpay_order["id"]
-        donations_storage.append(donation)
+        # Create donation record
+        async with shared_mutation("donations_storage"):
+            donation_id = len(donations_storage) + 1
+            donation = {
+                "id": donation_id,
+                "cause_id": cause_id,
+                "cause_title": cause["title"],
+                "ngo_id": cause["ngo_ids"][0] if cause["ngo_ids"] else None,
+                "ngo_name": cause["ngo_names"][0] if cause["ngo_names"] else "Unknown NGO",
+                "amount": amount,
+                "donor_name": donor_name,
+                "donor_email": donor_email,
+                "donor_phone": donor_phone,
+                "status": "PENDING",
+                "created_at": datetime.now().isoformat() + "Z",
+                "razorpay_receipt": receipt,
+                "razorpay_order_id": razorpay_order["id"],
+                "razorpay_payment_id": None,
+                "razorpay_signature": None
+            }
+            donations_storage.append(donation)
+            donor_index.add(donation)
         
         return {
             "donation_id": donation_id,
@@ -1946,33 +2019,36 @@ async def verify_donation(
 ):
     """Verify Razorpay payment and update donation status"""
     try:
-        # Find donation by order ID
-        donation = next((d for d in donations_storage if d["razorpay_order_id"] == razorpay_order_id), None)
-        if not donation:
-            raise HTTPException(status_code=404, detail="Donation not found")
+        async with shared_mutation("donations_storage", "causes_storage"):
+            # Find donation by order ID
+            donation = next((d for d in donations_storage if d["razorpay_order_id"] == razorpay_order_id), None)
+            if not donation:
+                raise HTTPException(status_code=404, detail="Donation not found")
         
-        # Verify signature
-        body = f"{razorpay_order_id}|{razorpay_payment_id}"
-        expected_signature = hmac.new(
-            RAZORPAY_KEY_SECRET.encode(),
-            body.encode(),
-            hashlib.sha256
-        ).hexdigest()
+            # Verify signature
+            body = f"{razorpay_order_id}|{razorpay_payment_id}"
+            expected_signature = hmac.new(
+                RAZORPAY_KEY_SECRET.encode(),
+                body.encode(),
+                hashlib.sha256
+            ).hexdigest()
         
-        if expected_signature != razorpay_signature:
-            raise HTTPException(status_code=400, detail="Invalid signature")
+            if expected_signature != razorpay_signature:
+                raise HTTPException(status_code=400, detail="Invalid signature")
         
-        # Update donation
-        donation["razorpay_payment_id"] = razorpay_payment_id
-        donation["razorpay_signature"] = razorpay_signature
-        donation["status"] = "COMPLETED"
-        donation["completed_at"] = datetime.now().isoformat() + "Z"
+            # Update donation
+            donation["razorpay_payment_id"] = razorpay_payment_id
+            donation["razorpay_signature"] = razorpay_signature
+            donation["status"] = "COMPLETED"
+            donation["completed_at"] = datetime.now().isoformat() + "Z"
+            donor_index.record_completed(donation)
         
-        # Update cause amount
-        cause = next((c for c in causes_storage if c["id"] == donation["cause_id"]), None)
-        if cause:
-            cause["current_amount"] += donation["amount"]
-            cause["donation_count"] += 1
+            # Update cause amount
+            cause = cause_store.get(donation["cause_id"])
+            if cause:
+                cause["current_amount"] += donation["amount"]
+                cause["donation_count"] += 1
+                cause_changed(cause, donation["amount"])
         
         return {
             "success": True,
@@ -2005,6 +2081,8 @@ async def get_donation_receipt(donation_id: int):
     
     return {
         "receipt_id": f"RCP-{donation_id:06d}",
+        "receipt_url": f"/receipts/{donation_id}.pdf",
+        "certificate_url": f"/receipts/{donation_id}/80g.pdf",
         "donation_id": donation_id,
         "cause_title": donation["cause_title"],
         "ngo_name": donation["ngo_name"],
@@ -2017,6 +2095,124 @@ async def get_donation_receipt(donation_id: int):
         "pan_number": "NGO-PLATFORM-001"
     }
 
+def receipt_document(donation: dict, ngos_by_id: dict = None, donors_by_email: dict = None) -> dict:
+    """Everything printed on a donation's receipt and 80G certificate.
+
+    Pass ``ngos_by_id`` / ``donors_by_email`` when building many documents.
+    """
+    if ngos_by_id is None:
+        ngo = next((n for n in ngos_storage if n["id"] == donation["ngo_id"]), {})
+    else:
+        ngo = ngos_by_id.get(donation["ngo_id"], {})
+    if donors_by_email is None:
+        donor = next((d for d in donors_storage if d["email"] == donation["donor_email"]), {})
+    else:
+        donor = donors_by_email.get(donation["donor_email"], {})
+    fy = financial_year(donation["completed_at"])
+    return {
+        "donation_id": donation["id"],
+        "receipt_number": f"RCP-{donation['id']:06d}",
+        "certificate_number": f"80G/{fy}/{donation['id']:06d}",
+        "financial_year": fy,
+        # The Indian date, matching the financial year above
+        "date": indian_date(donation["completed_at"]).isoformat(),
+        "amount": donation["amount"],
+        "cause_title": donation["cause_title"],
+        "payment_id": donation.get("razorpay_payment_id"),
+        "donor_name": donation["donor_name"],
+        "donor_email": donation["donor_email"],
+        "donor_pan": donor.get("pan_number", ""),
+        "donor_address": donor.get("address", ""),
+        "ngo_name": donation["ngo_name"],
+        "ngo_pan": ngo.get("pan_number", ""),
+        "ngo_80g_registration": ngo.get("registration_80g") or ngo.get("registration_number", ""),
+        "ngo_address": ngo.get("address", "")
+    }
+
+async def serve_receipt(request: Request, donation_id: int, kind: str):
+    current_user = await get_current_user_from_request(request)
+    if not current_user: raise HTTPException(status_code=401, detail="Authentication required")
+
+    donation = next((d for d in donations_storage if d["id"] == donation_id), None)
+    if not donation:
+        raise HTTPException(status_code=404, detail="Donation not found")
+
+    allowed = (
+        current_user["role"] == "PLATFORM_ADMIN"
+        or (current_user["role"] == "NGO_ADMIN" and current_user.get("ngo_id") == donation["ngo_id"])
+        or current_user["email"] == donation["donor_email"]
+    )
+    if not allowed: raise HTTPException(status_code=403, detail="Access denied")
+
+    if donation["status"] != "COMPLETED":
+        raise HTTPException(status_code=400, detail="Donation not completed")
+
+    document = await asyncio.to_thread(receipt_service.get, kind, receipt_document(donation))
+    filename = f"80G-{donation_id:06d}.pdf" if kind == "80g" else f"RCP-{donation_id:06d}.pdf"
+    return pdf_response(request, document, filename)
+
+@app.get("/receipts/{donation_id}.pdf")
+async def get_donation_receipt_pdf(donation_id: int, request: Request):
+    """Donation receipt as a PDF"""
+    return await serve_receipt(request, donation_id, "receipt")
+
+@app.get("/receipts/{donation_id}/80g.pdf")
+async def get_donation_certificate_pdf(donation_id: int, request: Request):
+    """Section 80G tax certificate as a PDF"""
+    return await serve_receipt(request, donation_id, "80g")
+
+@app.post("/admin/receipts/pregenerate", status_code=202)
+async def pregenerate_receipts(request: Request, financial_year_label: str = Form(..., alias="financial_year"), kind: str = Form("80g")):
+    """Build every certificate (or receipt) of a financial year in the background"""
+    current_user = await get_current_user_from_request(request)
+    if not current_user: raise HTTPException(status_code=401, detail="Authentication required")
+    if current_user["role"] != "PLATFORM_ADMIN": raise HTTPException(status_code=403, detail="Access denied")
+    if kind not in ("receipt", "80g"):
+        raise HTTPException(status_code=400, detail="kind must be 'receipt' or '80g'")
+
+    # Snapshot on the loop, build the documents in a thread
+    donations = list(donations_storage)
+    ngos_by_id = {n["id"]: n for n in ngos_storage}
+    donors_by_email = {d["email"]: d for d in donors_storage}
+
+    def build_documents():
+        return [
+            receipt_document(d, ngos_by_id, donors_by_email) for d in donations
+            if d["status"] == "COMPLETED" and d.get("completed_at") and financial_year(d["completed_at"]) == financial_year_label
+        ]
+
+    documents = await asyncio.to_thread(build_documents)
+    job_id = f"{kind}-{financial_year_label}-{int(datetime.now().timestamp())}"
+    job = {"id": job_id, "kind": kind, "financial_year": financial_year_label,
+           "documents": len(documents), "status": "RUNNING"}
+    # Jobs are shared state, so every worker can report on them
+    async with shared_mutation("receipt_jobs"):
+        receipt_jobs[job_id] = dict(job)
+
+    async def run():
+        try:
+            update = await asyncio.to_thread(receipt_service.pregenerate, kind, documents)
+            update["status"] = "COMPLETED"
+        except Exception as e:
+            update = {"status": "FAILED", "error": str(e)}
+        async with shared_mutation("receipt_jobs"):
+            receipt_jobs.setdefault(job_id, job).update(update)
+
+    task = asyncio.create_task(run())
+    background_tasks.add(task)
+    task.add_done_callback(background_tasks.discard)
+    return job
+
+@app.get("/admin/receipts/jobs/{job_id}")
+async def get_receipt_job(job_id: str, request: Request):
+    """Status of a receipt pre-generation job"""
+    current_user = await get_current_user_from_request(request)
+    if not current_user: raise HTTPException(status_code=401, detail="Authentication required")
+    if current_user["role"] != "PLATFORM_ADMIN": raise HTTPException(status_code=403, detail="Access denied")
+    if job_id not in receipt_jobs:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return receipt_jobs[job_id]
+
 # NGO-Vendor Association Management Endpoints
 @app.get("/admin/ngo-vendor-associations")
 async def get_ngo_vendor_associations():
@@ -2047,42 +2243,43 @@ async def create_ngo_vendor_association(
     category_id: int = Form(...)
 ):
     """Create a new NGO-Vendor association"""
-    # Check if association already exists
-    existing = next((a for a in ngo_vendor_associations 
-                   if a["ngo_id"] == ngo_id and a["vendor_id"] == vendor_id and a["category_id"] == category_id), None)
-    
-    if existing:
-        # Get names for better error message
-        ngo = next((n for n in ngos_storage if n["id"] == ngo_id), None)
-        vendor = next((v for v in vendors_storage if v["id"] == vendor_id), None)
-        category = next((c for c in categories_storage if c["id"] == category_id), None)
+    async with shared_mutation("ngo_vendor_associations"):
+        # Check if association already exists
+        existing = next((a for a in ngo_vendor_associations 
+                       if a["ngo_id"] == ngo_id and a["vendor_id"] == vendor_id and a["category_id"] == category_id), None)
+    
+        if existing:
+            # Get names for better error message
+            ngo = next((n for n in ngos_storage if n["id"] == ngo_id), None)
+            vendor = next((v for v in vendors_storage if v["id"] == vendor_id), None)
+            category = next((c for c in categories_storage if c["id"] == category_id), None)
         
-        ngo_name = ngo["name"] if ngo else "Unknown NGO"
-        vendor_name = vendor["name"] if vendor else "Unknown Vendor"
-        category_name = category["name"] if category else "Unknown Category"
+            ngo_name = ngo["name"] if ngo else "Unknown NGO"
+            vendor_name = vendor["name"] if vendor else "Unknown Vendor"
+            category_name = category["name"] if category else "Unknown Category"
         
-        raise HTTPException(
-            status_code=400,
-            detail=f"Association already exists: {ngo_name} ↔ {vendor_name} for {category_name}"
-        )
+            raise HTTPException(
+                status_code=400,
+                detail=f"Association already exists: {ngo_name} ↔ {vendor_name} for {category_name}"
+            )
     
-    new_id = max([a["id"] for a in ngo_vendor_associations], default=0) + 1
-    new_association = {
-        "id": new_id,
-        "ngo_id": ngo_id,
-        "vendor_id": vendor_id,
-        "category_id": category_id,
-        "status": "ACTIVE",
-        "created_at": datetime.now().isoformat() + "Z"
-    }
-    ngo_vendor_associations.append(new_association)
-    return new_association
+        new_id = max([a["id"] for a in ngo_vendor_associations], default=0) + 1
+        new_association = {
+            "id": new_id,
+            "ngo_id": ngo_id,
+            "vendor_id": vendor_id,
+            "category_id": category_id,
+            "status": "ACTIVE",
+            "created_at": datetime.now().isoformat() + "Z"
+        }
+        ngo_vendor_associations.append(new_association)
+        return new_association
 
 @app.delete("/admin/ngo-vendor-associations/{association_id}")
 async def delete_ngo_vendor_association(association_id: int):
     """Delete an NGO-Vendor association"""
-    global ngo_vendor_associations
-    ngo_vendor_associations = [a for a in ngo_vendor_associations if a["id"] != association_id]
+    async with shared_mutation("ngo_vendor_associations"):
+        ngo_vendor_associations[:] = [a for a in ngo_vendor_associations if a["id"] != association_id]
     return {"message": "Association deleted successfully"}
 
 # Password reset endpoints for admin
@@ -2373,7 +2570,7 @@ async def get_vendor_details(vendor_id: int):
     enriched_invoices = []
     for invoice in vendor_invoices:
         ngo = next((n for n in ngos_storage if n["id"] == invoice["ngo_id"]), None)
-        cause = next((c for c in causes_storage if c["id"] == invoice["cause_id"]), None)
+        cause = cause_store.get(invoice["cause_id"])
         enriched_invoices.append({
             **invoice,
             "ngo_name": ngo["name"] if ngo else "Unknown NGO",
@@ -2422,7 +2619,7 @@ async def get_ngo_details(ngo_id: int):
             })
     
     # Get causes
-    ngo_causes = [c for c in causes_storage if ngo_id in c.get("ngo_ids", [])]
+    ngo_causes = [c for c in cause_store.partition("LIVE") if ngo_id in c.get("ngo_ids", [])]
     enriched_causes = []
     for cause in ngo_causes:
         category = next((c for c in categories_storage if c["id"] == cause["category_id"]), None)
@@ -2436,7 +2633,7 @@ async def get_ngo_details(ngo_id: int):
     enriched_invoices = []
     for invoice in ngo_invoices:
         vendor = next((v for v in vendors_storage if v["id"] == invoice["vendor_id"]), None)
-        cause = next((c for c in causes_storage if c["id"] == invoice["cause_id"]), None)
+        cause = cause_store.get(invoice["cause_id"])
         enriched_invoices.append({
             **invoice,
             "vendor_name": vendor["name"] if vendor else "Unknown Vendor",
@@ -2557,31 +2754,32 @@ async def create_domain(
     if not ngo:
         raise HTTPException(status_code=404, detail="NGO not found")
     
-    # Create domain entry
-    new_domain = {
-        "id": len(domains_storage) + 1,
-        "tenant_id": user_ngo_id,
-        "host": clean_host,
-        "status": "PENDING_DNS",
-        "is_primary": is_primary,
-        "created_at": datetime.now().isoformat() + "Z",
-        "ngo_slug": ngo["slug"],
-        "dns_instructions": {
-            "cname_record": {
-                "name": "www",
-                "value": "microsites.yourplatform.com",
-                "ttl": 300
-            },
-            "a_record": {
-                "name": "@",
-                "value": "192.168.1.100",
-                "ttl": 300
+    async with shared_mutation("domains_storage"):
+        # Create domain entry
+        new_domain = {
+            "id": len(domains_storage) + 1,
+            "tenant_id": user_ngo_id,
+            "host": clean_host,
+            "status": "PENDING_DNS",
+            "is_primary": is_primary,
+            "created_at": datetime.now().isoformat() + "Z",
+            "ngo_slug": ngo["slug"],
+            "dns_instructions": {
+                "cname_record": {
+                    "name": "www",
+                    "value": "microsites.yourplatform.com",
+                    "ttl": 300
+                },
+                "a_record": {
+                    "name": "@",
+                    "value": "192.168.1.100",
+                    "ttl": 300
+                }
             }
         }
-    }
     
-    # Store domain (in real implementation, this would be in database)
-    domains_storage.append(new_domain)
+        # Store domain (in real implementation, this would be in database)
+        domains_storage.append(new_domain)
     
     return {
         "id": new_domain["id"],
@@ -2635,9 +2833,12 @@ async def verify_domain(domain_id: int, request: Request):
                 is_verified = False
         
         if is_verified:
-            # Update domain status
-            domain["status"] = "LIVE"
-            domain["verified_at"] = datetime.now().isoformat() + "Z"
+            # Update domain status; look it up again, the DNS check ran
+            # without the write lock and a reload may have replaced it
+            async with shared_mutation("domains_storage"):
+                domain = next((d for d in domains_storage if d["id"] == domain_id), domain)
+                domain["status"] = "LIVE"
+                domain["verified_at"] = datetime.now().isoformat() + "Z"
             
             return {
                 "id": domain_id,
@@ -2685,17 +2886,18 @@ async def delete_domain(domain_id: int, request: Request):
     
     if current_user["role"] not in ["NGO_ADMIN", "NGO_STAFF"]:
         raise HTTPException(status_code=403, detail="Access denied")
-    
-    # Find and remove domain
-    domain_index = next((i for i, d in enumerate(domains_storage) if d["id"] == domain_id), None)
-    if domain_index is not None:
-        domains_storage.pop(domain_index)
-        return {
-            "id": domain_id,
-            "message": "Domain deleted successfully"
-        }
-    else:
-        raise HTTPException(status_code=404, detail="Domain not found")
+
+    async with shared_mutation("domains_storage"):
+        # Find and remove domain
+        domain_index = next((i for i, d in enumerate(domains_storage) if d["id"] == domain_id), None)
+        if domain_index is not None:
+            domains_storage.pop(domain_index)
+            return {
+                "id": domain_id,
+                "message": "Domain deleted successfully"
+            }
+        else:
+            raise HTTPException(status_code=404, detail="Domain not found")
 
 # Domain routing endpoint - serves microsite for custom domains
 @app.get("/domain/{host}")
@@ -2761,7 +2963,8 @@ async def get_vendor_orders(request: Request):
     
     return {
         "value": vendor_orders,
-        "Count": len(vendor_orders)
+        "Count": len(vendor_orders),
+        "status_counts": order_machine.counts("vendor_id", vendor_id)
     }
 
 @app.get("/vendor/orders/{order_id}")
@@ -2780,7 +2983,7 @@ async def get_order_details(order_id: int, request: Request):
         raise HTTPException(status_code=400, detail="Vendor ID not found")
     
     # Find the order
-    order = next((o for o in orders_storage if o["id"] == order_id), None)
+    order = order_machine.get(order_id)
     if not order:
         raise HTTPException(status_code=404, detail="Order not found")
     
@@ -2805,43 +3008,102 @@ async def update_order_status(order_id: int, request: Request, status_data: dict
     if not vendor_id:
         raise HTTPException(status_code=400, detail="Vendor ID not found")
     
-    # Find the order
-    order = next((o for o in orders_storage if o["id"] == order_id), None)
-    if not order:
-        raise HTTPException(status_code=404, detail="Order not found")
+    async with shared_mutation("orders_storage", "order_events_storage"):
+        # Find the order
+        order = order_machine.get(order_id)
+        if not order:
+            raise HTTPException(status_code=404, detail="Order not found")
     
-    # Check if vendor has access to this order
-    if order["vendor_id"] != vendor_id:
-        raise HTTPException(status_code=403, detail="Access denied")
+        # Check if vendor has access to this order
+        if order["vendor_id"] != vendor_id:
+            raise HTTPException(status_code=403, detail="Access denied")
     
-    new_status = status_data.get("status")
-    delivery_date = status_data.get("delivery_date")
-    
-    # Validate status transition
-    valid_transitions = {
-        "ORDER_RECEIVED": ["ORDER_IN_PROCESS"],
-        "ORDER_IN_PROCESS": ["ORDER_IN_TRANSIT"],
-        "ORDER_IN_TRANSIT": ["ORDER_DELIVERED"],
-        "ORDER_DELIVERED": []  # Final state
+        new_status = status_data.get("status")
+        try:
+            event = ORDER_TRANSITIONS.event_for(order["status"], new_status, current_user["role"])
+            order_machine.fire(order_id, event, current_user, status_data)
+        except TransitionError as e:
+            raise HTTPException(status_code=e.status_code, detail=str(e))
+    
+    return {
+        "id": order_id,
+        "status": new_status,
+        "updated_at": order["updated_at"],
+        "message": f"Order status updated to {new_status}"
     }
+
+@app.post("/vendor/orders/bulk-status")
+async def bulk_update_order_status(request: Request, status_data: dict):
+    """Move many orders to the same status at once; nothing changes if any order cannot"""
+    current_user = await get_current_user_from_request(request)
     
-    if new_status not in valid_transitions.get(order["status"], []):
-        raise HTTPException(status_code=400, detail=f"Invalid status transition from {order['status']} to {new_status}")
+    if not current_user:
+        raise HTTPException(status_code=401, detail="Authentication required")
     
-    # Update order
-    order["status"] = new_status
-    order["updated_at"] = datetime.now().isoformat() + "Z"
+    if current_user["role"] != "VENDOR":
+        raise HTTPException(status_code=403, detail="Access denied")
     
-    if new_status == "ORDER_IN_TRANSIT" and delivery_date:
-        order["delivery_date"] = delivery_date
-    elif new_status == "ORDER_DELIVERED":
-        order["delivered_at"] = datetime.now().isoformat() + "Z"
+    vendor_id = current_user.get("vendor_id")
+    if not vendor_id:
+        raise HTTPException(status_code=400, detail="Vendor ID not found")
+    
+    order_ids = status_data.get("order_ids")
+    new_status = status_data.get("status")
+    if not isinstance(order_ids, list) or not order_ids:
+        raise HTTPException(status_code=400, detail="order_ids must be a non-empty list")
+    
+    async with shared_mutation("orders_storage", "order_events_storage"):
+        # All orders must belong to this vendor and be in a state that leads to new_status
+        events = set()
+        for order_id in order_ids:
+            order = order_machine.get(order_id)
+            if not order:
+                raise HTTPException(status_code=404, detail=f"Order {order_id} not found")
+            if order["vendor_id"] != vendor_id:
+                raise HTTPException(status_code=403, detail="Access denied")
+            try:
+                events.add(ORDER_TRANSITIONS.event_for(order["status"], new_status, current_user["role"]))
+            except TransitionError as e:
+                raise HTTPException(status_code=e.status_code, detail=f"Order {order_id}: {e}")
+        if len(events) > 1:
+            raise HTTPException(status_code=400, detail="Orders must all be in the same status")
+    
+        try:
+            orders = order_machine.fire_many(order_ids, events.pop(), current_user, status_data)
+        except TransitionError as e:
+            raise HTTPException(status_code=e.status_code, detail=str(e))
     
     return {
-        "id": order_id,
+        "updated": len(orders),
         "status": new_status,
-        "updated_at": order["updated_at"],
-        "message": f"Order status updated to {new_status}"
+        "order_ids": [order["id"] for order in orders],
+        "status_counts": order_machine.counts("vendor_id", vendor_id),
+        "message": f"{len(orders)} orders updated to {new_status}"
+    }
+
+@app.get("/orders/{order_id}/events")
+async def get_order_events(order_id: int, request: Request):
+    """Status history of an order, oldest first"""
+    current_user = await get_current_user_from_request(request)
+    if not current_user:
+        raise HTTPException(status_code=401, detail="Authentication required")
+    
+    order = order_machine.get(order_id)
+    if not order:
+        raise HTTPException(status_code=404, detail="Order not found")
+    
+    allowed = (
+        current_user["role"] == "PLATFORM_ADMIN"
+        or (current_user["role"] == "VENDOR" and current_user.get("vendor_id") == order["vendor_id"])
+        or (current_user["role"] in ["NGO_ADMIN", "NGO_STAFF"] and current_user.get("ngo_id") == order["ngo_id"])
+    )
+    if not allowed:
+        raise HTTPException(status_code=403, detail="Access denied")
+    
+    events = order_machine.history(order_id)
+    return {
+        "value": events,
+        "Count": len(events)
     }
 
 @app.get("/vendor/associations")
@@ -2890,7 +3152,7 @@ async def get_vendor_associations(request: Request):
     cause_ids_with_orders = list(set([o["cause_id"] for o in vendor_orders]))
     
     for cause_id in cause_ids_with_orders:
-        cause = next((c for c in causes_storage if c["id"] == cause_id), None)
+        cause = cause_store.get(cause_id)
         if cause and cause["status"] == "LIVE":
             vendor_orders_for_cause = [o for o in vendor_orders if o["cause_id"] == cause_id]
             associated_causes.append({
@@ -2916,79 +3178,107 @@ async def get_vendor_associations(request: Request):
         "total_causes": len(associated_causes)
     }
 
-@app.post("/vendor/stock-status")
-async def update_stock_status(request: Request, stock_data: dict):
-    """Update stock status for a cause/category"""
+async def get_current_vendor(request: Request) -> dict:
     current_user = await get_current_user_from_request(request)
     if not current_user:
         raise HTTPException(status_code=401, detail="Authentication required")
     if current_user["role"] != "VENDOR":
         raise HTTPException(status_code=403, detail="Access denied")
-    
-    vendor_id = current_user.get("vendor_id")
-    if not vendor_id:
+    if not current_user.get("vendor_id"):
         raise HTTPException(status_code=400, detail="Vendor ID not found")
-    
+    return current_user
+
+def build_stock_status(vendor: dict, stock_data: dict) -> dict:
+    """Validate one stock update and turn it into a stock status record"""
     # Validate required fields
     required_fields = ["cause_id", "status", "available_quantity", "notes"]
     for field in required_fields:
         if field not in stock_data:
             raise HTTPException(status_code=400, detail=f"Missing required field: {field}")
+    if stock_data["status"] not in STOCK_STATUSES:
+        raise HTTPException(status_code=400, detail=f"Invalid status: {stock_data['status']}")
     
     # Find the cause
-    cause = next((c for c in causes_storage if c["id"] == stock_data["cause_id"]), None)
+    cause = cause_store.get(stock_data["cause_id"])
     if not cause:
-        raise HTTPException(status_code=404, detail="Cause not found")
+        raise HTTPException(status_code=404, detail=f"Cause not found: {stock_data['cause_id']}")
     
-    # Create stock status record
-    stock_status = {
-        "id": len(stock_status_storage) + 1,
-        "vendor_id": vendor_id,
-        "vendor_name": current_user.get("vendor_name", "Unknown Vendor"),
+    now = datetime.now().isoformat() + "Z"
+    return {
+        "vendor_id": vendor["vendor_id"],
+        "vendor_name": vendor.get("vendor_name", "Unknown Vendor"),
         "cause_id": stock_data["cause_id"],
         "cause_title": cause["title"],
         "ngo_id": cause["ngo_ids"][0] if cause["ngo_ids"] else None,
-        "ngo_name": cause["ngo_name"],
+        "ngo_name": cause.get("ngo_name"),
         "status": stock_data["status"],  # AVAILABLE, LIMITED, OUT_OF_STOCK
         "available_quantity": stock_data["available_quantity"],
         "unit": stock_data.get("unit", "units"),
         "price_per_unit": stock_data.get("price_per_unit", 0),
         "notes": stock_data["notes"],
-        "updated_at": datetime.now().isoformat() + "Z",
-        "created_at": datetime.now().isoformat() + "Z"
+        "updated_at": now,
+        "created_at": now
     }
+
+@app.post("/vendor/stock-status")
+async def update_stock_status(request: Request, stock_data: dict):
+    """Update stock status for a cause/category"""
+    vendor = await get_current_vendor(request)
+    async with shared_mutation("stock_status_storage", "stock_status_history"):
+        stock_status = stock_store.upsert(build_stock_status(vendor, stock_data))
     
-    # Remove existing status for this vendor-cause combination
-    stock_status_storage[:] = [s for s in stock_status_storage if not (s["vendor_id"] == vendor_id and s["cause_id"] == stock_data["cause_id"])]
+    return {
+        "message": "Stock status updated successfully",
+        "stock_status": stock_status
+    }
+
+@app.post("/vendor/stock-status/bulk")
+async def bulk_update_stock_status(request: Request, payload: dict):
+    """Update the stock status of many causes at once; nothing is saved if any item is invalid"""
+    vendor = await get_current_vendor(request)
+    items = payload.get("items")
+    if not isinstance(items, list) or not items:
+        raise HTTPException(status_code=400, detail="items must be a non-empty list")
     
-    # Add new status
-    stock_status_storage.append(stock_status)
+    async with shared_mutation("stock_status_storage", "stock_status_history"):
+        records = [build_stock_status(vendor, item) for item in items]
+        stock_statuses = stock_store.upsert_many(records)
     
     return {
         "message": "Stock status updated successfully",
-        "stock_status": stock_status
+        "updated": len(stock_statuses),
+        "value": stock_statuses
     }
 
 @app.get("/vendor/stock-status")
 async def get_vendor_stock_status(request: Request):
     """Get current stock status for the vendor"""
-    current_user = await get_current_user_from_request(request)
-    if not current_user:
-        raise HTTPException(status_code=401, detail="Authentication required")
-    if current_user["role"] != "VENDOR":
-        raise HTTPException(status_code=403, detail="Access denied")
-    
-    vendor_id = current_user.get("vendor_id")
-    if not vendor_id:
-        raise HTTPException(status_code=400, detail="Vendor ID not found")
-    
-    vendor_stock_status = [s for s in stock_status_storage if s["vendor_id"] == vendor_id]
+    vendor = await get_current_vendor(request)
+    vendor_stock_status = stock_store.for_vendor(vendor["vendor_id"])
     
     return {
         "value": vendor_stock_status,
         "Count": len(vendor_stock_status)
     }
 
+@app.get("/vendor/stock-status/{cause_id}/history")
+async def get_vendor_stock_status_history(cause_id: int, request: Request):
+    """Stock status changes of the vendor for one cause, newest first"""
+    vendor = await get_current_vendor(request)
+    changes = stock_store.changes(vendor["vendor_id"], cause_id)
+    
+    return {
+        "value": changes,
+        "Count": len(changes)
+    }
+
+@app.get("/public/causes/{cause_id}/availability")
+async def get_cause_availability(cause_id: int):
+    """Stock availability for a cause across all its vendors"""
+    if not cause_store.get(cause_id):
+        raise HTTPException(status_code=404, detail="Cause not found")
+    return stock_store.availability(cause_id)
+
 @app.get("/ngo/orders")
 async def get_ngo_orders(request: Request):
     """Get orders for the current NGO"""
@@ -3009,7 +3299,8 @@ async def get_ngo_orders(request: Request):
     
     return {
         "value": ngo_orders,
-        "Count": len(ngo_orders)
+        "Count": len(ngo_orders),
+        "status_counts": order_machine.counts("ngo_id", ngo_id)
     }
 
 @app.put("/ngo/orders/{order_id}/confirm")
@@ -3027,22 +3318,24 @@ async def confirm_order_delivery(order_id: int, request: Request):
     if not ngo_id:
         raise HTTPException(status_code=400, detail="NGO ID not found")
     
-    # Find the order
-    order = next((o for o in orders_storage if o["id"] == order_id), None)
-    if not order:
-        raise HTTPException(status_code=404, detail="Order not found")
+    async with shared_mutation("orders_storage", "order_events_storage"):
+        # Find the order
+        order = order_machine.get(order_id)
+        if not order:
+            raise HTTPException(status_code=404, detail="Order not found")
     
-    # Check if NGO has access to this order
-    if order["ngo_id"] != ngo_id:
-        raise HTTPException(status_code=403, detail="Access denied")
+        # Check if NGO has access to this order
+        if order["ngo_id"] != ngo_id:
+            raise HTTPException(status_code=403, detail="Access denied")
     
-    # Check if order is delivered
-    if order["status"] != "ORDER_DELIVERED":
-        raise HTTPException(status_code=400, detail="Order must be delivered before confirmation")
+        # Check if order is delivered
+        if order["status"] != "ORDER_DELIVERED":
+            raise HTTPException(status_code=400, detail="Order must be delivered before confirmation")
     
-    # Update order
-    order["ngo_confirmed_at"] = datetime.now().isoformat() + "Z"
-    order["updated_at"] = datetime.now().isoformat() + "Z"
+        try:
+            order_machine.fire(order_id, "confirm_delivery", current_user)
+        except TransitionError as e:
+            raise HTTPException(status_code=e.status_code, detail=str(e))
     
     return {
         "id": order_id,
@@ -3145,7 +3438,7 @@ async def get_donor_orders(request: Request):
                 "donor_donation_id": donor_donation["id"] if donor_donation else None,
                 "vendor_contact_email": next((v["contact_email"] for v in vendors_storage if v["id"] == order["vendor_id"]), ""),
                 "ngo_contact_email": next((n["contact_email"] for n in ngos_storage if n["id"] == order["ngo_id"]), ""),
-                "cause_description": next((c["description"] for c in causes_storage if c["id"] == order["cause_id"]), ""),
+                "cause_description": (cause_store.get(order["cause_id"]) or {}).get("description", ""),
             }
             donor_orders.append(enriched_order)
     
@@ -3181,6 +3474,8 @@ async def get_donor_tax_documents(request: Request):
             "amount": donation["amount"],
             "date": donation["date"],
             "receipt_url": f"/receipts/{donation['id']}.pdf",
+            "certificate_url": f"/receipts/{donation['id']}/80g.pdf",
+            "financial_year": financial_year(donation["date"]),
             "tax_exempt": True,
             "pan_number": donor.get("pan_number", ""),
             "donor_name": donor["name"]
@@ -3188,6 +3483,42 @@ async def get_donor_tax_documents(request: Request):
     
     return {"value": tax_documents, "Count": len(tax_documents)}
 
+@app.get("/donor/tax-statements")
+async def get_donor_tax_statements(request: Request, financial_year_label: str = Query(None, alias="financial_year")):
+    """Consolidated tax statements of the current donor, one per NGO and financial year"""
+    current_user = await get_current_user_from_request(request)
+    if not current_user: raise HTTPException(status_code=401, detail="Authentication required")
+    if current_user["role"] != "DONOR": raise HTTPException(status_code=403, detail="Access denied")
+    
+    donor_email = current_user["email"]
+    donor = next((d for d in donors_storage if d["email"] == donor_email), None)
+    if not donor: raise HTTPException(status_code=404, detail="Donor not found")
+    
+    donations = sorted(
+        (d for d in donations_storage if d["donor_email"] == donor_email and d["status"] == "COMPLETED"),
+        key=lambda d: (d["ngo_id"], d["completed_at"])
+    )
+    ngo_names = {d["ngo_id"]: d["ngo_name"] for d in donations}
+    statements = []
+    for totals in aggregate_statements(((d["ngo_id"],), d["completed_at"], d["amount"]) for d in donations):
+        if financial_year_label and totals.financial_year != financial_year_label:
+            continue
+        statements.append({
+            "ngo_id": totals.key[0],
+            "ngo_name": ngo_names[totals.key[0]],
+            "financial_year": totals.financial_year,
+            "donation_count": totals.donation_count,
+            "total_amount": float(totals.total_amount),
+            "first_donation_at": totals.first_donation_at,
+            "last_donation_at": totals.last_donation_at,
+            "donor_name": donor["name"],
+            "pan_number": donor.get("pan_number", "")
+        })
+    statements.sort(key=lambda s: s["ngo_name"])
+    statements.sort(key=lambda s: s["financial_year"], reverse=True)
+    
+    return {"value": statements, "Count": len(statements)}
+
 @app.get("/donor/tickets")
 async def get_donor_tickets(request: Request):
     """Get tickets for the current donor"""
@@ -3207,23 +3538,24 @@ async def create_donor_ticket(request: Request, ticket_data: dict):
     if not current_user: raise HTTPException(status_code=401, detail="Authentication required")
     if current_user["role"] != "DONOR": raise HTTPException(status_code=403, detail="Access denied")
     
-    new_ticket = {
-        "id": len(tickets_storage) + 1,
-        "donor_email": current_user["email"],
-        "cause_id": ticket_data.get("cause_id"),
-        "cause_title": ticket_data.get("cause_title"),
-        "ngo_name": ticket_data.get("ngo_name"),
-        "subject": ticket_data.get("subject"),
-        "description": ticket_data.get("description"),
-        "status": "OPEN",
-        "priority": ticket_data.get("priority", "MEDIUM"),
-        "created_at": datetime.now().isoformat() + "Z",
-        "updated_at": datetime.now().isoformat() + "Z",
-        "admin_response": None,
-        "resolved_at": None
-    }
+    async with shared_mutation("tickets_storage"):
+        new_ticket = {
+            "id": len(tickets_storage) + 1,
+            "donor_email": current_user["email"],
+            "cause_id": ticket_data.get("cause_id"),
+            "cause_title": ticket_data.get("cause_title"),
+            "ngo_name": ticket_data.get("ngo_name"),
+            "subject": ticket_data.get("subject"),
+            "description": ticket_data.get("description"),
+            "status": "OPEN",
+            "priority": ticket_data.get("priority", "MEDIUM"),
+            "created_at": datetime.now().isoformat() + "Z",
+            "updated_at": datetime.now().isoformat() + "Z",
+            "admin_response": None,
+            "resolved_at": None
+        }
     
-    tickets_storage.append(new_ticket)
+        tickets_storage.append(new_ticket)
     return {"id": new_ticket["id"], "message": "Ticket created successfully"}
 
 @app.get("/admin/tickets")
@@ -3242,21 +3574,28 @@ async def update_ticket(ticket_id: int, request: Request, update_data: dict):
     if not current_user: raise HTTPException(status_code=401, detail="Authentication required")
     if current_user["role"] != "PLATFORM_ADMIN": raise HTTPException(status_code=403, detail="Access denied")
     
-    ticket = next((t for t in tickets_storage if t["id"] == ticket_id), None)
-    if not ticket: raise HTTPException(status_code=404, detail="Ticket not found")
+    async with shared_mutation("tickets_storage"):
+        ticket = next((t for t in tickets_storage if t["id"] == ticket_id), None)
+        if not ticket: raise HTTPException(status_code=404, detail="Ticket not found")
     
-    ticket["status"] = update_data.get("status", ticket["status"])
-    ticket["admin_response"] = update_data.get("admin_response", ticket["admin_response"])
-    ticket["updated_at"] = datetime.now().isoformat() + "Z"
+        ticket["status"] = update_data.get("status", ticket["status"])
+        ticket["admin_response"] = update_data.get("admin_response", ticket["admin_response"])
+        ticket["updated_at"] = datetime.now().isoformat() + "Z"
     
-    if ticket["status"] == "RESOLVED":
-        ticket["resolved_at"] = datetime.now().isoformat() + "Z"
+        if ticket["status"] == "RESOLVED":
+            ticket["resolved_at"] = datetime.now().isoformat() + "Z"
     
     return {"id": ticket_id, "message": "Ticket updated successfully"}
 
+def donor_page(donor_email: str, cursor: str, limit: int, ngo_id: int = None, cause_id: int = None):
+    try:
+        return donor_index.page(donor_email, ngo_id=ngo_id, cause_id=cause_id, cursor=cursor, limit=limit)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
 @app.get("/donor/donations")
-async def get_donor_donations(request: Request):
-    """Get donation history for the current donor"""
+async def get_donor_donations(request: Request, cursor: str = None, limit: int = Query(50, ge=1, le=200)):
+    """Get donation history for the current donor, most recent first"""
     current_user = await get_current_user_from_request(request)
     if not current_user: raise HTTPException(status_code=401, detail="Authentication required")
     if current_user["role"] != "DONOR": raise HTTPException(status_code=403, detail="Access denied")
@@ -3266,11 +3605,7 @@ async def get_donor_donations(request: Request):
     donor = next((d for d in donors_storage if d["email"] == donor_email), None)
     if not donor: raise HTTPException(status_code=404, detail="Donor not found")
     
-    # Get all donations for this donor
-    donor_donations = [d for d in donations_storage if d["donor_email"] == donor_email]
-    
-    # Sort by date (most recent first)
-    donor_donations.sort(key=lambda x: x["created_at"], reverse=True)
+    donor_donations, next_cursor = donor_page(donor_email, cursor, limit)
     
     # Format donations for frontend compatibility
     formatted_donations = []
@@ -3278,8 +3613,8 @@ async def get_donor_donations(request: Request):
         formatted_donations.append({
             "id": donation["id"],
             "cause_id": donation["cause_id"],
-            "cause_title": donation["cause_title"],
-            "ngo_name": donation["ngo_name"],
+            "cause_title": donation.get("cause_title"),
+            "ngo_name": donation.get("ngo_name"),
             "amount": donation["amount"],
             "date": donation["created_at"],
             "status": donation["status"],
@@ -3291,12 +3626,13 @@ async def get_donor_donations(request: Request):
     
     return {
         "value": formatted_donations,
-        "Count": len(formatted_donations),
-        "total_amount": sum(d["amount"] for d in donor_donations)
+        "Count": donor_index.count(donor_email),
+        "total_amount": donor_index.totals(donor_email).amount,
+        "next_cursor": next_cursor
     }
 
 @app.get("/donor/donations/{ngo_slug}")
-async def get_donor_donations_by_ngo(ngo_slug: str, request: Request):
+async def get_donor_donations_by_ngo(ngo_slug: str, request: Request, cursor: str = None, limit: int = Query(50, ge=1, le=200)):
     """Get donation history for a specific NGO by the current donor"""
     current_user = await get_current_user_from_request(request)
     if not current_user: raise HTTPException(status_code=401, detail="Authentication required")
@@ -3308,50 +3644,40 @@ async def get_donor_donations_by_ngo(ngo_slug: str, request: Request):
     
     # Get donations for this NGO by this donor
     donor_email = current_user["email"]
-    ngo_donations = [
-        d for d in donations_storage 
-        if d["donor_email"] == donor_email and d["ngo_slug"] == ngo_slug
-    ]
-    
-    # Sort by date (most recent first)
-    ngo_donations.sort(key=lambda x: x["created_at"], reverse=True)
+    ngo_donations, next_cursor = donor_page(donor_email, cursor, limit, ngo_id=ngo["id"])
     
     return {
         "ngo_name": ngo["name"],
         "ngo_slug": ngo_slug,
         "donations": ngo_donations,
-        "total_donations": len(ngo_donations),
-        "total_amount": sum(d["amount"] for d in ngo_donations)
+        "total_donations": donor_index.count(donor_email, ngo_id=ngo["id"]),
+        "total_amount": donor_index.totals(donor_email, ngo_id=ngo["id"]).amount,
+        "next_cursor": next_cursor
     }
 
 @app.get("/donor/donations/cause/{cause_id}")
-async def get_donor_donations_by_cause(cause_id: int, request: Request):
+async def get_donor_donations_by_cause(cause_id: int, request: Request, cursor: str = None, limit: int = Query(50, ge=1, le=200)):
     """Get donation history for a specific cause by the current donor"""
     current_user = await get_current_user_from_request(request)
     if not current_user: raise HTTPException(status_code=401, detail="Authentication required")
     if current_user["role"] != "DONOR": raise HTTPException(status_code=403, detail="Access denied")
     
     # Find the cause
-    cause = next((c for c in causes_storage if c["id"] == cause_id), None)
+    cause = cause_store.get(cause_id)
     if not cause: raise HTTPException(status_code=404, detail="Cause not found")
     
     # Get donations for this cause by this donor
     donor_email = current_user["email"]
-    cause_donations = [
-        d for d in donations_storage 
-        if d["donor_email"] == donor_email and d["cause_id"] == cause_id
-    ]
-    
-    # Sort by date (most recent first)
-    cause_donations.sort(key=lambda x: x["created_at"], reverse=True)
+    cause_donations, next_cursor = donor_page(donor_email, cursor, limit, cause_id=cause_id)
     
     return {
         "cause_id": cause_id,
         "cause_title": cause["title"],
-        "ngo_name": cause["ngo_name"],
+        "ngo_name": cause.get("ngo_name"),
         "donations": cause_donations,
-        "total_donations": len(cause_donations),
-        "total_amount": sum(d["amount"] for d in cause_donations)
+        "total_donations": donor_index.count(donor_email, cause_id=cause_id),
+        "total_amount": donor_index.totals(donor_email, cause_id=cause_id).amount,
+        "next_cursor": next_cursor
     }
 
 # Email and Website Settings Endpoints
@@ -3380,15 +3706,16 @@ async def update_email_settings(
     if not current_user: raise HTTPException(status_code=401, detail="Authentication required")
     if current_user["role"] != "PLATFORM_ADMIN": raise HTTPException(status_code=403, detail="Access denied")
     
-    email_settings_storage.update({
-        "smtp_host": smtp_host,
-        "smtp_port": smtp_port,
-        "smtp_username": smtp_username,
-        "smtp_password": smtp_password,
-        "smtp_encryption": smtp_encryption,
-        "from_email": from_email,
-        "from_name": from_name
-    })
+    async with shared_mutation("email_settings_storage"):
+        email_settings_storage.update({
+            "smtp_host": smtp_host,
+            "smtp_port": smtp_port,
+            "smtp_username": smtp_username,
+            "smtp_password": smtp_password,
+            "smtp_encryption": smtp_encryption,
+            "from_email": from_email,
+            "from_name": from_name
+        })
     
     return {"message": "Email settings updated successfully"}
 
@@ -3420,22 +3747,23 @@ async def update_website_settings(
     if not current_user: raise HTTPException(status_code=401, detail="Authentication required")
     if current_user["role"] != "PLATFORM_ADMIN": raise HTTPException(status_code=403, detail="Access denied")
     
-    website_settings_storage.update({
-        "app_name": app_name,
-        "app_title": app_title,
-        "logo_url": logo_url,
-        "favicon_url": favicon_url,
-        "primary_color": primary_color,
-        "secondary_color": secondary_color,
-        "footer_text": footer_text,
-        "contact_email": contact_email,
-        "contact_phone": contact_phone,
-        "address": address
-    })
+    async with shared_mutation("website_settings_storage"):
+        website_settings_storage.update({
+            "app_name": app_name,
+            "app_title": app_title,
+            "logo_url": logo_url,
+            "favicon_url": favicon_url,
+            "primary_color": primary_color,
+            "secondary_color": secondary_color,
+            "footer_text": footer_text,
+            "contact_email": contact_email,
+            "contact_phone": contact_phone,
+            "address": address
+        })
     
     return {"message": "Website settings updated successfully"}
 
-@app.post("/admin/send-password-reset")
+@app.post("/admin/send-password-reset", status_code=202)
 async def send_password_reset_email(
     user_email: str = Form(...),
     request: Request = None
@@ -3454,15 +3782,12 @@ async def send_password_reset_email(
     # Generate email content
     html_content = get_password_reset_template(user_name, reset_link)
     
-    # Send email
-    success = send_email(user_email, "Password Reset Request - NGO Platform", html_content)
+    # Queue email for background delivery
+    message = queue_email(user_email, "Password Reset Request - NGO Platform", html_content)
     
-    if success:
-        return {"message": f"Password reset email sent to {user_email}"}
-    else:
-        raise HTTPException(status_code=500, detail="Failed to send email")
+    return {"message": f"Password reset email queued for {user_email}", "message_id": message.id}
 
-@app.post("/admin/send-welcome-email")
+@app.post("/admin/send-welcome-email", status_code=202)
 async def send_welcome_email(
     user_email: str = Form(...),
     user_role: str = Form(...),
@@ -3479,15 +3804,12 @@ async def send_welcome_email(
     # Generate email content
     html_content = get_welcome_template(user_name, user_role)
     
-    # Send email
-    success = send_email(user_email, "Welcome to NGO Platform!", html_content)
+    # Queue email for background delivery
+    message = queue_email(user_email, "Welcome to NGO Platform!", html_content)
     
-    if success:
-        return {"message": f"Welcome email sent to {user_email}"}
-    else:
-        raise HTTPException(status_code=500, detail="Failed to send email")
+    return {"message": f"Welcome email queued for {user_email}", "message_id": message.id}
 
-@app.post("/admin/send-donation-invoice")
+@app.post("/admin/send-donation-invoice", status_code=202)
 async def send_donation_invoice(
     donor_email: str = Form(...),
     donor_name: str = Form(...),
@@ -3505,13 +3827,81 @@ async def send_donation_invoice(
     date = datetime.now().strftime("%B %d, %Y")
     html_content = get_donation_invoice_template(donor_name, cause_title, amount, transaction_id, date)
     
-    # Send email
-    success = send_email(donor_email, f"Donation Receipt - {cause_title}", html_content)
+    # Queue email for background delivery
+    message = queue_email(donor_email, f"Donation Receipt - {cause_title}", html_content)
     
-    if success:
-        return {"message": f"Donation invoice sent to {donor_email}"}
-    else:
-        raise HTTPException(status_code=500, detail="Failed to send email")
+    return {"message": f"Donation invoice queued for {donor_email}", "message_id": message.id}
+
+@app.post("/admin/campaigns/thank-you", status_code=202)
+async def send_thank_you_campaign(
+    year: int = Form(...),
+    message: str = Form("Your generosity changed lives this year. Thank you for standing with us."),
+    request: Request = None
+):
+    """Send a personalized year-end thank-you to every donor who gave in ``year``"""
+    current_user = await get_current_user_from_request(request)
+    if not current_user: raise HTTPException(status_code=401, detail="Authentication required")
+    if current_user["role"] != "PLATFORM_ADMIN": raise HTTPException(status_code=403, detail="Access denied")
+    
+    # One pass over the year's completed donations to build per-donor totals
+    year_prefix = str(year)
+    totals = {}
+    for donation in donations_storage:
+        if donation["status"] != "COMPLETED" or not donation["created_at"].startswith(year_prefix):
+            continue
+        entry = totals.setdefault(donation["donor_email"], {
+            "to_email": donation["donor_email"],
+            "donor_name": donation["donor_name"],
+            "year": year,
+            "message": message,
+            "donation_count": 0,
+            "total_amount": 0
+        })
+        entry["donation_count"] += 1
+        entry["total_amount"] += donation["amount"]
+    
+    rendered = email_templates.render_many("donor_thank_you", email_branding(), totals.values())
+    messages = (OutboundEmail(to_email=m.to_email, subject=m.subject, html_content=m.html_content) for m in rendered)
+    # Rendering is lazy, so the queue's back-pressure paces the whole campaign
+    task = asyncio.create_task(mail_queue.enqueue_many(messages))
+    background_tasks.add(task)
+    task.add_done_callback(background_tasks.discard)
+    
+    return {"message": f"Thank-you campaign queued for {len(totals)} donors", "recipients": len(totals)}
+
+@app.get("/admin/email-queue")
+async def get_email_queue(request: Request):
+    """Get outbound email queue status and dead letters"""
+    current_user = await get_current_user_from_request(request)
+    if not current_user: raise HTTPException(status_code=401, detail="Authentication required")
+    if current_user["role"] != "PLATFORM_ADMIN": raise HTTPException(status_code=403, detail="Access denied")
+    
+    return {
+        **mail_queue.stats(),
+        "dead_letter_messages": [
+            {
+                "id": m.id,
+                "to_email": m.to_email,
+                "subject": m.subject,
+                "attempts": m.attempts,
+                "last_error": m.last_error
+            }
+            for m in mail_queue.dead_letters
+        ]
+    }
+
+@app.post("/admin/email-queue/retry-dead-letters", status_code=202)
+async def retry_dead_letter_emails(request: Request):
+    """Re-queue every dead-lettered email"""
+    current_user = await get_current_user_from_request(request)
+    if not current_user: raise HTTPException(status_code=401, detail="Authentication required")
+    if current_user["role"] != "PLATFORM_ADMIN": raise HTTPException(status_code=403, detail="Access denied")
+    
+    try:
+        count = mail_queue.retry_dead_letters()
+    except MailQueueFull:
+        raise HTTPException(status_code=503, detail="Email queue is full, please retry shortly")
+    return {"message": f"Re-queued {count} emails", "count": count}
 
 @app.post("/admin/upload-logo")
 async def upload_logo(file: UploadFile = File(...), request: Request = None):
@@ -3534,7 +3924,8 @@ async def upload_logo(file: UploadFile = File(...), request: Request = None):
     filename = f"logo_{datetime.now().strftime('%Y%m%d_%H%M%S')}.{file.filename.split('.')[-1]}"
     
     # Update website settings with the new logo path
-    website_settings_storage["logo_url"] = f"/uploads/{filename}"
+    async with shared_mutation("website_settings_storage"):
+        website_settings_storage["logo_url"] = f"/uploads/{filename}"
     
     return {
         "message": "Logo uploaded successfully",
@@ -3563,7 +3954,8 @@ async def upload_favicon(file: UploadFile = File(...), request: Request = None):
     filename = f"favicon_{datetime.now().strftime('%Y%m%d_%H%M%S')}.{file.filename.split('.')[-1]}"
     
     # Update website settings with the new favicon path
-    website_settings_storage["favicon_url"] = f"/uploads/{filename}"
+    async with shared_mutation("website_settings_storage"):
+        website_settings_storage["favicon_url"] = f"/uploads/{filename}"
     
     return {
         "message": "Favicon uploaded successfully",
@@ -3571,6 +3963,89 @@ async def upload_favicon(file: UploadFile = File(...), request: Request = None):
         "url": f"/uploads/{filename}"
     }
 
+# Multi-worker mode: share the in-memory storage between workers through SQLite
+SHARED_STATE_PATH = os.getenv("SHARED_STATE_PATH", "")
+SHARED_COLLECTIONS = [
+    "categories_storage", "ngos_storage", "donors_storage", "vendors_storage",
+    "causes_storage", "domains_storage", "orders_storage", "order_events_storage",
+    "ngo_vendor_associations", "invoices_storage", "donations_storage",
+    "stock_status_storage", "stock_status_history", "email_settings_storage",
+    "website_settings_storage", "tickets_storage", "receipt_jobs"
+]
+shared_state = None
+
+def rebuild_derived_state():
+    """Rebuild every index, cache and feed derived from the storage collections"""
+    donor_index.rebuild(donations_storage)
+    cause_store.reindex()
+    stock_store.reindex()
+    order_machine.reindex()
+    catalogue_cache.clear()
+    reindex_search()
+    rebuild_feeds()
+
+if SHARED_STATE_PATH:
+    shared_state = SharedStateStore(SHARED_STATE_PATH, globals(), SHARED_COLLECTIONS)
+    shared_state.bootstrap()
+
+    # Derived indexes follow reloads of the collections they are built from
+    shared_state.subscribe("donations_storage", lambda name: donor_index.rebuild(donations_storage))
+    shared_state.subscribe("causes_storage", lambda name: cause_store.reindex())
+    shared_state.subscribe("categories_storage", lambda name: catalogue_cache.invalidate("categories"))
+    shared_state.subscribe("ngos_storage", lambda name: catalogue_cache.invalidate("ngos", "causes"))
+    shared_state.subscribe("causes_storage", lambda name: catalogue_cache.invalidate("causes"))
+    for name in ("causes_storage", "ngos_storage", "categories_storage"):
+        shared_state.subscribe(name, lambda name: reindex_search())
+    if not REDIS_URL:
+        for name in ("causes_storage", "donations_storage"):
+            shared_state.subscribe(name, lambda name: rebuild_feeds())
+    # Donations taken by other workers reach this worker's live streams
+    shared_state.subscribe("causes_storage", lambda name: [publish_progress(c) for c in cause_store.partition("LIVE")])
+    shared_state.subscribe("stock_status_storage", lambda name: stock_store.reindex())
+    shared_state.subscribe("orders_storage", lambda name: order_machine.reindex())
+    shared_state.subscribe("order_events_storage", lambda name: order_machine.reindex())
+    rebuild_derived_state()
+
+    @app.on_event("startup")
+    async def start_shared_state_poller():
+        """Keep live streams current on workers that are only serving SSE"""
+        async def poll():
+            while True:
+                await asyncio.sleep(1.0)
+                if progress_hub.subscriber_count():
+                    await shared_state.refresh()
+        task = asyncio.create_task(poll())
+        background_tasks.add(task)
+        task.add_done_callback(background_tasks.discard)
+
+    @app.middleware("http")
+    async def shared_state_middleware(request: Request, call_next):
+        """Pick up other workers' writes before serving; handlers publish their own through shared_mutation"""
+        await shared_state.refresh()
+        return await call_next(request)
+
+# Event loop watchdog: logs the stack and route of anything that blocks the
+# loop for LOOP_BLOCK_MS or more (0 = off). Added last, so it is outermost
+loop_monitor = LoopMonitor(int(os.getenv("LOOP_BLOCK_MS", "100")))
+app.add_middleware(LoopMonitorMiddleware)
+
+@app.on_event("startup")
+async def start_loop_monitor():
+    loop_monitor.start()
+
+@app.on_event("shutdown")
+async def stop_loop_monitor():
+    loop_monitor.stop()
+
 if __name__ == "__main__":
     import uvicorn
-    uvicorn.run(app, host=BACKEND_HOST, port=BACKEND_PORT)
+    workers = int(os.getenv("BACKEND_WORKERS", "1"))
+    if workers > 1:
+        # Every worker imports this module; point them all at one state file for this launch
+        os.environ.setdefault(
+            "SHARED_STATE_PATH",
+            os.path.join(tempfile.gettempdir(), f"ngo_simple_backend_{os.getpid()}.db")
+        )
+        uvicorn.run("simple_backend:app", host=BACKEND_HOST, port=BACKEND_PORT, workers=workers)
+    else:
+        uvicorn.run(app, host=BACKEND_HOST, port=BACKEND_PORT)
@@ -67,6 +67,14 @@ export interface Cause {
   donation_count?: number
 }
 
+export interface CauseProgress {
+  cause_id: number
+  raised_amount: number
+  target_amount: number
+  donation_count: number
+  progress: number
+}
+
 export interface DonationInitRequest {
   cause_id: number
   amount: number
@@ -188,6 +196,13 @@ class ApiClient {
     this.client.interceptors.response.use(
       (response) => response,
       async (error) => {
+        const original = error.config
+        if (error.response?.status === 401 && original && !original._retried && !original.url?.startsWith('/auth/')) {
+          original._retried = true
+          if (await this.refreshTokens()) {
+            return this.client(original)
+          }
+        }
         if (error.response?.status === 401) {
           localStorage.removeItem('access_token')
           localStorage.removeItem('refresh_token')
@@ -198,6 +213,27 @@ class ApiClient {
     )
   }
 
+  // Refresh tokens are single use, so concurrent 401s share one refresh
+  private refreshing: Promise<boolean> | null = null
+
+  private refreshTokens(): Promise<boolean> {
+    const refreshToken = localStorage.getItem('refresh_token')
+    if (!refreshToken) return Promise.resolve(false)
+    if (!this.refreshing) {
+      this.refreshing = this.client.post<LoginResponse>('/auth/refresh', { refresh_token: refreshToken })
+        .then((response) => {
+          localStorage.setItem('access_token', response.data.access_token)
+          localStorage.setItem('refresh_token', response.data.refresh_token)
+          return true
+        })
+        .catch(() => false)
+        .finally(() => {
+          this.refreshing = null
+        })
+    }
+    return this.refreshing
+  }
+
   // Auth endpoints
   async login(credentials: LoginRequest): Promise<LoginResponse> {
     const formData = new FormData()
@@ -212,6 +248,13 @@ class ApiClient {
     return response.data
   }
 
+  async logout(): Promise<void> {
+    // Read the token now: the caller clears storage before the request is sent
+    const token = localStorage.getItem('access_token')
+    if (!token) return
+    await this.client.post('/auth/logout', null, { headers: { Authorization: `Bearer ${token}` } })
+  }
+
   async getCurrentUser(): Promise<User> {
     const response: AxiosResponse<User> = await this.client.get('/auth/me')
     return response.data
@@ -233,6 +276,20 @@ class ApiClient {
     return response.data || []
   }
 
+  async getFeed(feed: 'trending' | 'nearly_funded' | 'newest' | 'most_donors', params?: { category_id?: number; limit?: number }): Promise<Cause[]> {
+    const response = await this.client.get(`/public/feeds/${feed}`, { params })
+    return response.data?.value || []
+  }
+
+  // Live progress of a cause over server-sent events; returns a function that closes the stream
+  streamCauseProgress(causeId: number, onUpdate: (progress: CauseProgress) => void): () => void {
+    const source = new EventSource(`${this.baseURL}/public/causes/${causeId}/stream`)
+    source.addEventListener('progress', (event) => {
+      onUpdate(JSON.parse((event as MessageEvent).data))
+    })
+    return () => source.close()
+  }
+
   async getAdminCauses(): Promise<Cause[]> {
     const response = await this.client.get('/admin/causes')
     return response.data || []
@@ -60,6 +60,8 @@ export const AuthProvider: React.FC<AuthProviderProps> = ({ children }) => {
   }
 
   const logout = () => {
+    // Revoke the session server-side; local sign-out does not wait for it
+    apiClient.logout().catch(() => {})
     localStorage.removeItem('access_token')
     localStorage.removeItem('refresh_token')
     setUser(null)
@@ -78,6 +78,18 @@ const CauseDetail: React.FC = () => {
     enabled: !!id,
   })
 
+  // Keep the raised amount live while the page is open
+  useEffect(() => {
+    if (!id || cause?.status !== 'LIVE') return
+    return apiClient.streamCauseProgress(parseInt(id), (progress) => {
+      queryClient.setQueryData(['cause', id], (current: any) => current && {
+        ...current,
+        current_amount: progress.raised_amount,
+        donation_count: progress.donation_count,
+      })
+    })
+  }, [id, cause?.status, queryClient])
+
   // Fetch donor's donation history for this cause (only if user is a donor)
   const { data: donationHistory, isLoading: historyLoading } = useQuery({
     queryKey: ['donation-history', id, user?.email],
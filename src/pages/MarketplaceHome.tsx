@@ -98,13 +98,23 @@ const MarketplaceHome: React.FC = () => {
     }),
   })
 
-  const filteredCauses = (Array.isArray(causes) ? causes : []).filter(cause => {
-    if (!searchTerm) return true
-    return cause.title.toLowerCase().includes(searchTerm.toLowerCase()) ||
-           cause.description.toLowerCase().includes(searchTerm.toLowerCase())
+  // Featured causes come ranked from the server
+  const { data: trendingCauses = [], isLoading: trendingLoading } = useQuery({
+    queryKey: ['feeds', 'trending', selectedCategory],
+    queryFn: () => apiClient.getFeed('trending', {
+      limit: 6,
+      ...(selectedCategory && { category_id: selectedCategory })
+    }),
   })
 
-  const isLoading = categoriesLoading || ngosLoading || causesLoading
+  const filteredCauses = searchTerm
+    ? (Array.isArray(causes) ? causes : []).filter(cause =>
+        cause.title.toLowerCase().includes(searchTerm.toLowerCase()) ||
+        cause.description.toLowerCase().includes(searchTerm.toLowerCase())
+      )
+    : trendingCauses
+
+  const isLoading = categoriesLoading || ngosLoading || causesLoading || trendingLoading
 
   if (isLoading) {
     return (
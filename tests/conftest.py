@@ -0,0 +1,92 @@
+import copy
+from contextlib import contextmanager
+from types import SimpleNamespace
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine, event
+from sqlalchemy.engine import Engine
+from sqlalchemy.orm import sessionmaker
+
+from app.core.database import Base, get_db
+from app.core.query_stats import QueryStats
+from app.core.tokens import TokenRevocations
+
+
+@pytest.fixture
+def query_budget():
+    """``with query_budget(n):`` fails the test when the block runs more than n SQL statements.
+
+    Counts statements on every engine, in every thread, so it covers
+    requests made through TestClient against test databases too.
+    """
+    @contextmanager
+    def budget(limit: int):
+        stats = QueryStats(statements=[])
+
+        def count(conn, cursor, statement, parameters, context, executemany):
+            stats.record(statement, 0.0)
+
+        event.listen(Engine, "after_cursor_execute", count)
+        try:
+            yield stats
+        finally:
+            event.remove(Engine, "after_cursor_execute", count)
+        assert stats.count <= limit, (
+            f"{stats.count} SQL statements, budget {limit}:\n" + "\n".join(stats.statements)
+        )
+
+    return budget
+
+
+@pytest.fixture
+def sqlite_api(tmp_path, monkeypatch):
+    """A bare FastAPI app whose ``get_db`` sessions use a fresh SQLite database.
+
+    Exposes ``engine``, ``Session`` (the sessionmaker), ``app`` and
+    ``client``. Token revocations start empty, so tokens minted in the
+    test are accepted.
+    """
+    from app import deps
+
+    engine = create_engine(f"sqlite:///{tmp_path / 'api.db'}")
+    Base.metadata.create_all(engine)
+    Session = sessionmaker(bind=engine)
+
+    def override_db():
+        session = Session()
+        try:
+            yield session
+        finally:
+            session.close()
+
+    monkeypatch.setattr(deps, "token_revocations", TokenRevocations())
+    app = FastAPI()
+    app.dependency_overrides[get_db] = override_db
+    yield SimpleNamespace(engine=engine, Session=Session, app=app, client=TestClient(app))
+    engine.dispose()
+
+
+@pytest.fixture
+def simple_backend():
+    """The in-memory ``simple_backend`` module, with its storage put back after the test.
+
+    Endpoint tests share one module-level app; restoring the collections
+    and rebuilding what is derived from them keeps a test's writes out of
+    the tests that follow.
+    """
+    import simple_backend as backend
+
+    saved = {name: copy.deepcopy(getattr(backend, name)) for name in backend.SHARED_COLLECTIONS}
+    yield backend
+    for name, value in saved.items():
+        # In place: indexes and handlers hold references to these objects
+        current = getattr(backend, name)
+        if isinstance(current, list):
+            current[:] = value
+        else:
+            current.clear()
+            current.update(value)
+    backend.published_progress.clear()
+    backend.rebuild_derived_state()
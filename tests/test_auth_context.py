@@ -0,0 +1,90 @@
+from fastapi import Depends
+from sqlalchemy import event, update
+
+from app.core.security import create_access_token
+from app.core.tokens import TokenClaims, TokenRevocations, access_claims
+from app.deps import AuthContext
+from app.models import MembershipRole, Tenant, User, Vendor
+
+
+def test_auth_context_is_shared_and_vendor_looked_up_once(sqlite_api):
+    """Every dependency of a request sees one context; the vendor costs one query"""
+    from app import deps
+
+    with sqlite_api.Session() as session:
+        session.add(Tenant(id=3, name="Vendor Co", slug="vendor-co"))
+        session.add(Vendor(id=9, tenant_id=3, name="Vendor Co"))
+        session.commit()
+
+    statements = []
+    event.listen(sqlite_api.engine, "before_cursor_execute", lambda *args: statements.append(args[2]))
+    app = sqlite_api.app
+
+    def vendor_guard(auth: AuthContext = Depends(deps.get_auth_context)):
+        assert auth.vendor_id == 9
+        return auth
+
+    @app.get("/vendor/me")
+    def me(guarded: AuthContext = Depends(vendor_guard), auth: AuthContext = Depends(deps.get_auth_context)):
+        return {"same": guarded is auth, "vendor_id": auth.vendor_id, "roles": sorted(auth.roles)}
+
+    token = create_access_token(access_claims(5, 0, [(3, MembershipRole.VENDOR)]))
+    response = sqlite_api.client.get("/vendor/me", headers={"Authorization": f"Bearer {token}"})
+
+    assert response.json() == {"same": True, "vendor_id": 9, "roles": ["VENDOR"]}
+    assert len(statements) == 1
+
+
+def test_vendor_lookup_tolerates_several_vendors_per_tenant(sqlite_api):
+    """A tenant may run several vendors; the vendor user still resolves to one of them"""
+    with sqlite_api.Session() as session:
+        session.add(Tenant(id=3, name="Vendor Co", slug="vendor-co"))
+        session.add_all([Vendor(id=9, tenant_id=3, name="Books Co"), Vendor(id=10, tenant_id=3, name="Meals Co")])
+        session.commit()
+
+        claims = TokenClaims.from_payload(access_claims(5, 0, [(3, MembershipRole.VENDOR)]))
+        assert AuthContext(claims, session).vendor_id in (9, 10)
+
+
+def test_auth_context_answers_from_claims():
+    """Roles and tenant checks need no database"""
+    claims = TokenClaims.from_payload(access_claims(5, 0, [(3, MembershipRole.NGO_ADMIN), (4, "DONOR")]))
+    auth = AuthContext(claims, db=None)
+
+    assert auth.tenant_ids == {3, 4}
+    assert auth.has_role(MembershipRole.NGO_ADMIN, tenant_id=3)
+    assert not auth.has_role(MembershipRole.NGO_ADMIN, tenant_id=4)
+    assert auth.membership().tenant_id == 3
+    assert auth.vendor_id is None
+
+
+def test_deactivated_users_lose_access(sqlite_api, monkeypatch):
+    """Tokens of a user deactivated by direct SQL stop working at the next reload"""
+    from app import deps
+    from app.routers import vendors
+
+    with sqlite_api.Session() as session:
+        session.add(Tenant(id=3, name="Helping Hands", slug="helping-hands"))
+        session.add(User(id=5, email="admin@example.org", hashed_password="x"))
+        session.commit()
+
+    monkeypatch.setattr(deps, "SessionLocal", sqlite_api.Session)
+    monkeypatch.setattr(deps, "token_revocations", TokenRevocations(
+        deps._load_token_versions, ttl=0, inactive_loader=deps._load_inactive_users
+    ))
+    sqlite_api.app.include_router(vendors.router)
+
+    def create_vendor(name, version=0):
+        token = create_access_token(access_claims(5, version, [(3, MembershipRole.NGO_ADMIN)]))
+        return sqlite_api.client.post("/vendors?tenant_id=3", json={"name": name}, headers={"Authorization": f"Bearer {token}"})
+
+    assert create_vendor("Rice Traders").status_code == 200
+
+    # Behind the ORM's back, as a script or another service would
+    with sqlite_api.engine.begin() as conn:
+        conn.execute(update(User).where(User.id == 5).values(is_active=False))
+    assert create_vendor("Grain Co").status_code == 401
+
+    with sqlite_api.engine.begin() as conn:
+        conn.execute(update(User).where(User.id == 5).values(is_active=True))
+    assert create_vendor("Grain Co").status_code == 200
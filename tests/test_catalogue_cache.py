@@ -0,0 +1,127 @@
+from app.services.catalogue_cache import CatalogueCache, etag_matches
+
+
+def test_bodies_are_built_once_per_generation():
+    """A view is serialized once, then again only after an invalidation"""
+    cache = CatalogueCache()
+    builds = []
+
+    def build():
+        builds.append(1)
+        return b'{"value":[]}'
+
+    first = cache.get("causes", None, build)
+    assert cache.get("causes", None, build) is first
+    cache.get("causes", "ngo-a", build)
+    assert len(builds) == 2
+
+    cache.invalidate("causes")
+    assert cache.get("causes", None, build).etag == first.etag
+    assert len(builds) == 3
+
+
+def test_body_built_across_an_invalidation_is_not_kept():
+    """A write landing while a body is being built leaves no stale entry behind"""
+    cache = CatalogueCache()
+
+    def racing_build():
+        cache.invalidate("ngos")
+        return b"old"
+
+    assert cache.get("ngos", None, racing_build).body == b"old"
+    assert cache.get("ngos", None, lambda: b"new").body == b"new"
+
+
+def test_if_none_match_comparison():
+    """Lists, wildcards and weak prefixes follow the If-None-Match rules"""
+    assert etag_matches('"a", W/"b"', '"b"')
+    assert etag_matches("*", '"b"')
+    assert not etag_matches('"a"', '"b"')
+    assert not etag_matches(None, '"b"')
+
+
+def test_public_endpoints_revalidate_and_follow_writes(simple_backend):
+    """Listings answer 304 until a write changes them; tenants get their own variant"""
+    from fastapi.testclient import TestClient
+
+    client = TestClient(simple_backend.app)
+    response = client.get("/public/categories")
+    etag = response.headers["etag"]
+    assert response.headers["cache-control"].startswith("public, max-age=")
+
+    not_modified = client.get("/public/categories", headers={"If-None-Match": etag})
+    assert not_modified.status_code == 304
+    assert not_modified.content == b""
+
+    client.post("/admin/categories", data={"name": "Sanitation", "description": "Clean water and toilets"})
+    changed = client.get("/public/categories", headers={"If-None-Match": etag})
+    assert changed.status_code == 200
+    assert changed.json()["value"][-1]["name"] == "Sanitation"
+
+    ngo = simple_backend.ngos_storage[0]
+    tenant_causes = client.get("/public/causes", params={"tenant": ngo["slug"]}).json()["value"]
+    assert tenant_causes
+    assert all(ngo["id"] in cause["ngo_ids"] for cause in tenant_causes)
+
+
+def test_sql_commits_invalidate_the_router_cache(tmp_path):
+    """Committed writes to catalogue tables drop the cached listings"""
+    from sqlalchemy import create_engine
+    from sqlalchemy.orm import sessionmaker
+    from app.core.database import Base
+    from app.models import Category
+    from app.routers.public import catalogue_cache
+
+    engine = create_engine(f"sqlite:///{tmp_path / 'catalogue.db'}")
+    Base.metadata.create_all(engine)
+    db = sessionmaker(bind=engine)()
+    catalogue_cache.get("categories", None, lambda: b"[]")
+
+    db.add(Category(name="Health"))
+    db.flush()
+    db.rollback()
+    assert catalogue_cache.get("categories", None, lambda: b"rebuilt").body == b"[]"
+
+    db.add(Category(name="Health"))
+    db.commit()
+    assert catalogue_cache.get("categories", None, lambda: b"rebuilt").body == b"rebuilt"
+
+
+def test_bodies_expire_after_the_ttl(monkeypatch):
+    """A write the cache never heard of shows up once the body expires"""
+    from app.services import catalogue_cache
+
+    now = [1000.0]
+    monkeypatch.setattr(catalogue_cache.time, "monotonic", lambda: now[0])
+    cache = CatalogueCache(max_age=60, ttl=30)
+    cache.get("ngos", None, lambda: b"old")
+
+    now[0] += 29
+    assert cache.get("ngos", None, lambda: b"new").body == b"old"
+    now[0] += 2
+    assert cache.get("ngos", None, lambda: b"new").body == b"new"
+
+
+def test_bulk_updates_invalidate_the_router_cache(tmp_path):
+    """Core and bulk UPDATEs through a session drop the listings they touch on commit"""
+    from sqlalchemy import create_engine, update
+    from sqlalchemy.orm import sessionmaker
+    from app.core.database import Base
+    from app.models import Cause, Category
+    from app.routers.public import catalogue_cache
+
+    engine = create_engine(f"sqlite:///{tmp_path / 'bulk.db'}")
+    Base.metadata.create_all(engine)
+    db = sessionmaker(bind=engine)()
+    catalogue_cache.clear()
+    catalogue_cache.get("categories", None, lambda: b"[]")
+    catalogue_cache.get("causes", None, lambda: b"[]")
+
+    db.execute(update(Cause).values(title="Renamed"))
+    db.commit()
+    assert catalogue_cache.get("categories", None, lambda: b"rebuilt").body == b"[]"
+    assert catalogue_cache.get("causes", None, lambda: b"rebuilt").body == b"rebuilt"
+
+    db.query(Category).update({"name": "Renamed"})
+    db.commit()
+    assert catalogue_cache.get("categories", None, lambda: b"rebuilt").body == b"rebuilt"
@@ -0,0 +1,63 @@
+from app.services.cause_store import CauseStore
+
+
+def make_store():
+    return CauseStore([
+        {"id": 1, "title": "Meals", "status": "LIVE"},
+        {"id": 4, "title": "Books", "status": "PENDING_APPROVAL"},
+    ])
+
+
+def test_ids_are_allocated_after_the_highest_existing_id():
+    """New causes get the next id without scanning"""
+    store = make_store()
+
+    first = store.add({"title": "Water", "status": "PENDING_APPROVAL"})
+    second = store.add({"title": "Shelter", "status": "PENDING_APPROVAL"})
+
+    assert (first["id"], second["id"]) == (5, 6)
+    assert [c["id"] for c in store.partition("PENDING_APPROVAL")] == [4, 5, 6]
+
+
+def test_transitions_move_causes_between_partitions():
+    """Approve and reject move a cause between partitions in place"""
+    store = make_store()
+    store.add({"title": "Water", "status": "PENDING_APPROVAL"})
+
+    approved = store.transition(4, "LIVE", approved_at="2024-01-15T00:00:00Z")
+    store.transition(5, "REJECTED")
+
+    assert approved is store.get(4, status="LIVE")
+    assert [c["id"] for c in store.partition("LIVE")] == [1, 4]
+    assert store.count("PENDING_APPROVAL") == 0
+    assert store.get(5, status="LIVE") is None
+    assert [c["id"] for c in store.records] == [1, 4, 5]
+
+
+def test_reindex_follows_reloaded_records():
+    """Reloading the records list (e.g. from another worker) rebuilds the index"""
+    store = make_store()
+    store.records[:] = [{"id": 9, "title": "Trees", "status": "LIVE"}]
+    store.reindex()
+
+    assert store.get(1) is None
+    assert store.partition("LIVE")[0]["id"] == 9
+    assert store.allocate_id() == 10
+
+
+def test_admin_approval_flow(simple_backend):
+    """Created causes wait in the pending view until approved into the public one"""
+    from fastapi.testclient import TestClient
+
+    client = TestClient(simple_backend.app)
+    created = client.post("/admin/causes", data={
+        "title": "Solar Lamps", "description": "Lamps", "target_amount": 5000, "category_id": 1, "ngo_ids": "1"
+    }).json()
+
+    pending_ids = [c["id"] for c in client.get("/admin/pending-causes").json()["value"]]
+    assert created["id"] in pending_ids
+
+    assert client.post(f"/admin/causes/{created['id']}/approve").json()["status"] == "LIVE"
+    live_ids = [c["id"] for c in client.get("/public/causes").json()["value"]]
+    assert created["id"] in live_ids
+    assert created["id"] not in [c["id"] for c in client.get("/admin/pending-causes").json()["value"]]
@@ -0,0 +1,99 @@
+from decimal import Decimal
+
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from app.core.database import Base
+from app.models import Category, Cause, CauseStatus, CauseType, Donation, DonationStatus, Tenant, User
+from app.services.donation_capture import DonationCapture
+
+
+def make_db(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'capture.db'}")
+    Base.metadata.create_all(engine)
+    db = sessionmaker(bind=engine)()
+    return db, seed(db)
+
+
+def seed(db):
+    tenant, category = Tenant(name="Hope Trust", slug="hope"), Category(name="Education")
+    donor = User(email="donor@example.com", first_name="Dev", hashed_password="x")
+    db.add_all([tenant, category, donor])
+    db.flush()
+    cause = Cause(
+        tenant_id=tenant.id, category_id=category.id, title="Books", goal_amount=1000,
+        raised_amount=0, type=CauseType.NGO_MANAGED, status=CauseStatus.LIVE
+    )
+    db.add(cause)
+    db.flush()
+    for order_id, amount in (("order_1", 600), ("order_2", 400)):
+        db.add(Donation(cause_id=cause.id, donor_user_id=donor.id, amount=amount, pg_order_id=order_id))
+    db.commit()
+    return cause.id
+
+
+def test_capture_credits_cause_once(tmp_path):
+    """A replayed capture of the same order changes nothing"""
+    db, cause_id = make_db(tmp_path)
+    capture = DonationCapture()
+
+    captured = capture.capture(db, "order_1", payment_id="pay_1", audit={"event": "payment.captured"})
+    replayed = capture.capture(db, "order_1", payment_id="pay_1")
+
+    assert (captured.cause_id, captured.amount, captured.raised_amount) == (cause_id, Decimal("600"), Decimal("600"))
+    assert not captured.funded and replayed is None
+    donation = db.query(Donation).filter(Donation.pg_order_id == "order_1").one()
+    assert (donation.status, donation.pg_payment_id) == (DonationStatus.CAPTURED, "pay_1")
+    assert db.get(Cause, cause_id).raised_amount == Decimal("600")
+
+
+def test_reaching_the_goal_marks_cause_funded(tmp_path):
+    """The capture that reaches the goal moves the cause to FUNDED"""
+    db, cause_id = make_db(tmp_path)
+    capture = DonationCapture()
+    capture.capture(db, "order_1")
+
+    captured = capture.capture(db, "order_2")
+
+    assert captured.funded and captured.raised_amount == Decimal("1000")
+    assert db.get(Cause, cause_id).status == CauseStatus.FUNDED
+    assert capture.capture(db, "missing") is None
+
+
+def test_capture_refreshes_the_public_cause_listing(sqlite_api):
+    """Cached /public/causes bodies are dropped when a capture commits"""
+    from app.routers import public
+
+    sqlite_api.app.include_router(public.router, prefix="/public")
+    public.catalogue_cache.clear()
+    db = sqlite_api.Session()
+    cause_id = seed(db)
+
+    before = sqlite_api.client.get("/public/causes").json()
+    DonationCapture().capture(db, "order_1")
+    DonationCapture().capture(db, "order_2")
+
+    assert [(c["id"], c["raised_amount"], c["status"]) for c in before] == [(cause_id, "0.00", "LIVE")]
+    assert sqlite_api.client.get("/public/causes").json() == []
+    funded = sqlite_api.client.get("/public/causes", params={"status": "FUNDED"}).json()
+    assert [(c["raised_amount"], c["status"]) for c in funded] == [("1000.00", "FUNDED")]
+
+
+def test_v1_webhook_captures_and_publishes_progress(sqlite_api, monkeypatch):
+    """The /api/v1 webhook reads its body, captures the order and pushes progress"""
+    from app.api.v1.endpoints import donations
+    from app.services.payment import PaymentService
+
+    published = []
+    monkeypatch.setattr(PaymentService, "publish_progress", staticmethod(lambda captured, db: published.append(captured)))
+    sqlite_api.app.include_router(donations.router, prefix="/api/v1")
+    with sqlite_api.Session() as db:
+        cause_id = seed(db)
+
+    event = {"event": "payment.captured", "payload": {"payment": {"id": "pay_1", "order_id": "order_1"}}}
+    response = sqlite_api.client.post("/api/v1/donations/webhook", json=event)
+
+    assert response.json() == {"status": "success"}
+    assert [(c.cause_id, c.raised_amount) for c in published] == [(cause_id, Decimal("600"))]
+    with sqlite_api.Session() as db:
+        assert db.query(Donation).filter(Donation.pg_order_id == "order_1").one().status == DonationStatus.CAPTURED
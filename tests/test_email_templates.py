@@ -0,0 +1,43 @@
+from app.services import email_templates
+
+
+def test_render_escapes_recipient_fields():
+    """Per-recipient values are HTML-escaped, branding is baked in"""
+    subject, html = email_templates.render(
+        "donation_invoice", {"app_name": "Hope Trust"},
+        donor_name="<script>", cause_title="Meals", amount=1234.5, transaction_id="T1", date="Jan 1"
+    )
+
+    assert subject == "Donation Receipt - Meals"
+    assert "&lt;script&gt;" in html
+    assert "<script>" not in html
+    assert "₹1,234.50" in html
+    assert "© 2024 Hope Trust" in html
+
+
+def test_compiled_templates_are_cached_per_branding():
+    """Same branding reuses the compiled template, new branding compiles again"""
+    email_templates.clear_cache()
+    first = email_templates.get_template("welcome", {"primary_color": "#111111"})
+    again = email_templates.get_template("welcome", {"primary_color": "#111111"})
+    other = email_templates.get_template("welcome", {"primary_color": "#222222"})
+
+    assert first is again
+    assert other is not first
+    assert "#222222" in other.html
+
+
+def test_render_many_streams_personalized_messages():
+    """Bulk rendering yields one personalized message per recipient"""
+    recipients = (
+        {"to_email": f"donor{i}@example.com", "donor_name": f"Donor {i}", "year": 2024,
+         "message": "Thank you", "donation_count": i, "total_amount": i * 100}
+        for i in range(1, 4)
+    )
+
+    messages = list(email_templates.render_many("donor_thank_you", {}, recipients))
+
+    assert [m.to_email for m in messages] == ["donor1@example.com", "donor2@example.com", "donor3@example.com"]
+    assert "Donor 2" in messages[1].html_content
+    assert "₹300.00" in messages[2].html_content
+    assert messages[0].subject == "Thank you for your support in 2024 - NGO Platform"
@@ -0,0 +1,63 @@
+import asyncio
+import json
+import logging
+import time
+
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from starlette.middleware.base import BaseHTTPMiddleware
+
+from app.core.loop_monitor import LoopMonitor, LoopMonitorMiddleware
+from app.core.metrics import MetricsRegistry
+
+
+def test_blocking_endpoint_is_logged_with_stack_and_route(caplog):
+    """A sync call inside an async handler is caught mid-stall, even behind a task-spawning middleware"""
+    registry = MetricsRegistry()
+    lag = registry.histogram("lag_seconds", "Lag")
+    blocked = registry.histogram("blocked_seconds", "Blocked", ("route",))
+    monitor = LoopMonitor(threshold_ms=50, interval=0.01, lag=lag, blocked=blocked)
+    app = FastAPI(on_startup=[monitor.start], on_shutdown=[monitor.stop])
+
+    @app.get("/reports/{report_id}")
+    async def blocking_report(report_id: int):
+        time.sleep(0.3)
+        return {"id": report_id}
+
+    @app.get("/fast")
+    async def fast():
+        return {}
+
+    async def passthrough(request, call_next):
+        return await call_next(request)
+
+    app.add_middleware(BaseHTTPMiddleware, dispatch=passthrough)
+    app.add_middleware(LoopMonitorMiddleware)
+
+    with caplog.at_level(logging.WARNING, logger="app.core.loop_monitor"), TestClient(app) as client:
+        assert client.get("/fast").status_code == 200
+        assert client.get("/reports/7").json() == {"id": 7}
+        time.sleep(0.05)
+
+    records = [json.loads(record.getMessage()) for record in caplog.records]
+    assert len(records) == 1
+    assert records[0]["method"] == "GET" and records[0]["route"] == "/reports/{report_id}"
+    assert records[0]["blocked_ms"] >= 50
+    assert "in blocking_report" in records[0]["stack"][-1]
+
+    text = registry.render()
+    assert 'blocked_seconds_count{route="/reports/{report_id}"} 1' in text
+    assert "lag_seconds_count" in text
+
+
+def test_disabled_monitor_changes_nothing():
+    """A zero threshold starts no thread and keeps the default task factory"""
+    monitor = LoopMonitor(threshold_ms=0)
+    app = FastAPI(on_startup=[monitor.start], on_shutdown=[monitor.stop])
+
+    @app.get("/")
+    async def root():
+        return {"factory": asyncio.get_running_loop().get_task_factory() is None}
+
+    with TestClient(app) as client:
+        assert client.get("/").json() == {"factory": True}
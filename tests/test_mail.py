@@ -0,0 +1,163 @@
+import asyncio
+import logging
+import socket
+import pytest
+from app.services.mail import MailQueue, OutboundEmail, SMTPConnectionPool
+
+aiosmtpd_controller = pytest.importorskip("aiosmtpd.controller")
+
+
+class CollectingHandler:
+    def __init__(self):
+        self.messages = []
+
+    async def handle_DATA(self, server, session, envelope):
+        self.messages.append(envelope)
+        return "250 OK"
+
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def smtp_settings(port):
+    return {
+        "smtp_host": "127.0.0.1",
+        "smtp_port": port,
+        "smtp_username": "",
+        "smtp_password": "",
+        "smtp_encryption": "NONE",
+        "from_email": "info@example.com",
+        "from_name": "NGO Platform"
+    }
+
+
+@pytest.fixture
+def smtp_server():
+    handler = CollectingHandler()
+    controller = aiosmtpd_controller.Controller(handler, hostname="127.0.0.1", port=free_port())
+    controller.start()
+    yield controller, handler
+    controller.stop()
+
+
+def test_burst_is_sent_over_pooled_connections(smtp_server):
+    """A burst of messages is delivered over at most pool-size connections"""
+    controller, handler = smtp_server
+    settings = smtp_settings(controller.port)
+    pool = SMTPConnectionPool(lambda: settings, size=2)
+    connects = []
+    original_connect = pool._connect
+    pool._connect = lambda *args: connects.append(1) or original_connect(*args)
+
+    async def run():
+        queue = MailQueue(pool, sender_provider=lambda: settings, batch_size=10)
+        await queue.start()
+        for i in range(25):
+            queue.enqueue(OutboundEmail(to_email=f"donor{i}@example.com", subject="Thanks", html_content="<p>Hi</p>"))
+        await queue.join()
+        await queue.stop()
+        return queue
+
+    queue = asyncio.run(run())
+
+    assert len(handler.messages) == 25
+    assert queue.sent_count == 25
+    assert len(connects) <= 2
+
+
+def test_undeliverable_messages_are_dead_lettered():
+    """Messages are retried with backoff and then dead-lettered"""
+    settings = smtp_settings(free_port())  # nothing listening
+    pool = SMTPConnectionPool(lambda: settings, size=1, timeout=1.0)
+
+    async def run():
+        queue = MailQueue(pool, sender_provider=lambda: settings, max_attempts=3, backoff_base=0.01)
+        await queue.start()
+        queue.enqueue(OutboundEmail(to_email="donor@example.com", subject="Thanks", html_content="<p>Hi</p>"))
+        await queue.join()
+        await queue.stop()
+        return queue
+
+    queue = asyncio.run(run())
+
+    assert queue.sent_count == 0
+    assert len(queue.dead_letters) == 1
+    assert queue.dead_letters[0].attempts == 3
+    assert "ConnectionRefusedError" in queue.dead_letters[0].last_error
+
+
+def test_full_dead_letter_store_reports_what_it_drops(caplog):
+    """Dead letters pushed out of a full store are logged and counted"""
+    settings = smtp_settings(free_port())  # nothing listening
+    pool = SMTPConnectionPool(lambda: settings, size=1, timeout=1.0)
+
+    async def run():
+        queue = MailQueue(pool, sender_provider=lambda: settings, batch_size=1, max_attempts=1, dead_letter_size=2)
+        await queue.start()
+        for i in range(3):
+            queue.enqueue(OutboundEmail(to_email=f"donor{i}@example.com", subject="Thanks", html_content="<p>Hi</p>"))
+        await queue.join()
+        await queue.stop()
+        return queue
+
+    with caplog.at_level(logging.ERROR, logger="app.services.mail"):
+        queue = asyncio.run(run())
+
+    assert [m.to_email for m in queue.dead_letters] == ["donor1@example.com", "donor2@example.com"]
+    assert queue.stats()["dead_letters_dropped"] == 1
+    errors = [r.getMessage() for r in caplog.records if r.levelno == logging.ERROR]
+    assert len(errors) == 1 and "dropping email" in errors[0] and "donor0@example.com" in errors[0]
+
+
+def test_worker_survives_unexpected_errors(smtp_server):
+    """A batch failing outside SMTP is retried and the worker keeps draining"""
+    controller, handler = smtp_server
+    settings = smtp_settings(controller.port)
+    pool = SMTPConnectionPool(lambda: settings, size=1)
+    calls = []
+
+    def flaky_sender():
+        calls.append(1)
+        if len(calls) == 1:
+            raise KeyError("from_email")
+        return settings
+
+    async def run():
+        queue = MailQueue(pool, sender_provider=flaky_sender, workers=1, backoff_base=0.01)
+        await queue.start()
+        queue.enqueue(OutboundEmail(to_email="donor@example.com", subject="Thanks", html_content="<p>Hi</p>"))
+        await queue.join()
+        queue.enqueue(OutboundEmail(to_email="donor2@example.com", subject="Thanks", html_content="<p>Hi</p>"))
+        await queue.join()
+        await queue.stop()
+        return queue
+
+    queue = asyncio.run(run())
+
+    assert queue.sent_count == 2 and not queue.dead_letters
+    assert len(handler.messages) == 2
+
+
+def test_send_endpoint_returns_202(simple_backend, smtp_server, monkeypatch):
+    """Admin email endpoints queue the message and return immediately"""
+    from fastapi.testclient import TestClient
+
+    controller, handler = smtp_server
+    for key, value in smtp_settings(controller.port).items():
+        monkeypatch.setitem(simple_backend.email_settings_storage, key, value)
+
+    with TestClient(simple_backend.app) as client:
+        response = client.post(
+            "/admin/send-welcome-email",
+            data={"user_email": "new.user@example.com", "user_role": "DONOR"},
+            headers={"Authorization": "Bearer demo_token_admin@example.com"}
+        )
+        assert response.status_code == 202
+        assert response.json()["message_id"]
+
+        status = client.get("/admin/email-queue", headers={"Authorization": "Bearer demo_token_admin@example.com"})
+        assert status.status_code == 200
+        assert status.json()["capacity"] == simple_backend.mail_queue.stats()["capacity"]
@@ -0,0 +1,85 @@
+import os
+import time
+
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from app.core import metrics
+from app.core.metrics import MetricsRegistry
+from app.middleware.metrics import MetricsMiddleware
+
+
+def worker(path, name):
+    registry = MetricsRegistry(str(path), flush_interval=60)
+    registry._pid, registry._worker_id = os.getpid(), name
+    return (
+        registry,
+        registry.counter("jobs_total", "Jobs", ("kind",)),
+        registry.gauge("jobs_running", "Running jobs"),
+        registry.histogram("job_seconds", "Job time", buckets=(0.1, 1.0))
+    )
+
+
+def test_render_uses_prometheus_text_format():
+    """Counters, gauges and cumulative histogram buckets with escaped labels"""
+    registry = MetricsRegistry()
+    jobs = registry.counter("jobs_total", "Jobs", ("kind",))
+    seconds = registry.histogram("job_seconds", "Job time", buckets=(0.1, 1.0))
+    jobs.inc('say "hi"')
+    seconds.observe(0.05)
+    seconds.observe(0.5)
+
+    text = registry.render()
+
+    assert '# TYPE jobs_total counter\njobs_total{kind="say \\"hi\\""} 1\n' in text
+    assert 'job_seconds_bucket{le="0.1"} 1\njob_seconds_bucket{le="1"} 2\njob_seconds_bucket{le="+Inf"} 2\n' in text
+    assert "job_seconds_sum 0.55\njob_seconds_count 2\n" in text
+
+
+def test_workers_are_summed_and_exited_workers_keep_their_totals(tmp_path):
+    """A scrape on any worker sees every worker; gauges of gone workers drop out"""
+    path = tmp_path / "metrics.db"
+    first, first_jobs, first_running, _ = worker(path, "first")
+    second, second_jobs, second_running, second_seconds = worker(path, "second")
+    first_jobs.inc("email", amount=2)
+    first_running.set(3)
+    second_jobs.inc("email")
+    second_running.set(4)
+    second_seconds.observe(0.5)
+    first.flush()
+
+    text = second.render()
+    assert 'jobs_total{kind="email"} 3' in text and "jobs_running 7" in text
+    assert 'job_seconds_bucket{le="1"} 1' in text
+
+    first.shutdown()
+    text = second.render()
+    assert 'jobs_total{kind="email"} 3' in text and "jobs_running 4" in text
+
+    third, _, third_running, _ = worker(path, "third")
+    third_running.set(5)
+    third.flush()
+    second.stale_after = 0
+    time.sleep(0.01)
+    assert "jobs_running 4\n" in second.render()
+
+
+def test_middleware_labels_requests_by_route_template():
+    """Raw paths never become labels"""
+    app = FastAPI()
+    app.add_middleware(MetricsMiddleware)
+
+    @app.get("/probe/{item_id}")
+    def probe(item_id: int):
+        return {"id": item_id}
+
+    client = TestClient(app)
+    before = metrics.http_requests.samples().get(("GET", "/probe/{item_id}", "200"), 0)
+    client.get("/probe/1")
+    client.get("/probe/2")
+    client.get("/probe-missing/3")
+
+    samples = metrics.http_requests.samples()
+    assert samples[("GET", "/probe/{item_id}", "200")] == before + 2
+    assert ("GET", "unmatched", "404") in samples
+    assert not any("/probe/1" in labels[1] for labels in samples)
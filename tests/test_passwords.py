@@ -0,0 +1,61 @@
+import pytest
+from fastapi import HTTPException
+
+from app.core.passwords import PasswordPool, PasswordPoolBusy
+
+
+def test_changed_cost_rehashes_on_verify():
+    """A hash made with another bcrypt cost verifies and comes back rehashed"""
+    old = PasswordPool(workers=0, rounds=4)
+    new = PasswordPool(workers=0, rounds=5)
+    hashed = old.hash("Donor@123")
+
+    assert old.verify("Donor@123", hashed) == (True, None)
+    verified, rehashed = new.verify("Donor@123", hashed)
+    assert verified and rehashed.startswith("$2b$05$")
+    assert new.verify("wrong", hashed) == (False, None)
+
+
+def test_full_pool_rejects_with_429(monkeypatch):
+    """Work beyond the queue limit is refused instead of waiting"""
+    from app.core import security
+
+    full = PasswordPool(workers=1, max_pending=0, rounds=4)
+    with pytest.raises(PasswordPoolBusy):
+        full.hash("secret")
+
+    monkeypatch.setattr(security, "password_pool", full)
+    with pytest.raises(HTTPException) as error:
+        security.verify_password("secret", "$2b$04$" + "a" * 53)
+    assert error.value.status_code == 429
+    assert error.value.headers["Retry-After"] == "1"
+
+
+def test_pool_hashes_in_worker_processes():
+    """Hashes made by the pool verify, and the pending count drains"""
+    pool = PasswordPool(workers=1, max_pending=4, rounds=4)
+    try:
+        hashed = pool.hash("Vendor@123")
+        assert pool.verify("Vendor@123", hashed) == (True, None)
+        assert pool.pending == 0
+    finally:
+        pool.shutdown()
+
+
+def test_pool_recovers_after_a_worker_dies():
+    """A killed worker fails the call in flight; the next call gets a fresh pool"""
+    from concurrent.futures.process import BrokenProcessPool
+
+    pool = PasswordPool(workers=1, max_pending=4, rounds=4)
+    try:
+        pool.hash("Vendor@123")
+        for process in list(pool._executor._processes.values()):
+            process.kill()
+            process.join()
+        with pytest.raises(BrokenProcessPool):
+            pool.hash("Vendor@123")
+
+        hashed = pool.hash("Vendor@123")
+        assert pool.verify("Vendor@123", hashed) == (True, None)
+    finally:
+        pool.shutdown()
@@ -0,0 +1,105 @@
+import threading
+import time
+
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from app.core.profiler import ProfilerBusy, StackSampler
+from app.core.tokens import TokenClaims, access_claims
+from app.deps import AuthContext, get_auth_context
+from app.middleware.profiler import ProfilerMiddleware
+from app.models import MembershipRole
+
+
+def busy_report(seconds):
+    deadline = time.perf_counter() + seconds
+    while time.perf_counter() < deadline:
+        sum(range(1000))
+
+
+def test_sampler_finds_busy_threads_and_skips_idle_ones():
+    """Work in another thread shows up by name; parked threads count as idle"""
+    parked = threading.Event()
+    idle = threading.Thread(target=parked.wait, name="parked")
+    worker = threading.Thread(target=busy_report, args=(0.2,), name="report-worker")
+    idle.start()
+
+    sampler = StackSampler(interval=0.002).start()
+    worker.start()
+    worker.join()
+    profile = sampler.stop()
+    parked.set()
+    idle.join()
+
+    collapsed = profile.collapsed()
+    assert any(line.startswith("report-worker;") and "busy_report (tests/test_profiler.py:" in line for line in collapsed.splitlines())
+    assert "parked" not in collapsed
+    assert profile.idle > 0
+
+    speedscope = profile.speedscope("report")
+    names = {frame["name"] for frame in speedscope["shared"]["frames"]}
+    report = next(p for p in speedscope["profiles"] if p["name"] == "report-worker")
+    assert "busy_report" in names
+    assert len(report["samples"]) == len(report["weights"]) and report["endValue"] > 0
+
+
+def test_one_profile_at_a_time():
+    """A second sampler is refused until the first stops"""
+    sampler = StackSampler().start()
+    try:
+        try:
+            StackSampler().start()
+            assert False, "second sampler started"
+        except ProfilerBusy:
+            pass
+    finally:
+        sampler.stop()
+    StackSampler().start().stop()
+
+
+def test_profile_query_needs_the_token():
+    """?__profile=collapsed swaps the response for a profile, only with the secret header"""
+    app = FastAPI()
+
+    @app.get("/slow")
+    def slow():
+        busy_report(0.1)
+        return {"ok": True}
+
+    app.add_middleware(ProfilerMiddleware, token="s3cret")
+    client = TestClient(app)
+
+    assert client.get("/slow?__profile=collapsed").json() == {"ok": True}
+    assert client.get("/slow?__profile=collapsed", headers={"X-Profile-Token": "wrong"}).json() == {"ok": True}
+
+    response = client.get("/slow?__profile=collapsed", headers={"X-Profile-Token": "s3cret"})
+    assert response.headers["x-profiled-status"] == "200"
+    assert "busy_report (tests/test_profiler.py:" in response.text
+
+    response = client.get("/slow?__profile=1", headers={"X-Profile-Token": "s3cret"})
+    assert response.json()["name"] == "GET /slow"
+
+
+def test_admin_profile_endpoint(monkeypatch):
+    """Platform admins get a worker profile; it is off unless enabled"""
+    from app.core.config import settings
+    from app.routers import admin
+
+    app = FastAPI()
+    app.include_router(admin.router)
+    roles = {"role": MembershipRole.PLATFORM_ADMIN}
+    app.dependency_overrides[get_auth_context] = lambda: AuthContext(
+        TokenClaims.from_payload(access_claims(1, 0, [(1, roles["role"])])), db=None
+    )
+    client = TestClient(app)
+
+    monkeypatch.setattr(settings, "PROFILING_ENABLED", False)
+    assert client.get("/admin/profile?seconds=0.05").status_code == 404
+
+    monkeypatch.setattr(settings, "PROFILING_ENABLED", True)
+    response = client.get("/admin/profile?seconds=0.05&format=speedscope")
+    assert response.status_code == 200
+    assert response.json()["$schema"].startswith("https://www.speedscope.app/")
+
+    roles["role"] = MembershipRole.NGO_ADMIN
+    assert client.get("/admin/profile?seconds=0.05").status_code == 403
@@ -0,0 +1,87 @@
+import asyncio
+import threading
+
+from app.services.progress_hub import ProgressHub, progress_payload
+
+
+async def next_frame(stream, timeout=1.0):
+    return await asyncio.wait_for(stream.__anext__(), timeout)
+
+
+def test_stream_sends_snapshot_then_coalesced_updates():
+    """A burst of updates for one cause reaches subscribers as its latest value"""
+    async def scenario():
+        hub = ProgressHub(min_interval=0.05)
+        stream = hub.stream("cause:1", initial=[(1, progress_payload(1, 100, 1000, 1))])
+        assert (await next_frame(stream)).startswith(b"retry:")
+        assert b'"raised_amount":100.0' in await next_frame(stream)
+        assert hub.subscriber_count("cause:1") == 1
+
+        for raised in (200, 300, 400):
+            hub.publish(["cause:1", "tenant:9"], 1, progress_payload(1, raised, 1000, raised // 100))
+        first, second = await next_frame(stream), await next_frame(stream)
+
+        await stream.aclose()
+        return first, second, hub.subscriber_count()
+
+    first, second, remaining = asyncio.run(scenario())
+    assert b"event: progress" in first and b'"raised_amount":200.0' in first
+    assert b'"raised_amount":400.0' in second and b'"progress":0.4' in second
+    assert remaining == 0
+
+
+def test_publish_from_worker_thread_and_heartbeats():
+    """Sync code in the threadpool can publish; idle streams get keep-alives"""
+    async def scenario():
+        hub = ProgressHub(heartbeat=0.05)
+        stream = hub.stream("tenant:2")
+        await next_frame(stream)
+        heartbeat = await next_frame(stream)
+
+        thread = threading.Thread(target=hub.publish, args=(["tenant:2"], 5, progress_payload(5, 10, 20, 1)))
+        thread.start()
+        thread.join()
+        update = await next_frame(stream)
+        await stream.aclose()
+        return heartbeat, update
+
+    heartbeat, update = asyncio.run(scenario())
+    assert heartbeat == b": keep-alive\n\n"
+    assert b'"cause_id":5' in update
+
+
+def test_stream_endpoint_rejects_unknown_causes(simple_backend):
+    """Only live causes can be streamed"""
+    from fastapi.testclient import TestClient
+
+    client = TestClient(simple_backend.app)
+
+    assert client.get("/public/causes/999999/stream").status_code == 404
+    assert client.get("/public/tenants/no-such-ngo/stream").status_code == 404
+
+
+def test_sql_streams_give_their_connection_back(sqlite_api):
+    """Open SSE streams hold no pooled database connection"""
+    from app.models import Category, Cause, CauseStatus, CauseType, Tenant
+    from app.routers.public import stream_cause_progress, stream_tenant_progress
+
+    db = sqlite_api.Session()
+    tenant, category = Tenant(name="Hope Trust", slug="hope"), Category(name="Education")
+    db.add_all([tenant, category])
+    db.flush()
+    cause = Cause(
+        tenant_id=tenant.id, category_id=category.id, title="Books", goal_amount=1000,
+        raised_amount=0, type=CauseType.NGO_MANAGED, status=CauseStatus.LIVE
+    )
+    db.add(cause)
+    db.commit()
+    cause_id = cause.id
+    db.close()
+
+    responses = [
+        stream_cause_progress(cause_id, db=sqlite_api.Session()),
+        stream_tenant_progress("hope", db=sqlite_api.Session()),
+    ]
+
+    assert all(response.media_type == "text/event-stream" for response in responses)
+    assert sqlite_api.engine.pool.checkedout() == 0
@@ -0,0 +1,80 @@
+import logging
+
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine, text
+
+from app.core.query_stats import instrument, redact, track_queries
+from app.core.security import create_access_token
+from app.core.tokens import access_claims
+from app.middleware.query_stats import QueryStatsMiddleware
+from app.models import Cause, CauseStatus, CauseType, Category, Membership, MembershipRole, Tenant, User, Vendor, VendorLink
+
+
+def test_statements_are_counted_per_context_with_literals_redacted():
+    """Only statements run inside track_queries count; values never leave"""
+    engine = create_engine("sqlite://")
+    instrument(engine)
+    instrument(engine)
+
+    with engine.connect() as connection:
+        connection.execute(text("SELECT 1"))
+        with track_queries() as stats:
+            connection.execute(text("SELECT 'secret@example.com', 42"))
+            connection.execute(text("SELECT :email"), {"email": "bound@example.com"})
+
+    assert stats.count == 2
+    assert "secret" not in stats.slowest_statement and "bound" not in stats.slowest_statement
+    assert redact("SELECT  *\nFROM users WHERE email = 'a''b' AND id = 7") == "SELECT * FROM users WHERE email = ? AND id = ?"
+
+
+def test_middleware_adds_server_timing_and_logs_slow_requests(caplog):
+    """Requests report their statement count; slow ones log the statement"""
+    engine = create_engine("sqlite://")
+    instrument(engine)
+    app = FastAPI()
+    app.add_middleware(QueryStatsMiddleware, slow_query_ms=0)
+
+    @app.get("/causes/{cause_id}")
+    def cause(cause_id: int):
+        with engine.connect() as connection:
+            connection.execute(text("SELECT 1"))
+            connection.execute(text("SELECT 2"))
+        return {"id": cause_id}
+
+    with caplog.at_level(logging.WARNING, logger="app.middleware.query_stats"):
+        response = TestClient(app).get("/causes/3")
+
+    assert response.headers["Server-Timing"].startswith("db;dur=")
+    assert '"2 queries"' in response.headers["Server-Timing"]
+    assert '"route": "/causes/{cause_id}"' in caplog.text and '"queries": 2' in caplog.text
+
+
+def test_admin_listings_stay_within_query_budget(sqlite_api, query_budget):
+    """Admin listings cost the same number of statements however many rows they return"""
+    from app.routers import admin
+
+    with sqlite_api.Session() as session:
+        session.add_all([Tenant(id=1, name="Hope", slug="hope"), Category(id=1, name="Food")])
+        session.add(Vendor(id=1, tenant_id=1, name="Alpha"))
+        for i in range(1, 11):
+            session.add(User(id=i, email=f"user{i}@example.com", hashed_password="x"))
+            session.add(Membership(user_id=i, tenant_id=1, role=MembershipRole.DONOR))
+            session.add(Cause(
+                id=i, tenant_id=1, category_id=1, title=f"Cause {i}", goal_amount=100,
+                type=CauseType.VENDOR, status=CauseStatus.LIVE
+            ))
+            session.add(VendorLink(cause_id=i, vendor_id=1))
+        session.commit()
+
+    sqlite_api.app.include_router(admin.router)
+    client = sqlite_api.client
+    token = create_access_token(access_claims(1, 0, [(1, MembershipRole.PLATFORM_ADMIN)]))
+    headers = {"Authorization": f"Bearer {token}"}
+
+    with query_budget(2):
+        response = client.get("/admin/users", headers=headers)
+    assert response.json()["Count"] == 10
+    with query_budget(1):
+        response = client.get("/admin/ngo-vendor-associations", headers=headers)
+    assert response.json()["Count"] == 10
@@ -0,0 +1,120 @@
+from datetime import datetime, timedelta, timezone
+
+from app.services.ranked_feeds import LocalSortedSets, RankedFeeds
+
+
+def cause(cause_id, category_id=1, raised=0, target=1000, donors=0, created="2024-01-01T00:00:00Z"):
+    return {
+        "id": cause_id, "category_id": category_id, "current_amount": raised, "target_amount": target,
+        "donation_count": donors, "created_at": created, "status": "LIVE"
+    }
+
+
+def test_local_sorted_sets_follow_redis_semantics():
+    """zadd replaces scores in place and zrevrange reads highest first"""
+    sets = LocalSortedSets()
+    assert sets.zadd("s", {"a": 1, "b": 3, "c": 2}) == 3
+    assert sets.zadd("s", {"a": 5}) == 0
+
+    assert sets.zrevrange("s", 0, 1) == ["a", "b"]
+    assert sets.zrevrange("s", 0, -1) == ["a", "b", "c"]
+    assert sets.zrem("s", "b", "missing") == 1
+    assert (sets.zcard("s"), sets.zscore("s", "c")) == (2, 2.0)
+
+
+def test_feeds_are_ranked_overall_and_per_category():
+    """Each feed orders causes by its own score, overall and within a category"""
+    feeds = RankedFeeds()
+    feeds.rebuild([
+        cause(1, raised=900, donors=5, created="2024-01-01T00:00:00Z"),
+        cause(2, category_id=2, raised=100, donors=9, created="2024-03-01T00:00:00Z"),
+        cause(3, raised=1000, donors=1, created="2024-02-01T00:00:00Z"),
+    ])
+
+    assert feeds.top("newest") == [2, 3, 1]
+    assert feeds.top("most_donors", limit=2) == [2, 1]
+    # Fully funded causes drop out of "nearly funded"
+    assert feeds.top("nearly_funded") == [1, 2]
+    assert feeds.top("newest", category_id=1) == [3, 1]
+
+
+def test_recent_donations_outweigh_older_larger_ones():
+    """Trending decays with time, and donations only touch their own cause"""
+    feeds = RankedFeeds()
+    old, recent = cause(1), cause(2)
+    feeds.rebuild([old, recent])
+    now = datetime(2024, 6, 1, tzinfo=timezone.utc)
+
+    feeds.record_donation(old, 5000, at=now - timedelta(days=14))
+    feeds.record_donation(recent, 500, at=now)
+    assert feeds.top("trending") == [2, 1]
+
+    old.update(current_amount=950, donation_count=1)
+    feeds.record_donation(old, 5000, at=now)
+    assert feeds.top("trending") == [1, 2]
+    assert feeds.top("nearly_funded") == [1, 2]
+
+
+def test_feed_endpoint(simple_backend):
+    """The marketplace home reads the top N of a feed"""
+    from fastapi.testclient import TestClient
+
+    client = TestClient(simple_backend.app)
+    newest = client.get("/public/feeds/newest", params={"limit": 2}).json()
+
+    assert newest["Count"] == 2
+    assert newest["value"][0]["created_at"] >= newest["value"][1]["created_at"]
+    assert client.get("/public/feeds/popular").status_code == 404
+
+
+def test_feed_endpoint_on_the_database(sqlite_api, monkeypatch):
+    """The SQL API loads the feeds once, then captures move single causes"""
+    from app.models import Category, Cause, CauseStatus, CauseType, Donation, DonationStatus, Tenant, User
+    from app.routers import public
+    from app.services.cause_feeds import cause_feeds
+    from app.services.donation_capture import DonationCapture
+
+    sqlite_api.app.include_router(public.router, prefix="/public")
+    cause_feeds.invalidate()
+    loads = []
+    load = cause_feeds._load
+    monkeypatch.setattr(cause_feeds, "_load", lambda db: loads.append(1) or load(db))
+    db = sqlite_api.Session()
+    tenant, category = Tenant(name="Hope Trust", slug="hope"), Category(name="Education")
+    arya, dev = User(email="arya@example.com", hashed_password="x"), User(email="dev@example.com", hashed_password="x")
+    db.add_all([tenant, category, arya, dev])
+    db.flush()
+    books, meals = [
+        Cause(
+            tenant_id=tenant.id, category_id=category.id, title=title, goal_amount=10000,
+            raised_amount=0, type=CauseType.NGO_MANAGED, status=CauseStatus.LIVE
+        )
+        for title in ("Books", "Meals")
+    ]
+    db.add_all([books, meals])
+    db.flush()
+    db.add_all([
+        Donation(cause_id=books.id, donor_user_id=arya.id, amount=100, status=DonationStatus.CAPTURED),
+        Donation(cause_id=books.id, donor_user_id=arya.id, amount=50, status=DonationStatus.CAPTURED),
+        Donation(cause_id=meals.id, donor_user_id=dev.id, amount=900, status=DonationStatus.FAILED),
+        Donation(cause_id=meals.id, donor_user_id=arya.id, amount=500, pg_order_id="order_1"),
+        Donation(cause_id=meals.id, donor_user_id=dev.id, amount=500, pg_order_id="order_2"),
+    ])
+    db.commit()
+
+    def titles(feed):
+        return [cause["title"] for cause in sqlite_api.client.get(f"/public/feeds/{feed}").json()["value"]]
+
+    assert titles("trending") == ["Books", "Meals"]
+    assert titles("most_donors") == ["Books", "Meals"]
+
+    capture = DonationCapture()
+    capture.capture(db, "order_1")
+    capture.capture(db, "order_2")
+
+    assert titles("trending") == ["Meals", "Books"]
+    assert titles("most_donors") == ["Meals", "Books"]  # two donors against one who gave twice
+    assert len(loads) == 1
+    assert sqlite_api.client.get("/public/feeds/popular").status_code == 404
+    db.close()
+    cause_feeds.invalidate()
@@ -0,0 +1,83 @@
+from app.services.receipts import LocalObjectStore, ReceiptService, financial_year, render_document
+
+DOCUMENT = {
+    "donation_id": 7, "receipt_number": "RCP-000007", "certificate_number": "80G/2024-25/000007",
+    "financial_year": "2024-25", "date": "2024-06-01", "amount": 2500, "cause_title": "Meals (Mumbai)",
+    "payment_id": "pay_1", "donor_name": "Arya Sharma", "donor_email": "arya@example.com",
+    "ngo_name": "Hope Trust", "ngo_pan": "AAACH1234H"
+}
+
+
+def test_financial_year_runs_april_to_march():
+    """Financial years start on the first of April, Indian time"""
+    assert financial_year("2024-03-31T18:29:59Z") == "2023-24"
+    assert financial_year("2024-03-31T18:30:00Z") == "2024-25"  # 00:00 IST on 1 April
+    assert financial_year("2024-04-01T00:15:00+05:30") == "2024-25"
+    assert financial_year("2024-04-01") == "2024-25"
+
+
+def test_receipt_date_is_printed_in_indian_time(simple_backend):
+    """The date on a certificate falls in the financial year it names"""
+    donation = dict(simple_backend.donations_storage[0], completed_at="2024-03-31T20:00:00Z")
+
+    document = simple_backend.receipt_document(donation)
+
+    assert (document["date"], document["financial_year"]) == ("2024-04-01", "2024-25")
+
+
+def test_rendering_is_deterministic():
+    """Same data renders to identical bytes, which content addressing relies on"""
+    first = render_document("80g", DOCUMENT)
+
+    assert first.startswith(b"%PDF-1.4")
+    assert first == render_document("80g", dict(DOCUMENT))
+    assert b"(Meals \\(Mumbai\\)) Tj" in render_document("receipt", DOCUMENT)
+
+
+def test_documents_are_rendered_once_and_rerendered_on_change(tmp_path):
+    """Later requests come from the store; changed data produces a new blob"""
+    service = ReceiptService(LocalObjectStore(str(tmp_path)))
+    first = service.get("receipt", DOCUMENT)
+
+    # A fresh service (e.g. another worker) finds it through the stored index
+    other = ReceiptService(LocalObjectStore(str(tmp_path)))
+    assert other._lookup("receipt", 7, other.fingerprint("receipt", DOCUMENT)) == first.digest
+    assert other.get("receipt", DOCUMENT) == first
+
+    changed = service.get("receipt", {**DOCUMENT, "donor_name": "Arya S."})
+    assert changed.digest != first.digest
+    assert (tmp_path / "receipts" / "sha256" / f"{first.digest}.pdf").exists()
+
+
+def test_pregenerate_skips_current_documents(tmp_path):
+    """Bulk generation renders only what is missing"""
+    service = ReceiptService(LocalObjectStore(str(tmp_path)))
+    documents = [{**DOCUMENT, "donation_id": i} for i in range(5)]
+    service.get("80g", documents[0])
+
+    assert service.pregenerate("80g", documents, workers=2) == {"generated": 4, "cached": 1}
+    assert service.pregenerate("80g", documents, workers=2) == {"generated": 0, "cached": 5}
+
+
+def test_receipt_endpoint_supports_etag_and_range(simple_backend, tmp_path, monkeypatch):
+    """PDF receipts are revalidated with ETags and served in byte ranges"""
+    from fastapi.testclient import TestClient
+
+    monkeypatch.setattr(simple_backend, "receipt_service", ReceiptService(LocalObjectStore(str(tmp_path))))
+    client = TestClient(simple_backend.app)
+    headers = {"Authorization": "Bearer demo_token_admin@example.com"}
+
+    response = client.get("/receipts/1.pdf", headers=headers)
+    assert response.status_code == 200
+    assert response.headers["content-type"] == "application/pdf"
+    etag = response.headers["etag"]
+
+    assert client.get("/receipts/1.pdf", headers={**headers, "If-None-Match": etag}).status_code == 304
+
+    partial = client.get("/receipts/1/80g.pdf", headers={**headers, "Range": "bytes=0-7"})
+    assert partial.status_code == 206
+    assert partial.content == b"%PDF-1.4"
+
+    malformed = client.get("/receipts/1/80g.pdf", headers={**headers, "Range": "bytes=abc-"})
+    assert malformed.status_code == 200
+    assert "content-range" not in malformed.headers
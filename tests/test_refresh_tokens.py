@@ -0,0 +1,62 @@
+from datetime import datetime, timedelta, timezone
+
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from app.core.database import Base
+from app.core.tokens import TokenClaims, TokenRevocations
+from app.models import RefreshToken, User
+from app.services.refresh_tokens import RefreshTokenError, RefreshTokenReuse, RefreshTokenStore
+
+
+@pytest.fixture
+def db(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'refresh.db'}")
+    Base.metadata.create_all(engine)
+    session = sessionmaker(bind=engine)()
+    session.add(User(email="donor@example.com", hashed_password="x"))
+    session.commit()
+    return session
+
+
+def test_rotation_issues_single_use_successors(db):
+    """Each refresh token works once and its successor stays in the family"""
+    store = RefreshTokenStore()
+    token, family = store.issue(db, 1)
+
+    user_id, rotated_family, successor = store.rotate(db, token)
+
+    assert (user_id, rotated_family) == (1, family)
+    assert store.rotate(db, successor)[1] == family
+    assert db.query(RefreshToken).filter(RefreshToken.token_hash == store.hash(token)).one().used_at is not None
+    assert db.query(RefreshToken.token_hash).filter(RefreshToken.token_hash == token).first() is None
+
+
+def test_reuse_revokes_the_family_and_its_access_tokens(db):
+    """Replaying a rotated token signs the whole session out"""
+    revocations = TokenRevocations()
+    store = RefreshTokenStore(revocations=revocations)
+    token, family = store.issue(db, 1)
+    _, _, successor = store.rotate(db, token)
+
+    with pytest.raises(RefreshTokenReuse):
+        store.rotate(db, token)
+    with pytest.raises(RefreshTokenError):
+        store.rotate(db, successor)
+
+    assert not revocations.is_current(TokenClaims(1, 0, family=family))
+    assert revocations.is_current(TokenClaims(1, 0, family="another-session"))
+    since = datetime.now(timezone.utc) - timedelta(minutes=1)
+    assert store.revoked_families(db, since) == [family]
+
+
+def test_expired_and_unknown_tokens_are_rejected(db):
+    """Only live tokens rotate"""
+    store = RefreshTokenStore(lifetime=timedelta(seconds=-1))
+    token, _ = store.issue(db, 1)
+
+    with pytest.raises(RefreshTokenError):
+        store.rotate(db, token)
+    with pytest.raises(RefreshTokenError):
+        store.rotate(db, "not-a-token")
@@ -0,0 +1,48 @@
+import json
+from datetime import date, datetime
+from decimal import Decimal
+
+from app.core.responses import _default, dumps, fast_json
+from app.models import CauseStatus
+
+
+def test_rows_encode_without_per_field_conversion():
+    """Datetimes, Decimals and enums are encoded directly, like the old manual conversion"""
+    row = {
+        "created_at": datetime(2024, 4, 1, 10, 30, 5),
+        "date": date(2024, 4, 1),
+        "amount": Decimal("1500.50"),
+        "status": CauseStatus.LIVE,
+        7: "non-string key",
+    }
+
+    encoded = json.loads(dumps(row))
+    fallback = json.loads(json.dumps(row, default=_default))
+
+    assert encoded == fallback == {
+        "created_at": "2024-04-01T10:30:05",
+        "date": "2024-04-01",
+        "amount": 1500.5,
+        "status": "LIVE",
+        "7": "non-string key",
+    }
+
+
+def test_fast_json_skips_the_encoder():
+    """Handlers returning fast_json hand FastAPI a finished response"""
+    response = fast_json({"value": [{"amount": Decimal("10")}], "Count": 1}, status_code=202)
+
+    assert response.status_code == 202
+    assert response.headers["content-type"] == "application/json"
+    assert json.loads(response.body) == {"value": [{"amount": 10.0}], "Count": 1}
+
+
+def test_admin_orders_endpoint(simple_backend):
+    """/admin/orders is served through the fast path with the enriched fields"""
+    from fastapi.testclient import TestClient
+
+    client = TestClient(simple_backend.app)
+    body = client.get("/admin/orders", headers={"Authorization": "Bearer demo_token_admin@example.com"}).json()
+
+    assert body["Count"] == len(simple_backend.orders_storage)
+    assert all("vendor_contact_email" in order for order in body["value"])
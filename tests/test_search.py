@@ -0,0 +1,95 @@
+from app.services.search_index import SearchIndex
+
+
+def make_index():
+    index = SearchIndex(facets=("category", "ngo"))
+    index.put(1, [("School Library Books", 1.0), ("Hope Trust", 0.5)], {"category": 2, "ngo": [1]}, progress=0.2)
+    index.put(2, [("Mobile Health Clinic", 1.0), ("Care Works", 0.5)], {"category": 3, "ngo": [2]}, progress=0.9)
+    index.put(3, [("Schoolbag Drive", 1.0), ("Care Works", 0.5)], {"category": 2, "ngo": [2]}, progress=0.5)
+    return index
+
+
+def test_exact_prefix_and_typo_matches():
+    """Exact terms outrank prefixes; misspelt words still find their documents"""
+    index = make_index()
+
+    assert [doc for doc, _ in index.search("school").hits] == [1, 3]
+    assert [doc for doc, _ in index.search("helth clinc").hits] == [2]
+    assert [doc for doc, _ in index.search("hope schol").hits] == [1]
+    assert index.search("zebra").total == 0
+
+
+def test_facets_ignore_their_own_filter():
+    """Facet counts show the alternatives to the current selection"""
+    index = make_index()
+
+    result = index.search("", {"category": 2, "ngo": 2})
+
+    assert [doc for doc, _ in result.hits] == [3]
+    assert result.facets["category"] == {2: 1, 3: 1}
+    assert result.facets["ngo"] == {1: 1, 2: 1}
+
+
+def test_empty_query_ranks_by_progress_and_remove_forgets_terms():
+    """Browsing without text orders by funding progress; removed documents vanish"""
+    index = make_index()
+    assert [doc for doc, _ in index.search("").hits] == [2, 3, 1]
+
+    index.remove(2)
+    assert index.search("clinic").total == 0
+    assert "clinic" not in index.expand("clinic")
+    assert len(index) == 2
+
+
+def test_sql_search_with_facets_and_pages(tmp_path):
+    """The SQL search filters public causes and pages through ranked results"""
+    from sqlalchemy import create_engine
+    from sqlalchemy.orm import sessionmaker
+    from app.core.database import Base
+    from app.models import Category, Cause, CauseStatus, CauseType, Tenant
+    from app.services.cause_search import CauseSearch
+
+    engine = create_engine(f"sqlite:///{tmp_path / 'search.db'}")
+    Base.metadata.create_all(engine)
+    db = sessionmaker(bind=engine)()
+    hope, care = Tenant(name="Hope Trust", slug="hope"), Tenant(name="Care Works", slug="care")
+    education, health = Category(name="Education"), Category(name="Health")
+    db.add_all([hope, care, education, health])
+    db.flush()
+    for tenant, category, title, raised, status in [
+        (hope, education, "School books", 10, CauseStatus.LIVE),
+        (care, education, "School uniforms", 90, CauseStatus.LIVE),
+        (care, health, "School health camp", 50, CauseStatus.FUNDED),
+        (care, education, "School roof", 0, CauseStatus.DRAFT),
+    ]:
+        db.add(Cause(
+            tenant_id=tenant.id, category_id=category.id, title=title, goal_amount=100,
+            raised_amount=raised, type=CauseType.NGO_MANAGED, status=status
+        ))
+    db.commit()
+
+    first = CauseSearch().search(db, "school", category_id=education.id, limit=1)
+    second = CauseSearch().search(db, "school", category_id=education.id, page=2, limit=1)
+
+    assert first["Count"] == 2
+    assert [first["value"][0]["title"], second["value"][0]["title"]] == ["School uniforms", "School books"]
+    assert {f["name"]: f["count"] for f in first["facets"]["category"]} == {"Education": 2, "Health": 1}
+    assert {f["value"]: f["count"] for f in first["facets"]["status"]} == {CauseStatus.LIVE: 2}
+
+
+def test_public_search_endpoint_follows_approvals(simple_backend):
+    """Causes become searchable when approved"""
+    from fastapi.testclient import TestClient
+
+    client = TestClient(simple_backend.app)
+    created = client.post("/admin/causes", data={
+        "title": "Rainwater Harvesting", "description": "Tanks for villages", "target_amount": 9000,
+        "category_id": 1, "ngo_ids": "1"
+    }).json()
+    assert client.get("/public/search", params={"q": "rainwater"}).json()["Count"] == 0
+
+    client.post(f"/admin/causes/{created['id']}/approve")
+    body = client.get("/public/search", params={"q": "rainwatr harvest"}).json()
+
+    assert [cause["id"] for cause in body["value"]] == [created["id"]]
+    assert body["facets"]["ngo"][0]["name"] == simple_backend.ngos_storage[0]["name"]
@@ -0,0 +1,49 @@
+from sqlalchemy import create_engine, func, select
+
+from app.core.database import Base
+from app.models import Cause, Donation, DonationStatus, User
+from seed_synthetic import SCALES, SyntheticDataset
+
+
+def generate(path, seed=3):
+    engine = create_engine(f"sqlite:///{path}")
+    Base.metadata.create_all(engine)
+    counts = SyntheticDataset(SCALES["tiny"], seed=seed).generate(engine, batch_size=100, log=lambda _: None)
+    return engine, counts
+
+
+def donations(engine):
+    with engine.connect() as connection:
+        return connection.execute(
+            select(Donation.id, Donation.cause_id, Donation.donor_user_id, Donation.amount, Donation.status, Donation.created_at)
+            .order_by(Donation.id)
+        ).all()
+
+
+def test_same_seed_gives_same_rows(tmp_path):
+    """Datasets are reproducible from their seed"""
+    first, counts = generate(tmp_path / "a.db")
+    second, _ = generate(tmp_path / "b.db")
+    other, _ = generate(tmp_path / "c.db", seed=4)
+
+    assert counts["donations"] == SCALES["tiny"].donations
+    assert donations(first) == donations(second) != donations(other)
+
+
+def test_raised_amounts_match_captured_donations(tmp_path):
+    """Causes carry the totals of their captured donations; reruns append"""
+    engine, _ = generate(tmp_path / "a.db")
+    SyntheticDataset(SCALES["tiny"], seed=5).generate(engine, batch_size=100, log=lambda _: None)
+
+    with engine.connect() as connection:
+        captured = dict(connection.execute(
+            select(Donation.cause_id, func.sum(Donation.amount))
+            .where(Donation.status == DonationStatus.CAPTURED)
+            .group_by(Donation.cause_id)
+        ).all())
+        raised = dict(connection.execute(select(Cause.id, Cause.raised_amount)).all())
+        hashes = connection.execute(select(func.count(func.distinct(User.hashed_password)))).scalar()
+
+    assert captured and all(raised[cause_id] == total for cause_id, total in captured.items())
+    assert len(donations(engine)) == 2 * SCALES["tiny"].donations
+    assert hashes == 2  # one bcrypt hash per run, shared by every account
@@ -0,0 +1,139 @@
+import asyncio
+import threading
+
+import pytest
+from app.services.shared_state import SharedStateStore
+
+
+def make_worker(path, seed_items):
+    namespace = {"items": list(seed_items), "settings": {"theme": "blue"}}
+    store = SharedStateStore(path, namespace, ["items", "settings"])
+    store.bootstrap()
+    return store, namespace
+
+
+def stored_versions(store):
+    return dict(store._reader.execute("SELECT name, version FROM collections").fetchall())
+
+
+def test_first_worker_seeds_the_store(tmp_path):
+    """Later workers adopt the state seeded by the first one"""
+    path = str(tmp_path / "state.db")
+    _, first = make_worker(path, [{"id": 1}])
+    _, second = make_worker(path, [{"id": 99}])
+
+    assert second["items"] == first["items"] == [{"id": 1}]
+
+
+def test_writes_propagate_between_workers(tmp_path):
+    """A mutation in one worker is visible in another after a refresh"""
+    path = str(tmp_path / "state.db")
+    store_a, ns_a = make_worker(path, [])
+    store_b, ns_b = make_worker(path, [])
+    items_b = ns_b["items"]
+
+    async def scenario():
+        async with store_a.mutation("items", "settings"):
+            ns_a["items"].append({"id": 1})
+            ns_a["settings"]["theme"] = "green"
+        assert await store_b.refresh() == ["items", "settings"]
+        assert await store_b.refresh() == []
+
+    asyncio.run(scenario())
+    assert ns_b["items"] == [{"id": 1}]
+    assert ns_b["items"] is items_b  # reloaded in place
+    assert ns_b["settings"]["theme"] == "green"
+
+
+def test_only_named_and_changed_collections_are_published(tmp_path):
+    """A mutation dumps only the collections it names, and skips unchanged ones"""
+    path = str(tmp_path / "state.db")
+    store, ns = make_worker(path, [])
+    before = stored_versions(store)
+
+    async def scenario():
+        async with store.mutation("items", "settings"):
+            ns["items"].append({"id": 1})
+
+    asyncio.run(scenario())
+    assert stored_versions(store) == {"items": before["items"] + 1, "settings": before["settings"]}
+
+
+def test_listeners_are_notified_on_reload(tmp_path):
+    """Subscribers learn about collections changed by other workers"""
+    path = str(tmp_path / "state.db")
+    store_a, ns_a = make_worker(path, [])
+    store_b, _ = make_worker(path, [])
+    reloaded = []
+    store_b.subscribe("items", reloaded.append)
+
+    async def scenario():
+        async with store_a.mutation("items"):
+            ns_a["items"].append({"id": 2})
+        await store_b.refresh()
+
+    asyncio.run(scenario())
+    assert reloaded == ["items"]
+
+
+def test_failed_write_rolls_back_memory(tmp_path):
+    """A failing mutation does not leak into memory or the store"""
+    path = str(tmp_path / "state.db")
+    store, ns = make_worker(path, [{"id": 1}])
+
+    async def scenario():
+        async with store.mutation("items"):
+            ns["items"].append({"id": 2})
+            raise RuntimeError("boom")
+
+    with pytest.raises(RuntimeError):
+        asyncio.run(scenario())
+    assert ns["items"] == [{"id": 1}]
+    assert stored_versions(store)["items"] == 1
+
+
+def test_failed_block_that_changed_nothing_reloads_nothing(tmp_path):
+    """A mutation rejected before touching memory does not wake subscribers"""
+    path = str(tmp_path / "state.db")
+    store, ns = make_worker(path, [{"id": 1}])
+    items = ns["items"]
+    reloaded = []
+    store.subscribe("items", reloaded.append)
+
+    async def scenario():
+        async with store.mutation("items"):
+            raise LookupError("order not found")
+
+    with pytest.raises(LookupError):
+        asyncio.run(scenario())
+    assert reloaded == []
+    assert ns["items"] is items and items == [{"id": 1}]
+
+
+def test_store_io_stays_off_the_event_loop(tmp_path):
+    """Refreshing and taking the write lock run in worker threads, and the lock is released after the block"""
+    path = str(tmp_path / "state.db")
+    store_a, ns_a = make_worker(path, [])
+    store_b, ns_b = make_worker(path, [])
+    threads = set()
+    for store in (store_a, store_b):
+        for method in ("_read", "_begin", "_commit", "_dump"):
+            original = getattr(store, method)
+
+            def traced(*args, _original=original):
+                threads.add(threading.get_ident())
+                return _original(*args)
+            setattr(store, method, traced)
+
+    async def scenario():
+        async with store_a.mutation("items"):
+            ns_a["items"].append({"id": 1})
+        # Worker A is done with the lock as soon as its block ends
+        async with store_b.mutation("items"):
+            ns_b["items"].append({"id": 2})
+        await store_a.refresh()
+        return threading.get_ident()
+
+    loop_thread = asyncio.run(scenario())
+    assert ns_a["items"] == ns_b["items"] == [{"id": 1}, {"id": 2}]
+    assert threads and loop_thread not in threads
@@ -0,0 +1,100 @@
+from datetime import datetime, timedelta, timezone
+from decimal import Decimal
+
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from app.core.database import Base
+from app.models import Category, Cause, CauseType, Donation, DonationStatus, TaxStatement, Tenant, User
+from app.services.tax_statements import TaxStatementBuilder, aggregate_statements
+
+
+def make_session(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'tax.db'}")
+    Base.metadata.create_all(engine)
+    db = sessionmaker(bind=engine)()
+    db.add_all([
+        Tenant(id=1, name="Hope Trust", slug="hope-trust"),
+        Tenant(id=2, name="Care Foundation", slug="care-foundation"),
+        Category(id=1, name="Food"),
+        Cause(id=1, tenant_id=1, category_id=1, title="Meals", goal_amount=1000, type=CauseType.VENDOR),
+        Cause(id=2, tenant_id=2, category_id=1, title="Books", goal_amount=1000, type=CauseType.VENDOR),
+        User(id=1, email="a@example.com", hashed_password="x"),
+        User(id=2, email="b@example.com", hashed_password="x"),
+    ])
+    db.commit()
+    return db
+
+
+def donation(donor, cause, amount, when, status=DonationStatus.CAPTURED):
+    return Donation(donor_user_id=donor, cause_id=cause, amount=amount, status=status, created_at=when)
+
+
+def test_aggregate_statements_splits_financial_years():
+    """Groups break on key and on the April financial year boundary"""
+    rows = [
+        (("a",), "2024-03-10T00:00:00Z", 100),
+        (("a",), "2024-04-02T00:00:00Z", 50),
+        (("a",), "2024-12-01T00:00:00Z", 25.5),
+        (("b",), "2024-12-01T00:00:00Z", 10),
+    ]
+
+    totals = [(t.key, t.financial_year, t.donation_count, t.total_amount) for t in aggregate_statements(rows)]
+
+    assert totals == [
+        (("a",), "2023-24", 1, Decimal("100")),
+        (("a",), "2024-25", 2, Decimal("75.5")),
+        (("b",), "2024-25", 1, Decimal("10")),
+    ]
+
+
+def test_full_rebuild_aggregates_per_donor_ngo_and_year(tmp_path):
+    """Only captured donations count, consolidated per donor, NGO and year"""
+    db = make_session(tmp_path)
+    db.add_all([
+        donation(1, 1, 100, datetime(2024, 5, 1)),
+        donation(1, 1, 200, datetime(2024, 6, 1)),
+        donation(1, 1, 999, datetime(2024, 6, 2), status=DonationStatus.FAILED),
+        donation(1, 2, 300, datetime(2024, 6, 1)),
+        donation(2, 1, 400, datetime(2025, 1, 1)),
+        donation(2, 1, 500, datetime(2025, 4, 1)),
+    ])
+    db.commit()
+
+    result = TaxStatementBuilder(batch_size=2, yield_per=2).rebuild(db)
+
+    statements = {
+        (s.donor_user_id, s.tenant_id, s.financial_year): (s.donation_count, s.total_amount)
+        for s in db.query(TaxStatement).all()
+    }
+    assert result["statements"] == 4
+    assert statements == {
+        (1, 1, "2024-25"): (2, Decimal("300.00")),
+        (1, 2, "2024-25"): (1, Decimal("300.00")),
+        (2, 1, "2024-25"): (1, Decimal("400.00")),
+        (2, 1, "2025-26"): (1, Decimal("500.00")),
+    }
+
+
+def test_incremental_rebuild_only_touches_affected_pairs(tmp_path):
+    """Late donations update their donor/NGO statements and leave others alone"""
+    db = make_session(tmp_path)
+    db.add_all([donation(1, 1, 100, datetime(2024, 5, 1)), donation(2, 1, 400, datetime(2024, 5, 1))])
+    db.commit()
+    builder = TaxStatementBuilder()
+    builder.rebuild(db)
+    untouched = db.query(TaxStatement).filter_by(donor_user_id=2).one()
+    untouched_id, untouched_generated_at = untouched.id, untouched.generated_at
+
+    late = datetime.now(timezone.utc) + timedelta(seconds=1)
+    db.add(donation(1, 1, 50, late))
+    db.commit()
+    result = builder.rebuild_incremental(db)
+
+    assert result["incremental"] is True
+    assert result["statements"] == 2
+    db.expire_all()
+    rebuilt = db.query(TaxStatement).filter_by(donor_user_id=1).order_by(TaxStatement.financial_year).all()
+    assert [s.total_amount for s in rebuilt] == [Decimal("100.00"), Decimal("50.00")]
+    other = db.query(TaxStatement).filter_by(donor_user_id=2).one()
+    assert (other.id, other.generated_at) == (untouched_id, untouched_generated_at)
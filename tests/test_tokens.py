@@ -0,0 +1,107 @@
+from fastapi import Depends, FastAPI
+from fastapi.testclient import TestClient
+
+from app.core.security import create_access_token, create_refresh_token, verify_token
+from app.core.tokens import TokenClaims, TokenMembership, TokenRevocations, access_claims
+from app.models import MembershipRole
+
+
+def test_claims_round_trip_through_jwt():
+    """Memberships and the token version survive signing and decoding"""
+    token = create_access_token(access_claims(7, 2, [(3, MembershipRole.NGO_ADMIN), (4, "VENDOR")]))
+
+    claims = TokenClaims.from_payload(verify_token(token))
+
+    assert (claims.user_id, claims.version) == (7, 2)
+    assert claims.membership(4) == TokenMembership(4, "VENDOR")
+    assert claims.has_role([MembershipRole.NGO_ADMIN]) and not claims.has_role(["PLATFORM_ADMIN"])
+    # Refresh tokens and tokens from before claims existed are not access claims
+    assert TokenClaims.from_payload(verify_token(create_refresh_token({"sub": "7"}))) is None
+    assert TokenClaims.from_payload({"sub": "7"}) is None
+
+
+def test_revocations_reload_after_ttl():
+    """Local revocations apply at once; others arrive on the next reload"""
+    remote = {}
+    revocations = TokenRevocations(lambda since: dict(remote), ttl=0)
+    old, new = TokenClaims(1, 0), TokenClaims(1, 1)
+
+    assert revocations.is_current(old)
+    remote[1] = 1
+    assert not revocations.is_current(old) and revocations.is_current(new)
+
+    revocations.revoke(2, 3)
+    assert not revocations.is_current(TokenClaims(2, 2))
+
+
+def test_revocations_are_forgotten_once_old_tokens_expired(monkeypatch):
+    """Entries only live as long as the access tokens they reject"""
+    from app.core import tokens
+
+    asked = []
+    revocations = TokenRevocations(lambda since: asked.append(since) or {}, ttl=0, window=60)
+    revocations.revoke(1, 2)
+    assert not revocations.is_current(TokenClaims(1, 1))
+
+    now = tokens.time.time() + 61
+    monkeypatch.setattr(tokens.time, "time", lambda: now)
+    assert revocations.is_current(TokenClaims(1, 1))
+    assert revocations._versions == {}
+    assert asked[-1] == now - 60
+
+
+def test_role_dependencies_use_claims_only(monkeypatch):
+    """Authorization is decided from the token; revoked tokens get 401"""
+    from app import deps
+
+    revocations = TokenRevocations()
+    monkeypatch.setattr(deps, "token_revocations", revocations)
+    app = FastAPI()
+
+    @app.get("/tenants/{tenant_id}/manage")
+    def manage(checked=Depends(deps.require_tenant_role([MembershipRole.NGO_ADMIN]))):
+        claims, membership = checked
+        return {"user_id": claims.user_id, "tenant_id": membership.tenant_id}
+
+    client = TestClient(app)
+    token = create_access_token(access_claims(5, 0, [(3, MembershipRole.NGO_ADMIN)]))
+    headers = {"Authorization": f"Bearer {token}"}
+
+    assert client.get("/tenants/3/manage", headers=headers).json() == {"user_id": 5, "tenant_id": 3}
+    assert client.get("/tenants/4/manage", headers=headers).status_code == 403
+    revocations.revoke(5, 1)
+    assert client.get("/tenants/3/manage", headers=headers).status_code == 401
+
+
+def test_membership_and_active_changes_revoke_tokens(sqlite_api):
+    """Demoting or deactivating a user revokes their tokens as soon as the change commits"""
+    from app.models import Membership, Tenant, User
+    from app.routers import admin
+
+    with sqlite_api.Session() as session:
+        session.add(Tenant(id=1, name="Platform", slug="platform"))
+        user = User(id=5, email="admin@example.org", hashed_password="x")
+        session.add_all([user, Membership(id=1, user=user, tenant_id=1, role=MembershipRole.PLATFORM_ADMIN)])
+        session.commit()
+        assert user.token_version == 0  # a new user has no tokens to revoke
+
+    sqlite_api.app.include_router(admin.router)
+
+    def list_users(version, role):
+        token = create_access_token(access_claims(5, version, [(1, role)]))
+        return sqlite_api.client.get("/admin/users", headers={"Authorization": f"Bearer {token}"}).status_code
+
+    assert list_users(0, MembershipRole.PLATFORM_ADMIN) == 200
+
+    with sqlite_api.Session() as session:
+        session.get(Membership, 1).role = MembershipRole.NGO_ADMIN
+        session.commit()
+    assert list_users(0, MembershipRole.PLATFORM_ADMIN) == 401
+    assert list_users(1, MembershipRole.NGO_ADMIN) == 403
+
+    with sqlite_api.Session() as session:
+        session.get(User, 5).is_active = False
+        session.commit()
+        assert session.get(User, 5).token_version == 2
+        assert session.get(User, 5).token_version_changed_at is not None
+    assert list_users(1, MembershipRole.NGO_ADMIN) == 401